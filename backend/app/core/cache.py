@@ -0,0 +1,317 @@
+"""
+Cache HTTP de respuestas para recursos de lectura frecuente.
+
+- Backend en memoria (LRU con TTL) por defecto; Redis opcional vía
+  `CACHE_REDIS_URL` (requiere el paquete `redis`) para compartir el cache
+  entre workers.
+- La llave incluye ruta, query string y rol del usuario (del JWT).
+- ETag débil + `If-None-Match` → 304 sin cuerpo.
+- Invalidación explícita por namespace: los endpoints que modifican las
+  tablas llaman `await response_cache.invalidate("cut_periods")`.
+
+Uso:
+    @router.get("/active")
+    @cached("cut_periods", ttl=60)
+    async def get_active_cut_period(...):
+        ...
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from anyio import from_thread
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .responses import ORJSONResponse
+from .security import decode_access_token
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - dependencia opcional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# (body, etag)
+CacheEntry = Tuple[bytes, str]
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class MemoryCacheBackend:
+    """LRU en proceso con expiración por entrada."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, CacheEntry]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, namespace: str) -> None:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        prefix = f"{namespace}:"
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+
+
+class RedisCacheBackend:
+    """
+    Backend compartido en Redis.
+
+    La invalidación incrementa un contador de generación por namespace; las
+    llaves de generaciones anteriores dejan de consultarse y expiran solas.
+    """
+
+    def __init__(self, url: str, prefix: str = "credinet:http"):
+        self.client = aioredis.from_url(url)
+        self.prefix = prefix
+
+    async def generation(self, namespace: str) -> int:
+        value = await self.client.get(f"{self.prefix}:gen:{namespace}")
+        return int(value) if value else 0
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        value = await self.client.hmget(f"{self.prefix}:{key}", "body", "etag")
+        if not value or value[0] is None:
+            return None
+        return value[0], value[1].decode()
+
+    async def set(self, key: str, entry: CacheEntry, ttl: int) -> None:
+        name = f"{self.prefix}:{key}"
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(name, mapping={"body": entry[0], "etag": entry[1]})
+            pipe.expire(name, ttl)
+            await pipe.execute()
+
+    async def invalidate(self, namespace: str) -> None:
+        await self.client.incr(f"{self.prefix}:gen:{namespace}")
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(f"{self.prefix}:*"):
+            await self.client.delete(key)
+
+
+# =============================================================================
+# CACHE DE RESPUESTAS
+# =============================================================================
+
+def weak_etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def request_role(request: Request) -> str:
+    """Rol(es) del usuario para separar respuestas por permisos."""
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        payload = decode_access_token(auth_header[7:])
+        if payload:
+            return ",".join(sorted(payload.get("roles") or [])) or "user"
+    return "anonymous"
+
+
+class ResponseCache:
+    """Cache de respuestas JSON con ETag e invalidación por namespace."""
+
+    def __init__(self, backend=None, default_ttl: int = 300, enabled: bool = True):
+        self.backend = backend or MemoryCacheBackend()
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    async def _key(self, namespace: str, request: Request) -> str:
+        generation = await self.backend.generation(namespace)
+        query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+        raw = f"{request.url.path}?{query}|{request_role(request)}"
+        return f"{namespace}:{generation}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    @staticmethod
+    def _response(body: bytes, etag: str, request: Request, cache_status: str) -> Response:
+        headers = {"ETag": etag, "X-Cache": cache_status, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def serve(
+        self,
+        request: Request,
+        namespace: str,
+        call: Callable[[], Any],
+        ttl: Optional[int] = None,
+        condition: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Devuelve la respuesta cacheada o ejecuta `call` y la guarda.
+
+        `condition(content)` permite cachear solo ciertos resultados (por
+        ejemplo, statements de períodos cerrados).
+        """
+        if not self.enabled or request.method != "GET":
+            return await call()
+
+        try:
+            key = await self._key(namespace, request)
+            entry = await self.backend.get(key)
+        except Exception as e:  # el cache nunca debe tumbar el endpoint
+            logger.warning(f"⚠️ Cache no disponible ({namespace}): {e}")
+            return await call()
+
+        if entry is not None:
+            self.hits += 1
+            return self._response(entry[0], entry[1], request, "HIT")
+
+        self.misses += 1
+        result = await call()
+
+        if isinstance(result, Response):
+            if result.status_code != 200 or not result.media_type or "json" not in result.media_type:
+                return result
+            body, content = result.body, None
+        else:
+            content = jsonable_encoder(result)
+            body = ORJSONResponse(content).body
+
+        etag = weak_etag(body)
+        if condition is None or condition(content if content is not None else result):
+            try:
+                await self.backend.set(key, (body, etag), ttl or self.default_ttl)
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo guardar en cache ({namespace}): {e}")
+        return self._response(body, etag, request, "MISS")
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Hook de invalidación para los endpoints de escritura."""
+        for namespace in namespaces:
+            try:
+                await self.backend.invalidate(namespace)
+                logger.info(f"🧹 Cache invalidado: {namespace}")
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo invalidar cache ({namespace}): {e}")
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+def _build_backend():
+    if settings.cache_redis_url:
+        if aioredis is None:
+            logger.warning("⚠️ CACHE_REDIS_URL definido pero el paquete redis no está instalado; se usa cache en memoria")
+        else:
+            return RedisCacheBackend(settings.cache_redis_url)
+    return MemoryCacheBackend(settings.cache_max_entries)
+
+
+response_cache = ResponseCache(
+    backend=_build_backend(),
+    default_ttl=settings.cache_default_ttl,
+    enabled=settings.cache_enabled,
+)
+
+
+def cached(
+    namespace: str,
+    ttl: Optional[int] = None,
+    condition: Optional[Callable[[Any], bool]] = None,
+):
+    """
+    Decorador para endpoints GET cacheables.
+
+    Si el endpoint no declara un parámetro `Request`, se agrega uno oculto a
+    la firma para que FastAPI lo inyecte. Los endpoints síncronos se ejecutan
+    en el threadpool, igual que los maneja FastAPI.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        request_param = next(
+            (p.name for p in signature.parameters.values() if p.annotation is Request),
+            None,
+        )
+        injected = request_param is None
+        if injected:
+            request_param = "_cache_request"
+            params = list(signature.parameters.values()) + [
+                inspect.Parameter(request_param, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            ]
+            signature = signature.replace(parameters=params)
+
+        is_coroutine = asyncio.iscoroutinefunction(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.pop(request_param) if injected else kwargs[request_param]
+
+            async def call():
+                if is_coroutine:
+                    return await func(*args, **kwargs)
+                return await run_in_threadpool(func, *args, **kwargs)
+
+            return await response_cache.serve(request, namespace, call, ttl=ttl, condition=condition)
+
+        wrapper.__signature__ = signature
+        return wrapper
+
+    return decorator
+
+
+async def invalidate(*namespaces: str) -> None:
+    """Atajo de `response_cache.invalidate`."""
+    await response_cache.invalidate(*namespaces)
+
+
+def invalidate_from_thread(*namespaces: str) -> None:
+    """
+    Invalidación desde endpoints síncronos (corren en el threadpool).
+
+    Se ejecuta antes de devolver la respuesta, así la siguiente lectura del
+    cliente ya no ve datos viejos.
+    """
+    from_thread.run(response_cache.invalidate, *namespaces)
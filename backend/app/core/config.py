@@ -27,6 +27,12 @@ class Settings(BaseSettings):
     database_url: str
     db_echo: bool = False  # Log SQL queries
     
+    # Réplica de lectura (opcional): reportes y listados vía get_async_read_db
+    database_read_url: Optional[str] = None
+    read_replica_max_lag_seconds: float = 5.0  # más atraso → primario
+    read_your_writes_seconds: float = 10.0  # tras escribir, el usuario lee del primario
+    read_replica_lag_check_seconds: float = 1.0  # cada cuánto se mide el atraso
+    
     # Security
     secret_key: str
     algorithm: str = "HS256"
@@ -44,6 +50,44 @@ class Settings(BaseSettings):
     
     # API
     api_v1_prefix: str = "/api/v1"
+    
+    # Logging (cola en segundo plano; json o text)
+    log_level: str = "INFO"
+    log_format: str = "json"
+    # Muestreo de GETs por prefijo: "/api/v1/dashboard=0.1,/api/v1/notifications/health=0"
+    log_request_sampling: str = ""
+    log_slow_request_ms: int = 1000  # los requests lentos y los errores siempre se registran
+    
+    # Compresión de respuestas (brotli si está instalado, si no gzip)
+    compression_minimum_size: int = 1024  # bytes
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    
+    # Cache HTTP de respuestas (memoria por defecto; Redis opcional y compartido)
+    cache_enabled: bool = True
+    cache_default_ttl: int = 300  # segundos
+    cache_max_entries: int = 1024
+    cache_redis_url: Optional[str] = None
+    
+    # Warm-up al arrancar (pool, statements calientes, cache); /ready espera a que termine
+    warmup_enabled: bool = True
+    warmup_cache_roles: str = "administrador,auxiliar_administrativo,asociado"
+    warmup_timeout_seconds: float = 30.0
+    
+    # Almacenamiento de archivos (disco local por defecto; S3/MinIO requiere boto3)
+    storage_backend: str = "local"  # local | s3
+    upload_dir: str = "uploads/documents"
+    max_file_size: int = 10 * 1024 * 1024  # bytes
+    storage_s3_bucket: str = "credinet-documents"
+    storage_s3_prefix: str = ""
+    storage_s3_endpoint_url: Optional[str] = None  # p. ej. http://localhost:9000 (MinIO)
+    storage_s3_region: Optional[str] = None
+    storage_s3_access_key: Optional[str] = None
+    storage_s3_secret_key: Optional[str] = None
+    
+    # Render de estados de cuenta imprimibles (0 workers = sin pool de procesos)
+    statement_render_workers: int = 2
+    statement_render_batch_size: int = 25  # statements por tarea enviada al pool
 
 
 # Global settings instance
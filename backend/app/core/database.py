@@ -1,15 +1,21 @@
 """
 Database connection and session management using SQLAlchemy.
 """
+from fastapi import Request
 from sqlalchemy import create_engine, text
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator, AsyncGenerator, Optional
+from typing import Dict, Generator, AsyncGenerator, Optional
 from contextvars import ContextVar
+import asyncio
+import logging
+import time
 
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 # ============================================================================= 
 # CONTEXT VAR para almacenar el usuario actual (thread-safe)
 # =============================================================================
@@ -67,6 +73,111 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+# =============================================================================
+# RÉPLICA DE LECTURA (opcional, DATABASE_READ_URL)
+# =============================================================================
+async_read_engine: Optional[AsyncEngine] = None
+AsyncReadSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.database_read_url:
+    async_read_engine = create_async_engine(
+        settings.database_read_url.replace("postgresql://", "postgresql+asyncpg://"),
+        echo=settings.db_echo,
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=10
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False
+    )
+
+# Segundos de atraso de la réplica. Si ya reprodujo todo lo recibido cuenta
+# como 0 (pg_last_xact_replay_timestamp no avanza cuando el primario está
+# ocioso); en un primario siempre es 0.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReadReplicaRouter:
+    """
+    Decide por request si una lectura puede ir a la réplica.
+
+    - Sin réplica configurada → primario.
+    - Read-your-writes: un usuario que hizo POST/PUT/PATCH/DELETE en los
+      últimos `read_your_writes_seconds` lee del primario (registro en
+      memoria del proceso, lo alimenta el middleware de auditoría).
+    - Atraso medido mayor a `max_lag_seconds`, o réplica caída → primario.
+      El atraso se mide a lo más una vez por `check_interval` segundos.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[AsyncEngine],
+        max_lag_seconds: float = 5.0,
+        read_your_writes_seconds: float = 10.0,
+        check_interval: float = 1.0,
+    ):
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.check_interval = check_interval
+        self._recent_writes: Dict[int, float] = {}
+        self._lag = float("inf")
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def note_write(self, user_id: int) -> None:
+        now = time.monotonic()
+        self._recent_writes[user_id] = now
+        if len(self._recent_writes) > 1024:
+            cutoff = now - self.read_your_writes_seconds
+            self._recent_writes = {u: t for u, t in self._recent_writes.items() if t >= cutoff}
+
+    def wrote_recently(self, user_id: Optional[int]) -> bool:
+        written_at = self._recent_writes.get(user_id) if user_id else None
+        return written_at is not None and time.monotonic() - written_at < self.read_your_writes_seconds
+
+    async def replica_lag(self) -> float:
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self._lag
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return self._lag
+            try:
+                async with self.engine.connect() as conn:
+                    lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0)
+                if self._lag == float("inf"):
+                    logger.info(f"📖 Réplica de lectura disponible (atraso {lag:.1f}s)")
+                self._lag = lag
+            except Exception as e:
+                if self._lag != float("inf"):
+                    logger.warning(f"⚠️ Réplica de lectura no disponible, usando primario: {e}")
+                self._lag = float("inf")
+            self._checked_at = time.monotonic()
+        return self._lag
+
+    async def use_replica(self, user_id: Optional[int] = None) -> bool:
+        if self.engine is None or self.wrote_recently(user_id):
+            return False
+        return await self.replica_lag() <= self.max_lag_seconds
+
+
+read_router = ReadReplicaRouter(
+    async_read_engine,
+    max_lag_seconds=settings.read_replica_max_lag_seconds,
+    read_your_writes_seconds=settings.read_your_writes_seconds,
+    check_interval=settings.read_replica_lag_check_seconds,
+)
+
 # Base class for SQLAlchemy models
 Base = declarative_base()
 
@@ -125,3 +236,32 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency injection for READ-ONLY async sessions (reportes y listados).
+    
+    Usa la réplica cuando `read_router` lo permite y si no el primario. La
+    transacción es READ ONLY en ambos casos y siempre se revierte. El
+    middleware agrega el header `X-DB-Route` (replica/primary).
+    
+    Usage in FastAPI routes:
+        @router.get("/stats")
+        async def get_stats(db: AsyncSession = Depends(get_async_read_db)):
+            ...
+    
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    use_replica = await read_router.use_replica(current_user_id_var.get())
+    session_factory = AsyncReadSessionLocal if use_replica else AsyncSessionLocal
+    request.state.db_route = "replica" if use_replica else "primary"
+
+    async with session_factory() as session:
+        try:
+            await session.execute(text("SET TRANSACTION READ ONLY"))
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
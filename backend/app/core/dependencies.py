@@ -164,3 +164,35 @@ def require_role(required_role: str):
                 detail=f"Requiere rol: {required_role}",
             )
     return _require_role
+
+
+# Roles del personal: pueden ver recursos de cualquier cliente o asociado
+STAFF_ROLES = {"admin", "desarrollador", "administrador", "auxiliar_administrativo", "supervisor"}
+
+
+def ensure_owner_or_staff(
+    owner_user_id: Optional[int],
+    user_id: int,
+    roles: List[str],
+    detail: str = "No tiene permisos para ver este recurso",
+) -> None:
+    """
+    Allow access only to the owner of a resource or to staff.
+    
+    Usage in routes (after loading the resource):
+        ensure_owner_or_staff(document.user_id, current_user_id, roles)
+    
+    Args:
+        owner_user_id: User that owns the resource (client or associate)
+        user_id: Current user ID
+        roles: Current user roles
+        detail: Error message
+    
+    Raises:
+        HTTPException: 403 if the user is neither the owner nor staff
+    """
+    if owner_user_id != user_id and not STAFF_ROLES.intersection(roles):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail,
+        )
@@ -0,0 +1,292 @@
+"""
+Eventos en vivo (LISTEN/NOTIFY → Server-Sent Events).
+
+Los triggers de migration_035_live_events.sql publican deltas pequeños en el
+canal `credinet_events` al confirmar cada transacción:
+
+    payment.registered  {count, payment_ids, loan_ids, cut_period_ids}
+    statement.paid      {count, statement_ids, associate_user_ids, cut_period_ids}
+    loan.approved       {count, loan_ids, associate_user_ids}
+    period.advanced     {count, periods: [{id, cut_code, from_status_id, status_id}]}
+    notification        {id, event_type, title, level, entity_type, entity_id}
+
+Cada proceso abre UNA conexión asyncpg dedicada a LISTEN (fuera del pool de
+SQLAlchemy) y reparte los eventos a las colas de los clientes conectados. El
+frontend solo vuelve a pedir lo que cambió en lugar de hacer polling.
+
+- Reconexión automática con backoff; al recuperar la conexión se emite
+  `resync` porque las notificaciones de ese intervalo se perdieron.
+- Buffer circular de eventos recientes para reanudar con `Last-Event-ID`.
+  Si el id es de otro proceso (otro worker o un reinicio) o ya salió del
+  buffer, el cliente recibe `resync` y debe recargar todo.
+- Un cliente lento que llena su cola recibe `resync` en lugar de bloquear
+  a los demás.
+
+Uso:
+    async with live_events.subscribe(types={"payment.registered"}) as sub:
+        event = await sub.get()
+
+Caches en proceso que se invalidan por NOTIFY usan EventWatcher: una tarea de
+fondo por worker que llama al handler con cada evento (y con cada `resync`).
+"""
+import asyncio
+import itertools
+import json
+import logging
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from .config import settings
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - viene con requirements.txt
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "credinet_events"
+
+# Evento sintético: el cliente debe recargar todo lo que muestra
+RESYNC = "resync"
+
+
+@dataclass
+class LiveEvent:
+    """Evento recibido de Postgres, numerado por el broker."""
+
+    id: str
+    type: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
+
+    def to_sse(self) -> bytes:
+        payload = json.dumps(self.data, separators=(",", ":"), default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    """Cola de eventos de un cliente conectado."""
+
+    def __init__(self, types: Optional[Set[str]], queue_size: int):
+        self.types = types
+        self.queue: "asyncio.Queue[LiveEvent]" = asyncio.Queue(maxsize=queue_size)
+
+    def wants(self, event: LiveEvent) -> bool:
+        return event.type == RESYNC or not self.types or event.type in self.types
+
+    def offer(self, event: LiveEvent) -> None:
+        if not self.wants(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente lento: se descarta lo pendiente y se le pide recargar
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(LiveEvent(id=event.id, type=RESYNC, seq=event.seq))
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[LiveEvent]:
+        """Siguiente evento, o None si se agota `timeout`."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LiveEventBroker:
+    """Escucha el canal de Postgres y reparte los eventos en el proceso."""
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        channel: str = CHANNEL,
+        queue_size: int = 100,
+        replay_size: int = 256,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        # Prefijo por proceso: los ids de otro worker no son comparables
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._recent: Deque[LiveEvent] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    # -------------------------------------------------------------------------
+    # Publicación
+    # -------------------------------------------------------------------------
+
+    def publish(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> LiveEvent:
+        seq = self._last_seq = next(self._seq)
+        event = LiveEvent(id=f"{self.boot_id}-{seq}", type=event_type, data=data or {}, seq=seq)
+        if event_type != RESYNC:
+            self._recent.append(event)
+        for subscriber in list(self._subscribers):
+            subscriber.offer(event)
+        return event
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self.publish(message["type"], message.get("data") or {})
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Evento en vivo inválido en {channel}: {e}")
+
+    def replay_since(self, last_event_id: Optional[str]) -> Optional[List[LiveEvent]]:
+        """
+        Eventos posteriores a `last_event_id`.
+
+        Regresa None si no se puede reanudar (id de otro proceso o fuera del
+        buffer); el llamador debe mandar `resync`.
+        """
+        if not last_event_id:
+            return []
+        boot_id, _, seq = last_event_id.partition("-")
+        if boot_id != self.boot_id or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if self._recent and seq < self._recent[0].seq - 1:
+            return None
+        return [event for event in self._recent if event.seq > seq]
+
+    # -------------------------------------------------------------------------
+    # Suscripción
+    # -------------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def subscribe(
+        self,
+        types: Optional[Set[str]] = None,
+        last_event_id: Optional[str] = None,
+    ) -> AsyncIterator[Subscription]:
+        subscription = Subscription(types, self.queue_size)
+        missed = self.replay_since(last_event_id)
+        if missed is None:
+            subscription.offer(
+                LiveEvent(id=f"{self.boot_id}-{self._last_seq}", type=RESYNC, seq=self._last_seq)
+            )
+        else:
+            for event in missed:
+                subscription.offer(event)
+
+        self._subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscribers.discard(subscription)
+
+    # -------------------------------------------------------------------------
+    # Conexión LISTEN
+    # -------------------------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._task is not None or asyncpg is None:
+            return
+        self._task = asyncio.create_task(self._listen_forever(), name="live-events")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._connected.clear()
+
+    async def _listen_forever(self) -> None:
+        delay = 1.0
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn or settings.database_url)
+                await connection.add_listener(self.channel, self._on_notification)
+                self._connected.set()
+                delay = 1.0
+                if not first:
+                    logger.info("🔌 Eventos en vivo: conexión recuperada")
+                    self.publish(RESYNC)
+                first = False
+
+                # asyncpg entrega las notificaciones por callback; aquí solo
+                # se vigila que la conexión siga viva
+                while not connection.is_closed():
+                    await asyncio.sleep(15)
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Eventos en vivo sin conexión ({e}); reintento en {delay:.0f}s")
+            finally:
+                self._connected.clear()
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+# Instancia global
+live_events = LiveEventBroker()
+
+
+class EventWatcher:
+    """
+    Consumidor en proceso de eventos en vivo.
+
+    Llama `handler(event)` con cada evento de `types` y también con `resync`
+    (se reconectó el LISTEN o se llenó la cola y pudo perderse un aviso: el
+    handler debe descartar todo lo que tenga en cache).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        types: Set[str],
+        handler: Callable[[LiveEvent], Awaitable[None]],
+        broker: Optional[LiveEventBroker] = None,
+    ):
+        self.name = name
+        self.types = types
+        self.handler = handler
+        self.broker = broker or live_events
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        async with self.broker.subscribe(types=self.types) as subscription:
+            while True:
+                event = await subscription.get()
+                try:
+                    await self.handler(event)
+                except Exception as e:
+                    logger.warning(f"⚠️ {self.name}: falló el manejo de {event.type}: {e}")
@@ -0,0 +1,268 @@
+"""
+Logging estructurado sin bloquear el event loop.
+
+- Todos los loggers propagan al root, que solo tiene un QueueHandler: el
+  request encola el LogRecord y un QueueListener en un hilo aparte formatea
+  y escribe a stdout. Ninguna escritura a disco/consola ocurre en el loop.
+- Formato JSON (LOG_FORMAT=json, por defecto) o texto para desarrollo.
+- Campos de contexto en cada línea: request_id, user_id y route, tomados de
+  ContextVars que llena el middleware de requests.
+- Tiempo de base de datos por request (db_ms, db_queries) medido con
+  eventos de SQLAlchemy sobre ambos engines.
+- Muestreo por ruta para GETs de alto volumen (LOG_REQUEST_SAMPLING); los
+  errores y los requests lentos siempre se registran.
+
+Uso:
+    setup_logging()          # una vez, al importar app.main
+    # shutdown_logging() corre en atexit y vacía lo pendiente
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+from .database import current_user_id_var
+
+# =============================================================================
+# CONTEXTO POR REQUEST
+# =============================================================================
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+route_var: ContextVar[Optional[str]] = ContextVar("route", default=None)
+
+
+class DbTimer:
+    """Acumula el tiempo de SQL de un request (compartido con sus subtareas)."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    @property
+    def ms(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+
+db_timer_var: ContextVar[Optional[DbTimer]] = ContextVar("db_timer", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    timer = db_timer_var.get()
+    if timer is not None:
+        timer.queries += 1
+        timer.seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine) -> None:
+    """Registra el cronómetro de SQL en un engine (sync o el sync_engine de uno async)."""
+    from sqlalchemy import event
+
+    target = getattr(engine, "sync_engine", engine)
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+# =============================================================================
+# FILTRO Y FORMATOS
+# =============================================================================
+
+# Atributos propios de LogRecord: lo demás viene de `extra=` y va al JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "color_message",  # color_message: duplicado con ANSI de uvicorn
+}
+_CONTEXT_FIELDS = ("request_id", "user_id", "route")
+
+
+class RequestContextFilter(logging.Filter):
+    """Copia el contexto del request al record (se evalúa en el hilo del request)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.user_id = current_user_id_var.get()
+        record.route = route_var.get()
+        return True
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deja el mensaje ya resuelto pero conserva el traceback
+    aparte (el prepare() estándar lo pega al mensaje).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por record; los `extra=` se agregan como campos."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for name in _CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and name not in _CONTEXT_FIELDS and not name.startswith("_"):
+                entry[name] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legible para desarrollo, con el request_id al final."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{line} [{request_id}]" if request_id else line
+
+
+# =============================================================================
+# MUESTREO DE REQUESTS
+# =============================================================================
+
+def parse_sampling(spec: str) -> List[Tuple[str, float]]:
+    """
+    "/api/v1/dashboard=0.1,/api/v1/notifications/health=0" → reglas por
+    prefijo de ruta, la más específica primero.
+    """
+    rules = []
+    for item in (spec or "").split(","):
+        prefix, _, rate = item.strip().partition("=")
+        if prefix and rate:
+            rules.append((prefix.strip(), min(max(float(rate), 0.0), 1.0)))
+    return sorted(rules, key=lambda rule: len(rule[0]), reverse=True)
+
+
+class RequestSampler:
+    """Decide si se registra la línea de un request."""
+
+    def __init__(self, rules: List[Tuple[str, float]], slow_ms: float):
+        self.rules = rules
+        self.slow_ms = slow_ms
+
+    def rate_for(self, path: str) -> float:
+        for prefix, rate in self.rules:
+            if path.startswith(prefix):
+                return rate
+        return 1.0
+
+    def should_log(self, method: str, path: str, status_code: int, duration_ms: float) -> bool:
+        if method not in ("GET", "HEAD") or status_code >= 400 or duration_ms >= self.slow_ms:
+            return True
+        rate = self.rate_for(path)
+        return rate >= 1.0 or random.random() < rate
+
+
+request_sampler = RequestSampler(parse_sampling(settings.log_request_sampling), settings.log_slow_request_ms)
+
+
+# =============================================================================
+# INSTALACIÓN
+# =============================================================================
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    """Reemplaza los handlers del root por QueueHandler → QueueListener(stdout)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = logging.DEBUG if settings.debug else getattr(logging, settings.log_level.upper(), logging.INFO)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if settings.log_format == "json" else TextFormatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    # uvicorn trae sus propios handlers de consola: que pasen por la cola.
+    # Su access log se apaga porque log_requests ya emite la línea del request.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Escribe lo pendiente en la cola y detiene el hilo."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def queued_handler(handler: logging.Handler) -> logging.Handler:
+    """
+    Envuelve un handler bloqueante (archivo, red) en su propia cola, para
+    loggers que necesitan un destino adicional.
+    """
+    handler_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(handler_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler = ContextQueueHandler(handler_queue)
+    queue_handler.setLevel(handler.level)
+    queue_handler.addFilter(RequestContextFilter())
+    return queue_handler
+
+
+def request_log_fields(method: str, path: str, status_code: int, duration_ms: float) -> Dict:
+    """Campos `extra=` de la línea de request."""
+    timer = db_timer_var.get()
+    fields = {
+        "method": method,
+        "path": path,
+        "status": status_code,
+        "duration_ms": round(duration_ms, 2),
+    }
+    if timer is not None:
+        fields["db_ms"] = timer.ms
+        fields["db_queries"] = timer.queries
+    return fields
@@ -8,9 +8,19 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import logging
 import time
+import uuid
 
 from .config import settings
-from .database import set_current_user
+from .compression import CompressionMiddleware
+from .database import read_router, set_current_user
+from .logging_config import (
+    DbTimer,
+    db_timer_var,
+    request_id_var,
+    request_log_fields,
+    request_sampler,
+    route_var,
+)
 from .security import decode_access_token
 from .exceptions import (
     AppException,
@@ -40,6 +50,14 @@ def setup_middleware(app: FastAPI):
         allow_headers=["*"],
     )
     
+    # Compresión brotli/gzip para respuestas grandes (listados, previews)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.gzip_level,
+        brotli_quality=settings.brotli_quality,
+    )
+    
     # Exception handlers
     
     @app.exception_handler(NotFoundException)
@@ -137,20 +155,31 @@ def setup_middleware(app: FastAPI):
     # Request logging middleware
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
-        start_time = time.time()
-        
-        logger.info(f"Request: {request.method} {request.url.path}")
+        """
+        Una línea por request (JSON con request_id, user_id, route y tiempo
+        de BD). Los GETs de alto volumen se muestrean según
+        LOG_REQUEST_SAMPLING; errores y requests lentos siempre se registran.
+        """
+        start_time = time.perf_counter()
+        request_id = request.headers.get("X-Request-ID", "")[:64] or uuid.uuid4().hex[:16]
+        request_id_var.set(request_id)
+        route_var.set(request.url.path)
+        db_timer_var.set(DbTimer())
         
         response = await call_next(request)
         
-        process_time = time.time() - start_time
-        logger.info(
-            f"Response: {response.status_code} | "
-            f"Time: {process_time:.3f}s | "
-            f"Path: {request.url.path}"
-        )
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        route = request.scope.get("route")
+        if route is not None:
+            route_var.set(getattr(route, "path", request.url.path))
+        if request_sampler.should_log(request.method, request.url.path, response.status_code, duration_ms):
+            logger.info(
+                f"{request.method} {request.url.path} → {response.status_code} ({duration_ms:.1f} ms)",
+                extra=request_log_fields(request.method, request.url.path, response.status_code, duration_ms),
+            )
         
-        response.headers["X-Process-Time"] = str(process_time)
+        response.headers["X-Process-Time"] = f"{duration_ms / 1000:.4f}"
+        response.headers["X-Request-ID"] = request_id
         return response
 
     # Middleware para setear el usuario actual para auditoría
@@ -178,4 +207,13 @@ def setup_middleware(app: FastAPI):
             set_current_user(user_id)
         
         response = await call_next(request)
+        
+        # Read-your-writes: sus siguientes lecturas van al primario
+        if user_id and request.method not in ("GET", "HEAD", "OPTIONS"):
+            read_router.note_write(user_id)
+        
+        # Base usada por get_async_read_db (réplica o primario)
+        db_route = getattr(request.state, "db_route", None)
+        if db_route:
+            response.headers["X-DB-Route"] = db_route
         return response
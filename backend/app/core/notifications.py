@@ -32,7 +32,6 @@ Opcionales para email:
 """
 import os
 import logging
-import httpx
 from datetime import datetime
 from typing import Optional, Literal
 from zoneinfo import ZoneInfo
@@ -100,6 +99,7 @@ class NotificationService:
         }
         
         try:
+            import httpx  # diferido: httpx (+trio) suma ~250 ms al arranque
             async with httpx.AsyncClient(timeout=10.0) as client:
                 response = await client.post(url, data=payload)
                 return response.status_code == 200
@@ -119,6 +119,7 @@ class NotificationService:
         content = f"{emoji} **{title}**\n\n{message}{created_line}\n\n📍 Servidor: `{self.hostname}`\n🕐 Chihuahua: `{chi_ts}`\n🌐 UTC: `{utc_ts}`"
         
         try:
+            import httpx
             async with httpx.AsyncClient(timeout=10.0) as client:
                 response = await client.post(
                     self.discord_webhook,
@@ -0,0 +1,138 @@
+"""
+Registro de consultas SQL calientes.
+
+Varios endpoints armaban su SQL en cada request (WHERE concatenados,
+f-strings, valores interpolados). Cada combinación de filtros era un texto
+distinto para el cache de prepared statements de asyncpg (por conexión y por
+texto exacto), así que muchas variantes nunca se reutilizaban, y un valor
+interpolado era además una inyección de SQL.
+
+Aquí cada consulta se declara una vez, al importar el módulo:
+
+- Filtros opcionales dentro del mismo texto, con parámetros enlazados:
+  `(CAST(:status AS VARCHAR) IS NULL OR ag.status = :status)`. El CAST le da
+  tipo al parámetro cuando llega NULL.
+- Cuando las variantes cambian la forma de la consulta (keyset vs OFFSET),
+  `register_variants()` compila una consulta por variante con fragmentos
+  fijos del código; los valores siempre van como parámetros.
+
+Cada ejecución registra llamadas, errores y tiempo por consulta
+(GET /metrics/queries).
+
+Uso:
+    LIST_THINGS = register_query("things.list", '''
+        SELECT ... WHERE (CAST(:kind AS VARCHAR) IS NULL OR t.kind = :kind)
+    ''')
+    result = await LIST_THINGS.execute(db, {"kind": kind})
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass
+class QueryStats:
+    """Contadores de una consulta registrada (por proceso)."""
+
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        self.calls += 1
+        self.errors += int(failed)
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "avg_ms": round(self.total_seconds * 1000 / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+        }
+
+
+class RegisteredQuery:
+    """Consulta con nombre: el texto SQL nunca cambia entre ejecuciones."""
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.statement = text(sql)
+        self.stats = QueryStats()
+
+    async def execute(self, db: AsyncSession, params: Optional[Mapping[str, Any]] = None) -> Result:
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await db.execute(self.statement, dict(params or {}))
+            failed = False
+            return result
+        finally:
+            self.stats.record(time.perf_counter() - start, failed)
+
+    def __repr__(self) -> str:
+        return f"RegisteredQuery({self.name!r})"
+
+
+class QueryRegistry:
+    """Consultas registradas por nombre."""
+
+    def __init__(self):
+        self._queries: Dict[str, RegisteredQuery] = {}
+
+    def register(self, name: str, sql: str) -> RegisteredQuery:
+        """
+        Declara una consulta. Registrar de nuevo el mismo nombre con el mismo
+        texto devuelve la existente (recarga de módulos).
+
+        Raises:
+            ValueError: si el nombre ya existe con otro texto
+        """
+        sql = sql.strip()
+        existing = self._queries.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"Consulta '{name}' ya registrada con otro SQL")
+            return existing
+        query = RegisteredQuery(name, sql)
+        self._queries[name] = query
+        return query
+
+    def register_variants(self, name: str, sql: str, **variants: str) -> Dict[str, RegisteredQuery]:
+        """
+        Compila una consulta por variante reemplazando `{variant}` en el SQL
+        con el fragmento fijo de cada una. Se registran como `name.variante`.
+        """
+        return {
+            variant: self.register(f"{name}.{variant}", sql.replace("{variant}", fragment))
+            for variant, fragment in variants.items()
+        }
+
+    def get(self, name: str) -> RegisteredQuery:
+        return self._queries[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Contadores por consulta, las de más tiempo acumulado primero."""
+        ranked = sorted(self._queries.values(), key=lambda q: q.stats.total_seconds, reverse=True)
+        return {query.name: query.stats.to_dict() for query in ranked}
+
+    def reset_stats(self) -> None:
+        for query in self._queries.values():
+            query.stats = QueryStats()
+
+
+# Instancia global
+query_registry = QueryRegistry()
+register_query = query_registry.register
+register_variants = query_registry.register_variants
@@ -0,0 +1,112 @@
+"""
+Serialización JSON rápida y sparse fieldsets (`?fields=`).
+
+`ORJSONResponse` es la clase de respuesta por defecto de la aplicación.
+Los endpoints con listados pesados pueden devolverla directamente (lo que
+evita el paso por `jsonable_encoder`) y recortar cada elemento con
+`apply_fields`.
+"""
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+import orjson
+from fastapi import Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """Tipos que orjson no serializa de forma nativa."""
+    if isinstance(obj, Decimal):
+        # Mismo criterio que jsonable_encoder: Decimal → float
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """Respuesta JSON serializada con orjson (Decimal, Pydantic, fechas)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+# =============================================================================
+# SPARSE FIELDSETS
+# =============================================================================
+
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+
+def parse_fields(fields: Optional[str]) -> Optional[FieldTree]:
+    """
+    Convierte `?fields=id,amount,payments.id` en un árbol de campos.
+
+    Un campo sin sub-campos (`payments`) conserva el valor completo;
+    con sub-campos (`payments.id`) se recorta cada elemento del valor.
+    """
+    if not fields:
+        return None
+    tree: FieldTree = {}
+    for raw in fields.split(","):
+        path = [p for p in raw.strip().split(".") if p]
+        node = tree
+        for i, name in enumerate(path):
+            last = i == len(path) - 1
+            if last:
+                # `payments` completo gana sobre `payments.id`
+                node[name] = None
+            else:
+                child = node.get(name, {})
+                if child is None:
+                    break
+                node[name] = child
+                node = child
+    return tree or None
+
+
+def sparse_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Campos a incluir por elemento, separados por coma (ej. id,amount,payments.id)",
+    ),
+) -> Optional[FieldTree]:
+    """Dependency: parsea el parámetro `fields` de la query."""
+    return parse_fields(fields)
+
+
+def _project(value: Any, tree: FieldTree) -> Any:
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    if isinstance(value, dict):
+        result = {}
+        for name, sub in tree.items():
+            if name in value:
+                result[name] = value[name] if sub is None else _project(value[name], sub)
+        return result
+    if isinstance(value, (list, tuple)):
+        return [_project(v, tree) for v in value]
+    return value
+
+
+def apply_fields(items: Iterable[Any], fields: Optional[FieldTree]) -> List[Any]:
+    """
+    Recorta cada elemento de un listado a los campos solicitados.
+
+    Sin `fields` devuelve los elementos sin cambios. Los campos desconocidos
+    se ignoran.
+    """
+    if not fields:
+        return list(items)
+    return [_project(item, fields) for item in items]
+
+
+def requested(fields: Optional[FieldTree], name: str) -> bool:
+    """Indica si un campo (de primer nivel) fue solicitado o si no hay filtro."""
+    return fields is None or name in fields
+
@@ -0,0 +1,571 @@
+"""
+Almacenamiento de archivos (documentos de clientes, evidencias de morosidad).
+
+- Direccionado por contenido: la llave de cada archivo es su SHA-256
+  (`sha256/ab/cd/abcd...`). Subir dos veces el mismo archivo (INE re-escaneado
+  y re-enviado) guarda una sola copia.
+- Subidas en streaming: el UploadFile se lee en bloques de `chunk_size`, se
+  hashea y se escribe a un área temporal conforme llega; al terminar se mueve
+  a su llave final o se descarta si ya existía. La memoria usada no depende
+  del tamaño del archivo (S3: como máximo una parte de `part_size`).
+- Descargas en streaming con `Range` (206) y condicionales (`If-None-Match`,
+  `If-Range`) usando el hash como ETag fuerte.
+- Tipo MIME: se detecta por los primeros bytes al subir (sniff_media_type);
+  el content_type del cliente no se usa para PDF/imágenes si no coincide.
+  Solo PDF e imágenes raster se sirven `inline`; todo lo demás (HTML, SVG,
+  texto...) va como `attachment` y siempre con `X-Content-Type-Options:
+  nosniff`, para que un archivo subido no se ejecute en el origen de la app.
+- Backends: disco local (`UPLOAD_DIR`, por defecto) o S3/MinIO
+  (`STORAGE_BACKEND=s3`, requiere el paquete `boto3`).
+
+Uso:
+    stored = await get_storage().save(upload_file)
+    ...
+    return await get_storage().download_response(request, stored.key, filename, stored.media_type)
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional, Tuple, Union
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+from .config import settings
+from .exceptions import BusinessException, NotFoundException
+
+try:
+    import boto3
+except ImportError:  # pragma: no cover - dependencia opcional
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+S3_PART_SIZE = 8 * 1024 * 1024  # S3 exige partes de al menos 5 MiB (salvo la última)
+
+
+class UploadTooLargeError(BusinessException):
+    """El archivo excede el tamaño máximo permitido."""
+
+    def __init__(self, max_size: int):
+        super().__init__(
+            f"El archivo excede el tamaño máximo de {max_size // (1024 * 1024)} MB",
+            details={"max_size": max_size},
+        )
+        self.max_size = max_size
+
+
+@dataclass
+class StoredObject:
+    """Resultado de una subida."""
+
+    key: str
+    sha256: str
+    size: int
+    created: bool  # False → el contenido ya existía (deduplicado)
+    media_type: str = "application/octet-stream"
+
+
+# Firmas de los tipos que se pueden mostrar inline
+MAGIC_NUMBERS = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+# Únicos tipos servidos con Content-Disposition: inline
+INLINE_MEDIA_TYPES = frozenset(["application/pdf", "image/png", "image/jpeg", "image/gif", "image/webp"])
+
+SNIFF_BYTES = 16
+
+
+def sniff_media_type(head: bytes, declared: Optional[str] = None) -> str:
+    """
+    Tipo MIME por los primeros bytes del archivo.
+
+    Si la firma no es de un tipo inline, el tipo declarado por el cliente se
+    conserva (se servirá como attachment), salvo que diga ser PDF/imagen sin
+    serlo: entonces application/octet-stream.
+    """
+    for magic, media_type in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+
+    declared = (declared or "").split(";")[0].strip().lower()
+    if not declared or declared in INLINE_MEDIA_TYPES:
+        return "application/octet-stream"
+    return declared
+
+
+def content_key(sha256: str) -> str:
+    return f"sha256/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def sha256_from_key(key: str) -> str:
+    return key.rsplit("/", 1)[-1]
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class Staging(ABC):
+    """Archivo en escritura: se llena por bloques y se publica con commit()."""
+
+    @abstractmethod
+    async def write(self, chunk: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def commit(self, key: str) -> bool:
+        """Publica en `key`; False si `key` ya existía (se descarta la copia)."""
+
+    @abstractmethod
+    async def abort(self) -> None:
+        ...
+
+
+class StorageBackend(ABC):
+    @abstractmethod
+    async def open_staging(self) -> Staging:
+        ...
+
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Tamaño en bytes o None si no existe."""
+
+    @abstractmethod
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> AsyncIterator[bytes]:
+        """Bytes [start, end] (inclusive) en bloques de `chunk_size`."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+
+class _LocalStaging(Staging):
+    def __init__(self, backend: "LocalStorageBackend", file):
+        self.backend = backend
+        self.file = file
+
+    async def write(self, chunk: bytes) -> None:
+        await run_in_threadpool(self.file.write, chunk)
+
+    async def commit(self, key: str) -> bool:
+        return await run_in_threadpool(self._commit, key)
+
+    def _commit(self, key: str) -> bool:
+        self.file.close()
+        path = self.backend.path(key)
+        if path.exists():
+            os.unlink(self.file.name)
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Atómico: dos subidas simultáneas del mismo contenido dejan un solo archivo
+        os.replace(self.file.name, path)
+        return True
+
+    async def abort(self) -> None:
+        await run_in_threadpool(self._abort)
+
+    def _abort(self) -> None:
+        self.file.close()
+        try:
+            os.unlink(self.file.name)
+        except FileNotFoundError:
+            pass
+
+
+class LocalStorageBackend(StorageBackend):
+    """Archivos bajo `root`; los temporales en `root/tmp` (mismo disco → rename atómico)."""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise NotFoundException("Archivo", key)
+        return path
+
+    async def open_staging(self) -> Staging:
+        def _open():
+            tmp_dir = self.root / "tmp"
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            return tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+        return _LocalStaging(self, await run_in_threadpool(_open))
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            return (await run_in_threadpool(os.stat, self.path(key))).st_size
+        except FileNotFoundError:
+            return None
+
+    async def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> AsyncIterator[bytes]:
+        file = await run_in_threadpool(open, self.path(key), "rb")
+        try:
+            await run_in_threadpool(file.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await run_in_threadpool(file.read, min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await run_in_threadpool(file.close)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await run_in_threadpool(os.unlink, self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+def _is_not_found(exc: Exception) -> bool:
+    code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class _S3Staging(Staging):
+    """
+    Sube por partes de `part_size` a una llave temporal. Un archivo que cabe
+    en una parte no usa multipart: se sube directo a su llave final.
+    """
+
+    def __init__(self, backend: "S3StorageBackend"):
+        self.backend = backend
+        self.tmp_key = backend.key(f"tmp/{uuid.uuid4().hex}")
+        self.buffer = bytearray()
+        self.upload_id: Optional[str] = None
+        self.parts = []
+
+    async def _flush_part(self) -> None:
+        b = self.backend
+        if self.upload_id is None:
+            response = await run_in_threadpool(
+                b.client.create_multipart_upload, Bucket=b.bucket, Key=self.tmp_key
+            )
+            self.upload_id = response["UploadId"]
+        part_number = len(self.parts) + 1
+        response = await run_in_threadpool(
+            b.client.upload_part, Bucket=b.bucket, Key=self.tmp_key,
+            UploadId=self.upload_id, PartNumber=part_number, Body=bytes(self.buffer),
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self.buffer.clear()
+
+    async def write(self, chunk: bytes) -> None:
+        self.buffer += chunk
+        if len(self.buffer) >= self.backend.part_size:
+            await self._flush_part()
+
+    async def commit(self, key: str) -> bool:
+        b = self.backend
+        final_key = b.key(key)
+        exists = await b.size(key) is not None
+
+        if self.upload_id is None:
+            if not exists:
+                await run_in_threadpool(
+                    b.client.put_object, Bucket=b.bucket, Key=final_key, Body=bytes(self.buffer)
+                )
+            self.buffer.clear()
+            return not exists
+
+        if exists:
+            await self.abort()
+            return False
+        if self.buffer:
+            await self._flush_part()
+        await run_in_threadpool(
+            b.client.complete_multipart_upload, Bucket=b.bucket, Key=self.tmp_key,
+            UploadId=self.upload_id, MultipartUpload={"Parts": self.parts},
+        )
+        await run_in_threadpool(
+            b.client.copy_object, Bucket=b.bucket, Key=final_key,
+            CopySource={"Bucket": b.bucket, "Key": self.tmp_key},
+        )
+        await run_in_threadpool(b.client.delete_object, Bucket=b.bucket, Key=self.tmp_key)
+        return True
+
+    async def abort(self) -> None:
+        self.buffer.clear()
+        if self.upload_id is not None:
+            await run_in_threadpool(
+                self.backend.client.abort_multipart_upload,
+                Bucket=self.backend.bucket, Key=self.tmp_key, UploadId=self.upload_id,
+            )
+            self.upload_id = None
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    S3 o compatible (MinIO). `client` es un cliente con la API de boto3
+    (`boto3.client("s3", endpoint_url=...)`); las llamadas son síncronas y se
+    ejecutan en el threadpool.
+    """
+
+    def __init__(self, client, bucket: str, prefix: str = "", part_size: int = S3_PART_SIZE):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = part_size
+
+    def key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    async def open_staging(self) -> Staging:
+        return _S3Staging(self)
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            response = await run_in_threadpool(self.client.head_object, Bucket=self.bucket, Key=self.key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+        return response["ContentLength"]
+
+    async def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> AsyncIterator[bytes]:
+        response = await run_in_threadpool(
+            self.client.get_object, Bucket=self.bucket, Key=self.key(key), Range=f"bytes={start}-{end}"
+        )
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await run_in_threadpool(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=self.key(key))
+
+
+# =============================================================================
+# SERVICIO
+# =============================================================================
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta `Range: bytes=...` de un solo rango.
+
+    Returns:
+        (start, end) inclusive, o None para responder el archivo completo
+        (sin Range, unidad distinta a bytes o varios rangos).
+
+    Raises:
+        HTTPException 416: rango fuera del archivo
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if first == "":
+            # Sufijo: los últimos N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Rango no satisfacible",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+class DocumentStorage:
+    """
+    Sube y descarga archivos sobre un StorageBackend.
+
+    Args:
+        backend: Backend de almacenamiento
+        max_size: Tamaño máximo de subida en bytes
+        chunk_size: Tamaño de bloque de lectura/escritura
+    """
+
+    def __init__(self, backend: StorageBackend, max_size: int, chunk_size: int = CHUNK_SIZE):
+        self.backend = backend
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+
+    async def _chunks(self, source: Union[UploadFile, AsyncIterable[bytes]]) -> AsyncIterator[bytes]:
+        if isinstance(source, UploadFile):
+            while chunk := await source.read(self.chunk_size):
+                yield chunk
+        else:
+            try:
+                async for chunk in source:
+                    yield chunk
+            finally:
+                # Si se corta la subida (p. ej. excede max_size) cerrar también el origen
+                if hasattr(source, "aclose"):
+                    await source.aclose()
+
+    async def save(self, source: Union[UploadFile, AsyncIterable[bytes]]) -> StoredObject:
+        """
+        Guarda el contenido de `source` bajo su SHA-256.
+
+        Raises:
+            UploadTooLargeError: si excede `max_size` (no queda nada guardado)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        staging = await self.backend.open_staging()
+        chunks = self._chunks(source)
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_size:
+                    raise UploadTooLargeError(self.max_size)
+                digest.update(chunk)
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                await staging.write(chunk)
+            sha256 = digest.hexdigest()
+            created = await staging.commit(content_key(sha256))
+        except BaseException:
+            await staging.abort()
+            raise
+        finally:
+            await chunks.aclose()
+
+        key = content_key(sha256)
+        if not created:
+            logger.info(f"♻️ Archivo deduplicado {sha256[:12]} ({size} bytes)")
+        declared = source.content_type if isinstance(source, UploadFile) else None
+        return StoredObject(
+            key=key,
+            sha256=sha256,
+            size=size,
+            created=created,
+            media_type=sniff_media_type(head, declared),
+        )
+
+    async def save_bytes(self, data: bytes) -> StoredObject:
+        """Guarda contenido ya generado en memoria (p. ej. documentos renderizados)."""
+        async def _single():
+            yield data
+        return await self.save(_single())
+
+    async def download_response(
+        self,
+        request: Request,
+        key: str,
+        filename: Optional[str] = None,
+        media_type: Optional[str] = None,
+    ) -> Response:
+        """
+        Respuesta de descarga en streaming con soporte de Range y ETag.
+
+        - If-None-Match igual al ETag → 304
+        - Range de un solo intervalo → 206 (salvo If-Range con otro ETag)
+        - `inline` solo para INLINE_MEDIA_TYPES; lo demás como `attachment`
+
+        Raises:
+            NotFoundException: si el archivo no existe en el backend
+        """
+        size = await self.backend.size(key)
+        if size is None:
+            raise NotFoundException("Archivo", key)
+
+        etag = f'"{sha256_from_key(key)}"'
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, no-cache",
+            "X-Content-Type-Options": "nosniff",
+        }
+        media_type = (media_type or "application/octet-stream").split(";")[0].strip().lower()
+        disposition = "inline" if media_type in INLINE_MEDIA_TYPES else "attachment"
+        headers["Content-Disposition"] = (
+            f"{disposition}; filename*=UTF-8''{quote(filename)}" if filename else disposition
+        )
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+
+        byte_range = None
+        if_range = request.headers.get("if-range")
+        if not if_range or if_range.strip() == etag:
+            byte_range = parse_range(request.headers.get("range"), size)
+
+        status_code = 200
+        start, end = 0, size - 1
+        if byte_range:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+
+        body = self.backend.iter_range(key, start, end, self.chunk_size) if size else iter(())
+        return StreamingResponse(
+            body,
+            status_code=status_code,
+            media_type=media_type,
+            headers=headers,
+        )
+
+
+_storage: Optional[DocumentStorage] = None
+
+
+def build_backend() -> StorageBackend:
+    if settings.storage_backend == "s3":
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND=s3 requiere el paquete boto3")
+        client = boto3.client(
+            "s3",
+            endpoint_url=settings.storage_s3_endpoint_url,
+            region_name=settings.storage_s3_region,
+            aws_access_key_id=settings.storage_s3_access_key,
+            aws_secret_access_key=settings.storage_s3_secret_key,
+        )
+        return S3StorageBackend(client, settings.storage_s3_bucket, prefix=settings.storage_s3_prefix)
+    return LocalStorageBackend(settings.upload_dir)
+
+
+def get_storage() -> DocumentStorage:
+    """Instancia compartida según la configuración (STORAGE_BACKEND)."""
+    global _storage
+    if _storage is None:
+        _storage = DocumentStorage(build_backend(), max_size=settings.max_file_size)
+    return _storage
+
+
+__all__ = [
+    "DocumentStorage",
+    "LocalStorageBackend",
+    "S3StorageBackend",
+    "StorageBackend",
+    "StoredObject",
+    "UploadTooLargeError",
+    "content_key",
+    "get_storage",
+    "parse_range",
+]
@@ -0,0 +1,259 @@
+"""
+Warm-up del worker al arrancar.
+
+El primer request de cada worker pagaba el arranque en frío: abrir conexiones
+(handshake + introspección de tipos de asyncpg), compilar los statements del
+ORM y llenar el cache de catálogos. El warm-up lo hace en segundo plano justo
+después del startup:
+
+1. Pool: abre `pool_size` conexiones en cada engine (sync, async y réplica).
+2. Statements calientes: los ejecuta en cada conexión del pool, así quedan en
+   el cache de compilación de SQLAlchemy y en el cache de prepared statements
+   de cada conexión asyncpg.
+3. Cache: GET en proceso de los catálogos y perfiles de tasa, una vez por rol
+   de WARMUP_CACHE_ROLES (la llave del cache incluye el rol).
+
+`GET /ready` responde 503 hasta que el warm-up termina; `/health` sigue
+siendo el probe de vida. Un paso que falla se registra y no bloquea los
+demás: un worker frío es mejor que uno que nunca queda listo.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import async_engine, async_read_engine, engine
+
+logger = logging.getLogger(__name__)
+
+# Rutas cacheadas que todo cliente pide al cargar la app
+WARMUP_PATHS = (
+    "/rate-profiles/",
+    "/catalogs/roles",
+    "/catalogs/loan-statuses",
+    "/catalogs/payment-statuses",
+    "/catalogs/contract-statuses",
+    "/catalogs/cut-period-statuses",
+    "/catalogs/payment-methods",
+    "/catalogs/document-statuses",
+    "/catalogs/statement-statuses",
+    "/catalogs/config-types",
+    "/catalogs/level-change-types",
+    "/catalogs/associate-levels",
+    "/catalogs/document-types",
+)
+
+
+class WarmupState:
+    """Estado del warm-up que expone /ready."""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+        self.steps: Dict[str, Dict] = {}
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        if self.started_at is not None:
+            self.duration_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+
+    def to_dict(self) -> Dict:
+        return {"ready": self.ready, "duration_ms": self.duration_ms, "steps": self.steps}
+
+
+warmup_state = WarmupState()
+
+
+# =============================================================================
+# STATEMENTS CALIENTES
+# =============================================================================
+
+async def _async_hot_statements(session: AsyncSession) -> None:
+    """Consultas de login/auth y catálogos, por los mismos repositorios que usan las rutas."""
+    from app.modules.auth.infrastructure.repositories import PostgresUserRepository
+    from app.modules.catalogs.infrastructure.repositories import (
+        PostgreSQLLoanStatusRepository,
+        PostgreSQLPaymentStatusRepository,
+        PostgreSQLRoleRepository,
+    )
+
+    users = PostgresUserRepository(session)
+    await users.get_by_id(0)
+    await users.get_by_username("")
+    await PostgreSQLRoleRepository(session).find_all()
+    await PostgreSQLLoanStatusRepository(session).find_all()
+    await PostgreSQLPaymentStatusRepository(session).find_all()
+
+
+def _sync_hot_statements(session) -> None:
+    """Perfiles de tasa y tabla legacy en memoria (servicio síncrono del simulador y del alta de préstamos)."""
+    from app.modules.rate_profiles.application.services import RateProfileService
+
+    service = RateProfileService(session)
+    service.list_profiles(enabled_only=True)
+    service.legacy_grid()
+
+
+# =============================================================================
+# PASOS
+# =============================================================================
+
+async def warm_async_pool(
+    db_engine,
+    statements: Callable[[AsyncSession], Awaitable[None]] = _async_hot_statements,
+    size: Optional[int] = None,
+) -> int:
+    """
+    Abre `size` conexiones a la vez (por defecto pool_size) y ejecuta los
+    statements calientes en cada una. Al cerrar vuelven al pool ya abiertas.
+
+    Returns:
+        Número de conexiones calentadas
+    """
+    size = size or db_engine.pool.size()
+    opened = asyncio.Event()
+    pending = [size]
+
+    def arrive() -> None:
+        pending[0] -= 1
+        if pending[0] == 0:
+            opened.set()
+
+    async def one() -> None:
+        arrived = False
+        try:
+            async with db_engine.connect() as conn:
+                # Retener la conexión hasta que todas estén abiertas: si no,
+                # las tareas reutilizarían la misma conexión del pool.
+                arrived = True
+                arrive()
+                await opened.wait()
+                async with AsyncSession(bind=conn) as session:
+                    await statements(session)
+                await conn.rollback()
+        finally:
+            if not arrived:
+                arrive()
+
+    results = await asyncio.gather(*(one() for _ in range(size)), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        raise errors[0]
+    return size
+
+
+def warm_sync_pool(db_engine, statements: Callable = _sync_hot_statements, size: Optional[int] = None) -> int:
+    """Equivalente síncrono de warm_async_pool (corre en el threadpool)."""
+    from sqlalchemy.orm import Session
+
+    size = size or db_engine.pool.size()
+    connections = [db_engine.connect() for _ in range(size)]
+    try:
+        for conn in connections:
+            with Session(bind=conn) as session:
+                statements(session)
+            conn.rollback()
+    finally:
+        for conn in connections:
+            conn.close()
+    return size
+
+
+async def prime_response_cache(app, paths: Sequence[str], roles: Sequence[str]) -> int:
+    """
+    Pide cada ruta en proceso (ASGI) una vez por rol para llenar el cache de
+    respuestas. Pasa por todo el stack, así también quedan calientes el
+    routing, la validación y la serialización de esas rutas.
+
+    Returns:
+        Número de respuestas 200
+    """
+    import httpx
+
+    from .security import create_access_token
+
+    ok = 0
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://warmup") as client:
+        for role in roles:
+            token = create_access_token({"sub": "warmup", "roles": [role]})
+            headers = {"Authorization": f"Bearer {token}", "X-Request-ID": "warmup"}
+            for path in paths:
+                response = await client.get(path, headers=headers)
+                if response.status_code == 200:
+                    ok += 1
+                else:
+                    logger.warning(f"⚠️ Warm-up: {path} ({role}) respondió {response.status_code}")
+    return ok
+
+
+# =============================================================================
+# ORQUESTACIÓN
+# =============================================================================
+
+async def _step(state: WarmupState, name: str, coro: Awaitable) -> None:
+    started = time.perf_counter()
+    try:
+        result = await coro
+        state.steps[name] = {"ok": True, "result": result}
+    except Exception as e:
+        state.steps[name] = {"ok": False, "error": str(e)}
+        logger.warning(f"⚠️ Warm-up: falló {name}: {e}")
+    state.steps[name]["ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def run_warmup(app, state: WarmupState = warmup_state) -> WarmupState:
+    """Ejecuta todos los pasos y marca el worker como listo."""
+    from starlette.concurrency import run_in_threadpool
+
+    state.started_at = time.perf_counter()
+    roles: List[str] = [r.strip() for r in settings.warmup_cache_roles.split(",") if r.strip()]
+    paths = [f"{settings.api_v1_prefix}{path}" for path in WARMUP_PATHS]
+
+    async def steps() -> None:
+        pools = [
+            _step(state, "async_pool", warm_async_pool(async_engine)),
+            _step(state, "sync_pool", run_in_threadpool(warm_sync_pool, engine)),
+        ]
+        if async_read_engine is not None:
+            pools.append(_step(state, "read_pool", warm_async_pool(async_read_engine)))
+        await asyncio.gather(*pools)
+        await _step(state, "response_cache", prime_response_cache(app, paths, roles))
+
+    try:
+        await asyncio.wait_for(steps(), timeout=settings.warmup_timeout_seconds)
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ Warm-up: se agotaron {settings.warmup_timeout_seconds}s, se continúa en frío")
+
+    state.mark_ready()
+    logger.info(f"🔥 Warm-up completo en {state.duration_ms} ms", extra={"warmup": state.steps})
+    return state
+
+
+_task: Optional[asyncio.Task] = None
+
+
+def start_warmup(app) -> None:
+    """Lanza el warm-up en segundo plano (o marca listo si está deshabilitado)."""
+    global _task
+    if not settings.warmup_enabled:
+        warmup_state.mark_ready()
+        return
+    if _task is None:
+        _task = asyncio.create_task(run_warmup(app), name="warmup")
+
+
+async def stop_warmup() -> None:
+    """Cancela el warm-up si el worker se detiene antes de terminarlo."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
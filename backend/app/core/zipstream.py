@@ -0,0 +1,67 @@
+"""
+Zip en streaming.
+
+Arma un .zip mientras se envía: cada miembro se comprime bloque a bloque y
+los bytes salen en cuanto zipfile los escribe, sin archivo temporal ni el
+zip completo en memoria. Como la salida no admite seek, zipfile escribe
+los tamaños en un data descriptor después de cada miembro.
+
+Uso:
+    return StreamingResponse(stream_zip(entries), media_type="application/zip")
+"""
+import io
+import time
+import zipfile
+from typing import AsyncIterable, AsyncIterator, Tuple
+
+# (nombre dentro del zip, bloques del contenido)
+ZipEntry = Tuple[str, AsyncIterable[bytes]]
+
+
+class _Sink(io.RawIOBase):
+    """Destino sin seek: acumula lo que escribe zipfile hasta que se consume."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def stream_zip(
+    entries: AsyncIterable[ZipEntry],
+    compression: int = zipfile.ZIP_DEFLATED,
+) -> AsyncIterator[bytes]:
+    """
+    Genera los bytes de un zip con los miembros de `entries`, en orden.
+
+    Args:
+        entries: Pares (nombre, bloques); los bloques se leen uno a la vez
+        compression: zipfile.ZIP_DEFLATED o zipfile.ZIP_STORED
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode="w", compression=compression) as archive:
+        async for name, chunks in entries:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = compression
+            with archive.open(info, mode="w") as member:
+                async for chunk in chunks:
+                    member.write(chunk)
+                    if data := sink.take():
+                        yield data
+            if data := sink.take():
+                yield data
+    # Directorio central
+    yield sink.take()
+
+
+__all__ = ["ZipEntry", "stream_zip"]
@@ -3,18 +3,24 @@ CrediNet Backend v2.0 - Main Application
 Clean Architecture implementation with FastAPI
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.responses import JSONResponse
 import logging
 
 from app.core.config import settings
+from app.core.database import async_engine, async_read_engine, engine
+from app.core.logging_config import instrument_engine, setup_logging
+from app.core.dependencies import require_admin
 from app.core.middleware import setup_middleware
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO if not settings.debug else logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+from app.core.queries import query_registry
+from app.core.responses import ORJSONResponse
+from app.core.warmup import warmup_state
+
+# Configure logging (QueueHandler → hilo escritor; JSON por defecto)
+setup_logging()
+for db_engine in (engine, async_engine, async_read_engine):
+    if db_engine is not None:
+        instrument_engine(db_engine)
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +37,22 @@ async def lifespan(app: FastAPI):
     from app.scheduler import start_scheduler
     start_scheduler()
     
+    # Escuchar eventos en vivo (LISTEN credinet_events → SSE)
+    from app.core.events import live_events
+    await live_events.start()
+    
+    # Tabla legacy en memoria: se descarta con cada cambio (NOTIFY)
+    from app.modules.rate_profiles.application.legacy_table import legacy_grid_watcher
+    legacy_grid_watcher.start()
+    
+    # Snapshots de crédito por asociado: se invalidan con cada cambio (NOTIFY)
+    from app.modules.associates.application.credit_snapshots import credit_snapshot_watcher
+    credit_snapshot_watcher.start()
+    
+    # Warm-up en segundo plano: pool, statements calientes y cache (/ready)
+    from app.core.warmup import start_warmup, stop_warmup
+    start_warmup(app)
+    
     logger.info("✅ Backend iniciado correctamente")
     
     yield  # La aplicación corre aquí
@@ -38,6 +60,17 @@ async def lifespan(app: FastAPI):
     # === SHUTDOWN ===
     logger.info("🛑 Deteniendo CrediNet Backend...")
     
+    await stop_warmup()
+    
+    # Pool de procesos del render de statements
+    from app.modules.statements.application.rendering import shutdown_render_pool
+    shutdown_render_pool()
+    
+    # Cerrar la conexión LISTEN
+    await legacy_grid_watcher.stop()
+    await credit_snapshot_watcher.stop()
+    await live_events.stop()
+    
     # Detener el scheduler
     from app.scheduler import shutdown_scheduler
     shutdown_scheduler()
@@ -52,6 +85,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -89,6 +123,27 @@ def health_check():
     }
 
 
+@app.get("/ready", tags=["Health"])
+def readiness_check():
+    """
+    Readiness probe: 503 hasta que termina el warm-up del worker.
+    
+    Returns:
+        dict: Estado y pasos del warm-up
+    """
+    body = {"status": "ready" if warmup_state.ready else "warming_up", **warmup_state.to_dict()}
+    return ORJSONResponse(body, status_code=200 if warmup_state.ready else 503)
+
+
+@app.get("/metrics/queries", tags=["Health"], dependencies=[Depends(require_admin)])
+def query_metrics():
+    """
+    Llamadas, errores y tiempos de las consultas registradas (app.core.queries)
+    de este worker, las de más tiempo acumulado primero.
+    """
+    return {"queries": query_registry.stats()}
+
+
 # Register module routers
 from app.modules.auth.routes import router as auth_router
 from app.modules.catalogs import router as catalogs_router
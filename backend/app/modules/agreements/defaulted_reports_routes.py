@@ -21,7 +21,7 @@ IMPORTANTE sobre consolidated_debt:
 - pending_payments_total: lo que debe por préstamos activos (suma de associate_payment pendientes)
 - consolidated_debt: deuda adicional (morosos aprobados, penalizaciones, etc.)
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from pydantic import BaseModel
@@ -29,7 +29,9 @@ from typing import Optional, List
 from decimal import Decimal
 from datetime import datetime
 from app.modules.auth.routes import get_current_user_id
-from app.core.database import get_async_db
+from app.core.database import get_async_db, get_async_read_db
+from app.core.dependencies import ensure_owner_or_staff, get_current_user_roles
+from app.core.storage import UploadTooLargeError, get_storage
 
 router = APIRouter(prefix="/defaulted-reports", tags=["defaulted-reports"])
 
@@ -77,7 +79,7 @@ async def list_defaulted_reports(
     associate_profile_id: Optional[int] = None,
     limit: int = 50,
     offset: int = 0,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Lista todos los reportes de clientes morosos.
@@ -154,7 +156,7 @@ async def list_defaulted_reports(
 @router.get("/{report_id}", response_model=DefaultedReportResponseDTO)
 async def get_defaulted_report(
     report_id: int,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Obtiene detalle de un reporte específico."""
     query = text("""
@@ -503,7 +505,7 @@ async def reject_defaulted_report(
 @router.get("/associate/{associate_profile_id}", response_model=List[DefaultedReportResponseDTO])
 async def get_associate_defaulted_reports(
     associate_profile_id: int,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Lista reportes de morosos de un asociado específico."""
     result = await list_defaulted_reports(
@@ -513,3 +515,105 @@ async def get_associate_defaulted_reports(
         db=db
     )
     return result.items
+
+
+@router.post("/{report_id}/evidence", response_model=DefaultedReportResponseDTO)
+async def upload_defaulted_report_evidence(
+    report_id: int,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    current_user_roles: List[str] = Depends(get_current_user_roles)
+):
+    """
+    Adjunta (o reemplaza) el archivo de evidencia de un reporte PENDING o IN_REVIEW.
+    
+    El archivo se sube en streaming y se guarda bajo su SHA-256
+    (evidence_file_path = llave en el almacenamiento).
+    Solo el asociado que reporta o el personal.
+    """
+    result = await db.execute(
+        text("""
+            SELECT dcr.status, ap.user_id AS associate_user_id
+            FROM defaulted_client_reports dcr
+            LEFT JOIN associate_profiles ap ON ap.id = dcr.associate_profile_id
+            WHERE dcr.id = :report_id
+        """),
+        {"report_id": report_id}
+    )
+    report = result.fetchone()
+    if not report:
+        raise HTTPException(status_code=404, detail=f"Reporte #{report_id} no encontrado")
+    ensure_owner_or_staff(
+        report.associate_user_id, current_user_id, current_user_roles,
+        detail="No tiene permisos para modificar este reporte"
+    )
+    if report.status not in ('PENDING', 'IN_REVIEW'):
+        raise HTTPException(
+            status_code=400,
+            detail=f"No se puede cambiar la evidencia de un reporte {report.status}"
+        )
+    
+    try:
+        stored = await get_storage().save(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=e.message)
+    
+    await db.execute(text("""
+        UPDATE defaulted_client_reports
+        SET evidence_file_path = :key,
+            evidence_sha256 = :sha256,
+            evidence_file_name = :file_name,
+            evidence_mime_type = :mime_type,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = :report_id
+    """), {
+        "report_id": report_id,
+        "key": stored.key,
+        "sha256": stored.sha256,
+        "file_name": (file.filename or stored.sha256)[:255],
+        "mime_type": stored.media_type,
+    })
+    await db.commit()
+    
+    return await get_defaulted_report(report_id, db)
+
+
+@router.get("/{report_id}/evidence")
+async def download_defaulted_report_evidence(
+    report_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_id: int = Depends(get_current_user_id),
+    current_user_roles: List[str] = Depends(get_current_user_roles)
+):
+    """
+    Descarga en streaming la evidencia (Range → 206, If-None-Match → 304).
+    Solo el asociado que reporta o el personal.
+    """
+    result = await db.execute(
+        text("""
+            SELECT dcr.evidence_file_path, dcr.evidence_file_name, dcr.evidence_mime_type,
+                   ap.user_id AS associate_user_id
+            FROM defaulted_client_reports dcr
+            LEFT JOIN associate_profiles ap ON ap.id = dcr.associate_profile_id
+            WHERE dcr.id = :report_id
+        """),
+        {"report_id": report_id}
+    )
+    row = result.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Reporte #{report_id} no encontrado")
+    ensure_owner_or_staff(
+        row.associate_user_id, current_user_id, current_user_roles,
+        detail="No tiene permisos para ver este reporte"
+    )
+    if not row.evidence_file_path:
+        raise HTTPException(status_code=404, detail=f"El reporte #{report_id} no tiene evidencia adjunta")
+    
+    return await get_storage().download_response(
+        request,
+        row.evidence_file_path,
+        filename=row.evidence_file_name,
+        media_type=row.evidence_mime_type
+    )
@@ -24,7 +24,7 @@ FÓRMULA CLAVE:
     - available_credit += $Y (se libera crédito)
 """
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from pydantic import BaseModel
@@ -32,12 +32,11 @@ from typing import Optional, List
 from decimal import Decimal
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from app.core.database import get_async_db
+from app.core.database import get_async_db, get_async_read_db
 from app.core.notifications import notify
+from app.core.queries import register_query, register_variants
 from app.modules.auth.routes import get_current_user
 from .application.dtos import AgreementResponseDTO, AgreementListItemDTO, PaginatedAgreementsDTO
-from .application.use_cases import ListAgreementsUseCase, GetAssociateAgreementsUseCase
-from .infrastructure.repositories import PgAgreementRepository
 
 router = APIRouter(prefix="/agreements", tags=["agreements"])
 
@@ -111,64 +110,200 @@ class AgreementDetailDTO(BaseModel):
     total_paid: Decimal = Decimal('0')
     payments_made: int = 0
     next_payment_date: Optional[date] = None
+    remaining_balance: Decimal = Decimal('0')
     items: List[dict] = []
     payments: List[AgreementPaymentDTO] = []
 
 
 # ============== ENDPOINTS ==============
 
+# Columnas de agreements que exponen los endpoints (sin SELECT ag.*)
+AGREEMENT_COLUMNS = """
+    ag.id, ag.associate_profile_id, ag.agreement_number, ag.agreement_date,
+    ag.total_debt_amount, ag.payment_plan_months, ag.monthly_payment_amount,
+    ag.payment_plan_periods, ag.period_payment_amount, ag.payment_frequency,
+    ag.status, ag.start_date, ag.end_date, ag.created_by, ag.approved_by,
+    ag.notes, ag.created_at, ag.updated_at,
+    ag.total_paid, ag.payments_made, ag.next_due_date, ag.remaining_balance
+"""
+
+
+async def _refresh_agreement_progress(db: AsyncSession, agreement_id: int) -> None:
+    """
+    Recalcula las columnas de avance del convenio (migration 033).
+    
+    Se llama dentro de la transacción que modifica agreement_payments,
+    antes del commit.
+    """
+    await db.execute(
+        text("SELECT refresh_agreement_progress(:agreement_id)"),
+        {"agreement_id": agreement_id}
+    )
+
+
+async def _load_agreement_details(
+    db: AsyncSession,
+    where: str,
+    params: dict
+) -> List[AgreementDetailDTO]:
+    """
+    Carga convenios con sus items y pagos en tres consultas, sin importar
+    cuántos convenios coincidan con `where`.
+    """
+    result = await db.execute(text(f"""
+        SELECT 
+            {AGREEMENT_COLUMNS},
+            CONCAT(u.first_name, ' ', u.last_name) as associate_name
+        FROM agreements ag
+        LEFT JOIN associate_profiles ap ON ag.associate_profile_id = ap.id
+        LEFT JOIN users u ON ap.user_id = u.id
+        WHERE {where}
+        ORDER BY ag.id DESC
+    """), params)
+    agreements = result.fetchall()
+    if not agreements:
+        return []
+    
+    agreement_ids = [agreement.id for agreement in agreements]
+    
+    # Get items
+    items_query = text("""
+        SELECT ai.*, 
+               CONCAT(c.first_name, ' ', c.last_name) as client_name
+        FROM agreement_items ai
+        LEFT JOIN users c ON ai.client_user_id = c.id
+        WHERE ai.agreement_id = ANY(:agreement_ids)
+        ORDER BY ai.agreement_id, ai.id
+    """)
+    items_result = await db.execute(items_query, {"agreement_ids": agreement_ids})
+    items_by_agreement = {agreement_id: [] for agreement_id in agreement_ids}
+    for row in items_result.fetchall():
+        items_by_agreement[row.agreement_id].append(dict(row._mapping))
+    
+    # Get payments with cut_period info
+    payments_query = text("""
+        SELECT ap.*, cp.cut_code as cut_period_code
+        FROM agreement_payments ap
+        LEFT JOIN cut_periods cp ON cp.id = ap.cut_period_id
+        WHERE ap.agreement_id = ANY(:agreement_ids)
+        ORDER BY ap.agreement_id, ap.payment_number
+    """)
+    payments_result = await db.execute(payments_query, {"agreement_ids": agreement_ids})
+    payments_by_agreement = {agreement_id: [] for agreement_id in agreement_ids}
+    for row in payments_result.fetchall():
+        payments_by_agreement[row.agreement_id].append(AgreementPaymentDTO(
+            id=row.id,
+            agreement_id=row.agreement_id,
+            payment_number=row.payment_number,
+            payment_amount=row.payment_amount,
+            payment_due_date=row.payment_due_date,
+            cut_period_id=row.cut_period_id,
+            cut_period_code=row.cut_period_code,
+            payment_date=row.payment_date,
+            payment_method_id=row.payment_method_id,
+            payment_reference=row.payment_reference,
+            status=row.status,
+            created_at=row.created_at
+        ))
+    
+    return [
+        AgreementDetailDTO(
+            id=agreement.id,
+            associate_profile_id=agreement.associate_profile_id,
+            agreement_number=agreement.agreement_number,
+            agreement_date=agreement.agreement_date,
+            total_debt_amount=agreement.total_debt_amount,
+            payment_plan_months=agreement.payment_plan_months,
+            monthly_payment_amount=agreement.monthly_payment_amount,
+            payment_plan_periods=agreement.payment_plan_periods,
+            period_payment_amount=agreement.period_payment_amount,
+            payment_frequency=agreement.payment_frequency or 'monthly',
+            status=agreement.status,
+            start_date=agreement.start_date,
+            end_date=agreement.end_date,
+            created_by=agreement.created_by,
+            approved_by=agreement.approved_by,
+            notes=agreement.notes,
+            created_at=agreement.created_at,
+            updated_at=agreement.updated_at,
+            associate_name=agreement.associate_name,
+            total_paid=agreement.total_paid,
+            payments_made=agreement.payments_made,
+            next_payment_date=agreement.next_due_date,
+            remaining_balance=agreement.remaining_balance,
+            items=items_by_agreement[agreement.id],
+            payments=payments_by_agreement[agreement.id]
+        )
+        for agreement in agreements
+    ]
+
+
+_AGREEMENT_FILTERS = """
+    (CAST(:status AS VARCHAR) IS NULL OR ag.status = :status)
+    AND (CAST(:associate_profile_id AS INTEGER) IS NULL OR ag.associate_profile_id = :associate_profile_id)
+"""
+
+_COUNT_AGREEMENTS = register_query("agreements.count", f"""
+    SELECT COUNT(*) FROM agreements ag
+    WHERE {_AGREEMENT_FILTERS}
+""")
+
+_LIST_AGREEMENTS = register_variants("agreements.list", f"""
+    SELECT 
+        ag.id, ag.associate_profile_id, ag.agreement_number, ag.agreement_date,
+        ag.total_debt_amount, ag.status,
+        ag.monthly_payment_amount, ag.payment_plan_months,
+        ag.period_payment_amount, ag.payment_plan_periods, ag.payment_frequency,
+        ag.total_paid, ag.payments_made, ag.next_due_date, ag.remaining_balance,
+        CONCAT(u.first_name, ' ', u.last_name) as associate_name
+    FROM agreements ag
+    LEFT JOIN associate_profiles ap ON ag.associate_profile_id = ap.id
+    LEFT JOIN users u ON ap.user_id = u.id
+    WHERE {_AGREEMENT_FILTERS}
+    {{variant}}
+""",
+    keyset="AND ag.id < :cursor ORDER BY ag.id DESC LIMIT :limit",
+    offset="ORDER BY ag.id DESC LIMIT :limit OFFSET :offset",
+)
+
+
 @router.get("")
 async def list_agreements(
     status: Optional[str] = None,
     associate_profile_id: Optional[int] = None,
-    limit: int = 50,
-    offset: int = 0,
-    db: AsyncSession = Depends(get_async_db)
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[int] = Query(None, description="Keyset: id del último convenio de la página anterior (next_cursor)"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Lista convenios con filtros opcionales."""
-    query = """
-        SELECT 
-            ag.*,
-            CONCAT(u.first_name, ' ', u.last_name) as associate_name,
-            COALESCE((
-                SELECT SUM(payment_amount) 
-                FROM agreement_payments 
-                WHERE agreement_id = ag.id AND status = 'PAID'
-            ), 0) as total_paid,
-            (
-                SELECT COUNT(*) 
-                FROM agreement_payments 
-                WHERE agreement_id = ag.id AND status = 'PAID'
-            ) as payments_made
-        FROM agreements ag
-        LEFT JOIN associate_profiles ap ON ag.associate_profile_id = ap.id
-        LEFT JOIN users u ON ap.user_id = u.id
-        WHERE 1=1
     """
-    params = {}
-    
-    if status:
-        query += " AND ag.status = :status"
-        params["status"] = status
+    Lista convenios con filtros opcionales.
     
-    if associate_profile_id:
-        query += " AND ag.associate_profile_id = :associate_profile_id"
-        params["associate_profile_id"] = associate_profile_id
+    Paginación keyset por id DESC: enviar `cursor=<next_cursor>` para la
+    siguiente página. `offset` se mantiene por compatibilidad y se ignora
+    cuando viene `cursor`.
+    """
+    params = {
+        "status": status or None,
+        "associate_profile_id": associate_profile_id or None,
+    }
     
-    # Count
-    count_result = await db.execute(
-        text(f"SELECT COUNT(*) FROM ({query}) sub"), 
-        params
-    )
+    # Count (solo agreements, sin joins)
+    count_result = await _COUNT_AGREEMENTS.execute(db, params)
     total = count_result.scalar_one()
     
     # Pagination
-    query += " ORDER BY ag.created_at DESC LIMIT :limit OFFSET :offset"
-    params["limit"] = limit
-    params["offset"] = offset
+    if cursor is not None:
+        page_query = _LIST_AGREEMENTS["keyset"]
+        page_params = {**params, "limit": limit + 1, "cursor": cursor}
+    else:
+        page_query = _LIST_AGREEMENTS["offset"]
+        page_params = {**params, "limit": limit + 1, "offset": offset}
     
-    result = await db.execute(text(query), params)
+    result = await page_query.execute(db, page_params)
     rows = result.fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
     items = []
     for row in rows:
@@ -182,118 +317,40 @@ async def list_agreements(
             "associate_name": row.associate_name,
             "total_paid": row.total_paid,
             "payments_made": row.payments_made,
+            "next_due_date": row.next_due_date,
+            "remaining_balance": row.remaining_balance,
             # Legacy fields (for backward compatibility)
             "monthly_payment_amount": row.monthly_payment_amount,
             "payment_plan_months": row.payment_plan_months,
             # New biweekly fields
-            "period_payment_amount": getattr(row, 'period_payment_amount', None),
-            "payment_plan_periods": getattr(row, 'payment_plan_periods', None),
-            "payment_frequency": getattr(row, 'payment_frequency', 'monthly') or 'monthly',
+            "period_payment_amount": row.period_payment_amount,
+            "payment_plan_periods": row.payment_plan_periods,
+            "payment_frequency": row.payment_frequency or 'monthly',
         })
     
     return {
         "items": items,
         "total": total,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": rows[-1].id if has_more else None
     }
 
 
 @router.get("/{agreement_id}", response_model=AgreementDetailDTO)
 async def get_agreement_detail(
     agreement_id: int,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Obtiene detalle de un convenio con items y pagos."""
-    # Get agreement
-    query = text("""
-        SELECT 
-            ag.*,
-            CONCAT(u.first_name, ' ', u.last_name) as associate_name
-        FROM agreements ag
-        LEFT JOIN associate_profiles ap ON ag.associate_profile_id = ap.id
-        LEFT JOIN users u ON ap.user_id = u.id
-        WHERE ag.id = :agreement_id
-    """)
-    result = await db.execute(query, {"agreement_id": agreement_id})
-    agreement = result.fetchone()
+    details = await _load_agreement_details(
+        db, "ag.id = :agreement_id", {"agreement_id": agreement_id}
+    )
     
-    if not agreement:
+    if not details:
         raise HTTPException(status_code=404, detail="Convenio no encontrado")
     
-    # Get items
-    items_query = text("""
-        SELECT ai.*, 
-               CONCAT(c.first_name, ' ', c.last_name) as client_name
-        FROM agreement_items ai
-        LEFT JOIN users c ON ai.client_user_id = c.id
-        WHERE ai.agreement_id = :agreement_id
-        ORDER BY ai.id
-    """)
-    items_result = await db.execute(items_query, {"agreement_id": agreement_id})
-    items = [dict(row._mapping) for row in items_result.fetchall()]
-    
-    # Get payments with cut_period info
-    payments_query = text("""
-        SELECT ap.*, cp.cut_code as cut_period_code
-        FROM agreement_payments ap
-        LEFT JOIN cut_periods cp ON cp.id = ap.cut_period_id
-        WHERE ap.agreement_id = :agreement_id
-        ORDER BY ap.payment_number
-    """)
-    payments_result = await db.execute(payments_query, {"agreement_id": agreement_id})
-    payments = []
-    total_paid = Decimal('0')
-    payments_made = 0
-    next_payment_date = None
-    
-    for row in payments_result.fetchall():
-        payments.append(AgreementPaymentDTO(
-            id=row.id,
-            agreement_id=row.agreement_id,
-            payment_number=row.payment_number,
-            payment_amount=row.payment_amount,
-            payment_due_date=row.payment_due_date,
-            cut_period_id=row.cut_period_id,
-            cut_period_code=row.cut_period_code,
-            payment_date=row.payment_date,
-            payment_method_id=row.payment_method_id,
-            payment_reference=row.payment_reference,
-            status=row.status,
-            created_at=row.created_at
-        ))
-        if row.status == 'PAID':
-            total_paid += row.payment_amount
-            payments_made += 1
-        elif row.status == 'PENDING' and next_payment_date is None:
-            next_payment_date = row.payment_due_date
-    
-    return AgreementDetailDTO(
-        id=agreement.id,
-        associate_profile_id=agreement.associate_profile_id,
-        agreement_number=agreement.agreement_number,
-        agreement_date=agreement.agreement_date,
-        total_debt_amount=agreement.total_debt_amount,
-        payment_plan_months=agreement.payment_plan_months,
-        monthly_payment_amount=agreement.monthly_payment_amount,
-        payment_plan_periods=getattr(agreement, 'payment_plan_periods', None),
-        period_payment_amount=getattr(agreement, 'period_payment_amount', None),
-        payment_frequency=getattr(agreement, 'payment_frequency', 'monthly') or 'monthly',
-        status=agreement.status,
-        start_date=agreement.start_date,
-        end_date=agreement.end_date,
-        created_by=agreement.created_by,
-        approved_by=agreement.approved_by,
-        notes=agreement.notes,
-        created_at=agreement.created_at,
-        updated_at=agreement.updated_at,
-        associate_name=agreement.associate_name,
-        total_paid=total_paid,
-        payments_made=payments_made,
-        next_payment_date=next_payment_date,
-        items=items,
-        payments=payments
-    )
+    return details[0]
 
 
 @router.post("", response_model=AgreementDetailDTO)
@@ -470,6 +527,8 @@ async def create_agreement(
         
         payment_date = payment_date + relativedelta(months=1)
     
+    await _refresh_agreement_progress(db, agreement_id)
+    
     await db.commit()
     
     # Return created agreement
@@ -836,6 +895,8 @@ async def create_agreement_from_loans(
             # From last day of month, go to day 15 of NEXT month
             payment_date = (payment_date.replace(day=1) + relativedelta(months=1)).replace(day=15)
     
+    await _refresh_agreement_progress(db, agreement_id)
+    
     # 8. Verify available_credit didn't change
     verify_query = text("""
         SELECT credit_limit, pending_payments_total, consolidated_debt,
@@ -879,20 +940,14 @@ async def create_agreement_from_loans(
 @router.get("/associates/{associate_profile_id}", response_model=list[AgreementDetailDTO])
 async def get_associate_agreements(
     associate_profile_id: int,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Obtiene convenios de un asociado específico."""
-    repository = PgAgreementRepository(db)
-    use_case = GetAssociateAgreementsUseCase(repository)
-    agreements = await use_case.execute(associate_profile_id)
-    
-    # Get full details for each
-    details = []
-    for agreement in agreements:
-        detail = await get_agreement_detail(agreement.id, db)
-        details.append(detail)
-    
-    return details
+    return await _load_agreement_details(
+        db,
+        "ag.associate_profile_id = :associate_profile_id",
+        {"associate_profile_id": associate_profile_id}
+    )
 
 
 @router.post("/{agreement_id}/payments/{payment_number}", response_model=AgreementDetailDTO)
@@ -970,6 +1025,8 @@ async def register_agreement_payment(
     })
     
     # Record in associate_debt_payments for tracking
+    # (el libro de pagos lo registra como PAGO_CONVENIO, ver migración 038)
+    await db.execute(text("SELECT set_config('credinet.ledger_entry_type', 'PAGO_CONVENIO', true)"))
     await db.execute(text("""
         INSERT INTO associate_debt_payments (
             associate_profile_id,
@@ -995,8 +1052,10 @@ async def register_agreement_payment(
         "payment_reference": data.payment_reference,
         "notes": f"Pago #{payment_number} de convenio {agreement.agreement_number}"
     })
+    await db.execute(text("SELECT set_config('credinet.ledger_entry_type', '', true)"))
     
-    # Check if all payments are done
+    # Update denormalized progress and check if all payments are done
+    await _refresh_agreement_progress(db, agreement_id)
     pending_query = text("""
         SELECT COUNT(*) FROM agreement_payments
         WHERE agreement_id = :agreement_id AND status = 'PENDING'
@@ -1098,13 +1157,7 @@ async def cancel_agreement(
     loan_ids = [row.loan_id for row in loans_result.fetchall()]
     
     # Get paid amount (what was already paid shouldn't be restored)
-    paid_query = text("""
-        SELECT COALESCE(SUM(payment_amount), 0) as paid
-        FROM agreement_payments
-        WHERE agreement_id = :agreement_id AND status = 'PAID'
-    """)
-    paid_result = await db.execute(paid_query, {"agreement_id": agreement_id})
-    paid_amount = Decimal(str(paid_result.scalar_one()))
+    paid_amount = Decimal(str(agreement.total_paid))
     
     # Calculate amount to restore (what wasn't paid yet)
     remaining_debt = Decimal(str(agreement.total_debt_amount)) - paid_amount
@@ -1137,6 +1190,7 @@ async def cancel_agreement(
             updated_at = CURRENT_TIMESTAMP
         WHERE agreement_id = :agreement_id AND status = 'PENDING'
     """), {"agreement_id": agreement_id})
+    await _refresh_agreement_progress(db, agreement_id)
     
     # 3. Restore loan payments: IN_AGREEMENT (13) → PENDING (1)
     # Solo si los préstamos NO están en OTRO convenio ACTIVE
@@ -1284,7 +1338,7 @@ debt_breakdown_router = APIRouter(prefix="/associates", tags=["debt-breakdown"])
 async def get_debt_breakdown(
     associate_profile_id: int,
     is_liquidated: Optional[bool] = None,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Obtiene el desglose de deudas de un asociado.
@@ -0,0 +1,106 @@
+"""
+Cache de estado de crédito por asociado.
+
+El crédito de un asociado (límite, pagos pendientes, deuda consolidada,
+disponible y períodos con deuda) solo cambia cuando lo tocan los triggers de
+crédito de 07_triggers.sql (aprobación, pago, liquidación de deuda, cambio de
+nivel) o el cierre de período / convenios, y todos terminan en un UPDATE de
+associate_profiles o de associate_debt_summary. La migración 043 publica
+'associate.credit_changed' {count, user_ids} en esos dos casos.
+
+- Cada worker guarda un AssociateCreditSnapshot por user_id.
+- Cada aviso sube la versión de esos asociados (o de todos, si el aviso trae
+  la lista recortada o es un `resync`). Una lectura que empezó antes de un
+  aviso no se guarda: su versión ya no es la vigente.
+- Sin la conexión LISTEN no hay forma de enterarse de un cambio: mientras
+  falte, los snapshots no se guardan y se leen de la base en cada uso.
+"""
+import itertools
+import logging
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, Optional
+
+from app.core.events import RESYNC, EventWatcher, LiveEvent, live_events
+
+from ..domain.entities.associate import AssociateCreditSnapshot
+from ..domain.repositories.associate_repository import AssociateRepository
+
+logger = logging.getLogger(__name__)
+
+# Evento de la migración 043
+CREDIT_CHANGED_EVENT = "associate.credit_changed"
+
+
+class CreditSnapshotCache:
+    """Snapshots de crédito del proceso, versionados por asociado."""
+
+    def __init__(self, is_live: Optional[Callable[[], bool]] = None):
+        self._snapshots: Dict[int, AssociateCreditSnapshot] = {}
+        self._versions: Dict[int, int] = {}
+        self._clock = itertools.count(1)
+        self._epoch = 0
+        self._is_live = is_live or (lambda: live_events.connected)
+
+    def version(self, user_id: int) -> int:
+        return max(self._epoch, self._versions.get(user_id, 0))
+
+    async def get_many(
+        self,
+        repository: AssociateRepository,
+        user_ids: Iterable[int],
+    ) -> Dict[int, AssociateCreditSnapshot]:
+        """
+        Snapshots de los asociados pedidos (los que no existen se omiten).
+
+        Los que no están en cache se leen juntos en una sola consulta.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        live = self._is_live()
+        found = {
+            user_id: self._snapshots[user_id]
+            for user_id in user_ids
+            if live and user_id in self._snapshots
+        }
+
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        if missing:
+            versions = {user_id: self.version(user_id) for user_id in missing}
+            loaded = await repository.find_credit_snapshots(missing)
+            store = live and self._is_live()
+            for user_id, snapshot in loaded.items():
+                snapshot = replace(snapshot, version=versions[user_id])
+                if store and self.version(user_id) == versions[user_id]:
+                    self._snapshots[user_id] = snapshot
+                found[user_id] = snapshot
+        return found
+
+    async def get(self, repository: AssociateRepository, user_id: int) -> Optional[AssociateCreditSnapshot]:
+        return (await self.get_many(repository, [user_id])).get(user_id)
+
+    def invalidate(self, user_ids: Optional[Iterable[int]] = None) -> None:
+        """Descarta los snapshots de esos asociados (o todos con None)."""
+        version = next(self._clock)
+        if user_ids is None:
+            self._epoch = version
+            self._versions.clear()
+            self._snapshots.clear()
+            return
+        for user_id in user_ids:
+            self._versions[user_id] = version
+            self._snapshots.pop(user_id, None)
+
+
+# Instancia global
+credit_snapshot_cache = CreditSnapshotCache()
+
+
+async def _on_credit_changed(event: LiveEvent) -> None:
+    user_ids = event.data.get("user_ids")
+    if event.type == RESYNC or user_ids is None or event.data.get("count", 0) > len(user_ids):
+        credit_snapshot_cache.invalidate()
+        logger.info(f"🔄 Snapshots de crédito descartados ({event.type})")
+    else:
+        credit_snapshot_cache.invalidate(user_ids)
+
+
+credit_snapshot_watcher = EventWatcher("credit-snapshots", {CREDIT_CHANGED_EVENT}, _on_credit_changed)
@@ -1,16 +1,18 @@
 """Use Case: Get Associate Credit Summary"""
 from typing import Optional
 
-from ...domain.entities.associate import Associate
+from ...domain.entities.associate import AssociateCreditSnapshot
 from ...domain.repositories.associate_repository import AssociateRepository
+from ..credit_snapshots import CreditSnapshotCache, credit_snapshot_cache
 
 
 class GetAssociateCreditUseCase:
     """Caso de uso: Obtener resumen de crédito de un asociado"""
     
-    def __init__(self, repository: AssociateRepository):
+    def __init__(self, repository: AssociateRepository, snapshots: CreditSnapshotCache = credit_snapshot_cache):
         self.repository = repository
+        self.snapshots = snapshots
     
-    async def execute(self, user_id: int) -> Optional[Associate]:
-        """Obtiene el perfil de crédito de un asociado por user_id"""
-        return await self.repository.find_by_user_id(user_id)
+    async def execute(self, user_id: int) -> Optional[AssociateCreditSnapshot]:
+        """Obtiene el estado de crédito de un asociado por user_id (desde el cache de snapshots)"""
+        return await self.snapshots.get(self.repository, user_id)
@@ -1,3 +1,3 @@
-from .associate import Associate
+from .associate import Associate, AssociateCreditSnapshot
 
-__all__ = ['Associate']
+__all__ = ['Associate', 'AssociateCreditSnapshot']
@@ -55,3 +55,31 @@ class Associate:
     def is_active(self) -> bool:
         """Verifica si el asociado está activo"""
         return self.active
+
+
+@dataclass(frozen=True)
+class AssociateCreditSnapshot:
+    """
+    Value Object: estado de crédito de un asociado.
+
+    `version` es la versión del cache de snapshots con la que se leyó; cambia
+    cada vez que un trigger avisa que el crédito de ese asociado cambió.
+    """
+    associate_id: int
+    user_id: int
+    credit_limit: Decimal
+    pending_payments_total: Decimal
+    consolidated_debt: Decimal
+    available_credit: Decimal
+    pending_debts_count: int = 0
+    version: int = 0
+    
+    def get_credit_usage_percentage(self) -> float:
+        """Calcula el porcentaje de crédito usado (pagos pendientes)"""
+        if self.credit_limit == 0:
+            return 0.0
+        return float(self.pending_payments_total / self.credit_limit * 100)
+    
+    def has_available_credit(self, amount: Decimal) -> bool:
+        """Mismo criterio que check_associate_credit_available()"""
+        return self.available_credit >= amount
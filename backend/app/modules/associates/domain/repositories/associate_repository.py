@@ -3,9 +3,9 @@ Repository Interface: AssociateRepository
 """
 from abc import ABC, abstractmethod
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 
-from ..entities.associate import Associate
+from ..entities.associate import Associate, AssociateCreditSnapshot
 
 
 class AssociateRepository(ABC):
@@ -31,6 +31,11 @@ class AssociateRepository(ABC):
         """Lista todos los asociados"""
         pass
     
+    @abstractmethod
+    async def find_credit_snapshots(self, user_ids: Sequence[int]) -> Dict[int, AssociateCreditSnapshot]:
+        """Estado de crédito de varios asociados, por user_id"""
+        pass
+    
     @abstractmethod
     async def count(self, active_only: bool = True) -> int:
         """Cuenta el total de asociados"""
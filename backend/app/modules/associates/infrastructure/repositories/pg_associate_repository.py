@@ -2,12 +2,12 @@
 Repositorio PostgreSQL de Associates
 """
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.modules.associates.domain.entities.associate import Associate
+from app.modules.associates.domain.entities.associate import Associate, AssociateCreditSnapshot
 from app.modules.associates.domain.repositories.associate_repository import AssociateRepository
 from app.modules.associates.infrastructure.models import AssociateProfileModel
 
@@ -78,6 +78,39 @@ class PgAssociateRepository(AssociateRepository):
         
         return [_map_model_to_entity(m) for m in models]
     
+    async def find_credit_snapshots(self, user_ids: Sequence[int]) -> Dict[int, AssociateCreditSnapshot]:
+        """
+        Estado de crédito de varios asociados en una sola consulta.
+        
+        Los períodos con deuda salen de associate_debt_summary (migración 037)
+        en lugar de contar associate_accumulated_balances por asociado.
+        """
+        if not user_ids:
+            return {}
+        result = await self._db.execute(
+            text("""
+                SELECT ap.id, ap.user_id, ap.credit_limit, ap.pending_payments_total,
+                       ap.consolidated_debt, ap.available_credit,
+                       COALESCE(ds.periods_with_debt, 0) AS pending_debts_count
+                FROM associate_profiles ap
+                LEFT JOIN associate_debt_summary ds ON ds.associate_profile_id = ap.id
+                WHERE ap.user_id = ANY(:user_ids)
+            """),
+            {"user_ids": list(user_ids)}
+        )
+        return {
+            row.user_id: AssociateCreditSnapshot(
+                associate_id=row.id,
+                user_id=row.user_id,
+                credit_limit=row.credit_limit,
+                pending_payments_total=row.pending_payments_total,
+                consolidated_debt=row.consolidated_debt,
+                available_credit=row.available_credit,
+                pending_debts_count=row.pending_debts_count,
+            )
+            for row in result
+        }
+    
     async def count(self, active_only: bool = True) -> int:
         """Cuenta el total de asociados"""
         stmt = select(func.count(AssociateProfileModel.id))
@@ -14,9 +14,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import logging
 
-from app.core.database import get_async_db
+from app.core.database import get_async_db, get_async_read_db
 from app.core.dependencies import require_admin
+from app.core.responses import ORJSONResponse, FieldTree, sparse_fields, apply_fields
 from app.core.notifications import notify
+from app.core.queries import register_query
 from app.modules.auth.routes import get_current_user_id
 from app.modules.associates.application.dtos import (
     AssociateResponseDTO,
@@ -30,6 +32,7 @@ from app.modules.associates.application.use_cases import (
     ListAssociatesUseCase,
     GetAssociateCreditUseCase,
 )
+from app.modules.associates.application.credit_snapshots import credit_snapshot_cache
 from app.modules.associates.infrastructure.repositories.pg_associate_repository import PgAssociateRepository
 
 logger = logging.getLogger(__name__)
@@ -337,30 +340,14 @@ async def list_associates(
     from app.modules.auth.infrastructure.models import UserModel
     
     try:
-        # Query con JOIN para obtener datos del usuario y deuda real
-        from sqlalchemy import func, text
-        
-        # ⭐ Subquery para contar períodos con deuda desde associate_accumulated_balances (la tabla real)
-        pending_debts_subq = (
-            select(func.count(text('*')))
-            .select_from(text('associate_accumulated_balances aab'))
-            .where(
-                text('aab.user_id = users.id'),
-                text('aab.accumulated_debt > 0')
-            )
-            .correlate(UserModel)
-            .scalar_subquery()
-        )
+        # Query con JOIN para obtener datos del usuario; el crédito sale del
+        # cache de snapshots (una sola consulta para los que no estén)
+        from sqlalchemy import func
         
         stmt = (
             select(
                 AssociateProfileModel.id,
                 AssociateProfileModel.user_id,
-                AssociateProfileModel.credit_limit,
-                AssociateProfileModel.pending_payments_total,
-                AssociateProfileModel.available_credit,
-                AssociateProfileModel.consolidated_debt,
-                pending_debts_subq.label('pending_debts_count'),
                 AssociateProfileModel.active,
                 AssociateProfileModel.level_id,
                 UserModel.username,
@@ -396,6 +383,7 @@ async def list_associates(
         
         result = await db.execute(stmt)
         rows = result.all()
+        snapshots = await credit_snapshot_cache.get_many(repo, [row.user_id for row in rows])
         
         items = [
             AssociateListItemDTO(
@@ -405,14 +393,15 @@ async def list_associates(
                 full_name=f"{row.first_name} {row.last_name}",
                 email=row.email,
                 level_id=row.level_id,
-                credit_limit=row.credit_limit,
-                pending_payments_total=row.pending_payments_total,
-                available_credit=row.available_credit,
-                consolidated_debt=row.consolidated_debt,
-                pending_debts_count=row.pending_debts_count or 0,
+                credit_limit=snapshots[row.user_id].credit_limit,
+                pending_payments_total=snapshots[row.user_id].pending_payments_total,
+                available_credit=snapshots[row.user_id].available_credit,
+                consolidated_debt=snapshots[row.user_id].consolidated_debt,
+                pending_debts_count=snapshots[row.user_id].pending_debts_count,
                 active=row.active,
             )
             for row in rows
+            if row.user_id in snapshots
         ]
         
         return PaginatedAssociatesDTO(
@@ -641,6 +630,9 @@ async def get_associate_credit(
     """
     Obtiene el resumen de crédito de un asociado.
     
+    Se sirve del cache de snapshots de crédito (se invalida por NOTIFY
+    cuando cambia el crédito del asociado).
+    
     Args:
         user_id: ID del usuario asociado
         
@@ -652,23 +644,23 @@ async def get_associate_credit(
     """
     try:
         use_case = GetAssociateCreditUseCase(repo)
-        associate = await use_case.execute(user_id)
+        credit = await use_case.execute(user_id)
         
-        if not associate:
+        if not credit:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Associate with user_id {user_id} not found"
             )
         
         return AssociateCreditSummaryDTO(
-            associate_id=associate.id,
-            user_id=associate.user_id,
-            credit_limit=associate.credit_limit,
-            pending_payments_total=associate.pending_payments_total,
-            available_credit=associate.available_credit,
-            credit_usage_percentage=associate.get_credit_usage_percentage(),
+            associate_id=credit.associate_id,
+            user_id=credit.user_id,
+            credit_limit=credit.credit_limit,
+            pending_payments_total=credit.pending_payments_total,
+            available_credit=credit.available_credit,
+            credit_usage_percentage=credit.get_credit_usage_percentage(),
             active_loans_count=0,  # TODO: Contar loans activos
-            total_disbursed=associate.pending_payments_total,
+            total_disbursed=credit.pending_payments_total,
         )
     except HTTPException:
         raise
@@ -683,6 +675,44 @@ async def get_associate_credit(
 # ⭐ LISTA DE CLIENTES POR ASOCIADO
 # =============================================================================
 
+_ASSOCIATE_CLIENTS = register_query("associates.clients", """
+    WITH client_stats AS (
+        SELECT 
+            l.user_id as client_user_id,
+            u.first_name,
+            u.last_name,
+            u.phone_number,
+            u.email,
+            u.curp,
+            COUNT(l.id) as total_loans,
+            SUM(l.amount) as total_amount_loaned,
+            SUM(CASE WHEN ls.name = 'ACTIVE' THEN 1 ELSE 0 END) as active_loans,
+            SUM(CASE WHEN ls.name = 'COMPLETED' OR ls.name = 'PAID' THEN 1 ELSE 0 END) as completed_loans,
+            SUM(CASE WHEN ls.name = 'DEFAULTED' THEN 1 ELSE 0 END) as defaulted_loans,
+            MIN(l.approved_at) as first_loan_date,
+            MAX(l.approved_at) as last_loan_date,
+            CASE 
+                WHEN SUM(CASE WHEN ls.name = 'ACTIVE' THEN 1 ELSE 0 END) > 0 THEN 'ACTIVE'
+                WHEN SUM(CASE WHEN ls.name = 'DEFAULTED' THEN 1 ELSE 0 END) > 0 THEN 'DEFAULTED'
+                WHEN SUM(CASE WHEN ls.name = 'COMPLETED' OR ls.name = 'PAID' THEN 1 ELSE 0 END) > 0 THEN 'GOOD_STANDING'
+                ELSE 'INACTIVE'
+            END as client_status
+        FROM loans l
+        JOIN users u ON u.id = l.user_id
+        JOIN loan_statuses ls ON ls.id = l.status_id
+        WHERE l.associate_user_id = :associate_user_id
+          AND (CAST(:status_names AS VARCHAR[]) IS NULL OR ls.name = ANY(:status_names))
+        GROUP BY l.user_id, u.first_name, u.last_name, u.phone_number, u.email, u.curp
+    )
+    SELECT 
+        cs.*,
+        (SELECT COUNT(*) FROM client_stats) as total_count
+    FROM client_stats cs
+    ORDER BY cs.last_loan_date DESC NULLS LAST
+    LIMIT :limit OFFSET :offset
+""")
+
+
 @router.get("/{associate_id}/clients")
 async def get_associate_clients(
     associate_id: int,
@@ -730,57 +760,19 @@ async def get_associate_clients(
         
         associate_user_id = profile.user_id
         
-        # Construir query base
-        base_query = """
-        WITH client_stats AS (
-            SELECT 
-                l.user_id as client_user_id,
-                u.first_name,
-                u.last_name,
-                u.phone_number,
-                u.email,
-                u.curp,
-                COUNT(l.id) as total_loans,
-                SUM(l.amount) as total_amount_loaned,
-                SUM(CASE WHEN ls.name = 'ACTIVE' THEN 1 ELSE 0 END) as active_loans,
-                SUM(CASE WHEN ls.name = 'COMPLETED' OR ls.name = 'PAID' THEN 1 ELSE 0 END) as completed_loans,
-                SUM(CASE WHEN ls.name = 'DEFAULTED' THEN 1 ELSE 0 END) as defaulted_loans,
-                MIN(l.approved_at) as first_loan_date,
-                MAX(l.approved_at) as last_loan_date,
-                CASE 
-                    WHEN SUM(CASE WHEN ls.name = 'ACTIVE' THEN 1 ELSE 0 END) > 0 THEN 'ACTIVE'
-                    WHEN SUM(CASE WHEN ls.name = 'DEFAULTED' THEN 1 ELSE 0 END) > 0 THEN 'DEFAULTED'
-                    WHEN SUM(CASE WHEN ls.name = 'COMPLETED' OR ls.name = 'PAID' THEN 1 ELSE 0 END) > 0 THEN 'GOOD_STANDING'
-                    ELSE 'INACTIVE'
-                END as client_status
-            FROM loans l
-            JOIN users u ON u.id = l.user_id
-            JOIN loan_statuses ls ON ls.id = l.status_id
-            WHERE l.associate_user_id = :associate_user_id
-        """
-        
-        # Aplicar filtro por status si se especifica
-        if status_filter:
-            if status_filter == "GOOD_STANDING":
-                base_query += " AND ls.name IN ('COMPLETED', 'PAID')"
-            else:
-                base_query += f" AND ls.name = '{status_filter}'"
-        
-        base_query += """
-            GROUP BY l.user_id, u.first_name, u.last_name, u.phone_number, u.email, u.curp
-        )
-        SELECT 
-            cs.*,
-            (SELECT COUNT(*) FROM client_stats) as total_count
-        FROM client_stats cs
-        ORDER BY cs.last_loan_date DESC NULLS LAST
-        LIMIT :limit OFFSET :offset
-        """
+        # Filtro por status del préstamo (GOOD_STANDING = COMPLETED o PAID)
+        if not status_filter:
+            status_names = None
+        elif status_filter == "GOOD_STANDING":
+            status_names = ["COMPLETED", "PAID"]
+        else:
+            status_names = [status_filter]
         
-        result = await db.execute(
-            text(base_query),
+        result = await _ASSOCIATE_CLIENTS.execute(
+            db,
             {
                 "associate_user_id": associate_user_id,
+                "status_names": status_names,
                 "limit": limit,
                 "offset": offset
             }
@@ -957,7 +949,11 @@ async def get_debt_summary(
     db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Resumen de deuda del asociado (usa vista v_associate_real_debt_summary).
+    Resumen de deuda del asociado (tabla associate_debt_summary).
+    
+    El resumen lo mantienen los triggers de associate_accumulated_balances y
+    associate_debt_payments (migración 037): la consulta es por llave primaria,
+    sin agregar la cartera completa. Montos exactos (NUMERIC → Decimal).
     
     **Returns:**
     - Deuda total real (desde associate_accumulated_balances)
@@ -971,22 +967,24 @@ async def get_debt_summary(
     result = await db.execute(
         text("""
             SELECT 
-                associate_profile_id,
-                user_id,
-                associate_name,
-                total_debt,
-                periods_with_debt,
-                oldest_debt_date,
-                newest_debt_date,
-                profile_consolidated_debt,
-                credit_limit,
-                available_credit,
-                pending_payments_total,
-                total_paid_to_debt,
-                total_payments_count,
-                last_payment_date
-            FROM v_associate_real_debt_summary
-            WHERE associate_profile_id = :id
+                ap.id AS associate_profile_id,
+                ap.user_id,
+                CONCAT(u.first_name, ' ', u.last_name) AS associate_name,
+                COALESCE(s.total_debt, 0) AS total_debt,
+                COALESCE(s.periods_with_debt, 0) AS periods_with_debt,
+                s.oldest_debt_date,
+                s.newest_debt_date,
+                COALESCE(ap.consolidated_debt, 0) AS profile_consolidated_debt,
+                COALESCE(ap.credit_limit, 0) AS credit_limit,
+                COALESCE(ap.available_credit, 0) AS available_credit,
+                COALESCE(ap.pending_payments_total, 0) AS pending_payments_total,
+                COALESCE(s.total_paid_to_debt, 0) AS total_paid_to_debt,
+                COALESCE(s.total_payments_count, 0) AS total_payments_count,
+                s.last_payment_date
+            FROM associate_profiles ap
+            JOIN users u ON u.id = ap.user_id
+            LEFT JOIN associate_debt_summary s ON s.associate_profile_id = ap.id
+            WHERE ap.id = :id
         """),
         {"id": associate_id}
     )
@@ -999,25 +997,25 @@ async def get_debt_summary(
             detail=f"Asociado {associate_id} no encontrado"
         )
     
-    return {
+    return ORJSONResponse({
         "success": True,
         "data": {
-            "associate_profile_id": row[0],
-            "user_id": row[1],
-            "associate_name": row[2],
-            "total_debt": float(row[3]),
-            "periods_with_debt": row[4],
-            "oldest_debt_date": row[5].isoformat() if row[5] else None,
-            "newest_debt_date": row[6].isoformat() if row[6] else None,
-            "profile_consolidated_debt": float(row[7]),
-            "credit_limit": float(row[8]),
-            "available_credit": float(row[9]),
-            "pending_payments_total": float(row[10]),
-            "total_paid_to_debt": float(row[11]),
-            "total_payments_count": row[12],
-            "last_payment_date": row[13].isoformat() if row[13] else None
+            "associate_profile_id": row.associate_profile_id,
+            "user_id": row.user_id,
+            "associate_name": row.associate_name,
+            "total_debt": row.total_debt,
+            "periods_with_debt": row.periods_with_debt,
+            "oldest_debt_date": row.oldest_debt_date.isoformat() if row.oldest_debt_date else None,
+            "newest_debt_date": row.newest_debt_date.isoformat() if row.newest_debt_date else None,
+            "profile_consolidated_debt": row.profile_consolidated_debt,
+            "credit_limit": row.credit_limit,
+            "available_credit": row.available_credit,
+            "pending_payments_total": row.pending_payments_total,
+            "total_paid_to_debt": row.total_paid_to_debt,
+            "total_payments_count": row.total_payments_count,
+            "last_payment_date": row.last_payment_date.isoformat() if row.last_payment_date else None
         }
-    }
+    })
 
 
 @router.get("/{associate_id}/all-payments")
@@ -1025,58 +1023,92 @@ async def get_all_payments(
     associate_id: int,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[int] = Query(None, description="Keyset: ledger_id del último pago de la página anterior (next_cursor)"),
+    fields: Optional[FieldTree] = Depends(sparse_fields),
     db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Historial unificado de TODOS los pagos (usa vista v_associate_all_payments).
+    Historial unificado de TODOS los pagos (tabla associate_payment_ledger).
     
     **Incluye:**
     - Abonos a saldo actual (associate_statement_payments)
-    - Abonos a deuda acumulada (associate_debt_payments)
+    - Abonos a deuda acumulada (associate_debt_payments, incluye pagos de convenio)
+    - Reversiones de abonos eliminados (monto negativo, `is_reversal`)
+    
+    `running_balance` es el total abonado por el asociado hasta ese registro.
+    
+    Paginación keyset por (payment_date, ledger_id) DESC: enviar
+    `cursor=<next_cursor>` para la siguiente página. `offset` se mantiene por
+    compatibilidad y se ignora cuando viene `cursor`.
+    
+    `?fields=` recorta cada elemento de `payments` (ej. `fields=id,payment_amount,payment_date`).
     """
     from sqlalchemy import text
     
-    result = await db.execute(
-        text("""
-            SELECT 
-                id, payment_type, associate_profile_id, associate_name,
-                payment_amount, payment_date, payment_method, payment_reference,
-                cut_period_id, period_start, period_end, notes, created_at
-            FROM v_associate_all_payments
-            WHERE associate_profile_id = :id
-            ORDER BY payment_date DESC, created_at DESC
-            LIMIT :limit OFFSET :offset
-        """),
-        {"id": associate_id, "limit": limit, "offset": offset}
+    count_result = await db.execute(
+        text("SELECT COUNT(*) FROM associate_payment_ledger WHERE associate_profile_id = :id"),
+        {"id": associate_id}
     )
+    total = count_result.scalar_one()
+    
+    query = """
+        SELECT 
+            l.id AS ledger_id, l.source_id, l.entry_type, l.is_reversal,
+            l.payment_amount, l.payment_date, l.payment_method, l.payment_reference,
+            l.cut_period_id, l.period_start, l.period_end, l.notes,
+            l.running_balance, l.created_at
+        FROM associate_payment_ledger l
+        WHERE l.associate_profile_id = :id
+    """
+    params = {"id": associate_id, "limit": limit + 1}
+    
+    if cursor is not None:
+        query += """
+          AND (l.payment_date, l.id) < (
+              SELECT payment_date, id FROM associate_payment_ledger WHERE id = :cursor
+          )
+        ORDER BY l.payment_date DESC, l.id DESC
+        LIMIT :limit
+        """
+        params["cursor"] = cursor
+    else:
+        query += " ORDER BY l.payment_date DESC, l.id DESC LIMIT :limit OFFSET :offset"
+        params["offset"] = offset
     
+    result = await db.execute(text(query), params)
     rows = result.fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
-    return {
+    return ORJSONResponse({
         "success": True,
         "data": {
             "associate_profile_id": associate_id,
-            "total": len(rows),
+            "total": total,
             "limit": limit,
             "offset": offset,
-            "payments": [
+            "next_cursor": rows[-1].ledger_id if has_more else None,
+            "payments": apply_fields([
                 {
-                    "id": r[0],
-                    "payment_type": r[1],
-                    "payment_amount": float(r[4]),
-                    "payment_date": r[5].isoformat(),
-                    "payment_method": r[6],
-                    "payment_reference": r[7],
-                    "cut_period_id": r[8],
-                    "period_start": r[9].isoformat() if r[9] else None,
-                    "period_end": r[10].isoformat() if r[10] else None,
-                    "notes": r[11],
-                    "created_at": r[12].isoformat()
+                    "id": r.source_id,
+                    "ledger_id": r.ledger_id,
+                    "payment_type": r.entry_type,
+                    "is_reversal": r.is_reversal,
+                    "payment_amount": r.payment_amount,
+                    "payment_date": r.payment_date.isoformat(),
+                    "payment_method": r.payment_method,
+                    "payment_reference": r.payment_reference,
+                    "cut_period_id": r.cut_period_id,
+                    "period_start": r.period_start.isoformat() if r.period_start else None,
+                    "period_end": r.period_end.isoformat() if r.period_end else None,
+                    "notes": r.notes,
+                    "running_balance": r.running_balance,
+                    "created_at": r.created_at.isoformat() if r.created_at else None
                 }
                 for r in rows
-            ]
+            ], fields)
         }
-    }
+    })
 
 
 
@@ -1127,7 +1159,7 @@ async def validate_contact_email(
 )
 async def get_associate_debt_history(
     associate_id: int,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Retorna el historial completo de deudas acumuladas del asociado.
@@ -1140,9 +1172,14 @@ async def get_associate_debt_history(
     from sqlalchemy import text
     
     try:
-        # Verificar que existe el asociado
+        # Verificar que existe el asociado (total desde associate_debt_summary)
         associate_check = await db.execute(
-            text("SELECT id, user_id FROM associate_profiles WHERE id = :id"),
+            text("""
+            SELECT ap.id, ap.user_id, COALESCE(s.total_debt, 0) AS total_debt
+            FROM associate_profiles ap
+            LEFT JOIN associate_debt_summary s ON s.associate_profile_id = ap.id
+            WHERE ap.id = :id
+            """),
             {"id": associate_id}
         )
         associate = associate_check.fetchone()
@@ -1178,9 +1215,6 @@ async def get_associate_debt_history(
         
         debts = result.fetchall()
         
-        # Calcular totales
-        total_debt = sum(float(d.accumulated_debt) for d in debts)
-        
         # Formatear respuesta
         debt_history = []
         for d in debts:
@@ -1196,22 +1230,22 @@ async def get_associate_debt_history(
                 "period_code": d.cut_code,
                 "period_start": d.period_start_date.isoformat() if d.period_start_date else None,
                 "period_end": d.period_end_date.isoformat() if d.period_end_date else None,
-                "accumulated_debt": float(d.accumulated_debt),
+                "accumulated_debt": d.accumulated_debt,
                 "details": details or [],
                 "created_at": d.created_at.isoformat() if d.created_at else None,
                 "updated_at": d.updated_at.isoformat() if d.updated_at else None
             })
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "data": {
                 "associate_id": associate_id,
                 "user_id": user_id,
-                "total_debt": total_debt,
+                "total_debt": associate.total_debt,
                 "periods_with_debt": len(debts),
                 "debt_history": debt_history
             }
-        }
+        })
         
     except HTTPException:
         raise
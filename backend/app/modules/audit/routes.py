@@ -1,8 +1,11 @@
 """Rutas FastAPI para audit logs"""
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_async_db
+from app.core.database import get_async_read_db
+from app.core.responses import ORJSONResponse, FieldTree, sparse_fields, apply_fields
 from app.modules.audit.application.dtos import (
     AuditLogResponseDTO,
     AuditLogListItemDTO,
@@ -19,7 +22,7 @@ from app.modules.audit.infrastructure.repositories.pg_audit_log_repository impor
 router = APIRouter(prefix="/audit", tags=["Audit"])
 
 
-def get_audit_repository(db: AsyncSession = Depends(get_async_db)) -> PgAuditLogRepository:
+def get_audit_repository(db: AsyncSession = Depends(get_async_read_db)) -> PgAuditLogRepository:
     """Dependency injection del repositorio"""
     return PgAuditLogRepository(db)
 
@@ -28,9 +31,10 @@ def get_audit_repository(db: AsyncSession = Depends(get_async_db)) -> PgAuditLog
 async def list_audit_logs(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    fields: Optional[FieldTree] = Depends(sparse_fields),
     repo: PgAuditLogRepository = Depends(get_audit_repository),
 ):
-    """Lista todos los registros de auditoría con paginación"""
+    """Lista todos los registros de auditoría con paginación (`?fields=` recorta cada item)"""
     try:
         use_case = ListAuditLogsUseCase(repo)
         logs = await use_case.execute(limit, offset)
@@ -48,12 +52,12 @@ async def list_audit_logs(
             for log in logs
         ]
         
-        return PaginatedAuditLogsDTO(
-            items=items,
-            total=total,
-            limit=limit,
-            offset=offset,
-        )
+        return ORJSONResponse({
+            "items": apply_fields(items, fields),
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        })
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -66,14 +70,15 @@ async def get_table_audit_logs(
     table_name: str,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    fields: Optional[FieldTree] = Depends(sparse_fields),
     repo: PgAuditLogRepository = Depends(get_audit_repository),
 ):
-    """Obtiene registros de auditoría de una tabla específica"""
+    """Obtiene registros de auditoría de una tabla específica (`?fields=` recorta cada registro)"""
     try:
         use_case = GetTableAuditLogsUseCase(repo)
         logs = await use_case.execute(table_name, limit, offset)
         
-        return [
+        return ORJSONResponse(apply_fields((
             AuditLogResponseDTO(
                 id=log.id,
                 table_name=log.table_name,
@@ -88,7 +93,7 @@ async def get_table_audit_logs(
                 changed_fields=log.get_changed_fields(),
             )
             for log in logs
-        ]
+        ), fields))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -100,10 +105,11 @@ async def get_table_audit_logs(
 async def get_record_history(
     table_name: str,
     record_id: int,
+    fields: Optional[FieldTree] = Depends(sparse_fields),
     repo: PgAuditLogRepository = Depends(get_audit_repository),
-    db: AsyncSession = Depends(get_async_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    """Obtiene historial completo de cambios de un registro específico"""
+    """Obtiene historial completo de cambios de un registro específico (`?fields=` recorta cada registro)"""
     from sqlalchemy import select
     from app.modules.auth.infrastructure.models import UserModel
     
@@ -143,7 +149,7 @@ async def get_record_history(
                 response.new_data['_changed_by_name'] = user_names[log.changed_by]
             response_list.append(response)
         
-        return response_list
+        return ORJSONResponse(apply_fields(response_list, fields))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -154,12 +160,15 @@ async def get_record_history(
 @router.get("/users/{user_id}/full-history", response_model=list[AuditLogResponseDTO])
 async def get_user_full_history(
     user_id: int,
-    db: AsyncSession = Depends(get_async_db),
+    fields: Optional[FieldTree] = Depends(sparse_fields),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Obtiene historial completo de un usuario incluyendo tablas relacionadas.
     
     Busca en: users, addresses, guarantors, beneficiaries
+    
+    `?fields=` recorta cada registro (ej. `fields=id,table_name,changed_at,changed_fields`).
     """
     from sqlalchemy import select, or_, and_
     from app.modules.auth.infrastructure.models import UserModel
@@ -258,7 +267,7 @@ async def get_user_full_history(
                 response.new_data['_changed_by_name'] = user_names[log.changed_by]
             response_list.append(response)
         
-        return response_list
+        return ORJSONResponse(apply_fields(response_list, fields))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
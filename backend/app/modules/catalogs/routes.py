@@ -1,6 +1,9 @@
 """
 Rutas del módulo de catálogos.
 Proporciona endpoints read-only para los 12 catálogos del sistema.
+
+Los listados se cachean (namespace "catalogs"): los catálogos solo cambian
+por migración, y el warm-up de arranque los deja precargados por rol.
 """
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -13,6 +16,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cached
 from app.core.database import get_db
 from app.modules.catalogs.application.dtos import (
     AssociateLevelDTO,
@@ -52,11 +56,12 @@ router = APIRouter(prefix="/catalogs", tags=["Catalogs"])
 
 
 @router.get("/roles", response_model=List[RoleDTO], summary="Obtener todos los roles")
+@cached("catalogs", ttl=3600)
 async def get_all_roles(db: AsyncSession = Depends(get_async_db)):
     """Obtiene la lista completa de roles del sistema."""
     repository = PostgreSQLRoleRepository(db)
     roles = await repository.find_all()
-    return roles
+    return [RoleDTO.model_validate(role) for role in roles]
 
 
 @router.get("/roles/{role_id}", response_model=RoleDTO, summary="Obtener rol por ID")
@@ -75,13 +80,14 @@ async def get_role_by_id(role_id: int, db: AsyncSession = Depends(get_async_db))
 
 
 @router.get("/loan-statuses", response_model=List[LoanStatusDTO], summary="Obtener estados de préstamo")
+@cached("catalogs", ttl=3600)
 async def get_all_loan_statuses(
     active_only: bool = Query(False, description="Filtrar solo estados activos"), db: AsyncSession = Depends(get_async_db)
 ):
     """Obtiene la lista de estados de préstamo."""
     repository = PostgreSQLLoanStatusRepository(db)
     statuses = await repository.find_all(active_only=active_only)
-    return statuses
+    return [LoanStatusDTO.model_validate(status) for status in statuses]
 
 
 @router.get("/loan-statuses/{status_id}", response_model=LoanStatusDTO, summary="Obtener estado de préstamo por ID")
@@ -100,6 +106,7 @@ async def get_loan_status_by_id(status_id: int, db: AsyncSession = Depends(get_a
 
 
 @router.get("/payment-statuses", response_model=List[PaymentStatusDTO], summary="Obtener estados de pago")
+@cached("catalogs", ttl=3600)
 async def get_all_payment_statuses(
     active_only: bool = Query(False, description="Filtrar solo estados activos"),
     real_payments_only: bool = Query(False, description="Filtrar solo pagos reales (excluir ficticios)"),
@@ -108,7 +115,7 @@ async def get_all_payment_statuses(
     """Obtiene la lista de estados de pago (12 estados v2.0)."""
     repository = PostgreSQLPaymentStatusRepository(db)
     statuses = await repository.find_all(active_only=active_only, real_payments_only=real_payments_only)
-    return statuses
+    return [PaymentStatusDTO.model_validate(status) for status in statuses]
 
 
 @router.get("/payment-statuses/{status_id}", response_model=PaymentStatusDTO, summary="Obtener estado de pago por ID")
@@ -127,13 +134,14 @@ async def get_payment_status_by_id(status_id: int, db: AsyncSession = Depends(ge
 
 
 @router.get("/contract-statuses", response_model=List[ContractStatusDTO], summary="Obtener estados de contrato")
+@cached("catalogs", ttl=3600)
 async def get_all_contract_statuses(
     active_only: bool = Query(False, description="Filtrar solo estados activos"), db: AsyncSession = Depends(get_async_db)
 ):
     """Obtiene la lista de estados de contrato."""
     repository = PostgreSQLContractStatusRepository(db)
     statuses = await repository.find_all(active_only=active_only)
-    return statuses
+    return [ContractStatusDTO.model_validate(status) for status in statuses]
 
 
 @router.get(
@@ -154,11 +162,12 @@ async def get_contract_status_by_id(status_id: int, db: AsyncSession = Depends(g
 
 
 @router.get("/cut-period-statuses", response_model=List[CutPeriodStatusDTO], summary="Obtener estados de período de corte")
+@cached("catalogs", ttl=3600)
 async def get_all_cut_period_statuses(db: AsyncSession = Depends(get_async_db)):
     """Obtiene la lista de estados de período de corte."""
     repository = PostgreSQLCutPeriodStatusRepository(db)
     statuses = await repository.find_all()
-    return statuses
+    return [CutPeriodStatusDTO.model_validate(status) for status in statuses]
 
 
 @router.get(
@@ -181,13 +190,14 @@ async def get_cut_period_status_by_id(status_id: int, db: AsyncSession = Depends
 
 
 @router.get("/payment-methods", response_model=List[PaymentMethodDTO], summary="Obtener métodos de pago")
+@cached("catalogs", ttl=3600)
 async def get_all_payment_methods(
     active_only: bool = Query(False, description="Filtrar solo métodos activos"), db: AsyncSession = Depends(get_async_db)
 ):
     """Obtiene la lista de métodos de pago."""
     repository = PostgreSQLPaymentMethodRepository(db)
     methods = await repository.find_all(active_only=active_only)
-    return methods
+    return [PaymentMethodDTO.model_validate(method) for method in methods]
 
 
 @router.get("/payment-methods/{method_id}", response_model=PaymentMethodDTO, summary="Obtener método de pago por ID")
@@ -206,11 +216,12 @@ async def get_payment_method_by_id(method_id: int, db: AsyncSession = Depends(ge
 
 
 @router.get("/document-statuses", response_model=List[DocumentStatusDTO], summary="Obtener estados de documento")
+@cached("catalogs", ttl=3600)
 async def get_all_document_statuses(db: AsyncSession = Depends(get_async_db)):
     """Obtiene la lista de estados de documento."""
     repository = PostgreSQLDocumentStatusRepository(db)
     statuses = await repository.find_all()
-    return statuses
+    return [DocumentStatusDTO.model_validate(status) for status in statuses]
 
 
 @router.get(
@@ -231,11 +242,12 @@ async def get_document_status_by_id(status_id: int, db: AsyncSession = Depends(g
 
 
 @router.get("/statement-statuses", response_model=List[StatementStatusDTO], summary="Obtener estados de cuenta de asociado")
+@cached("catalogs", ttl=3600)
 async def get_all_statement_statuses(db: AsyncSession = Depends(get_async_db)):
     """Obtiene la lista de estados de cuenta de asociado."""
     repository = PostgreSQLStatementStatusRepository(db)
     statuses = await repository.find_all()
-    return statuses
+    return [StatementStatusDTO.model_validate(status) for status in statuses]
 
 
 @router.get(
@@ -256,11 +268,12 @@ async def get_statement_status_by_id(status_id: int, db: AsyncSession = Depends(
 
 
 @router.get("/config-types", response_model=List[ConfigTypeDTO], summary="Obtener tipos de configuración")
+@cached("catalogs", ttl=3600)
 async def get_all_config_types(db: AsyncSession = Depends(get_async_db)):
     """Obtiene la lista de tipos de configuración."""
     repository = PostgreSQLConfigTypeRepository(db)
     types = await repository.find_all()
-    return types
+    return [ConfigTypeDTO.model_validate(item) for item in types]
 
 
 @router.get("/config-types/{type_id}", response_model=ConfigTypeDTO, summary="Obtener tipo de configuración por ID")
@@ -279,11 +292,12 @@ async def get_config_type_by_id(type_id: int, db: AsyncSession = Depends(get_asy
 
 
 @router.get("/level-change-types", response_model=List[LevelChangeTypeDTO], summary="Obtener tipos de cambio de nivel")
+@cached("catalogs", ttl=3600)
 async def get_all_level_change_types(db: AsyncSession = Depends(get_async_db)):
     """Obtiene la lista de tipos de cambio de nivel."""
     repository = PostgreSQLLevelChangeTypeRepository(db)
     types = await repository.find_all()
-    return types
+    return [LevelChangeTypeDTO.model_validate(item) for item in types]
 
 
 @router.get(
@@ -304,11 +318,12 @@ async def get_level_change_type_by_id(type_id: int, db: AsyncSession = Depends(g
 
 
 @router.get("/associate-levels", response_model=List[AssociateLevelDTO], summary="Obtener niveles de asociado")
+@cached("catalogs", ttl=3600)
 async def get_all_associate_levels(db: AsyncSession = Depends(get_async_db)):
     """Obtiene la lista de niveles de asociado (Bronce, Plata, Oro, Platino, Diamante)."""
     repository = PostgreSQLAssociateLevelRepository(db)
     levels = await repository.find_all()
-    return levels
+    return [AssociateLevelDTO.model_validate(level) for level in levels]
 
 
 @router.get("/associate-levels/{level_id}", response_model=AssociateLevelDTO, summary="Obtener nivel de asociado por ID")
@@ -327,6 +342,7 @@ async def get_associate_level_by_id(level_id: int, db: AsyncSession = Depends(ge
 
 
 @router.get("/document-types", response_model=List[DocumentTypeDTO], summary="Obtener tipos de documento")
+@cached("catalogs", ttl=3600)
 async def get_all_document_types(
     required_only: bool = Query(False, description="Filtrar solo documentos requeridos"),
     db: AsyncSession = Depends(get_async_db),
@@ -334,7 +350,7 @@ async def get_all_document_types(
     """Obtiene la lista de tipos de documento."""
     repository = PostgreSQLDocumentTypeRepository(db)
     types = await repository.find_all(required_only=required_only)
-    return types
+    return [DocumentTypeDTO.model_validate(item) for item in types]
 
 
 @router.get("/document-types/{type_id}", response_model=DocumentTypeDTO, summary="Obtener tipo de documento por ID")
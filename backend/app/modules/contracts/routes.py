@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_async_db
+from app.core.cache import cached
 from app.modules.contracts.application.dtos import (
     ContractResponseDTO,
     ContractListItemDTO,
@@ -23,6 +24,7 @@ def get_contract_repository(db: AsyncSession = Depends(get_async_db)) -> PgContr
 
 
 @router.get("", response_model=PaginatedContractsDTO)
+@cached("contracts", ttl=600)
 async def list_contracts(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
@@ -54,6 +56,7 @@ async def list_contracts(
 
 
 @router.get("/loans/{loan_id}", response_model=ContractResponseDTO)
+@cached("contracts", ttl=600)
 async def get_loan_contract(
     loan_id: int,
     repo: PgContractRepository = Depends(get_contract_repository),
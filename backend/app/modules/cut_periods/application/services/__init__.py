@@ -0,0 +1,12 @@
+from .cut_engine import CutEngine, CutPlan, DebtTransfer, PeriodTransition
+from .cut_runs import CutRunInProgressError, CutRunLeaseLostError, CutRunStore
+
+__all__ = [
+    'CutEngine',
+    'CutPlan',
+    'CutRunInProgressError',
+    'CutRunLeaseLostError',
+    'CutRunStore',
+    'DebtTransfer',
+    'PeriodTransition',
+]
@@ -0,0 +1,758 @@
+"""
+Motor de cortes de períodos.
+
+Única implementación de la lógica de avance de períodos. La usan:
+- El job programado (app/scheduler/jobs.py → auto_cut_period_job)
+- POST /scheduler/run-cut-now
+- POST /cut-periods/advance-periods
+- PATCH /cut-periods/{id} y POST /cut-periods/{id}/close
+- scripts/auto_cut_scheduler.py (CLI)
+
+Reglas de avance respecto a la fecha de referencia:
+- Período ACTUAL (contiene la fecha): no se modifica
+- Período ANTERIOR INMEDIATO: debe quedar en COLLECTING (4)
+- Períodos más antiguos: deben quedar al menos en SETTLING (6)
+
+Si el sistema estuvo caído y quedaron períodos viejos en PENDING/CUTOFF,
+se recuperan todos en la misma pasada (back-fill): statements y cambios
+de estado se hacen set-based por lote de períodos. Cada lote se confirma
+por separado (checkpoint): si la corrida se interrumpe, la siguiente
+vuelve a planear desde el estado de la BD y continúa donde quedó.
+
+`run_resumable()` (job programado, run-cut-now, advance-periods y CLI) va
+más fino: cada etapa de cada período y cada bloque de asociados se confirma
+por separado y queda registrado en cut_runs / cut_run_periods (ver
+cut_runs.py). Ninguna transacción dura más que un bloque, así los locks
+sobre cut_periods y associate_payment_statements se liberan enseguida.
+
+Flujo de estados:
+PENDING (1) → CUTOFF (3) → COLLECTING (4) → SETTLING (6) → CLOSED (5)
+"""
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cut_runs import (
+    DONE,
+    STAGE_COLLECTING,
+    STAGE_CUTOFF,
+    STAGE_STATEMENTS,
+    CutRun,
+    CutRunLeaseLostError,
+    CutRunStore,
+    PeriodCursor,
+)
+
+logger = logging.getLogger(__name__)
+
+# cut_period_statuses
+PENDING = 1
+CUTOFF = 3
+COLLECTING = 4
+CLOSED = 5
+SETTLING = 6
+
+STATUS_NAMES = {
+    PENDING: "PENDING",
+    2: "ACTIVE",
+    CUTOFF: "CUTOFF",
+    COLLECTING: "COLLECTING",
+    CLOSED: "CLOSED",
+    SETTLING: "SETTLING",
+}
+
+ProgressCallback = Callable[[Dict], None]
+
+# Un statement (COLLECTING) por asociado con pagos en el período. Excluye
+# pagos IN_AGREEMENT (13) y no duplica statements existentes (asociado + período).
+_INSERT_STATEMENTS_SQL = """
+INSERT INTO associate_payment_statements (
+    user_id, cut_period_id, statement_number,
+    total_amount_collected, total_to_credicuenta, commission_earned,
+    total_payments_count, commission_rate_applied,
+    paid_amount, late_fee_amount, status_id,
+    generated_date, due_date, created_at
+)
+SELECT
+    l.associate_user_id,
+    cp.id,
+    'ST-' || cp.cut_code || '-'
+        || lpad(l.associate_user_id::text, GREATEST(4, length(l.associate_user_id::text)), '0'),
+    COALESCE(SUM(p.expected_amount), 0),
+    COALESCE(SUM(p.associate_payment), 0),
+    COALESCE(SUM(p.expected_amount), 0) - COALESCE(SUM(p.associate_payment), 0),
+    COUNT(DISTINCT p.id),
+    COALESCE(MAX(l.commission_rate), 0),
+    0, 0, 7,
+    CURRENT_DATE, cp.period_end_date, NOW()
+FROM payments p
+JOIN loans l ON l.id = p.loan_id
+JOIN cut_periods cp ON cp.id = p.cut_period_id
+WHERE {period_filter}
+  AND p.status_id != 13  -- Excluir pagos IN_AGREEMENT
+  AND l.associate_user_id IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM associate_payment_statements s
+      WHERE s.user_id = l.associate_user_id
+        AND s.cut_period_id = cp.id
+  )
+GROUP BY l.associate_user_id, cp.id, cp.cut_code, cp.period_end_date
+{tail}
+"""
+
+
+@dataclass
+class PeriodRef:
+    """Datos mínimos de un período de corte."""
+
+    id: int
+    cut_code: str
+    period_start_date: date
+    period_end_date: date
+    status_id: int
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "cut_code": self.cut_code,
+            "period_start": self.period_start_date.isoformat(),
+            "period_end": self.period_end_date.isoformat(),
+            "status_id": self.status_id,
+        }
+
+
+@dataclass
+class PeriodTransition:
+    """Cambio planeado (o aplicado) sobre un período."""
+
+    period_id: int
+    cut_code: str
+    from_status: int
+    to_status: int
+    generate_statements: bool
+    mark_settling: bool
+    reason: str
+    status: str = "PLANNED"
+    statements_generated: int = 0
+
+    @property
+    def action(self) -> str:
+        path = [STATUS_NAMES[self.from_status]]
+        if self.from_status == PENDING:
+            path.append(STATUS_NAMES[CUTOFF])
+        if self.to_status == SETTLING and self.from_status in (PENDING, CUTOFF):
+            path.append(STATUS_NAMES[COLLECTING])
+        path.append(STATUS_NAMES[self.to_status])
+        return " → ".join(path)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["action"] = self.action
+        return data
+
+
+@dataclass
+class CutPlan:
+    """Resultado de planear (o ejecutar) un avance de períodos."""
+
+    reference_date: date
+    current_period: Optional[PeriodRef] = None
+    previous_period: Optional[PeriodRef] = None
+    transitions: List[PeriodTransition] = field(default_factory=list)
+    dry_run: bool = False
+    run_id: Optional[int] = None
+    resumed: bool = False
+
+    @property
+    def backfill(self) -> bool:
+        """True si hay períodos atrasados además del anterior inmediato."""
+        previous_id = self.previous_period.id if self.previous_period else None
+        return any(
+            t.period_id != previous_id and t.from_status in (PENDING, CUTOFF)
+            for t in self.transitions
+        )
+
+    @property
+    def statements_generated(self) -> int:
+        return sum(t.statements_generated for t in self.transitions)
+
+    def to_dict(self) -> Dict:
+        return {
+            "reference_date": self.reference_date.isoformat(),
+            "dry_run": self.dry_run,
+            "run_id": self.run_id,
+            "resumed": self.resumed,
+            "backfill": self.backfill,
+            "current_period": self.current_period.to_dict() if self.current_period else None,
+            "previous_period": self.previous_period.to_dict() if self.previous_period else None,
+            "changes": [t.to_dict() for t in self.transitions],
+            "statements_generated": self.statements_generated,
+        }
+
+
+@dataclass
+class DebtTransfer:
+    """Deuda transferida a un asociado al cerrar un período."""
+
+    associate_id: int
+    associate_name: Optional[str]
+    statements: int
+    debt_amount: Decimal
+    payments_absorbed: int = 0
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["debt_amount"] = float(self.debt_amount)
+        return data
+
+
+class CutEngine:
+    """
+    Motor de avance de períodos de corte.
+
+    No hace commit fuera de `run()` / `run_resumable()`; las primitivas (generate_statements,
+    mark_settling, transfer_pending_debts) participan en la transacción
+    del llamador.
+
+    Args:
+        db: Sesión async
+        batch_size: Períodos por lote (y por commit) en el back-fill
+        progress: Callback opcional, recibe un dict por lote (o período) aplicado
+        associate_chunk_size: Asociados por bloque (y por commit) de statements
+            en run_resumable
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        batch_size: int = 12,
+        progress: Optional[ProgressCallback] = None,
+        associate_chunk_size: int = 200,
+    ):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.progress = progress
+        self.associate_chunk_size = max(1, associate_chunk_size)
+
+    # =========================================================================
+    # PLAN
+    # =========================================================================
+
+    async def plan(self, reference_date: Optional[date] = None) -> CutPlan:
+        """
+        Calcula las transiciones necesarias para la fecha de referencia.
+
+        Una sola consulta trae el período actual y todos los anteriores que
+        aún no llegaron a su estado objetivo.
+        """
+        today = reference_date or date.today()
+        plan = CutPlan(reference_date=today)
+
+        result = await self.db.execute(
+            text("""
+            SELECT id, cut_code, period_start_date, period_end_date, status_id
+            FROM cut_periods
+            WHERE period_start_date <= :today AND period_end_date >= :today
+            ORDER BY period_start_date DESC
+            LIMIT 1
+            """),
+            {"today": today}
+        )
+        row = result.fetchone()
+        if not row:
+            return plan
+        plan.current_period = PeriodRef(*row)
+
+        # Anterior inmediato + todos los previos que no estén en SETTLING/CLOSED
+        result = await self.db.execute(
+            text("""
+            WITH previous AS (
+                SELECT id FROM cut_periods
+                WHERE period_end_date < :current_start
+                ORDER BY period_end_date DESC
+                LIMIT 1
+            )
+            SELECT cp.id, cp.cut_code, cp.period_start_date, cp.period_end_date, cp.status_id,
+                   cp.id = (SELECT id FROM previous) AS is_previous
+            FROM cut_periods cp
+            WHERE cp.period_end_date < :current_start
+              AND (cp.id = (SELECT id FROM previous) OR cp.status_id IN (1, 2, 3, 4))
+            ORDER BY cp.period_start_date ASC
+            """),
+            {"current_start": plan.current_period.period_start_date}
+        )
+
+        for r in result.fetchall():
+            period = PeriodRef(r.id, r.cut_code, r.period_start_date, r.period_end_date, r.status_id)
+            # ACTIVE (2) es un PENDING heredado de versiones anteriores
+            from_status = PENDING if period.status_id == 2 else period.status_id
+
+            if r.is_previous:
+                plan.previous_period = period
+                if from_status in (PENDING, CUTOFF):
+                    plan.transitions.append(PeriodTransition(
+                        period_id=period.id,
+                        cut_code=period.cut_code,
+                        from_status=from_status,
+                        to_status=COLLECTING,
+                        generate_statements=True,
+                        mark_settling=False,
+                        reason="Período terminado - iniciando cobro",
+                    ))
+            elif from_status in (PENDING, CUTOFF):
+                plan.transitions.append(PeriodTransition(
+                    period_id=period.id,
+                    cut_code=period.cut_code,
+                    from_status=from_status,
+                    to_status=SETTLING,
+                    generate_statements=True,
+                    mark_settling=True,
+                    reason="Corte atrasado - recuperando (back-fill)",
+                ))
+            elif from_status == COLLECTING:
+                plan.transitions.append(PeriodTransition(
+                    period_id=period.id,
+                    cut_code=period.cut_code,
+                    from_status=COLLECTING,
+                    to_status=SETTLING,
+                    generate_statements=False,
+                    mark_settling=True,
+                    reason="Período antiguo - tiempo de cobro terminado",
+                ))
+
+        return plan
+
+    # =========================================================================
+    # EJECUCIÓN
+    # =========================================================================
+
+    async def run(
+        self,
+        reference_date: Optional[date] = None,
+        dry_run: bool = False,
+    ) -> CutPlan:
+        """
+        Planea y aplica las transiciones, un commit por lote.
+
+        En dry_run no modifica nada; `statements_generated` indica cuántos
+        statements se crearían.
+        """
+        plan = await self.plan(reference_date)
+        plan.dry_run = dry_run
+
+        if dry_run:
+            counts = await self.count_pending_statements(
+                [t.period_id for t in plan.transitions if t.generate_statements]
+            )
+            for t in plan.transitions:
+                t.statements_generated = counts.get(t.period_id, 0)
+                t.status = "DRY_RUN"
+            return plan
+
+        transitions = plan.transitions
+        total_batches = (len(transitions) + self.batch_size - 1) // self.batch_size
+        for index in range(total_batches):
+            batch = transitions[index * self.batch_size:(index + 1) * self.batch_size]
+            await self._apply_batch(batch)
+            await self.db.commit()
+
+            for t in batch:
+                t.status = "APPLIED"
+                logger.info(f"🔄 {t.cut_code}: {t.action} ({t.statements_generated} statements)")
+
+            if self.progress:
+                self.progress({
+                    "batch": index + 1,
+                    "batches": total_batches,
+                    "periods": [t.cut_code for t in batch],
+                    "statements_generated": sum(t.statements_generated for t in batch),
+                })
+
+        return plan
+
+    async def run_resumable(
+        self,
+        reference_date: Optional[date] = None,
+        triggered_by: str = "scheduler",
+        store: Optional[CutRunStore] = None,
+    ) -> CutPlan:
+        """
+        Planea y aplica las transiciones con checkpoints por etapa.
+
+        Por período, cada etapa es una transacción corta junto con su
+        checkpoint en cut_run_periods:
+        1. PENDING → CUTOFF
+        2. Statements por bloques de `associate_chunk_size` asociados
+           (cursor: último asociado confirmado)
+        3. CUTOFF → COLLECTING
+        4. Statements → SETTLING y período → SETTLING (DONE)
+
+        Todas las etapas son idempotentes (el plan se recalcula desde la BD
+        y los statements existentes no se duplican), así que retomar una
+        corrida FAILED o abandonada solo rehace, como mucho, un bloque.
+
+        Raises:
+            CutRunInProgressError: si otra corrida está activa
+        """
+        store = store or CutRunStore(self.db)
+        today = reference_date or date.today()
+        run = await store.claim(today, triggered_by)
+
+        try:
+            plan = await self.plan(today)
+            plan.run_id = run.id
+            plan.resumed = run.resumed
+            cursors = await store.register_periods(run, plan.transitions)
+            await self.db.commit()
+
+            for index, t in enumerate(plan.transitions, start=1):
+                await self._apply_transition(store, run, t, cursors[t.period_id])
+                t.status = "APPLIED"
+                logger.info(f"🔄 {t.cut_code}: {t.action} ({t.statements_generated} statements)")
+                if self.progress:
+                    self.progress({
+                        "batch": index,
+                        "batches": len(plan.transitions),
+                        "periods": [t.cut_code],
+                        "statements_generated": t.statements_generated,
+                    })
+
+            await store.finish(run)
+        except Exception as e:
+            await self.db.rollback()
+            if not isinstance(e, CutRunLeaseLostError):
+                await store.fail(run, str(e))
+            raise
+
+        return plan
+
+    async def _apply_transition(
+        self,
+        store: CutRunStore,
+        run: CutRun,
+        t: PeriodTransition,
+        cursor: PeriodCursor,
+    ) -> None:
+        """Aplica una transición etapa por etapa, un commit por etapa/bloque."""
+        if cursor.stage == DONE:
+            t.statements_generated = cursor.statements_generated
+            return
+
+        if t.from_status == PENDING:
+            await self._set_status([t.period_id], CUTOFF)
+            await store.checkpoint(run, cursor, STAGE_CUTOFF)
+            await self.db.commit()
+
+        if t.generate_statements:
+            while True:
+                created, last_associate_id = await self.generate_statements_chunk(
+                    t.period_id, cursor.last_associate_id, self.associate_chunk_size
+                )
+                await store.checkpoint(run, cursor, STAGE_STATEMENTS, last_associate_id, created)
+                await self.db.commit()
+                if created < self.associate_chunk_size:
+                    break
+            await self._set_status([t.period_id], COLLECTING)
+            await store.checkpoint(run, cursor, STAGE_COLLECTING)
+            if not t.mark_settling:
+                await store.checkpoint(run, cursor, DONE)
+            await self.db.commit()
+
+        if t.mark_settling:
+            await self.mark_settling([t.period_id])
+            await self._set_status([t.period_id], SETTLING)
+            await store.checkpoint(run, cursor, DONE)
+            await self.db.commit()
+
+        t.statements_generated = cursor.statements_generated
+
+    async def _apply_batch(self, batch: Sequence[PeriodTransition]) -> None:
+        """Aplica un lote de transiciones con operaciones set-based."""
+        to_cutoff = [t.period_id for t in batch if t.from_status == PENDING]
+        need_statements = [t.period_id for t in batch if t.generate_statements]
+        to_settle = [t.period_id for t in batch if t.mark_settling]
+
+        # PENDING → CUTOFF (queda registrado en la auditoría del período)
+        if to_cutoff:
+            await self._set_status(to_cutoff, CUTOFF)
+
+        if need_statements:
+            created = await self.generate_statements(need_statements)
+            for t in batch:
+                t.statements_generated = created.get(t.period_id, 0)
+
+        # CUTOFF → COLLECTING para todo lo que generó statements
+        if need_statements:
+            await self._set_status(need_statements, COLLECTING)
+
+        if to_settle:
+            await self.mark_settling(to_settle)
+            await self._set_status(to_settle, SETTLING)
+
+    async def _set_status(self, period_ids: Sequence[int], status_id: int) -> None:
+        await self.db.execute(
+            text("""
+            UPDATE cut_periods
+            SET status_id = :status_id, updated_at = NOW()
+            WHERE id = ANY(:ids)
+            """),
+            {"ids": list(period_ids), "status_id": status_id}
+        )
+
+    # =========================================================================
+    # PRIMITIVAS (participan en la transacción del llamador)
+    # =========================================================================
+
+    async def count_pending_statements(self, period_ids: Sequence[int]) -> Dict[int, int]:
+        """Cuántos statements generaría `generate_statements` por período."""
+        if not period_ids:
+            return {}
+        result = await self.db.execute(
+            text("""
+            SELECT p.cut_period_id, COUNT(DISTINCT l.associate_user_id) AS count
+            FROM payments p
+            JOIN loans l ON l.id = p.loan_id
+            WHERE p.cut_period_id = ANY(:ids)
+              AND p.status_id != 13
+              AND l.associate_user_id IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM associate_payment_statements s
+                  WHERE s.user_id = l.associate_user_id
+                    AND s.cut_period_id = p.cut_period_id
+              )
+            GROUP BY p.cut_period_id
+            """),
+            {"ids": list(period_ids)}
+        )
+        return {row.cut_period_id: row.count for row in result.fetchall()}
+
+    async def generate_statements(self, period_ids: Sequence[int]) -> Dict[int, int]:
+        """
+        Genera statements (COLLECTING) para cada asociado con pagos en los
+        períodos indicados, en un solo INSERT ... SELECT.
+
+        IMPORTANTE: Excluye pagos IN_AGREEMENT (status_id=13) porque esos
+        ya fueron consolidados en un convenio. Los statements existentes
+        (asociado + período) no se duplican.
+
+        Returns:
+            {period_id: statements creados}
+        """
+        if not period_ids:
+            return {}
+        result = await self.db.execute(
+            text(_INSERT_STATEMENTS_SQL.format(
+                period_filter="p.cut_period_id = ANY(:ids)",
+                tail="RETURNING cut_period_id",
+            )),
+            {"ids": list(period_ids)}
+        )
+        created: Dict[int, int] = {}
+        for row in result.fetchall():
+            created[row.cut_period_id] = created.get(row.cut_period_id, 0) + 1
+        return created
+
+    async def generate_statements_chunk(
+        self,
+        period_id: int,
+        after_associate_id: int = 0,
+        limit: int = 200,
+    ) -> Tuple[int, int]:
+        """
+        Como generate_statements, para un período y solo los siguientes
+        `limit` asociados (por id) después de `after_associate_id`.
+
+        Returns:
+            (statements creados, id del último asociado procesado); si no se
+            creó ninguno, el cursor no avanza
+        """
+        result = await self.db.execute(
+            text(_INSERT_STATEMENTS_SQL.format(
+                period_filter="p.cut_period_id = :period_id AND l.associate_user_id > :after",
+                tail="ORDER BY l.associate_user_id\nLIMIT :limit\nRETURNING user_id",
+            )),
+            {"period_id": period_id, "after": after_associate_id, "limit": limit}
+        )
+        associate_ids = [row.user_id for row in result.fetchall()]
+        return len(associate_ids), max(associate_ids, default=after_associate_id)
+
+    async def mark_settling(self, period_ids: Sequence[int]) -> int:
+        """
+        Mueve TODOS los statements activos de los períodos a SETTLING (9).
+        Se ejecuta cuando el período pasa a liquidación (COLLECTING → SETTLING).
+
+        El estado de deuda (pagado/parcial/pendiente) se calcula dinámicamente
+        basado en los campos paid_amount y total_to_credicuenta.
+
+        Returns:
+            int: Statements movidos
+        """
+        if not period_ids:
+            return 0
+        result = await self.db.execute(
+            text("""
+            UPDATE associate_payment_statements
+            SET status_id = 9,  -- SETTLING
+                updated_at = NOW()
+            WHERE cut_period_id = ANY(:ids)
+              AND status_id IN (3, 4, 5, 7, 8)  -- Cualquier estado activo (no DRAFT ni ya SETTLING/CLOSED)
+            """),
+            {"ids": list(period_ids)}
+        )
+        logger.info(f"📋 Statements movidos a SETTLING para períodos {list(period_ids)}: {result.rowcount}")
+        return result.rowcount
+
+    async def transfer_pending_debts(self, period_id: int) -> List[DebtTransfer]:
+        """
+        Transfiere deudas pendientes de statements no pagados a balances acumulados.
+        Se ejecuta cuando se cierra definitivamente (SETTLING → CLOSED).
+
+        Número fijo de sentencias sin importar cuántos asociados tenga el período:
+        1. CTE: deuda por statement → agregado por asociado (jsonb_agg) →
+           UPSERT en associate_accumulated_balances (debt_details || nuevos) y
+           suma a associate_profiles.consolidated_debt
+        2. Pagos PENDING de esos asociados → PAID_BY_ASSOCIATE (un UPDATE con JOIN)
+        3. TODOS los statements del período → CLOSED (10)
+
+        Returns:
+            Resumen por asociado con deuda transferida
+        """
+        result = await self.db.execute(
+            text("""
+            WITH period AS (
+                SELECT id, cut_code FROM cut_periods WHERE id = :period_id
+            ),
+            debts AS (
+                SELECT
+                    aps.id,
+                    aps.user_id,
+                    aps.statement_number,
+                    COALESCE(aps.total_to_credicuenta, 0) AS original_amount,
+                    COALESCE(aps.late_fee_amount, 0) AS late_fee,
+                    COALESCE(aps.paid_amount, 0) AS paid_amount,
+                    COALESCE(aps.total_to_credicuenta, 0) + COALESCE(aps.late_fee_amount, 0)
+                        - COALESCE(aps.paid_amount, 0) AS debt_amount
+                FROM associate_payment_statements aps
+                WHERE aps.cut_period_id = :period_id
+            ),
+            per_associate AS (
+                SELECT
+                    d.user_id,
+                    SUM(d.debt_amount) AS debt_amount,
+                    COUNT(*) AS statements,
+                    jsonb_agg(jsonb_build_object(
+                        'statement_id', d.id,
+                        'statement_number', d.statement_number,
+                        'original_amount', d.original_amount,
+                        'late_fee', d.late_fee,
+                        'paid_amount', d.paid_amount,
+                        'debt_amount', d.debt_amount,
+                        'absorbed_date', to_jsonb(LOCALTIMESTAMP),
+                        'period_code', COALESCE((SELECT cut_code FROM period), :fallback_code)
+                    ) ORDER BY d.id) AS details
+                FROM debts d
+                WHERE d.debt_amount > 0.01
+                GROUP BY d.user_id
+            ),
+            balances AS (
+                INSERT INTO associate_accumulated_balances AS aab (
+                    user_id, cut_period_id, accumulated_debt, debt_details, created_at, updated_at
+                )
+                SELECT user_id, :period_id, debt_amount, details, NOW(), NOW()
+                FROM per_associate
+                ON CONFLICT (user_id, cut_period_id) DO UPDATE
+                SET accumulated_debt = aab.accumulated_debt + EXCLUDED.accumulated_debt,
+                    debt_details = COALESCE(aab.debt_details, '[]'::jsonb) || EXCLUDED.debt_details,
+                    updated_at = NOW()
+                RETURNING aab.user_id
+            ),
+            profiles AS (
+                -- La deuda del statement no pagado se suma al consolidated_debt
+                UPDATE associate_profiles ap
+                SET consolidated_debt = COALESCE(ap.consolidated_debt, 0) + pa.debt_amount,
+                    updated_at = NOW()
+                FROM per_associate pa
+                WHERE ap.user_id = pa.user_id
+                RETURNING ap.user_id
+            )
+            SELECT
+                pa.user_id,
+                u.first_name || ' ' || u.last_name AS associate_name,
+                pa.statements,
+                pa.debt_amount
+            FROM per_associate pa
+            LEFT JOIN users u ON u.id = pa.user_id
+            ORDER BY pa.user_id
+            """),
+            {"period_id": period_id, "fallback_code": f"P{period_id}"}
+        )
+        transfers = [
+            DebtTransfer(
+                associate_id=row.user_id,
+                associate_name=row.associate_name,
+                statements=row.statements,
+                debt_amount=row.debt_amount,
+            )
+            for row in result.fetchall()
+        ]
+
+        if transfers:
+            # ⭐ Marcar los pagos de clientes como PAID_BY_ASSOCIATE
+            # Estos son los pagos que el asociado absorbió al no reportarlos
+            # El cliente ya no debe pagar a CrediCuenta, pero puede que aún deba al asociado
+            result = await self.db.execute(
+                text("""
+                WITH period AS (
+                    SELECT COALESCE((SELECT cut_code FROM cut_periods WHERE id = :period_id), :fallback_code) AS cut_code
+                )
+                UPDATE payments p
+                SET status_id = 9,  -- PAID_BY_ASSOCIATE
+                    marking_notes = CONCAT(
+                        COALESCE(p.marking_notes, ''),
+                        CASE WHEN p.marking_notes IS NOT NULL THEN ' | ' ELSE '' END,
+                        'Absorbido por asociado al cierre del período ',
+                        (SELECT cut_code FROM period)
+                    ),
+                    updated_at = NOW()
+                FROM loans l
+                WHERE p.loan_id = l.id
+                  AND l.associate_user_id = ANY(:associate_ids)
+                  AND p.cut_period_id = :period_id
+                  AND p.status_id = 1  -- Solo los PENDING
+                RETURNING l.associate_user_id
+                """),
+                {
+                    "period_id": period_id,
+                    "fallback_code": f"P{period_id}",
+                    "associate_ids": [t.associate_id for t in transfers],
+                }
+            )
+            absorbed: Dict[int, int] = {}
+            for row in result.fetchall():
+                absorbed[row.associate_user_id] = absorbed.get(row.associate_user_id, 0) + 1
+            for t in transfers:
+                t.payments_absorbed = absorbed.get(t.associate_id, 0)
+
+        # Mover TODOS los statements a CLOSED (10)
+        result = await self.db.execute(
+            text("""
+            UPDATE associate_payment_statements
+            SET status_id = 10, updated_at = NOW()
+            WHERE cut_period_id = :period_id
+            """),
+            {"period_id": period_id}
+        )
+
+        logger.info(
+            f"💰 Período {period_id}: deuda transferida de {len(transfers)} asociados "
+            f"(${float(sum(t.debt_amount for t in transfers)):.2f}, "
+            f"{sum(t.payments_absorbed for t in transfers)} pagos PAID_BY_ASSOCIATE, "
+            f"{result.rowcount} statements → CLOSED)"
+        )
+
+        return transfers
@@ -0,0 +1,342 @@
+"""
+Registro de progreso del corte automático (tablas cut_runs / cut_run_periods).
+
+Cada corrida de CutEngine.run_resumable tiene una fila en cut_runs con un
+dueño (host:pid:token) y un heartbeat que se renueva en cada checkpoint.
+Solo puede haber una corrida RUNNING (índice único parcial); si su dueño
+deja de renovar el heartbeat por más de `lease_seconds`, otra corrida la
+toma y continúa desde los checkpoints de cut_run_periods.
+
+Los checkpoints NO hacen commit: se escriben en la misma transacción que la
+etapa que registran, así la etapa y su checkpoint se confirman juntas.
+"""
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BusinessException
+
+logger = logging.getLogger(__name__)
+
+# cut_run_periods.stage, en orden
+PLANNED = "PLANNED"
+STAGE_CUTOFF = "CUTOFF"
+STAGE_STATEMENTS = "STATEMENTS"
+STAGE_COLLECTING = "COLLECTING"
+DONE = "DONE"
+
+
+class CutRunInProgressError(BusinessException):
+    """Otra corrida del corte está activa (heartbeat vigente)."""
+
+    def __init__(self, run_id: int):
+        super().__init__(
+            f"Ya hay un corte en ejecución (run {run_id})",
+            details={"run_id": run_id},
+        )
+        self.run_id = run_id
+
+
+class CutRunLeaseLostError(BusinessException):
+    """La corrida fue tomada por otro proceso (heartbeat vencido)."""
+
+    def __init__(self, run_id: int):
+        super().__init__(
+            f"La corrida {run_id} ya no pertenece a este proceso",
+            details={"run_id": run_id},
+        )
+        self.run_id = run_id
+
+
+@dataclass
+class CutRun:
+    """Corrida reclamada por este proceso."""
+
+    id: int
+    reference_date: date
+    owner: str
+    attempts: int = 1
+    resumed: bool = False
+
+
+@dataclass
+class PeriodCursor:
+    """Checkpoint de un período dentro de una corrida."""
+
+    period_id: int
+    stage: str = PLANNED
+    last_associate_id: int = 0
+    statements_generated: int = 0
+
+
+def _new_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class CutRunStore:
+    """
+    Acceso a cut_runs / cut_run_periods.
+
+    Args:
+        db: Sesión async (la misma del CutEngine)
+        lease_seconds: Segundos sin heartbeat tras los que una corrida
+            RUNNING se considera abandonada
+        max_attempts: Intentos antes de dejar de retomar una corrida
+    """
+
+    def __init__(self, db: AsyncSession, lease_seconds: int = 600, max_attempts: int = 3):
+        self.db = db
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    async def _latest(self):
+        result = await self.db.execute(
+            text("""
+            SELECT id, reference_date, status, attempts,
+                   heartbeat_at < NOW() - make_interval(secs => :lease) AS stale
+            FROM cut_runs
+            ORDER BY id DESC
+            LIMIT 1
+            """),
+            {"lease": self.lease_seconds}
+        )
+        return result.fetchone()
+
+    async def claim(self, reference_date: date, triggered_by: str = "scheduler") -> CutRun:
+        """
+        Reclama la corrida del corte y hace commit.
+
+        - Hay una RUNNING con heartbeat vigente → CutRunInProgressError
+        - La última corrida es de la misma fecha y quedó FAILED o abandonada
+          (con intentos disponibles) → se retoma (resumed=True)
+        - En otro caso se crea una corrida nueva; una RUNNING abandonada de
+          otra fecha se marca FAILED antes
+
+        Tanto la toma como el alta están protegidas por el índice único
+        parcial: si dos procesos compiten, uno recibe CutRunInProgressError.
+        """
+        owner = _new_owner()
+        latest = await self._latest()
+
+        if latest and latest.status == "RUNNING" and not latest.stale:
+            await self.db.rollback()
+            raise CutRunInProgressError(latest.id)
+
+        try:
+            if (
+                latest
+                and latest.status in ("RUNNING", "FAILED")
+                and latest.reference_date == reference_date
+                and latest.attempts < self.max_attempts
+            ):
+                result = await self.db.execute(
+                    text("""
+                    UPDATE cut_runs
+                    SET status = 'RUNNING', owner = :owner, attempts = attempts + 1,
+                        error = NULL, finished_at = NULL, heartbeat_at = NOW()
+                    WHERE id = :id
+                      AND (status = 'FAILED'
+                           OR heartbeat_at < NOW() - make_interval(secs => :lease))
+                    RETURNING attempts
+                    """),
+                    {"id": latest.id, "owner": owner, "lease": self.lease_seconds}
+                )
+                row = result.fetchone()
+                if not row:
+                    await self.db.rollback()
+                    raise CutRunInProgressError(latest.id)
+                await self.db.commit()
+                logger.info(f"♻️ Retomando corte run {latest.id} (intento {row.attempts})")
+                return CutRun(latest.id, reference_date, owner, row.attempts, resumed=True)
+
+            if latest and latest.status == "RUNNING":
+                await self.db.execute(
+                    text("""
+                    UPDATE cut_runs
+                    SET status = 'FAILED', error = 'Abandonada (sin heartbeat)', finished_at = NOW()
+                    WHERE id = :id AND status = 'RUNNING'
+                      AND heartbeat_at < NOW() - make_interval(secs => :lease)
+                    """),
+                    {"id": latest.id, "lease": self.lease_seconds}
+                )
+
+            result = await self.db.execute(
+                text("""
+                INSERT INTO cut_runs (reference_date, triggered_by, owner)
+                VALUES (:reference_date, :triggered_by, :owner)
+                RETURNING id
+                """),
+                {"reference_date": reference_date, "triggered_by": triggered_by, "owner": owner}
+            )
+            run_id = result.scalar_one()
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            latest = await self._latest()
+            raise CutRunInProgressError(latest.id if latest else 0)
+
+        return CutRun(run_id, reference_date, owner)
+
+    async def register_periods(self, run: CutRun, transitions: Sequence) -> Dict[int, PeriodCursor]:
+        """
+        Registra los períodos del plan (los ya registrados conservan su
+        checkpoint) y devuelve el cursor de cada uno. No hace commit.
+        """
+        if transitions:
+            await self.db.execute(
+                text("""
+                INSERT INTO cut_run_periods (run_id, period_id, cut_code, from_status_id, to_status_id)
+                SELECT :run_id, t.period_id, t.cut_code, t.from_status, t.to_status
+                FROM unnest(CAST(:ids AS INTEGER[]), CAST(:codes AS VARCHAR[]),
+                            CAST(:froms AS INTEGER[]), CAST(:tos AS INTEGER[]))
+                     AS t(period_id, cut_code, from_status, to_status)
+                ON CONFLICT (run_id, period_id) DO NOTHING
+                """),
+                {
+                    "run_id": run.id,
+                    "ids": [t.period_id for t in transitions],
+                    "codes": [t.cut_code for t in transitions],
+                    "froms": [t.from_status for t in transitions],
+                    "tos": [t.to_status for t in transitions],
+                }
+            )
+        await self.db.execute(
+            text("""
+            UPDATE cut_runs
+            SET periods_total = (SELECT COUNT(*) FROM cut_run_periods WHERE run_id = :run_id),
+                heartbeat_at = NOW()
+            WHERE id = :run_id
+            """),
+            {"run_id": run.id}
+        )
+        result = await self.db.execute(
+            text("""
+            SELECT period_id, stage, last_associate_id, statements_generated
+            FROM cut_run_periods
+            WHERE run_id = :run_id
+            """),
+            {"run_id": run.id}
+        )
+        return {row.period_id: PeriodCursor(*row) for row in result.fetchall()}
+
+    async def checkpoint(
+        self,
+        run: CutRun,
+        cursor: PeriodCursor,
+        stage: str,
+        last_associate_id: Optional[int] = None,
+        created: int = 0,
+    ) -> None:
+        """
+        Avanza el checkpoint del período y renueva el heartbeat. No hace
+        commit: se confirma junto con la etapa.
+
+        Raises:
+            CutRunLeaseLostError: si la corrida ya no pertenece a este proceso
+        """
+        if last_associate_id is None:
+            last_associate_id = cursor.last_associate_id
+        result = await self.db.execute(
+            text("""
+            WITH run AS (
+                UPDATE cut_runs
+                SET heartbeat_at = NOW(),
+                    statements_generated = statements_generated + :created,
+                    periods_done = periods_done
+                        + CASE WHEN CAST(:stage AS VARCHAR) = 'DONE' THEN 1 ELSE 0 END
+                WHERE id = :run_id AND owner = :owner AND status = 'RUNNING'
+                RETURNING id
+            )
+            UPDATE cut_run_periods
+            SET stage = :stage,
+                last_associate_id = GREATEST(last_associate_id, :last_associate_id),
+                statements_generated = statements_generated + :created,
+                updated_at = NOW()
+            WHERE run_id = (SELECT id FROM run) AND period_id = :period_id
+            RETURNING run_id
+            """),
+            {
+                "run_id": run.id,
+                "owner": run.owner,
+                "period_id": cursor.period_id,
+                "stage": stage,
+                "last_associate_id": last_associate_id,
+                "created": created,
+            }
+        )
+        if result.fetchone() is None:
+            raise CutRunLeaseLostError(run.id)
+        cursor.stage = stage
+        cursor.last_associate_id = max(cursor.last_associate_id, last_associate_id)
+        cursor.statements_generated += created
+
+    async def finish(self, run: CutRun) -> None:
+        """Marca la corrida COMPLETED y hace commit."""
+        await self.db.execute(
+            text("""
+            UPDATE cut_runs
+            SET status = 'COMPLETED', finished_at = NOW(), heartbeat_at = NOW()
+            WHERE id = :run_id AND owner = :owner AND status = 'RUNNING'
+            """),
+            {"run_id": run.id, "owner": run.owner}
+        )
+        await self.db.commit()
+
+    async def fail(self, run: CutRun, error: str) -> None:
+        """Marca la corrida FAILED (se retoma después) y hace commit."""
+        await self.db.execute(
+            text("""
+            UPDATE cut_runs
+            SET status = 'FAILED', error = :error, finished_at = NOW()
+            WHERE id = :run_id AND owner = :owner AND status = 'RUNNING'
+            """),
+            {"run_id": run.id, "owner": run.owner, "error": error[:2000]}
+        )
+        await self.db.commit()
+
+    async def needs_resume(self) -> Optional[date]:
+        """
+        Fecha de referencia de la última corrida si quedó FAILED o abandonada
+        y aún tiene intentos; None si no hay nada que retomar.
+        """
+        latest = await self._latest()
+        if (
+            latest
+            and (latest.status == "FAILED" or (latest.status == "RUNNING" and latest.stale))
+            and latest.attempts < self.max_attempts
+        ):
+            return latest.reference_date
+        return None
+
+    async def recent(self, limit: int = 20) -> List[Dict]:
+        """Últimas corridas con el avance de cada período."""
+        result = await self.db.execute(
+            text("""
+            SELECT r.id, r.reference_date, r.status, r.triggered_by, r.owner, r.attempts,
+                   r.periods_total, r.periods_done, r.statements_generated, r.error,
+                   r.started_at, r.heartbeat_at, r.finished_at,
+                   COALESCE(jsonb_agg(jsonb_build_object(
+                       'period_id', p.period_id,
+                       'cut_code', p.cut_code,
+                       'stage', p.stage,
+                       'last_associate_id', p.last_associate_id,
+                       'statements_generated', p.statements_generated
+                   ) ORDER BY p.period_id) FILTER (WHERE p.period_id IS NOT NULL), '[]') AS periods
+            FROM (SELECT * FROM cut_runs ORDER BY id DESC LIMIT :limit) r
+            LEFT JOIN cut_run_periods p ON p.run_id = r.id
+            GROUP BY r.id, r.reference_date, r.status, r.triggered_by, r.owner, r.attempts,
+                     r.periods_total, r.periods_done, r.statements_generated, r.error,
+                     r.started_at, r.heartbeat_at, r.finished_at
+            ORDER BY r.id DESC
+            """),
+            {"limit": limit}
+        )
+        return [dict(row._mapping) for row in result.fetchall()]
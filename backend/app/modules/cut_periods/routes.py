@@ -3,11 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Dict, Any, Optional
-from datetime import date, datetime
+from datetime import date
 from pydantic import BaseModel
-from decimal import Decimal
 
-from app.core.database import get_async_db
+from app.core.database import get_async_db, get_async_read_db
+from app.core.cache import cached, response_cache
+from app.core.responses import ORJSONResponse, FieldTree, sparse_fields, apply_fields
 from app.modules.cut_periods.application.dtos import (
     CutPeriodResponseDTO,
     CutPeriodListItemDTO,
@@ -17,7 +18,9 @@ from app.modules.cut_periods.application.use_cases import (
     ListCutPeriodsUseCase,
     GetActiveCutPeriodUseCase,
 )
+from app.modules.cut_periods.application.services import CutEngine, CutRunInProgressError
 from app.modules.cut_periods.infrastructure.repositories.pg_cut_period_repository import PgCutPeriodRepository
+from app.scheduler.jobs import portfolio_snapshot_job
 
 
 router = APIRouter(prefix="/cut-periods", tags=["Cut Periods"])
@@ -46,6 +49,7 @@ def get_cut_period_repository(db: AsyncSession = Depends(get_async_db)) -> PgCut
 
 
 @router.get("", response_model=PaginatedCutPeriodsDTO)
+@cached("cut_periods", ttl=60)
 async def list_cut_periods(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
@@ -105,6 +109,7 @@ async def list_cut_periods(
 
 
 @router.get("/active", response_model=CutPeriodResponseDTO)
+@cached("cut_periods", ttl=60)
 async def get_active_cut_period(
     repo: PgCutPeriodRepository = Depends(get_cut_period_repository),
 ):
@@ -143,11 +148,17 @@ async def get_active_cut_period(
         )
 
 
+def _is_closed_period(content: dict) -> bool:
+    """Solo los statements de períodos cerrados (5) son inmutables y cacheables."""
+    return content.get("period_status_id") == 5
+
+
 @router.get("/{period_id}/statements")
+@cached("statements", ttl=3600, condition=_is_closed_period)
 async def get_period_statements(
     period_id: int,
     include_all_associates: bool = Query(False, description="Incluir asociados sin statement en el período"),
-    db: AsyncSession = Depends(get_async_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Obtiene todos los statements de un período específico.
@@ -159,7 +170,7 @@ async def get_period_statements(
         # Verificar que el período existe
         result = await db.execute(
             text("""
-            SELECT id, cut_code FROM cut_periods WHERE id = :id
+            SELECT id, cut_code, status_id FROM cut_periods WHERE id = :id
             """),
             {"id": period_id}
         )
@@ -285,6 +296,7 @@ async def get_period_statements(
         
         return {
             "success": True,
+            "period_status_id": period.status_id,
             "data": all_data,
             "counts": {
                 "with_payments": len(statements_data),
@@ -306,6 +318,7 @@ async def get_period_payments_preview(
     period_id: int,
     include_all_associates: bool = Query(True, description="Incluir asociados sin pagos en el período"),
     include_payments_detail: bool = Query(False, description="Incluir array de pagos detallado (más pesado)"),
+    fields: Optional[FieldTree] = Depends(sparse_fields),
     db: AsyncSession = Depends(get_async_db),
 ):
     """
@@ -317,6 +330,9 @@ async def get_period_payments_preview(
     
     Por defecto NO incluye el detalle de pagos (include_payments_detail=false)
     para mejor rendimiento. Los pagos se cargan on-demand al expandir.
+    
+    `?fields=` recorta cada asociado de `data` (ej.
+    `fields=associate_id,balance,payments.id,payments.amount_paid`).
     """
     try:
         # Verificar período y obtener datos
@@ -474,7 +490,7 @@ async def get_period_payments_preview(
         associates_with_payments = [a for a in sorted_associates if a["has_payments"]]
         associates_without = [a for a in sorted_associates if not a["has_payments"]]
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "period": {
                 "id": period.id,
@@ -483,7 +499,7 @@ async def get_period_payments_preview(
                 "end_date": period.period_end_date.isoformat(),
                 "status_id": period.status_id
             },
-            "data": sorted_associates,
+            "data": apply_fields(sorted_associates, fields),
             "totals": {
                 "total_collected": sum(a["total_collected"] for a in associates_with_payments),
                 "total_commission": sum(a["total_commission"] for a in associates_with_payments),
@@ -495,7 +511,7 @@ async def get_period_payments_preview(
                 "associates_without_payments": len(associates_without),
                 "payment_count": sum(a["payment_count"] for a in associates_with_payments)
             }
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -568,17 +584,18 @@ async def update_period_status(
                 )
         
         # Ejecutar acciones específicas según la transición
+        engine = CutEngine(db)
         if current_status == 3 and new_status == 4:  # CUTOFF → COLLECTING
             # Generar statements para cada asociado con pagos en el período
-            await _generate_statements_for_period(db, period_id)
+            await engine.generate_statements([period_id])
         
         elif current_status == 4 and new_status == 6:  # COLLECTING → SETTLING
             # Marcar statements no pagados como vencidos
-            await _mark_overdue_statements(db, period_id)
+            await engine.mark_settling([period_id])
             
         elif current_status == 6 and new_status == 5:  # SETTLING → CLOSED
             # Transferir deudas pendientes a balances acumulados
-            await _transfer_pending_debts(db, period_id)
+            await engine.transfer_pending_debts(period_id)
         
         # Actualizar el estado del período
         await db.execute(
@@ -586,6 +603,7 @@ async def update_period_status(
             {"status": new_status, "id": period_id}
         )
         await db.commit()
+        await response_cache.invalidate("cut_periods", "statements")
         
         # Obtener datos actualizados
         result = await db.execute(
@@ -637,147 +655,41 @@ async def advance_periods(
        - Se generan statements, inicia el cobro a asociados
     3. Períodos más antiguos en COLLECTING pasan a SETTLING
        - Ya pasó su tiempo de cobro, entran en liquidación
+    4. Períodos más antiguos que quedaron en PENDING/CUTOFF (cortes perdidos)
+       se recuperan en la misma pasada hasta SETTLING (back-fill)
     
     Flujo de estados:
     PENDING (1) → CUTOFF (3) → COLLECTING (4) → SETTLING (6) → CLOSED (5)
     
-    Estados:
-    - PENDING (1): Período actual, recibiendo pagos de préstamos
-    - CUTOFF (3): Corte ejecutado, statements en borrador
-    - COLLECTING (4): EN COBRO - Asociados deben pagar sus statements
-    - SETTLING (6): Liquidación - Preparar deudas para cierre
-    - CLOSED (5): Cerrado definitivamente
+    La lógica vive en CutEngine (la misma que usa el job programado). Fuera
+    de dry_run cada etapa se confirma con su checkpoint en cut_runs; si ya
+    hay un corte en ejecución responde 409. Después de un corte con cambios
+    se toman las fotos de cartera de esos períodos (portfolio_snapshot_job).
     """
     try:
-        today = date.today()
-        changes = []
-        
-        # 1. Obtener el período ACTUAL (donde cae hoy)
-        result = await db.execute(
-            text("""
-            SELECT id, cut_code, period_start_date, period_end_date, status_id
-            FROM cut_periods
-            WHERE period_start_date <= :today AND period_end_date >= :today
-            ORDER BY period_start_date DESC
-            LIMIT 1
-            """),
-            {"today": today}
-        )
-        current_period = result.fetchone()
+        if dry_run:
+            plan = await CutEngine(db).run(dry_run=True)
+        else:
+            plan = await CutEngine(db).run_resumable(triggered_by="manual")
+        # 📸 Fotos de cartera de los períodos que cambiaron (como el job de corte)
+        snapshot = None
+        if plan.transitions and not dry_run:
+            await response_cache.invalidate("cut_periods", "statements")
+            snapshot = await portfolio_snapshot_job(
+                period_ids=[t.period_id for t in plan.transitions]
+            )
         
-        if not current_period:
+        if not plan.current_period:
             return {
                 "success": True,
                 "message": "No se encontró período para la fecha actual",
                 "changes": [],
-                "date_checked": today.isoformat()
+                "portfolio_snapshot": snapshot,
+                "date_checked": plan.reference_date.isoformat()
             }
         
-        # 2. Obtener el período ANTERIOR INMEDIATO (el que recién terminó)
-        #    Este debería estar en COLLECTING si ya pasó su corte
-        result = await db.execute(
-            text("""
-            SELECT id, cut_code, period_start_date, period_end_date, status_id
-            FROM cut_periods
-            WHERE period_end_date < :current_start
-            ORDER BY period_end_date DESC
-            LIMIT 1
-            """),
-            {"current_start": current_period.period_start_date}
-        )
-        previous_period = result.fetchone()
-        
-        # 3. Obtener períodos MÁS ANTIGUOS en COLLECTING (deben pasar a SETTLING)
-        if previous_period:
-            result = await db.execute(
-                text("""
-                SELECT id, cut_code, period_start_date, period_end_date, status_id
-                FROM cut_periods
-                WHERE period_end_date < :previous_start
-                AND status_id = 4  -- COLLECTING
-                ORDER BY period_start_date ASC
-                """),
-                {"previous_start": previous_period.period_start_date}
-            )
-            old_collecting_periods = result.fetchall()
-        else:
-            old_collecting_periods = []
-        
-        # 4. Procesar transiciones
-        
-        # 4a. Períodos antiguos COLLECTING → SETTLING
-        for period in old_collecting_periods:
-            change = {
-                "period_id": period.id,
-                "cut_code": period.cut_code,
-                "action": "COLLECTING → SETTLING",
-                "reason": "Período antiguo - tiempo de cobro terminado"
-            }
-            
-            if not dry_run:
-                await _mark_overdue_statements(db, period.id)
-                await db.execute(
-                    text("UPDATE cut_periods SET status_id = 6, updated_at = NOW() WHERE id = :id"),
-                    {"id": period.id}
-                )
-                change["status"] = "APPLIED"
-            else:
-                change["status"] = "DRY_RUN"
-            
-            changes.append(change)
-        
-        # 4b. Período anterior: Si está en CUTOFF o PENDING, pasar a COLLECTING
-        if previous_period and previous_period.status_id in [1, 3]:  # PENDING o CUTOFF
-            if previous_period.status_id == 1:
-                # PENDING → CUTOFF (generar statements primero)
-                change = {
-                    "period_id": previous_period.id,
-                    "cut_code": previous_period.cut_code,
-                    "action": "PENDING → CUTOFF → COLLECTING",
-                    "reason": "Período terminado - iniciando cobro"
-                }
-                
-                if not dry_run:
-                    # Primero a CUTOFF
-                    await db.execute(
-                        text("UPDATE cut_periods SET status_id = 3, updated_at = NOW() WHERE id = :id"),
-                        {"id": previous_period.id}
-                    )
-                    # Generar statements
-                    await _generate_statements_for_period(db, previous_period.id)
-                    # Luego a COLLECTING
-                    await db.execute(
-                        text("UPDATE cut_periods SET status_id = 4, updated_at = NOW() WHERE id = :id"),
-                        {"id": previous_period.id}
-                    )
-                    change["status"] = "APPLIED"
-                else:
-                    change["status"] = "DRY_RUN"
-                
-                changes.append(change)
-                
-            elif previous_period.status_id == 3:
-                # CUTOFF → COLLECTING
-                change = {
-                    "period_id": previous_period.id,
-                    "cut_code": previous_period.cut_code,
-                    "action": "CUTOFF → COLLECTING",
-                    "reason": "Período en corte - iniciando cobro"
-                }
-                
-                if not dry_run:
-                    await db.execute(
-                        text("UPDATE cut_periods SET status_id = 4, updated_at = NOW() WHERE id = :id"),
-                        {"id": previous_period.id}
-                    )
-                    change["status"] = "APPLIED"
-                else:
-                    change["status"] = "DRY_RUN"
-                
-                changes.append(change)
-        
-        if not dry_run:
-            await db.commit()
+        current_period = plan.current_period
+        previous_period = plan.previous_period
         
         return {
             "success": True,
@@ -794,10 +706,16 @@ async def advance_periods(
                 "cut_code": previous_period.cut_code,
                 "status_id": previous_period.status_id
             } if previous_period else None,
-            "changes": changes,
-            "date_checked": today.isoformat()
+            "changes": [t.to_dict() for t in plan.transitions],
+            "backfill": plan.backfill,
+            "statements_generated": plan.statements_generated,
+            "run_id": plan.run_id,
+            "portfolio_snapshot": snapshot,
+            "date_checked": plan.reference_date.isoformat()
         }
         
+    except CutRunInProgressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -843,8 +761,8 @@ async def close_period(
                 detail=f"Solo se pueden cerrar períodos en SETTLING (6). Estado actual: {period.status_id}"
             )
         
-        # Transferir deudas pendientes con detalles
-        debts_created = await _transfer_pending_debts(db, period_id)
+        # Transferir deudas pendientes con detalles (set-based)
+        transfers = await CutEngine(db).transfer_pending_debts(period_id)
         
         # Actualizar estado a CLOSED
         await db.execute(
@@ -853,11 +771,14 @@ async def close_period(
         )
         
         await db.commit()
+        await response_cache.invalidate("cut_periods", "statements")
         
         return {
             "success": True,
             "message": f"Período {period.cut_code} cerrado exitosamente",
-            "debts_created": debts_created,
+            "debts_created": sum(t.statements for t in transfers),
+            "total_debt_transferred": float(sum(t.debt_amount for t in transfers)),
+            "debt_summary": [t.to_dict() for t in transfers],
             "data": {
                 "id": period.id,
                 "cut_code": period.cut_code,
@@ -873,319 +794,3 @@ async def close_period(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error cerrando período: {str(e)}"
         )
-
-
-async def _mark_overdue_statements(db: AsyncSession, period_id: int):
-    """
-    Mueve TODOS los statements del período a estado SETTLING (9).
-    Se ejecuta cuando el período pasa a liquidación (COLLECTING → SETTLING).
-    
-    El estado de deuda (pagado/parcial/pendiente) se calcula dinámicamente
-    basado en los campos paid_amount y total_to_credicuenta.
-    """
-    # Mover TODOS los statements activos a SETTLING
-    await db.execute(
-        text("""
-        UPDATE associate_payment_statements
-        SET 
-            status_id = 9,  -- SETTLING
-            updated_at = NOW()
-        WHERE cut_period_id = :period_id
-          AND status_id IN (3, 4, 5, 7, 8)  -- Cualquier estado activo (no DRAFT ni ya SETTLING/CLOSED)
-        """),
-        {"period_id": period_id}
-    )
-    
-    # Log: Contar cuántos se movieron
-    result = await db.execute(
-        text("""
-        SELECT COUNT(*) as count
-        FROM associate_payment_statements
-        WHERE cut_period_id = :period_id AND status_id = 9
-        """),
-        {"period_id": period_id}
-    )
-    count = result.fetchone()
-    print(f"📋 Statements movidos a SETTLING para período {period_id}: {count.count if count else 0}")
-
-
-async def _generate_statements_for_period(db: AsyncSession, period_id: int):
-    """
-    Genera statements para cada asociado que tiene pagos en el período.
-    Se ejecuta cuando se cierra el corte (CUTOFF → COLLECTING).
-    
-    IMPORTANTE: Excluye pagos IN_AGREEMENT (status_id=13) porque están en convenio.
-    """
-    # Obtener asociados con pagos en el período, agrupados
-    # EXCLUIR: status_id = 13 (IN_AGREEMENT) - estos están consolidados en convenio
-    result = await db.execute(
-        text("""
-        SELECT 
-            l.associate_user_id as associate_id,
-            COUNT(DISTINCT p.id) as payment_count,
-            SUM(p.expected_amount) as total_collected,
-            SUM(p.commission_amount) as total_commission,
-            SUM(p.associate_payment) as total_to_credicuenta,
-            MAX(l.commission_rate) as commission_rate
-        FROM payments p
-        JOIN loans l ON l.id = p.loan_id
-        WHERE p.cut_period_id = :period_id
-          AND p.status_id != 13  -- Excluir pagos IN_AGREEMENT
-          AND l.associate_user_id IS NOT NULL
-        GROUP BY l.associate_user_id
-        """),
-        {"period_id": period_id}
-    )
-    
-    associates = result.fetchall()
-    
-    if not associates:
-        return  # No hay pagos en el período
-    
-    # Obtener información del período para fechas
-    period_result = await db.execute(
-        text("SELECT cut_code, period_end_date FROM cut_periods WHERE id = :id"),
-        {"id": period_id}
-    )
-    period = period_result.fetchone()
-    
-    # Generar un statement por cada asociado
-    for assoc in associates:
-        # Verificar si ya existe un statement para este asociado/período
-        existing = await db.execute(
-            text("""
-            SELECT id FROM associate_payment_statements 
-            WHERE user_id = :user_id AND cut_period_id = :period_id
-            """),
-            {"user_id": assoc.associate_id, "period_id": period_id}
-        )
-        
-        if existing.fetchone():
-            continue  # Ya existe, saltar
-        
-        # Generar número de statement único
-        statement_number = f"ST-{period.cut_code}-{assoc.associate_id:04d}"
-        
-        # Crear statement en estado COLLECTING (7)
-        await db.execute(
-            text("""
-            INSERT INTO associate_payment_statements (
-                user_id,
-                cut_period_id,
-                statement_number,
-                total_amount_collected,
-                total_to_credicuenta,
-                commission_earned,
-                total_payments_count,
-                commission_rate_applied,
-                paid_amount,
-                late_fee_amount,
-                status_id,
-                generated_date,
-                due_date,
-                created_at
-            ) VALUES (
-                :user_id,
-                :period_id,
-                :statement_number,
-                :total_collected,
-                :total_to_credicuenta,
-                :commission_earned,
-                :payment_count,
-                :commission_rate,
-                0,
-                0,
-                7,
-                CURRENT_DATE,
-                :due_date,
-                NOW()
-            )
-            """),
-            {
-                "user_id": assoc.associate_id,
-                "period_id": period_id,
-                "statement_number": statement_number,
-                "total_collected": assoc.total_collected or 0,
-                "total_to_credicuenta": assoc.total_to_credicuenta or 0,  # Lo que debe pagar a Credicuenta
-                "commission_earned": (assoc.total_collected or 0) - (assoc.total_to_credicuenta or 0),  # Comisión ganada
-                "payment_count": assoc.payment_count,
-                "commission_rate": assoc.commission_rate or 0,
-                "due_date": period.period_end_date  # Fecha límite = fin del período
-            }
-        )
-
-
-async def _transfer_pending_debts(db: AsyncSession, period_id: int) -> int:
-    """
-    Transfiere deudas pendientes de statements no pagados a balances acumulados.
-    Se ejecuta cuando se cierra definitivamente (SETTLING → CLOSED).
-    
-    1. Mueve TODOS los statements a estado CLOSED (10)
-    2. Para los que tienen deuda pendiente, la transfiere a associate_accumulated_balances
-    
-    Returns:
-        int: Número de deudas creadas/actualizadas
-    """
-    import json
-    
-    # Obtener información del período
-    period_result = await db.execute(
-        text("SELECT cut_code FROM cut_periods WHERE id = :id"),
-        {"id": period_id}
-    )
-    period = period_result.fetchone()
-    period_code = period.cut_code if period else f"P{period_id}"
-    
-    # Obtener TODOS los statements del período para procesar
-    result = await db.execute(
-        text("""
-        SELECT 
-            aps.id,
-            aps.user_id,
-            aps.statement_number,
-            aps.total_to_credicuenta,
-            aps.paid_amount,
-            aps.late_fee_amount,
-            aps.status_id,
-            u.first_name || ' ' || u.last_name as associate_name
-        FROM associate_payment_statements aps
-        LEFT JOIN users u ON u.id = aps.user_id
-        WHERE aps.cut_period_id = :period_id
-        """),
-        {"period_id": period_id}
-    )
-    
-    all_statements = result.fetchall()
-    debts_created = 0
-    
-    for stmt in all_statements:
-        total_due = Decimal(str(stmt.total_to_credicuenta or 0)) + Decimal(str(stmt.late_fee_amount or 0))
-        paid = Decimal(str(stmt.paid_amount or 0))
-        pending_amount = total_due - paid
-        
-        # Si tiene deuda pendiente, transferirla
-        if pending_amount > Decimal("0.01"):
-            # Crear detalle de la deuda en JSON
-            debt_detail = {
-                "statement_id": stmt.id,
-                "statement_number": stmt.statement_number,
-                "original_amount": float(stmt.total_to_credicuenta or 0),
-                "late_fee": float(stmt.late_fee_amount or 0),
-                "paid_amount": float(stmt.paid_amount or 0),
-                "debt_amount": float(pending_amount),
-                "absorbed_date": datetime.now().isoformat(),
-                "period_code": period_code
-            }
-            
-            # Verificar si ya existe un registro para este asociado y período
-            existing = await db.execute(
-                text("""
-                SELECT id, accumulated_debt, debt_details 
-                FROM associate_accumulated_balances 
-                WHERE user_id = :user_id AND cut_period_id = :period_id
-                """),
-                {"user_id": stmt.user_id, "period_id": period_id}
-            )
-            existing_balance = existing.fetchone()
-            
-            if existing_balance:
-                # Actualizar balance existente
-                current_details = existing_balance.debt_details or []
-                if isinstance(current_details, str):
-                    current_details = json.loads(current_details)
-                current_details.append(debt_detail)
-                
-                await db.execute(
-                    text("""
-                    UPDATE associate_accumulated_balances 
-                    SET accumulated_debt = accumulated_debt + :amount,
-                        debt_details = CAST(:details AS jsonb),
-                        updated_at = NOW()
-                    WHERE id = :id
-                    """),
-                    {
-                        "id": existing_balance.id,
-                        "amount": float(pending_amount),
-                        "details": json.dumps(current_details)
-                    }
-                )
-            else:
-                # Crear nuevo registro de balance
-                await db.execute(
-                    text("""
-                    INSERT INTO associate_accumulated_balances (
-                        user_id, cut_period_id, accumulated_debt, debt_details, created_at, updated_at
-                    ) VALUES (
-                        :user_id, :period_id, :amount, CAST(:details AS jsonb), NOW(), NOW()
-                    )
-                    """),
-                    {
-                        "user_id": stmt.user_id,
-                        "period_id": period_id,
-                        "amount": float(pending_amount),
-                        "details": json.dumps([debt_detail])
-                    }
-                )
-            
-            # ⭐ IMPORTANTE: Actualizar consolidated_debt del associate_profile
-            # La deuda del statement no pagado se suma al consolidated_debt
-            await db.execute(
-                text("""
-                UPDATE associate_profiles
-                SET consolidated_debt = COALESCE(consolidated_debt, 0) + :amount,
-                    updated_at = NOW()
-                WHERE user_id = :user_id
-                """),
-                {
-                    "user_id": stmt.user_id,
-                    "amount": float(pending_amount)
-                }
-            )
-            print(f"   📊 consolidated_debt actualizado: +${float(pending_amount):.2f}")
-            
-            # ⭐ Marcar los pagos de clientes como PAID_BY_ASSOCIATE
-            # Estos son los pagos que el asociado absorbió al no reportarlos
-            # El cliente ya no debe pagar a CrediCuenta, pero puede que aún deba al asociado
-            client_payments_result = await db.execute(
-                text("""
-                UPDATE payments p
-                SET status_id = 9,  -- PAID_BY_ASSOCIATE
-                    marking_notes = CONCAT(
-                        COALESCE(marking_notes, ''),
-                        CASE WHEN marking_notes IS NOT NULL THEN ' | ' ELSE '' END,
-                        'Absorbido por asociado al cierre del período ',
-                        CAST(:period_code AS TEXT)
-                    ),
-                    updated_at = NOW()
-                FROM loans l
-                WHERE p.loan_id = l.id
-                  AND l.associate_user_id = :associate_user_id
-                  AND p.cut_period_id = :period_id
-                  AND p.status_id = 1  -- Solo los PENDING
-                RETURNING p.id
-                """),
-                {
-                    "associate_user_id": stmt.user_id,
-                    "period_id": period_id,
-                    "period_code": period_code
-                }
-            )
-            marked_payments = client_payments_result.fetchall()
-            print(f"   📌 {len(marked_payments)} pagos de clientes marcados como PAID_BY_ASSOCIATE")
-            
-            debts_created += 1
-            print(f"💰 Deuda transferida: {stmt.associate_name} - ${float(pending_amount):.2f} ({stmt.statement_number})")
-    
-    # Mover TODOS los statements a CLOSED (10)
-    await db.execute(
-        text("""
-        UPDATE associate_payment_statements 
-        SET status_id = 10, updated_at = NOW()
-        WHERE cut_period_id = :period_id
-        """),
-        {"period_id": period_id}
-    )
-    
-    print(f"📋 Todos los statements del período {period_id} movidos a CLOSED")
-    
-    return debts_created
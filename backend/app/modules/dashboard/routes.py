@@ -1,13 +1,14 @@
 """
 Dashboard Routes - Métricas principales del sistema
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, text
 from datetime import datetime, date
 from decimal import Decimal
+from typing import List, Optional
 
-from app.core.database import get_async_db
+from app.core.database import get_async_read_db
 from app.core.dependencies import require_admin
 from app.modules.loans.infrastructure.models import LoanModel
 from app.modules.payments.infrastructure.models import PaymentModel
@@ -29,6 +30,35 @@ class DashboardStatsDTO(BaseModel):
     total_disbursed: Decimal
 
 
+class PortfolioTrendPointDTO(BaseModel):
+    """Foto de cartera de un período (tablas portfolio_*_snapshots)"""
+    cut_period_id: int
+    cut_code: Optional[str]
+    period_end_date: date
+    associates_count: Optional[int] = None
+    loans_count: Optional[int] = None
+    payments_due: int
+    expected_amount: Decimal
+    collected_amount: Decimal
+    commission_amount: Decimal
+    outstanding_amount: Decimal
+    overdue_amount: Decimal
+    collection_rate: Optional[Decimal] = None
+
+
+def _trend(rows) -> List[PortfolioTrendPointDTO]:
+    """Filas más recientes primero → puntos en orden cronológico."""
+    points = []
+    for row in reversed(rows):
+        data = dict(row)
+        expected = data["expected_amount"]
+        data["collection_rate"] = (
+            round(data["collected_amount"] / expected * 100, 2) if expected else None
+        )
+        points.append(PortfolioTrendPointDTO(**data))
+    return points
+
+
 router = APIRouter(
     prefix="/dashboard",
     tags=["dashboard"],
@@ -37,7 +67,7 @@ router = APIRouter(
 
 
 @router.get("/stats", response_model=DashboardStatsDTO)
-async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_read_db)):
     """
     Obtiene estadísticas principales para el dashboard.
     
@@ -134,3 +164,78 @@ async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
         collected_this_month=collected_this_month,
         total_disbursed=total_disbursed
     )
+
+
+# =============================================================================
+# TENDENCIAS DE CARTERA
+# Leen solo las fotos por período (migración 044), nunca payments/loans.
+# =============================================================================
+
+@router.get("/portfolio/trend", response_model=List[PortfolioTrendPointDTO])
+async def get_portfolio_trend(
+    periods: int = Query(12, ge=1, le=120, description="Últimos N períodos con foto"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Tendencia de toda la cartera por período: esperado, cobrado, comisión,
+    saldo pendiente y vencido, con la tasa de cobro (cobrado / esperado).
+    """
+    rows = (await db.execute(text("""
+        SELECT
+            cut_period_id,
+            MIN(cut_code) AS cut_code,
+            period_end_date,
+            COUNT(*) AS associates_count,
+            SUM(loans_count) AS loans_count,
+            SUM(payments_due) AS payments_due,
+            SUM(expected_amount) AS expected_amount,
+            SUM(collected_amount) AS collected_amount,
+            SUM(commission_amount) AS commission_amount,
+            SUM(outstanding_amount) AS outstanding_amount,
+            SUM(overdue_amount) AS overdue_amount
+        FROM portfolio_associate_snapshots
+        GROUP BY period_end_date, cut_period_id
+        ORDER BY period_end_date DESC
+        LIMIT :periods
+    """), {"periods": periods})).mappings().all()
+    return _trend(rows)
+
+
+@router.get("/portfolio/associates/{associate_user_id}/trend", response_model=List[PortfolioTrendPointDTO])
+async def get_associate_portfolio_trend(
+    associate_user_id: int,
+    periods: int = Query(12, ge=1, le=120, description="Últimos N períodos con foto"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Tendencia de la cartera de un asociado por período."""
+    rows = (await db.execute(text("""
+        SELECT
+            cut_period_id, cut_code, period_end_date, loans_count, payments_due,
+            expected_amount, collected_amount, commission_amount,
+            outstanding_amount, overdue_amount
+        FROM portfolio_associate_snapshots
+        WHERE associate_user_id = :associate_user_id
+        ORDER BY period_end_date DESC
+        LIMIT :periods
+    """), {"associate_user_id": associate_user_id, "periods": periods})).mappings().all()
+    return _trend(rows)
+
+
+@router.get("/portfolio/loans/{loan_id}/trend", response_model=List[PortfolioTrendPointDTO])
+async def get_loan_portfolio_trend(
+    loan_id: int,
+    periods: int = Query(24, ge=1, le=120, description="Últimos N períodos con foto"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Tendencia de un préstamo por período."""
+    rows = (await db.execute(text("""
+        SELECT
+            cut_period_id, cut_code, period_end_date, payments_due,
+            expected_amount, collected_amount, commission_amount,
+            outstanding_amount, overdue_amount
+        FROM portfolio_loan_snapshots
+        WHERE loan_id = :loan_id
+        ORDER BY period_end_date DESC
+        LIMIT :periods
+    """), {"loan_id": loan_id, "periods": periods})).mappings().all()
+    return _trend(rows)
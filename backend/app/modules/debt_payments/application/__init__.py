@@ -2,6 +2,7 @@
 from .dtos import (
     RegisterDebtPaymentDTO,
     DebtPaymentResponseDTO,
+    DebtPaymentPreviewDTO,
     DebtPaymentSummaryDTO,
     AssociateDebtSummaryDTO
 )
@@ -11,6 +12,7 @@ from .enhanced_service import DebtPaymentEnhancedService
 __all__ = [
     "RegisterDebtPaymentDTO",
     "DebtPaymentResponseDTO",
+    "DebtPaymentPreviewDTO",
     "DebtPaymentSummaryDTO",
     "AssociateDebtSummaryDTO",
     "RegisterDebtPaymentUseCase",
@@ -98,6 +98,51 @@ class DebtPaymentResponseDTO(BaseModel):
         }
 
 
+class DebtPaymentPreviewDTO(BaseModel):
+    """DTO con la asignación FIFO que tendría un abono (sin registrarlo)."""
+    
+    associate_profile_id: int
+    associate_name: str
+    payment_amount: Decimal
+    amount_applied: Decimal
+    unapplied_amount: Decimal
+    current_consolidated_debt: Decimal
+    applied_breakdown_items: List[Dict[str, Any]]
+    total_items_liquidated: int
+    total_items_partial: int
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "associate_profile_id": 5,
+                "associate_name": "Juan Pérez",
+                "payment_amount": "50000.00",
+                "amount_applied": "50000.00",
+                "unapplied_amount": "0.00",
+                "current_consolidated_debt": "55000.00",
+                "applied_breakdown_items": [
+                    {
+                        "breakdown_id": 10,
+                        "cut_period_id": 5,
+                        "original_amount": "30000.00",
+                        "amount_applied": "30000.00",
+                        "liquidated": True
+                    },
+                    {
+                        "breakdown_id": 11,
+                        "cut_period_id": 6,
+                        "original_amount": "25000.00",
+                        "amount_applied": "20000.00",
+                        "liquidated": False,
+                        "remaining_amount": "5000.00"
+                    }
+                ],
+                "total_items_liquidated": 1,
+                "total_items_partial": 1
+            }
+        }
+
+
 class DebtPaymentSummaryDTO(BaseModel):
     """DTO resumido para listados."""
     
@@ -3,9 +3,11 @@ Use Case: Register Debt Payment
 
 Registra un pago de deuda que se aplica automáticamente usando lógica FIFO.
 """
+from decimal import Decimal
+
 from ..domain.entities import DebtPayment
 from ..infrastructure.pg_repository import PgDebtPaymentRepository
-from .dtos import RegisterDebtPaymentDTO
+from .dtos import DebtPaymentPreviewDTO, RegisterDebtPaymentDTO
 
 
 class RegisterDebtPaymentUseCase:
@@ -16,11 +18,64 @@ class RegisterDebtPaymentUseCase:
     - Liquida primero los items de deuda más antiguos
     - Actualiza consolidated_debt del asociado
     - Registra el detalle en applied_breakdown_items
+    
+    `preview()` calcula la misma asignación FIFO sin escribir.
     """
     
     def __init__(self, repository: PgDebtPaymentRepository):
         self.repository = repository
     
+    def _get_debt_summary(self, associate_profile_id: int) -> dict:
+        """
+        Verifica que el asociado exista y tenga deuda pendiente.
+        
+        Raises:
+            ValueError: Si el asociado no existe o no tiene deuda pendiente
+        """
+        debt_summary = self.repository.get_associate_debt_summary(associate_profile_id)
+        
+        if not debt_summary:
+            raise ValueError(f"Associate profile {associate_profile_id} not found")
+        
+        if debt_summary["current_consolidated_debt"] <= 0:
+            raise ValueError(
+                f"Associate {debt_summary['associate_name']} has no pending debt. "
+                f"Current debt balance: {debt_summary['current_consolidated_debt']}"
+            )
+        
+        return debt_summary
+    
+    def preview(self, dto: RegisterDebtPaymentDTO) -> DebtPaymentPreviewDTO:
+        """
+        Calcula cómo se aplicaría el abono (FIFO) sin registrarlo.
+        
+        Args:
+            dto: Datos del pago a simular
+        
+        Returns:
+            DebtPaymentPreviewDTO: Items que se liquidarían y monto no aplicado
+        
+        Raises:
+            ValueError: Si el asociado no existe o no tiene deuda pendiente
+        """
+        debt_summary = self._get_debt_summary(dto.associate_profile_id)
+        items = self.repository.preview_allocation(dto.associate_profile_id, dto.payment_amount)
+        
+        amount_applied = sum((Decimal(item["amount_applied"]) for item in items), Decimal("0"))
+        liquidated = sum(1 for item in items if item["liquidated"])
+        
+        return DebtPaymentPreviewDTO(
+            associate_profile_id=dto.associate_profile_id,
+            associate_name=debt_summary["associate_name"],
+            payment_amount=dto.payment_amount,
+            amount_applied=amount_applied,
+            unapplied_amount=dto.payment_amount - amount_applied,
+            current_consolidated_debt=Decimal(str(debt_summary["current_consolidated_debt"])),
+            applied_breakdown_items=items,
+            total_items_liquidated=liquidated,
+            total_items_partial=len(items) - liquidated,
+        )
+    
     def execute(self, dto: RegisterDebtPaymentDTO, registered_by: int) -> DebtPayment:
         """
         Registra un nuevo pago de deuda.
@@ -35,17 +90,7 @@ class RegisterDebtPaymentUseCase:
         Raises:
             ValueError: Si el asociado no existe o no tiene deuda pendiente
         """
-        # Verificar que el asociado tenga deuda pendiente
-        debt_summary = self.repository.get_associate_debt_summary(dto.associate_profile_id)
-        
-        if not debt_summary:
-            raise ValueError(f"Associate profile {dto.associate_profile_id} not found")
-        
-        if debt_summary["current_consolidated_debt"] <= 0:
-            raise ValueError(
-                f"Associate {debt_summary['associate_name']} has no pending debt. "
-                f"Current debt balance: {debt_summary['current_consolidated_debt']}"
-            )
+        debt_summary = self._get_debt_summary(dto.associate_profile_id)
         
         # Advertencia si el pago excede la deuda
         if dto.payment_amount > debt_summary["current_consolidated_debt"]:
@@ -1,6 +1,7 @@
 """
 Repositorio PostgreSQL para Debt Payments.
 """
+from decimal import Decimal
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -32,7 +33,9 @@ class PgDebtPaymentRepository:
         """
         Registra un nuevo pago de deuda.
         
-        El trigger `trigger_apply_debt_payment_fifo` se ejecuta automáticamente:
+        El trigger `trigger_apply_debt_payment_fifo` (migración 045) se ejecuta
+        automáticamente, con los mismos totales acumulados que
+        `preview_allocation()`:
         1. Aplica FIFO para liquidar items de deuda (oldest first)
         2. Actualiza consolidated_debt en associate_profiles
         3. Llena applied_breakdown_items con el detalle
@@ -89,6 +92,49 @@ class PgDebtPaymentRepository:
         
         return [self._to_entity(m) for m in models]
     
+    def preview_allocation(self, associate_profile_id: int, payment_amount: Decimal) -> List[dict]:
+        """
+        Calcula la asignación FIFO de un abono sin escribir nada.
+
+        Misma regla que `apply_excess_to_debt_fifo`: totales acumulados por
+        created_at, id; cada item recibe LEAST(monto, abono - deuda anterior).
+        Una sola consulta sin importar cuántos items tenga el asociado.
+        """
+        rows = self.db.execute(text("""
+            WITH fifo AS (
+                SELECT
+                    id,
+                    cut_period_id,
+                    amount,
+                    SUM(amount) OVER (ORDER BY created_at, id) AS running_total
+                FROM associate_debt_breakdown
+                WHERE associate_profile_id = :associate_id
+                  AND is_liquidated = false
+            )
+            SELECT
+                id,
+                cut_period_id,
+                amount,
+                LEAST(amount, CAST(:amount AS NUMERIC) - (running_total - amount)) AS amount_applied
+            FROM fifo
+            WHERE running_total - amount < CAST(:amount AS NUMERIC)
+            ORDER BY running_total
+        """), {"associate_id": associate_profile_id, "amount": payment_amount}).fetchall()
+
+        items = []
+        for row in rows:
+            item = {
+                "breakdown_id": row.id,
+                "cut_period_id": row.cut_period_id,
+                "original_amount": row.amount,
+                "amount_applied": row.amount_applied,
+                "liquidated": row.amount_applied >= row.amount,
+            }
+            if not item["liquidated"]:
+                item["remaining_amount"] = row.amount - row.amount_applied
+            items.append(item)
+        return items
+
     def get_associate_debt_summary(self, associate_profile_id: int) -> Optional[dict]:
         """
         Obtiene el resumen de deuda de un asociado desde la vista.
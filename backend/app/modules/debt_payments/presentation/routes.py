@@ -13,6 +13,7 @@ from app.modules.auth.routes import get_current_user_id
 from ..application.dtos import (
     RegisterDebtPaymentDTO,
     DebtPaymentResponseDTO,
+    DebtPaymentPreviewDTO,
     DebtPaymentSummaryDTO,
     AssociateDebtSummaryDTO
 )
@@ -84,6 +85,41 @@ def register_debt_payment(
         )
 
 
+@router.post(
+    "/preview",
+    response_model=DebtPaymentPreviewDTO,
+    summary="Preview debt payment",
+    description="Compute the FIFO allocation of a debt payment without registering it"
+)
+def preview_debt_payment(
+    dto: RegisterDebtPaymentDTO,
+    repository: PgDebtPaymentRepository = Depends(get_repository),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    Simula un pago de deuda (no escribe nada).
+    
+    Devuelve los items que se liquidarían (completos y parcial) y el monto
+    que quedaría sin aplicar, con la misma regla FIFO del registro.
+    
+    **Permissions**: admin, auxiliar_administrativo
+    """
+    try:
+        use_case = RegisterDebtPaymentUseCase(repository)
+        return use_case.preview(dto)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error previewing debt payment: {str(e)}"
+        )
+
+
 @router.get(
     "/{payment_id}",
     response_model=DebtPaymentResponseDTO,
@@ -1,5 +1,6 @@
 from .client_document_dto import (
     ClientDocumentResponseDTO,
+    UploadedClientDocumentDTO,
     CreateClientDocumentDTO,
     ClientDocumentListItemDTO,
     PaginatedClientDocumentsDTO
@@ -7,6 +8,7 @@ from .client_document_dto import (
 
 __all__ = [
     "ClientDocumentResponseDTO",
+    "UploadedClientDocumentDTO",
     "CreateClientDocumentDTO",
     "ClientDocumentListItemDTO",
     "PaginatedClientDocumentsDTO"
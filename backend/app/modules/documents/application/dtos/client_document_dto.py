@@ -20,6 +20,10 @@ class ClientDocumentResponseDTO(BaseModel):
     comments: Optional[str]
     created_at: datetime
     updated_at: datetime
+    content_sha256: Optional[str] = None
+
+class UploadedClientDocumentDTO(ClientDocumentResponseDTO):
+    deduplicated: bool  # True si el contenido ya estaba almacenado
 
 class CreateClientDocumentDTO(BaseModel):
     user_id: int
@@ -1,7 +1,9 @@
 from .list_client_documents import ListClientDocumentsUseCase
 from .get_user_documents import GetUserDocumentsUseCase
+from .upload_client_document import UploadClientDocumentUseCase
 
 __all__ = [
     "ListClientDocumentsUseCase",
-    "GetUserDocumentsUseCase"
+    "GetUserDocumentsUseCase",
+    "UploadClientDocumentUseCase"
 ]
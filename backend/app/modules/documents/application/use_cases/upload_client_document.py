@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import UploadFile
+from app.core.storage import DocumentStorage
+from ...domain.entities import ClientDocument
+from ...domain.repositories import ClientDocumentRepository
+
+class UploadClientDocumentUseCase:
+    def __init__(self, repository: ClientDocumentRepository, storage: DocumentStorage):
+        self.repository = repository
+        self.storage = storage
+    
+    async def execute(
+        self,
+        user_id: int,
+        document_type_id: int,
+        file: UploadFile,
+        comments: Optional[str] = None
+    ) -> Tuple[ClientDocument, bool]:
+        # Se guarda en streaming bajo su SHA-256; si el contenido ya existía
+        # el documento apunta al mismo archivo (stored.created = False)
+        stored = await self.storage.save(file)
+        original_name = file.filename or stored.sha256
+        now = datetime.utcnow()
+        document = await self.repository.create(ClientDocument(
+            id=None,
+            user_id=user_id,
+            document_type_id=document_type_id,
+            file_name=original_name[:255],
+            original_file_name=original_name[:255],
+            file_path=stored.key,
+            file_size=stored.size,
+            mime_type=stored.media_type,
+            status_id=1,  # PENDING
+            upload_date=now,
+            reviewed_by=None,
+            reviewed_at=None,
+            comments=comments,
+            created_at=now,
+            updated_at=now,
+            content_sha256=stored.sha256
+        ))
+        return document, not stored.created
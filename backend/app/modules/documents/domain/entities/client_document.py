@@ -19,6 +19,7 @@ class ClientDocument:
     comments: Optional[str]
     created_at: datetime
     updated_at: datetime
+    content_sha256: Optional[str] = None
     
     def is_verified(self) -> bool:
         return self.status_id == 3  # VERIFIED
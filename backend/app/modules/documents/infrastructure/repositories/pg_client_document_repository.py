@@ -21,7 +21,8 @@ def _map_model_to_entity(model: ClientDocumentModel) -> ClientDocument:
         reviewed_at=model.reviewed_at,
         comments=model.comments,
         created_at=model.created_at,
-        updated_at=model.updated_at
+        updated_at=model.updated_at,
+        content_sha256=model.content_sha256
     )
 
 class PgClientDocumentRepository(ClientDocumentRepository):
@@ -65,7 +66,8 @@ class PgClientDocumentRepository(ClientDocumentRepository):
             file_size=document.file_size,
             mime_type=document.mime_type,
             status_id=document.status_id,
-            comments=document.comments
+            comments=document.comments,
+            content_sha256=document.content_sha256
         )
         self.session.add(model)
         await self.session.flush()
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.core.database import get_async_db
-from .application.dtos import ClientDocumentResponseDTO, ClientDocumentListItemDTO, PaginatedClientDocumentsDTO
-from .application.use_cases import ListClientDocumentsUseCase, GetUserDocumentsUseCase
+from app.core.dependencies import ensure_owner_or_staff, get_current_user_id, get_current_user_roles
+from app.core.storage import UploadTooLargeError, get_storage
+from .application.dtos import (
+    ClientDocumentResponseDTO,
+    UploadedClientDocumentDTO,
+    ClientDocumentListItemDTO,
+    PaginatedClientDocumentsDTO
+)
+from .application.use_cases import ListClientDocumentsUseCase, GetUserDocumentsUseCase, UploadClientDocumentUseCase
 from .infrastructure.repositories import PgClientDocumentRepository
 
 router = APIRouter(prefix="/documents", tags=["documents"])
@@ -32,3 +40,61 @@ async def get_user_documents(
     use_case = GetUserDocumentsUseCase(repository)
     documents = await use_case.execute(user_id)
     return [ClientDocumentResponseDTO.model_validate(d) for d in documents]
+
+@router.post("/upload", response_model=UploadedClientDocumentDTO, status_code=201)
+async def upload_client_document(
+    user_id: int = Form(...),
+    document_type_id: int = Form(...),
+    comments: Optional[str] = Form(None),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    current_user_roles: List[str] = Depends(get_current_user_roles)
+):
+    """
+    Sube un documento del cliente (multipart, en streaming).
+    El archivo se guarda bajo su SHA-256: si ya existía no se duplica (deduplicated=true).
+    Solo el propio cliente o el personal pueden subir documentos de un cliente.
+    """
+    ensure_owner_or_staff(
+        user_id, current_user_id, current_user_roles,
+        detail="No tiene permisos para subir documentos de este cliente"
+    )
+    repository = PgClientDocumentRepository(db)
+    use_case = UploadClientDocumentUseCase(repository, get_storage())
+    try:
+        document, deduplicated = await use_case.execute(user_id, document_type_id, file, comments)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=e.message)
+    await db.commit()
+    return UploadedClientDocumentDTO(
+        **ClientDocumentResponseDTO.model_validate(document).model_dump(),
+        deduplicated=deduplicated
+    )
+
+@router.get("/{document_id}/download")
+async def download_client_document(
+    document_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    current_user_roles: List[str] = Depends(get_current_user_roles)
+):
+    """
+    Descarga en streaming. Soporta Range (206) e If-None-Match (304, ETag = SHA-256).
+    Solo el cliente dueño del documento o el personal.
+    """
+    repository = PgClientDocumentRepository(db)
+    document = await repository.find_by_id(document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail=f"Documento {document_id} no encontrado")
+    ensure_owner_or_staff(
+        document.user_id, current_user_id, current_user_roles,
+        detail="No tiene permisos para ver este documento"
+    )
+    return await get_storage().download_response(
+        request,
+        document.file_path,
+        filename=document.original_file_name,
+        media_type=document.mime_type
+    )
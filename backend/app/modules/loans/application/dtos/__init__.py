@@ -3,7 +3,7 @@ DTOs (Data Transfer Objects) para el módulo de préstamos.
 
 Pydantic v2 para validación y serialización.
 """
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
 
@@ -108,6 +108,31 @@ class LoanCancelDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class LoanEligibilityCandidateDTO(BaseModel):
+    """
+    Candidato (cliente, asociado, monto) para pre-evaluar sin crear préstamo.
+    """
+    user_id: int = Field(..., gt=0, description="ID del cliente")
+    associate_user_id: int = Field(..., gt=0, description="ID del asociado")
+    amount: Decimal = Field(..., gt=0, description="Monto solicitado")
+
+
+class LoanEligibilityRequestDTO(BaseModel):
+    """
+    DTO para pre-evaluar elegibilidad en lote.
+    
+    Usado en: POST /loans/eligibility
+    """
+    loan_ids: list[int] = Field(
+        default_factory=list, max_length=200,
+        description="Préstamos de la cola de aprobaciones a evaluar"
+    )
+    candidates: list[LoanEligibilityCandidateDTO] = Field(
+        default_factory=list, max_length=200,
+        description="Solicitudes hipotéticas a evaluar"
+    )
+
+
 # =============================================================================
 # RESPONSE DTOs
 # =============================================================================
@@ -233,6 +258,65 @@ class LoanBalanceDTO(BaseModel):
         )
 
 
+class LoanEligibilityReasonDTO(BaseModel):
+    """Regla no cumplida."""
+    code: str = Field(..., description="Código de la regla (INSUFFICIENT_CREDIT, CLIENT_DEFAULTER, ...)")
+    message: str = Field(..., description="Mensaje para el usuario")
+
+
+class LoanEligibilityDTO(BaseModel):
+    """
+    DTO de elegibilidad de un préstamo o candidato.
+    
+    Usado en: POST /loans/eligibility (items)
+    """
+    loan_id: Optional[int] = Field(None, description="ID del préstamo (None para candidatos)")
+    user_id: Optional[int] = Field(None, description="ID del cliente")
+    associate_user_id: Optional[int] = Field(None, description="ID del asociado")
+    amount: Optional[Decimal] = Field(None, description="Monto")
+    eligible: bool = Field(..., description="¿Cumple todas las reglas?")
+    reasons: list[LoanEligibilityReasonDTO] = Field(default_factory=list, description="Reglas no cumplidas")
+    available_credit: Optional[Decimal] = Field(None, description="Crédito disponible del asociado")
+    pending_loans: int = Field(0, description="Otros préstamos PENDING del cliente")
+    is_defaulter: bool = Field(False, description="¿Cliente con reporte de morosidad aprobado?")
+    first_payment_date: Optional[date] = Field(None, description="Primer pago si se aprueba hoy")
+    
+    @classmethod
+    def from_result(cls, result):
+        """
+        Crea un LoanEligibilityDTO desde EligibilityResult.
+        
+        Args:
+            result: Instancia de EligibilityResult
+            
+        Returns:
+            LoanEligibilityDTO
+        """
+        return cls(
+            loan_id=result.loan_id,
+            user_id=result.client_user_id,
+            associate_user_id=result.associate_user_id,
+            amount=result.amount,
+            eligible=result.eligible,
+            reasons=[LoanEligibilityReasonDTO(code=r.code, message=r.message) for r in result.reasons],
+            available_credit=result.available_credit,
+            pending_loans=result.pending_loans,
+            is_defaulter=result.is_defaulter,
+            first_payment_date=result.first_payment_date,
+        )
+
+
+class LoanEligibilityBatchDTO(BaseModel):
+    """
+    DTO para la respuesta de elegibilidad en lote.
+    
+    Usado en: POST /loans/eligibility
+    """
+    items: list[LoanEligibilityDTO] = Field(..., description="Resultados en el orden solicitado (préstamos y luego candidatos)")
+    total: int = Field(..., description="Total evaluados")
+    eligible_count: int = Field(..., description="Cuántos cumplen todas las reglas")
+
+
 # =============================================================================
 # PAGINACIÓN
 # =============================================================================
@@ -261,5 +345,10 @@ __all__ = [
     'LoanSummaryDTO',
     'LoanResponseDTO',
     'LoanBalanceDTO',
+    'LoanEligibilityCandidateDTO',
+    'LoanEligibilityRequestDTO',
+    'LoanEligibilityReasonDTO',
+    'LoanEligibilityDTO',
+    'LoanEligibilityBatchDTO',
     'PaginatedLoansDTO',
 ]
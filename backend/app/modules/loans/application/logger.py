@@ -5,9 +5,10 @@ Sistema de logging estructurado con niveles INFO, WARNING, ERROR.
 Reemplaza los print() por logs profesionales para monitoreo y debugging.
 """
 import logging
-import sys
 from typing import Optional
 
+from app.core.logging_config import queued_handler
+
 
 def setup_loan_logger(
     name: str = "loans",
@@ -28,28 +29,16 @@ def setup_loan_logger(
     logger = logging.getLogger(name)
     logger.setLevel(level)
     
-    # Evitar duplicar handlers
-    if logger.handlers:
-        return logger
-    
-    # Formato estructurado
-    formatter = logging.Formatter(
-        fmt='%(asctime)s | %(name)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Handler para consola
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # Handler para archivo (opcional)
-    if log_file:
+    # La consola la atiende el root (QueueHandler de app.core.logging_config),
+    # así la escritura ocurre en el hilo del listener y no en el event loop
+    if log_file and not logger.handlers:
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(logging.Formatter(
+            fmt='%(asctime)s | %(name)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        logger.addHandler(queued_handler(file_handler))
     
     return logger
 
@@ -9,9 +9,10 @@ Este servicio encapsula la lógica de negocio para:
 
 ⭐ CRÍTICO: Validaciones de negocio para garantizar integridad
 """
-from datetime import datetime
+import logging
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -24,6 +25,11 @@ from app.modules.loans.domain.entities import (
 )
 from app.modules.loans.domain.repositories import LoanRepository
 from app.modules.loans.infrastructure.repositories import PostgreSQLLoanRepository
+from app.modules.loans.application.services.eligibility import (
+    EligibilityCandidate,
+    EligibilityResult,
+    LoanEligibilityEngine,
+)
 from app.modules.loans.application.logger import (
     log_loan_created,
     log_loan_approved,
@@ -34,6 +40,8 @@ from app.modules.loans.application.logger import (
 )
 from app.core.notifications import notify
 
+logger = logging.getLogger(__name__)
+
 
 class LoanService:
     """
@@ -55,6 +63,7 @@ class LoanService:
         """
         self.session = session
         self.repository: LoanRepository = PostgreSQLLoanRepository(session)
+        self.eligibility = LoanEligibilityEngine(session)
     
     # =============================================================================
     # CREAR SOLICITUD DE PRÉSTAMO
@@ -110,7 +119,7 @@ class LoanService:
             # Usar SQL directo para calcular (evitar importar RateProfileService por ahora)
             from sqlalchemy import text
             
-            print(f"🔍 DEBUG: Calculando con perfil '{profile_code}'")
+            logger.debug(f"🔍 Calculando con perfil '{profile_code}'")
             
             try:
                 # Llamar a la función SQL directamente
@@ -139,8 +148,7 @@ class LoanService:
                 
                 row = result.fetchone()
                 
-                print(f"🔍 DEBUG: Resultado de calculate_loan_payment:")
-                print(f"  row: {row}")
+                logger.debug(f"🔍 Resultado de calculate_loan_payment: {row}")
                 
                 if not row:
                     raise ValueError(f"No se pudo calcular préstamo con perfil '{profile_code}'")
@@ -159,14 +167,12 @@ class LoanService:
                 final_interest_rate = row.interest_rate_percent
                 final_commission_rate = row.commission_rate_percent
                 
-                print(f"🔍 DEBUG: Tasas calculadas:")
-                print(f"  final_interest_rate: {final_interest_rate}")
-                print(f"  final_commission_rate: {final_commission_rate}")
+                logger.debug(
+                    f"🔍 Tasas calculadas: interés {final_interest_rate}, comisión {final_commission_rate}"
+                )
                 
             except Exception as e:
-                print(f"❌ ERROR en calculate_loan_payment: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"❌ Error en calculate_loan_payment: {e}")
                 raise ValueError(f"Error al calcular tasas con perfil '{profile_code}': {e}")
         
         elif profile_code == 'custom':
@@ -178,7 +184,9 @@ class LoanService:
                     "Para perfil 'custom' se requieren interest_rate y commission_rate"
                 )
             
-            print(f"🔍 DEBUG: Calculando con perfil 'custom', interest_rate={interest_rate}, commission_rate={commission_rate}")
+            logger.debug(
+                f"🔍 Calculando con perfil 'custom', interest_rate={interest_rate}, commission_rate={commission_rate}"
+            )
             
             try:
                 # Usar la función SQL para custom
@@ -229,14 +237,14 @@ class LoanService:
                 final_interest_rate = interest_rate
                 final_commission_rate = commission_rate
                 
-                print(f"🔍 DEBUG: Resultado de calculate_loan_payment_custom:")
-                print(f"  biweekly_payment: {calculated_values['biweekly_payment']}")
-                print(f"  commission_per_payment: {calculated_values['commission_per_payment']}")
+                logger.debug(
+                    f"🔍 Resultado de calculate_loan_payment_custom: "
+                    f"biweekly_payment={calculated_values['biweekly_payment']}, "
+                    f"commission_per_payment={calculated_values['commission_per_payment']}"
+                )
                 
             except Exception as e:
-                print(f"❌ ERROR en calculate_loan_payment_custom: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"❌ Error en calculate_loan_payment_custom: {e}")
                 raise ValueError(f"Error al calcular préstamo custom: {e}")
         
         else:
@@ -270,41 +278,21 @@ class LoanService:
                 'associate_payment': associate_payment.quantize(Decimal('0.01')),
             }
             
-            print(f"🔍 DEBUG: Valores calculados manualmente (sin perfil):")
-            print(f"  biweekly_payment: {calculated_values['biweekly_payment']}")
-            print(f"  total_payment: {calculated_values['total_payment']}")
-        
-        # Validación 1: Crédito del asociado
-        print(f"🔍 DEBUG: Validación 1 - Verificando crédito del asociado {associate_user_id}")
-        has_credit = await self.repository.check_associate_available_credit(
-            associate_user_id, amount
-        )
-        print(f"🔍 DEBUG: has_credit = {has_credit}")
-        if not has_credit:
-            raise ValueError(
-                f"El asociado {associate_user_id} no tiene crédito disponible "
-                f"suficiente para otorgar ${amount}"
-            )
-        
-        # Validación 2: Cliente no tiene préstamos PENDING
-        print(f"🔍 DEBUG: Validación 2 - Verificando préstamos PENDING del cliente {user_id}")
-        has_pending = await self.repository.has_pending_loans(user_id)
-        print(f"🔍 DEBUG: has_pending = {has_pending}")
-        if has_pending:
-            raise ValueError(
-                f"El cliente {user_id} ya tiene préstamos pendientes de aprobación. "
-                f"Por favor, espere a que se procesen antes de solicitar otro."
+            logger.debug(
+                f"🔍 Valores calculados sin perfil: biweekly_payment={calculated_values['biweekly_payment']}, "
+                f"total_payment={calculated_values['total_payment']}"
             )
         
-        # Validación 3: Cliente no es moroso
-        print(f"🔍 DEBUG: Validación 3 - Verificando morosidad del cliente {user_id}")
-        is_defaulter = await self.repository.is_client_defaulter(user_id)
-        print(f"🔍 DEBUG: is_defaulter = {is_defaulter}")
-        if is_defaulter:
-            raise ValueError(
-                f"El cliente {user_id} está marcado como moroso. "
-                f"No puede solicitar nuevos préstamos hasta regularizar su situación."
-            )
+        # Validaciones 1-3: crédito del asociado, cliente sin préstamos PENDING
+        # y cliente no moroso (una sola consulta, ver LoanEligibilityEngine)
+        eligibility = (await self.eligibility.evaluate(
+            [EligibilityCandidate(user_id, associate_user_id, amount)]
+        ))[0]
+        logger.debug(
+            f"🔍 Elegibilidad cliente {user_id} / asociado {associate_user_id}: "
+            f"{[r.code for r in eligibility.reasons] or 'OK'}"
+        )
+        eligibility.raise_if_ineligible()
         
         # Crear entidad Loan (status PENDING por default)
         # Si no hay profile_code (tasas manuales), asignar 'custom'
@@ -398,19 +386,16 @@ class LoanService:
                 f"Verifique que no esté rechazado o cancelado."
             )
         
-        # 4. Validaciones pre-aprobación
-        await self._validate_pre_approval(loan)
-        
-        # 5. Calcular fecha del primer pago (⭐ FUNCIÓN DB - DOBLE CALENDARIO)
+        # 4. Validaciones pre-aprobación + fecha del primer pago
+        # (⭐ FUNCIÓN DB calculate_first_payment_date - DOBLE CALENDARIO)
         approval_date = datetime.utcnow().date()
-        first_payment_date = await self.repository.calculate_first_payment_date(
-            approval_date
-        )
+        eligibility = await self._validate_pre_approval(loan, approval_date)
+        first_payment_date = eligibility.first_payment_date
         
         # 6. CRÍTICO: Asegurar que los campos calculados existan
         # Si biweekly_payment es NULL, recalcular usando profile_code o tasas manuales
         if loan.biweekly_payment is None:
-            print(f"⚠️  WARN: Préstamo {loan_id} no tiene biweekly_payment. Recalculando...")
+            logger.warning(f"⚠️ Préstamo {loan_id} no tiene biweekly_payment. Recalculando...")
             
             if loan.profile_code:
                 # Recalcular usando perfil
@@ -447,14 +432,15 @@ class LoanService:
                         loan.commission_per_payment = Decimal(str(row.commission_per_payment))
                         loan.associate_payment = Decimal(str(row.associate_payment))
                         
-                        print(f"✅ Valores recalculados con perfil '{loan.profile_code}'")
-                        print(f"   - biweekly_payment: {loan.biweekly_payment}")
-                        print(f"   - total_payment: {loan.total_payment}")
+                        logger.info(
+                            f"✅ Préstamo {loan_id} recalculado con perfil '{loan.profile_code}': "
+                            f"biweekly_payment={loan.biweekly_payment}, total_payment={loan.total_payment}"
+                        )
                     else:
                         raise ValueError(f"No se pudo recalcular valores con perfil '{loan.profile_code}'")
                         
                 except Exception as e:
-                    print(f"❌ ERROR recalculando valores: {e}")
+                    logger.error(f"❌ Error recalculando valores del préstamo {loan_id}: {e}")
                     raise ValueError(f"Error al recalcular valores del préstamo: {e}")
             else:
                 # Sin profile_code, calcular manualmente con generate_loan_summary
@@ -499,21 +485,22 @@ class LoanService:
                         loan.commission_per_payment = Decimal(str(row.comision_por_pago))
                         loan.associate_payment = Decimal(str(row.pago_quincenal_socio))
                         
-                        print(f"✅ Valores recalculados con tasas manuales")
-                        print(f"   - interest_rate: {loan.interest_rate}%")
-                        print(f"   - commission_rate: {loan.commission_rate}%")
-                        print(f"   - biweekly_payment: {loan.biweekly_payment}")
+                        logger.info(
+                            f"✅ Préstamo {loan_id} recalculado con tasas manuales: "
+                            f"interés {loan.interest_rate}%, comisión {loan.commission_rate}%, "
+                            f"biweekly_payment={loan.biweekly_payment}"
+                        )
                     else:
                         raise ValueError("No se pudo calcular valores con generate_loan_summary")
                         
                 except Exception as e:
-                    print(f"❌ ERROR calculando valores: {e}")
+                    logger.error(f"❌ Error calculando valores del préstamo {loan_id}: {e}")
                     raise ValueError(f"Error al calcular valores del préstamo: {e}")
         else:
-            print(f"✅ Préstamo {loan_id} ya tiene valores calculados:")
-            print(f"   - biweekly_payment: {loan.biweekly_payment}")
-            print(f"   - total_payment: {loan.total_payment}")
-            print(f"   - commission_per_payment: {loan.commission_per_payment}")
+            logger.debug(
+                f"✅ Préstamo {loan_id} ya tiene valores calculados: biweekly_payment={loan.biweekly_payment}, "
+                f"total_payment={loan.total_payment}, commission_per_payment={loan.commission_per_payment}"
+            )
         
         # 7. Actualizar préstamo a ACTIVE (antes era APPROVED, ahora unificado)
         loan.status_id = LoanStatusEnum.ACTIVE.value
@@ -606,15 +593,15 @@ class LoanService:
                 entity_id=loan_id
             )
         except Exception as e:
-            print(f"⚠️ Error enviando notificación: {e}")
+            logger.warning(f"⚠️ Error enviando notificación: {e}")
         
         return approved_loan
     
-    async def _validate_pre_approval(self, loan: Loan) -> None:
+    async def _validate_pre_approval(self, loan: Loan, approval_date: date) -> EligibilityResult:
         """
         Valida que el préstamo cumple con los requisitos para ser aprobado.
         
-        Validaciones:
+        Validaciones (una sola consulta, ver LoanEligibilityEngine):
         1. Crédito del asociado disponible (puede haber cambiado desde creación)
         2. Cliente no es moroso
         3. Cliente no tiene préstamos PENDING (además del actual)
@@ -623,37 +610,19 @@ class LoanService:
         
         Args:
             loan: Préstamo a validar
+            approval_date: Fecha de aprobación (para la fecha del primer pago)
+            
+        Returns:
+            EligibilityResult con first_payment_date calculada
             
         Raises:
             ValueError: Si alguna validación falla
         """
-        # Validación 1: Crédito del asociado
-        has_credit = await self.repository.check_associate_available_credit(
-            loan.associate_user_id, loan.amount
-        )
-        if not has_credit:
-            raise ValueError(
-                f"El asociado {loan.associate_user_id} ya no tiene crédito disponible "
-                f"suficiente para otorgar ${loan.amount}. "
-                f"Es posible que haya otorgado otros préstamos mientras tanto."
-            )
-        
-        # Validación 2: Cliente no es moroso
-        is_defaulter = await self.repository.is_client_defaulter(loan.user_id)
-        if is_defaulter:
-            raise ValueError(
-                f"El cliente {loan.user_id} está marcado como moroso. "
-                f"No se puede aprobar el préstamo hasta que regularice su situación."
-            )
-        
-        # Validación 3: No tiene otros préstamos PENDING
-        # (Verificar que solo tenga este préstamo PENDING)
-        count_pending = await self._count_pending_loans_except(loan.user_id, loan.id)
-        if count_pending > 0:
-            raise ValueError(
-                f"El cliente {loan.user_id} tiene {count_pending} préstamos PENDING adicionales. "
-                f"Por favor, procese o cancele esos préstamos antes de aprobar este."
-            )
+        eligibility = (await self.eligibility.evaluate(
+            [EligibilityCandidate(loan.user_id, loan.associate_user_id, loan.amount, loan_id=loan.id)],
+            reference_date=approval_date,
+        ))[0]
+        eligibility.raise_if_ineligible()
         
         # TODO Sprint 3: Validación 4 - Documentos completos
         # has_documents = await self._check_required_documents(loan.user_id)
@@ -661,29 +630,25 @@ class LoanService:
         #     raise ValueError(
         #         f"El cliente {loan.user_id} no tiene los documentos requeridos completos"
         #     )
+        
+        return eligibility
     
-    async def _count_pending_loans_except(self, user_id: int, exclude_loan_id: int) -> int:
+    async def evaluate_eligibility(self, loan_ids: List[int]) -> List[EligibilityResult]:
         """
-        Cuenta préstamos PENDING del cliente, excluyendo el préstamo actual.
+        Pre-evalúa préstamos de la cola de aprobaciones en una sola consulta.
+        
+        No modifica nada: devuelve, por préstamo y en el mismo orden, las
+        reglas que impedirían aprobarlo hoy y la fecha del primer pago.
         
         Args:
-            user_id: ID del cliente
-            exclude_loan_id: ID del préstamo a excluir
+            loan_ids: IDs de préstamos a evaluar
             
         Returns:
-            Cantidad de préstamos PENDING (sin contar el excluido)
+            Lista de EligibilityResult
         """
-        total_count = await self.repository.count(
-            status_id=LoanStatusEnum.PENDING.value,
-            user_id=user_id
+        return await self.eligibility.evaluate_loans(
+            loan_ids, reference_date=datetime.utcnow().date()
         )
-        
-        # Si encontramos el préstamo actual, restar 1
-        loan = await self.repository.find_by_id(exclude_loan_id)
-        if loan and loan.is_pending():
-            return total_count - 1
-        
-        return total_count
     
     # =============================================================================
     # RECHAZAR PRÉSTAMO
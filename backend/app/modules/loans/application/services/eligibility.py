@@ -0,0 +1,301 @@
+"""
+Motor de elegibilidad de préstamos.
+
+Evalúa en UNA sola consulta todas las reglas previas a crear o aprobar un
+préstamo, para uno o muchos candidatos (cliente, asociado, monto):
+
+- ASSOCIATE_NOT_FOUND: el asociado no tiene perfil de asociado
+- INSUFFICIENT_CREDIT: available_credit del asociado < monto
+- CLIENT_DEFAULTER: el cliente está marcado como moroso. Igual que antes
+  (PostgreSQLLoanRepository.is_client_defaulter), todavía ningún cliente se
+  marca: la regla y sus mensajes quedan listos, la fuente está pendiente
+- CLIENT_HAS_PENDING_LOANS: el cliente tiene otros préstamos PENDING
+- LOAN_NOT_FOUND / LOAN_NOT_PENDING: solo al evaluar préstamos existentes
+
+Antes, crear una solicitud hacía 4 consultas secuenciales y aprobarla 5
+(incluyendo volver a leer el préstamo para contar sus PENDING y otra para la
+fecha del primer pago). Ahora cada llamada es un solo round-trip y devuelve
+también la fecha del primer pago si se aprobara en `reference_date`.
+
+Cada candidato se evalúa contra el estado actual de la BD de forma
+independiente: si varios candidatos comparten asociado, el crédito de uno no
+se descuenta del otro.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.loans.domain.entities import LoanStatusEnum
+
+# Códigos de regla (se exponen en POST /loans/eligibility)
+ASSOCIATE_NOT_FOUND = "ASSOCIATE_NOT_FOUND"
+INSUFFICIENT_CREDIT = "INSUFFICIENT_CREDIT"
+CLIENT_DEFAULTER = "CLIENT_DEFAULTER"
+CLIENT_HAS_PENDING_LOANS = "CLIENT_HAS_PENDING_LOANS"
+LOAN_NOT_FOUND = "LOAN_NOT_FOUND"
+LOAN_NOT_PENDING = "LOAN_NOT_PENDING"
+
+
+@dataclass
+class EligibilityCandidate:
+    """Candidato a evaluar. Con loan_id, ese préstamo no cuenta como PENDING."""
+
+    client_user_id: int
+    associate_user_id: int
+    amount: Decimal
+    loan_id: Optional[int] = None
+
+
+@dataclass
+class EligibilityReason:
+    """Regla no cumplida."""
+
+    code: str
+    message: str
+
+
+@dataclass
+class EligibilityResult:
+    """Resultado de un candidato con los datos usados para evaluarlo."""
+
+    client_user_id: Optional[int]
+    associate_user_id: Optional[int]
+    amount: Optional[Decimal]
+    loan_id: Optional[int] = None
+    loan_status_id: Optional[int] = None
+    associate_profile_id: Optional[int] = None
+    available_credit: Optional[Decimal] = None
+    pending_loans: int = 0
+    is_defaulter: bool = False
+    first_payment_date: Optional[date] = None
+    reasons: List[EligibilityReason] = field(default_factory=list)
+
+    @property
+    def eligible(self) -> bool:
+        return not self.reasons
+
+    def raise_if_ineligible(self) -> None:
+        """
+        Raises:
+            ValueError: con el mensaje de la primera regla no cumplida
+        """
+        if self.reasons:
+            raise ValueError(self.reasons[0].message)
+
+
+# {source} es un CTE `c` con: idx, loan_id, client_user_id,
+# associate_user_id, amount, loan_status_id
+_ELIGIBILITY_SQL = """
+WITH c AS (
+    {source}
+)
+SELECT
+    c.idx,
+    c.loan_id,
+    c.client_user_id,
+    c.associate_user_id,
+    c.amount,
+    c.loan_status_id,
+    ap.id AS associate_profile_id,
+    ap.available_credit,
+    COALESCE(p.pending_loans, 0) AS pending_loans,
+    -- Morosidad: sin fuente todavía (ver is_client_defaulter)
+    false AS is_defaulter,
+    calculate_first_payment_date(CAST(:reference_date AS DATE)) AS first_payment_date
+FROM c
+LEFT JOIN associate_profiles ap ON ap.user_id = c.associate_user_id
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS pending_loans
+    FROM loans l
+    WHERE l.user_id = c.client_user_id
+      AND l.status_id = :pending_status_id
+      AND l.id IS DISTINCT FROM c.loan_id
+) p ON true
+ORDER BY c.idx
+"""
+
+_CANDIDATES_SOURCE = """
+    SELECT q.idx, q.loan_id, q.client_user_id, q.associate_user_id, q.amount,
+           CAST(NULL AS INTEGER) AS loan_status_id
+    FROM unnest(
+        CAST(:client_ids AS INTEGER[]),
+        CAST(:associate_ids AS INTEGER[]),
+        CAST(:amounts AS NUMERIC[]),
+        CAST(:loan_ids AS INTEGER[])
+    ) WITH ORDINALITY AS q(client_user_id, associate_user_id, amount, loan_id, idx)
+"""
+
+_LOANS_SOURCE = """
+    SELECT q.idx, q.loan_id, l.user_id AS client_user_id, l.associate_user_id, l.amount,
+           l.status_id AS loan_status_id
+    FROM unnest(CAST(:loan_ids AS INTEGER[])) WITH ORDINALITY AS q(loan_id, idx)
+    LEFT JOIN loans l ON l.id = q.loan_id
+"""
+
+
+def evaluate_row(row) -> EligibilityResult:
+    """
+    Aplica las reglas a una fila de _ELIGIBILITY_SQL.
+
+    Una fila con loan_id es una aprobación (mensajes de pre-aprobación); sin
+    loan_id, una solicitud nueva. El orden de las razones es el orden en que
+    se validaban antes (la primera es la que se reporta como error): al
+    crear, crédito → PENDING → morosidad; al aprobar, crédito → morosidad →
+    PENDING.
+    """
+    for_approval = row.loan_id is not None
+    result = EligibilityResult(
+        client_user_id=row.client_user_id,
+        associate_user_id=row.associate_user_id,
+        amount=row.amount,
+        loan_id=row.loan_id,
+        loan_status_id=row.loan_status_id,
+        associate_profile_id=row.associate_profile_id,
+        available_credit=row.available_credit,
+        pending_loans=row.pending_loans,
+        is_defaulter=row.is_defaulter,
+        first_payment_date=row.first_payment_date,
+    )
+    reasons = result.reasons
+
+    if row.loan_id is not None and row.client_user_id is None:
+        reasons.append(EligibilityReason(
+            LOAN_NOT_FOUND, f"Préstamo con ID {row.loan_id} no encontrado"
+        ))
+        return result
+
+    if row.loan_status_id is not None and row.loan_status_id != LoanStatusEnum.PENDING.value:
+        reasons.append(EligibilityReason(
+            LOAN_NOT_PENDING,
+            f"El préstamo {row.loan_id} no está en estado PENDING. "
+            f"Estado actual: {row.loan_status_id}"
+        ))
+
+    # Sin perfil de asociado también se reportaba como falta de crédito
+    if row.associate_profile_id is None or row.available_credit < row.amount:
+        if for_approval:
+            message = (
+                f"El asociado {row.associate_user_id} ya no tiene crédito disponible "
+                f"suficiente para otorgar ${row.amount}. "
+                f"Es posible que haya otorgado otros préstamos mientras tanto."
+            )
+        else:
+            message = (
+                f"El asociado {row.associate_user_id} no tiene crédito disponible "
+                f"suficiente para otorgar ${row.amount}"
+            )
+        code = ASSOCIATE_NOT_FOUND if row.associate_profile_id is None else INSUFFICIENT_CREDIT
+        reasons.append(EligibilityReason(code, message))
+
+    pending = None
+    if row.pending_loans > 0:
+        if for_approval:
+            message = (
+                f"El cliente {row.client_user_id} tiene {row.pending_loans} préstamos PENDING adicionales. "
+                f"Por favor, procese o cancele esos préstamos antes de aprobar este."
+            )
+        else:
+            message = (
+                f"El cliente {row.client_user_id} ya tiene préstamos pendientes de aprobación. "
+                f"Por favor, espere a que se procesen antes de solicitar otro."
+            )
+        pending = EligibilityReason(CLIENT_HAS_PENDING_LOANS, message)
+
+    defaulter = None
+    if row.is_defaulter:
+        if for_approval:
+            message = (
+                f"El cliente {row.client_user_id} está marcado como moroso. "
+                f"No se puede aprobar el préstamo hasta que regularice su situación."
+            )
+        else:
+            message = (
+                f"El cliente {row.client_user_id} está marcado como moroso. "
+                f"No puede solicitar nuevos préstamos hasta regularizar su situación."
+            )
+        defaulter = EligibilityReason(CLIENT_DEFAULTER, message)
+
+    ordered = (defaulter, pending) if for_approval else (pending, defaulter)
+    reasons.extend(r for r in ordered if r is not None)
+    return result
+
+
+class LoanEligibilityEngine:
+    """
+    Evalúa la elegibilidad de candidatos o de préstamos existentes.
+
+    Args:
+        session: Sesión async (no hace commit)
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _run(self, source: str, params: dict, reference_date: Optional[date]):
+        result = await self.session.execute(
+            text(_ELIGIBILITY_SQL.format(source=source)),
+            {
+                **params,
+                "reference_date": reference_date or date.today(),
+                "pending_status_id": LoanStatusEnum.PENDING.value,
+            }
+        )
+        return [evaluate_row(row) for row in result.fetchall()]
+
+    async def evaluate(
+        self,
+        candidates: Sequence[EligibilityCandidate],
+        reference_date: Optional[date] = None,
+    ) -> List[EligibilityResult]:
+        """
+        Evalúa candidatos (cliente, asociado, monto) en una consulta.
+        Los resultados vienen en el mismo orden que `candidates`.
+
+        Un candidato con loan_id se evalúa como aprobación de ese préstamo
+        (usa los mensajes de pre-aprobación).
+        """
+        if not candidates:
+            return []
+        return await self._run(
+            _CANDIDATES_SOURCE,
+            {
+                "client_ids": [c.client_user_id for c in candidates],
+                "associate_ids": [c.associate_user_id for c in candidates],
+                "amounts": [c.amount for c in candidates],
+                "loan_ids": [c.loan_id for c in candidates],
+            },
+            reference_date,
+        )
+
+    async def evaluate_loans(
+        self,
+        loan_ids: Sequence[int],
+        reference_date: Optional[date] = None,
+    ) -> List[EligibilityResult]:
+        """
+        Evalúa préstamos existentes (cola de aprobaciones) en una consulta.
+        Los resultados vienen en el mismo orden que `loan_ids`.
+        """
+        if not loan_ids:
+            return []
+        return await self._run(
+            _LOANS_SOURCE, {"loan_ids": list(loan_ids)}, reference_date
+        )
+
+
+__all__ = [
+    'ASSOCIATE_NOT_FOUND',
+    'INSUFFICIENT_CREDIT',
+    'CLIENT_DEFAULTER',
+    'CLIENT_HAS_PENDING_LOANS',
+    'LOAN_NOT_FOUND',
+    'LOAN_NOT_PENDING',
+    'EligibilityCandidate',
+    'EligibilityReason',
+    'EligibilityResult',
+    'LoanEligibilityEngine',
+]
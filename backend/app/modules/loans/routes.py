@@ -5,6 +5,7 @@ Sprint 1: Endpoints de lectura (GET)
 Sprint 2: Endpoints de escritura (POST approve/reject)
 Sprint 3: Endpoints restantes
 """
+import logging
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -12,6 +13,8 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_async_db
+from app.core.dependencies import require_admin
+from app.core.responses import ORJSONResponse, FieldTree, sparse_fields, apply_fields
 from app.modules.auth.routes import get_current_user
 from app.modules.loans.application.dtos import (
     LoanFilterDTO,
@@ -23,12 +26,18 @@ from app.modules.loans.application.dtos import (
     LoanSummaryDTO,
     LoanResponseDTO,
     LoanBalanceDTO,
+    LoanEligibilityRequestDTO,
+    LoanEligibilityDTO,
+    LoanEligibilityBatchDTO,
     PaginatedLoansDTO,
 )
 from app.modules.loans.application.services import LoanService
+from app.modules.loans.application.services.eligibility import EligibilityCandidate
+from app.modules.loans.application.enhanced_service import LoanEnhancedService
 from app.modules.loans.infrastructure.repositories import PostgreSQLLoanRepository
 from app.modules.loans.application.logger import log_loan_deleted, log_validation_error
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/loans", tags=["loans"])
 
@@ -190,8 +199,6 @@ async def get_loan_detail(
     """
     Obtiene el detalle completo de un préstamo con datos relacionados.
     """
-    from app.modules.loans.application.enhanced_service import LoanEnhancedService
-    
     enhanced_service = LoanEnhancedService(db)
     loan_data = await enhanced_service.get_loan_with_details(loan_id)
     
@@ -272,6 +279,7 @@ async def get_loan_balance(
 @router.get("/{loan_id}/amortization")
 async def get_loan_amortization(
     loan_id: int,
+    fields: Optional[FieldTree] = Depends(sparse_fields),
     db: AsyncSession = Depends(get_async_db),
 ):
     """
@@ -284,6 +292,8 @@ async def get_loan_amortization(
     - status: 'approved' o 'pending'
     - is_simulation: true si son fechas simuladas
     - schedule: array con el cronograma de pagos
+    
+    `?fields=` recorta cada fila de `schedule` (ej. `fields=payment_number,payment_date,client_payment`).
     """
     from sqlalchemy import text
     
@@ -358,12 +368,12 @@ async def get_loan_amortization(
             for row in payments
         ]
         
-        return {
+        return ORJSONResponse({
             "status": "approved",
             "is_simulation": False,
             "loan_id": loan_id,
-            "schedule": schedule
-        }
+            "schedule": apply_fields(schedule, fields)
+        })
     
     else:
         # Préstamo pendiente: generar simulación
@@ -449,13 +459,13 @@ async def get_loan_amortization(
                 "associate_total_pending": associate_total_pending,
             })
         
-        return {
+        return ORJSONResponse({
             "status": "pending",
             "is_simulation": True,
             "loan_id": loan_id,
             "approval_date_used": approval_date.isoformat(),
-            "schedule": schedule
-        }
+            "schedule": apply_fields(schedule, fields)
+        })
 
 
 # =============================================================================
@@ -516,16 +526,10 @@ async def create_loan(
     service = LoanService(db)
     
     try:
-        # DEBUG: Log del payload recibido
-        print(f"🔍 DEBUG CREATE LOAN - Payload recibido:")
-        print(f"  user_id: {loan_data.user_id}")
-        print(f"  associate_user_id: {loan_data.associate_user_id}")
-        print(f"  amount: {loan_data.amount}")
-        print(f"  term_biweeks: {loan_data.term_biweeks}")
-        print(f"  profile_code: {loan_data.profile_code}")
-        print(f"  interest_rate: {loan_data.interest_rate}")
-        print(f"  commission_rate: {loan_data.commission_rate}")
-        print(f"  notes: {loan_data.notes}")
+        logger.debug(
+            "🔍 Crear préstamo - payload recibido",
+            extra={"payload": loan_data.model_dump(mode="json")},
+        )
         
         loan = await service.create_loan_request(
             user_id=loan_data.user_id,
@@ -573,6 +577,55 @@ async def create_loan(
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 
+@router.post(
+    "/eligibility",
+    response_model=LoanEligibilityBatchDTO,
+    dependencies=[Depends(require_admin)],  # 🔒 Solo admins
+)
+async def evaluate_loans_eligibility(
+    request: LoanEligibilityRequestDTO,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Pre-evalúa en lote las reglas de aprobación (cola de aprobaciones).
+    
+    Evalúa crédito del asociado, préstamos PENDING del cliente, morosidad y
+    estado del préstamo en una sola consulta por lista, sin modificar nada.
+    Son las mismas reglas que aplica POST /loans/{id}/approve.
+    
+    Body:
+    ```json
+    {
+        "loan_ids": [101, 102, 103],
+        "candidates": [{"user_id": 5, "associate_user_id": 10, "amount": 5000}]
+    }
+    ```
+    
+    Retorna:
+    - items: un resultado por préstamo y luego por candidato, en el orden
+      solicitado, con `eligible` y `reasons` [{code, message}]
+    
+    Errores:
+    - 400: Lista vacía
+    """
+    if not request.loan_ids and not request.candidates:
+        raise HTTPException(status_code=400, detail="Debe indicar loan_ids o candidates")
+    
+    service = LoanService(db)
+    results = await service.evaluate_eligibility(request.loan_ids)
+    results += await service.eligibility.evaluate([
+        EligibilityCandidate(c.user_id, c.associate_user_id, c.amount)
+        for c in request.candidates
+    ])
+    
+    items = [LoanEligibilityDTO.from_result(r) for r in results]
+    return LoanEligibilityBatchDTO(
+        items=items,
+        total=len(items),
+        eligible_count=sum(1 for i in items if i.eligible),
+    )
+
+
 @router.post("/{loan_id}/approve", response_model=LoanResponseDTO)
 async def approve_loan(
     loan_id: int,
@@ -1308,8 +1361,10 @@ async def renew_loan(
         "original_associate_id": original.associate_user_id
     })
     
-    print(f"✅ Crédito liberado del asociado {original.associate_user_id}: ${original_loan_amount:,.2f} (capital del préstamo original)")
-    print(f"   Nota: Saldo pendiente total (con intereses/comisión): ${pending_amount:,.2f}")
+    logger.info(
+        f"✅ Crédito liberado del asociado {original.associate_user_id}: ${original_loan_amount:,.2f} "
+        f"(capital del préstamo original; saldo pendiente con intereses/comisión ${pending_amount:,.2f})"
+    )
     
     # 3. Crear el nuevo préstamo usando el servicio existente
     service = LoanService(db)
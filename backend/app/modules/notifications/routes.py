@@ -2,16 +2,26 @@
 Notification Routes - Endpoints para el sistema de notificaciones.
 Permite verificar estado y enviar notificaciones de prueba.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional, Literal
 import os
 
 from app.modules.auth.routes import get_current_user
+from app.core.events import live_events
 from app.core.notifications import notify
+from app.core.security import decode_access_token
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
+# EventSource no permite headers: el token también se acepta en ?token=
+optional_bearer = HTTPBearer(auto_error=False)
+
+# Comentario SSE para mantener viva la conexión detrás de proxies
+STREAM_HEARTBEAT_SECONDS = 15
+
 
 class NotificationStatus(BaseModel):
     """Estado de los canales de notificación."""
@@ -162,3 +172,61 @@ async def notification_health():
         "discord": "ok" if discord_webhook else "not_configured",
         "email": "not_configured"
     }
+
+
+def get_stream_user_id(
+    token: Optional[str] = Query(None, description="JWT (para EventSource)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+) -> int:
+    """Valida el JWT del header Authorization o del query param `token`."""
+    raw_token = credentials.credentials if credentials else token
+    payload = decode_access_token(raw_token) if raw_token else None
+    if not payload or not payload.get("user_id"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return payload["user_id"]
+
+
+@router.get(
+    "/stream",
+    summary="Eventos en vivo (SSE)",
+    description="Stream text/event-stream con los cambios de pagos, statements, préstamos, periodos y notificaciones."
+)
+async def stream_live_events(
+    request: Request,
+    types: Optional[str] = Query(
+        None,
+        description="Tipos separados por coma (payment.registered, statement.paid, loan.approved, period.advanced, notification)"
+    ),
+    user_id: int = Depends(get_stream_user_id),
+):
+    """
+    Reemplaza el polling del dashboard, del preview de corte y del historial
+    de notificaciones: cada evento trae solo los ids afectados para que el
+    frontend recargue únicamente lo que cambió.
+
+    - `event: resync` → recargar todo (reconexión sin historial suficiente,
+      cliente lento o pérdida de la conexión LISTEN del backend).
+    - Reanuda con el header `Last-Event-ID` que el navegador manda solo.
+    """
+    wanted = {t.strip() for t in types.split(",") if t.strip()} if types else None
+    last_event_id = request.headers.get("last-event-id")
+
+    async def event_stream():
+        async with live_events.subscribe(types=wanted, last_event_id=last_event_id) as subscription:
+            yield f"retry: {STREAM_HEARTBEAT_SECONDS * 1000}\n\n".encode()
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                yield event.to_sse() if event else b": ping\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -101,6 +101,27 @@ class CompareProfilesResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UpdateRateProfileRequest(BaseModel):
+    """DTO para editar un perfil (solo los campos enviados)."""
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    description: Optional[str] = None
+    interest_rate_percent: Optional[Decimal] = Field(None, ge=0, le=100, description="Tasa de interés por quincena")
+    commission_rate_percent: Optional[Decimal] = Field(None, ge=0, le=100, description="Tasa de comisión % del monto")
+    enabled: Optional[bool] = None
+    is_recommended: Optional[bool] = None
+    display_order: Optional[int] = None
+    valid_terms: Optional[List[int]] = Field(None, min_length=1, description="Plazos válidos en quincenas")
+    min_amount: Optional[Decimal] = Field(None, gt=0)
+    max_amount: Optional[Decimal] = Field(None, gt=0)
+
+
+class ReferenceRegenerationDTO(BaseModel):
+    """DTO para resultado de regenerar la tabla de referencia."""
+    profiles: List[str] = Field(..., description="Perfiles regenerados")
+    rows: int = Field(..., description="Filas escritas")
+    duration_ms: int
+
+
 __all__ = [
     'RateProfileDTO',
     'LegacyAmountDTO',
@@ -108,4 +129,6 @@ __all__ = [
     'LoanCalculationDTO',
     'CompareProfilesRequest',
     'CompareProfilesResponse',
+    'UpdateRateProfileRequest',
+    'ReferenceRegenerationDTO',
 ]
@@ -0,0 +1,243 @@
+"""
+Tabla legacy en memoria.
+
+El perfil 'table_lookup' (legacy) se resuelve con legacy_payment_table y cada
+cotización y el listado /rate-profiles/legacy-payments la volvían a consultar.
+La tabla es chica (decenas de filas) y casi no cambia, así que cada worker la
+carga una vez en un LegacyGrid inmutable indexado por (monto, plazo):
+
+- lookup(): mismo criterio que calculate_loan_payment(): el monto se redondea
+  a centavos (el parámetro es DECIMAL(12,2)) y monto y plazo deben coincidir
+  exactamente. La SQL no aproxima montos; nearest_amount() solo sugiere en el
+  error el monto más cercano disponible para ese plazo.
+- quote(): LoanCalculation con los mismos valores que la rama table_lookup de
+  calculate_loan_payment().
+
+Refresco: la migración 042 publica 'legacy_grid.changed' en credinet_events
+(LISTEN/NOTIFY) cuando cambia legacy_payment_table o rate_profiles y
+legacy_grid_watcher descarta la rejilla y el cache "rate_profiles". Sin la
+conexión LISTEN no hay forma de enterarse de un cambio: mientras falte, la
+rejilla no se guarda y se lee de la base en cada uso.
+"""
+import bisect
+import logging
+import threading
+from dataclasses import dataclass, field
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache
+from app.core.events import EventWatcher, LiveEvent, live_events
+
+from ..domain import LoanCalculation
+from .reference_table import RATE_SCALE, _round
+
+logger = logging.getLogger(__name__)
+
+# Evento de la migración 042
+LEGACY_GRID_EVENT = "legacy_grid.changed"
+
+
+@dataclass(frozen=True)
+class LegacyGridEntry:
+    """Una fila de legacy_payment_table (columnas opcionales ya con COALESCE a 0)."""
+
+    amount: Decimal
+    term_biweeks: int
+    biweekly_payment: Decimal
+    total_payment: Decimal
+    total_interest: Decimal
+    effective_rate_percent: Decimal
+    biweekly_rate_percent: Decimal
+    commission_per_payment: Decimal
+    total_commission: Decimal
+    associate_biweekly_payment: Decimal
+    associate_total_payment: Decimal
+
+
+@dataclass(frozen=True)
+class LegacyProfile:
+    """Perfil de tasa tipo table_lookup."""
+
+    code: str
+    name: str
+    enabled: bool
+
+
+@dataclass(frozen=True)
+class LegacyGrid:
+    """
+    Rejilla legacy inmutable. Un cambio en la base produce una rejilla nueva;
+    esta nunca se modifica, así que se puede leer desde cualquier hilo.
+    """
+
+    entries: Tuple[LegacyGridEntry, ...]
+    profiles: Mapping[str, LegacyProfile] = field(default_factory=dict)
+    _by_key: Mapping[Tuple[Decimal, int], LegacyGridEntry] = field(init=False, repr=False)
+    _amounts_by_term: Mapping[int, Tuple[Decimal, ...]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        entries = tuple(sorted(self.entries, key=lambda e: (e.amount, e.term_biweeks)))
+        amounts: Dict[int, list] = {}
+        for entry in entries:
+            amounts.setdefault(entry.term_biweeks, []).append(entry.amount)
+
+        object.__setattr__(self, "entries", entries)
+        object.__setattr__(self, "profiles", MappingProxyType(dict(self.profiles)))
+        object.__setattr__(self, "_by_key", MappingProxyType({(e.amount, e.term_biweeks): e for e in entries}))
+        object.__setattr__(self, "_amounts_by_term", MappingProxyType({t: tuple(a) for t, a in amounts.items()}))
+
+    def handles(self, profile_code: str) -> bool:
+        """True si el perfil se calcula con la tabla legacy."""
+        return profile_code in self.profiles
+
+    def get(self, amount: Decimal, term_biweeks: int) -> Optional[LegacyGridEntry]:
+        return self._by_key.get((_round(Decimal(amount)), term_biweeks))
+
+    def nearest_amount(self, amount: Decimal, term_biweeks: int) -> Optional[Decimal]:
+        """Monto disponible más cercano para el plazo (en empate, el menor)."""
+        amounts = self._amounts_by_term.get(term_biweeks)
+        if not amounts:
+            return None
+        amount = Decimal(amount)
+        i = bisect.bisect_left(amounts, amount)
+        candidates = amounts[max(i - 1, 0):i + 1]
+        return min(candidates, key=lambda a: (abs(a - amount), a))
+
+    def lookup(self, amount: Decimal, term_biweeks: int) -> LegacyGridEntry:
+        """
+        Fila exacta para (monto, plazo), como calculate_loan_payment().
+
+        Raises:
+            ValueError: si el monto no está en la tabla para ese plazo
+        """
+        entry = self.get(amount, term_biweeks)
+        if entry is None:
+            message = f"Monto {_round(Decimal(amount))} no encontrado en tabla legacy para plazo {term_biweeks}Q"
+            nearest = self.nearest_amount(amount, term_biweeks)
+            if nearest is not None:
+                message += f" (monto más cercano: {nearest})"
+            raise ValueError(message)
+        return entry
+
+    def quote(self, profile_code: str, amount: Decimal, term_biweeks: int) -> LoanCalculation:
+        """
+        Cálculo del perfil legacy sin ir a la base.
+
+        Raises:
+            ValueError: perfil inexistente/deshabilitado o monto fuera de la tabla
+        """
+        profile = self.profiles.get(profile_code)
+        if profile is None or not profile.enabled:
+            raise ValueError(f"Perfil de tasa no encontrado o deshabilitado: {profile_code}")
+
+        entry = self.lookup(amount, term_biweeks)
+        return LoanCalculation(
+            profile_code=profile.code,
+            profile_name=profile.name,
+            calculation_method="table_lookup",
+            amount=amount,
+            term_biweeks=term_biweeks,
+            interest_rate_percent=entry.biweekly_rate_percent,
+            commission_rate_percent=_round(entry.commission_per_payment / entry.biweekly_payment * 100, RATE_SCALE),
+            biweekly_payment=entry.biweekly_payment,
+            total_payment=entry.total_payment,
+            total_interest=entry.total_interest,
+            effective_rate_percent=entry.effective_rate_percent,
+            commission_per_payment=_round(entry.commission_per_payment),
+            total_commission=_round(entry.total_commission),
+            associate_payment=_round(entry.associate_biweekly_payment),
+            associate_total=_round(entry.associate_total_payment),
+        )
+
+
+def load_legacy_grid(db: Session) -> LegacyGrid:
+    """Lee legacy_payment_table y los perfiles table_lookup."""
+    rows = db.execute(text("""
+        SELECT amount, term_biweeks, biweekly_payment, total_payment, total_interest,
+               effective_rate_percent, biweekly_rate_percent,
+               COALESCE(commission_per_payment, 0) AS commission_per_payment,
+               COALESCE(total_commission, 0) AS total_commission,
+               COALESCE(associate_biweekly_payment, 0) AS associate_biweekly_payment,
+               COALESCE(associate_total_payment, 0) AS associate_total_payment
+        FROM legacy_payment_table
+    """)).mappings().all()
+    profiles = db.execute(text("""
+        SELECT code, name, enabled
+        FROM rate_profiles
+        WHERE calculation_type = 'table_lookup'
+    """)).fetchall()
+
+    return LegacyGrid(
+        entries=tuple(LegacyGridEntry(**row) for row in rows),
+        profiles={p.code: LegacyProfile(code=p.code, name=p.name, enabled=p.enabled) for p in profiles},
+    )
+
+
+class LegacyGridCache:
+    """
+    Rejilla vigente del proceso. Se reemplaza completa, nunca en sitio.
+
+    El contador de generación evita guardar una rejilla leída antes de una
+    invalidación que llegó mientras se leía.
+    """
+
+    def __init__(self, is_live: Optional[Callable[[], bool]] = None):
+        self._grid: Optional[LegacyGrid] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._is_live = is_live or (lambda: live_events.connected)
+
+    def get(self, db: Session) -> LegacyGrid:
+        """Rejilla en memoria; la lee de la base solo si falta o no hay LISTEN."""
+        grid = self._grid
+        if grid is not None and self._is_live():
+            return grid
+
+        with self._lock:
+            generation = self._generation
+        grid = load_legacy_grid(db)
+        with self._lock:
+            if generation == self._generation and self._is_live():
+                self._grid = grid
+        return grid
+
+    def handles(self, db: Session, profile_code: str) -> bool:
+        """
+        True si el perfil se calcula con la tabla legacy. Sin LISTEN solo
+        consulta el tipo del perfil: no lee legacy_payment_table.
+        """
+        if self._is_live():
+            return self.get(db).handles(profile_code)
+        return bool(db.execute(
+            text("""
+                SELECT EXISTS (
+                    SELECT 1 FROM rate_profiles
+                    WHERE code = :code AND calculation_type = 'table_lookup'
+                )
+            """),
+            {"code": profile_code}
+        ).scalar())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._grid = None
+
+
+# Instancia global
+legacy_grid_cache = LegacyGridCache()
+
+
+async def _on_legacy_grid_changed(event: LiveEvent) -> None:
+    legacy_grid_cache.invalidate()
+    await response_cache.invalidate("rate_profiles")
+    logger.info(f"🔄 Tabla legacy en memoria descartada ({event.type})")
+
+
+# Descarta la rejilla y el cache "rate_profiles" con cada 'legacy_grid.changed'
+legacy_grid_watcher = EventWatcher("legacy-grid", {LEGACY_GRID_EVENT}, _on_legacy_grid_changed)
@@ -0,0 +1,271 @@
+"""
+Regeneración de rate_profile_reference_table.
+
+La tabla de referencia se calcula completa en Python con Decimal, replicando
+calculate_loan_payment() centavo por centavo (incluidos los redondeos
+intermedios de sus variables DECIMAL(10,6)/(12,2)/(10,2)):
+
+- Perfiles 'formula': rejilla montos × plazos. El factor depende solo del
+  plazo y la comisión solo del monto, así que se calculan una vez por eje y
+  la rejilla es el cruce de ambos.
+- Perfil 'table_lookup' (legacy): se copia de legacy_payment_table.
+
+Escritura: COPY a una tabla sombra temporal y reemplazo en la misma
+transacción (DELETE + INSERT ... SELECT). Las lecturas ven la tabla anterior
+hasta el COMMIT y la nueva después, nunca una tabla a medias o vacía.
+"""
+import io
+import logging
+import time
+from dataclasses import dataclass, fields
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+FACTOR_SCALE = Decimal("0.000001")
+RATE_SCALE = Decimal("0.001")
+
+# Perfiles sin tabla de referencia ('custom' usa las tasas que captura el usuario)
+EXCLUDED_PROFILES = ("custom",)
+
+_LOCK_KEY = "rate_profile_reference_table"
+
+
+def _round(value: Decimal, exp: Decimal = CENT) -> Decimal:
+    # NUMERIC de PostgreSQL redondea la mitad alejándose de cero
+    return value.quantize(exp, rounding=ROUND_HALF_UP)
+
+
+@dataclass(frozen=True)
+class ReferenceRow:
+    """Una fila de rate_profile_reference_table (mismas columnas, sin id)."""
+
+    profile_code: str
+    amount: Decimal
+    term_biweeks: int
+    biweekly_payment: Decimal
+    total_payment: Decimal
+    commission_per_payment: Decimal
+    total_commission: Decimal
+    associate_payment: Decimal
+    associate_total: Decimal
+    interest_rate_percent: Optional[Decimal]
+    commission_rate_percent: Optional[Decimal]
+
+
+COLUMNS = [f.name for f in fields(ReferenceRow)]
+
+
+@dataclass
+class RegenerationResult:
+    """Resultado de una regeneración."""
+
+    profiles: List[str]
+    rows: int
+    duration_ms: int
+
+
+def formula_grid(
+    profile_code: str,
+    interest_rate_percent: Decimal,
+    commission_rate_percent: Decimal,
+    amounts: Sequence[Decimal],
+    terms: Sequence[int],
+) -> List[ReferenceRow]:
+    """
+    Rejilla de un perfil 'formula' (interés simple, comisión sobre el monto).
+
+    Mismo resultado que calculate_loan_payment(amount, term, profile_code).
+    """
+    rate = interest_rate_percent / 100
+    factors = {term: _round(1 + rate * term, FACTOR_SCALE) for term in terms}
+    commissions = {amount: _round(amount * (commission_rate_percent / 100)) for amount in amounts}
+
+    rows = []
+    for term in terms:
+        factor = factors[term]
+        for amount in amounts:
+            total = _round(amount * factor)
+            payment = _round(total / term)
+            commission = commissions[amount]
+            associate_payment = payment - commission
+            rows.append(ReferenceRow(
+                profile_code=profile_code,
+                amount=amount,
+                term_biweeks=term,
+                biweekly_payment=payment,
+                total_payment=total,
+                commission_per_payment=commission,
+                total_commission=commission * term,
+                associate_payment=associate_payment,
+                associate_total=associate_payment * term,
+                interest_rate_percent=interest_rate_percent,
+                commission_rate_percent=commission_rate_percent,
+            ))
+    return rows
+
+
+def legacy_grid(profile_code: str, legacy_rows: Iterable) -> List[ReferenceRow]:
+    """Filas del perfil legacy a partir de legacy_payment_table (como migraciones 018/020)."""
+    rows = []
+    for r in legacy_rows:
+        commission = r.commission_per_payment or Decimal("0")
+        associate_payment = r.associate_biweekly_payment or Decimal("0")
+        rows.append(ReferenceRow(
+            profile_code=profile_code,
+            amount=r.amount,
+            term_biweeks=r.term_biweeks,
+            biweekly_payment=r.biweekly_payment,
+            total_payment=r.total_payment,
+            commission_per_payment=commission,
+            total_commission=commission * r.term_biweeks,
+            associate_payment=associate_payment,
+            associate_total=r.associate_total_payment or Decimal("0"),
+            interest_rate_percent=r.biweekly_rate_percent,
+            commission_rate_percent=_round(commission / r.biweekly_payment * 100, RATE_SCALE) if r.biweekly_payment else None,
+        ))
+    return rows
+
+
+def _copy_value(value) -> str:
+    return "\\N" if value is None else str(value)
+
+
+class ReferenceTableRegenerator:
+    """
+    Recalcula la tabla de referencia completa o de un solo perfil.
+
+    Uso:
+        ReferenceTableRegenerator(db).regenerate("standard")
+        db.commit()
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _load_profiles(self, profile_code: Optional[str]) -> list:
+        result = self.db.execute(
+            text("""
+                SELECT code, calculation_type, interest_rate_percent, commission_rate_percent,
+                       min_amount, max_amount, valid_terms
+                FROM rate_profiles
+                WHERE (CAST(:code AS varchar) IS NULL OR code = :code)
+                  AND code != ALL(:excluded)
+                ORDER BY code
+            """),
+            {"code": profile_code, "excluded": list(EXCLUDED_PROFILES)},
+        )
+        return result.fetchall()
+
+    def build_rows(self, profile_code: Optional[str] = None) -> tuple:
+        """
+        Calcula las filas sin escribir.
+
+        Returns:
+            (códigos de perfil incluidos, filas)
+        """
+        profiles = self._load_profiles(profile_code)
+        amounts = [
+            row.amount for row in self.db.execute(
+                text("SELECT amount FROM rate_profile_reference_amounts ORDER BY amount")
+            ).fetchall()
+        ]
+
+        codes, rows = [], []
+        for profile in profiles:
+            if profile.calculation_type == "table_lookup":
+                legacy = self.db.execute(text("""
+                    SELECT amount, term_biweeks, biweekly_payment, total_payment,
+                           commission_per_payment, associate_biweekly_payment,
+                           associate_total_payment, biweekly_rate_percent
+                    FROM legacy_payment_table
+                    ORDER BY term_biweeks, amount
+                """)).fetchall()
+                rows += legacy_grid(profile.code, legacy)
+            elif profile.interest_rate_percent is None or profile.commission_rate_percent is None:
+                logger.warning(f"⚠️ Perfil {profile.code} sin tasas configuradas: se omite de la tabla de referencia")
+                continue
+            else:
+                profile_amounts = [
+                    a for a in amounts
+                    if (profile.min_amount is None or a >= profile.min_amount)
+                    and (profile.max_amount is None or a <= profile.max_amount)
+                ]
+                rows += formula_grid(
+                    profile.code,
+                    profile.interest_rate_percent,
+                    profile.commission_rate_percent,
+                    profile_amounts,
+                    sorted(profile.valid_terms or []),
+                )
+            codes.append(profile.code)
+        return codes, rows
+
+    def _copy_to_shadow(self, rows: List[ReferenceRow]) -> None:
+        self.db.execute(text("DROP TABLE IF EXISTS rate_profile_reference_shadow"))
+        self.db.execute(text("""
+            CREATE TEMP TABLE rate_profile_reference_shadow ON COMMIT DROP AS
+            SELECT {columns} FROM rate_profile_reference_table WITH NO DATA
+        """.format(columns=", ".join(COLUMNS))))
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(getattr(row, c)) for c in COLUMNS))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY rate_profile_reference_shadow ({', '.join(COLUMNS)}) FROM STDIN",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+    def regenerate(self, profile_code: Optional[str] = None) -> RegenerationResult:
+        """
+        Regenera un perfil (o todos si profile_code es None) dentro de la
+        transacción actual. El llamador hace commit e invalida el cache
+        "rate_profiles".
+
+        Raises:
+            ValueError: si el perfil no existe o no lleva tabla de referencia
+        """
+        started = time.monotonic()
+        # Serializa regeneraciones concurrentes; las lecturas no se bloquean
+        self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _LOCK_KEY})
+
+        codes, rows = self.build_rows(profile_code)
+        if profile_code is not None and not codes:
+            raise ValueError(f"Perfil de tasa '{profile_code}' no encontrado o sin tabla de referencia")
+
+        self._copy_to_shadow(rows)
+        if profile_code is None:
+            self.db.execute(text("DELETE FROM rate_profile_reference_table"))
+        else:
+            self.db.execute(
+                text("DELETE FROM rate_profile_reference_table WHERE profile_code = :code"),
+                {"code": profile_code},
+            )
+        columns = ", ".join(COLUMNS)
+        self.db.execute(text(
+            f"INSERT INTO rate_profile_reference_table ({columns}) "
+            f"SELECT {columns} FROM rate_profile_reference_shadow"
+        ))
+
+        result = RegenerationResult(
+            profiles=codes,
+            rows=len(rows),
+            duration_ms=int((time.monotonic() - started) * 1000),
+        )
+        logger.info(
+            f"📊 Tabla de referencia regenerada ({', '.join(codes) or 'sin perfiles'}): "
+            f"{result.rows} filas en {result.duration_ms} ms"
+        )
+        return result
@@ -4,14 +4,19 @@ Servicio de perfiles de tasa.
 Integra con funciones SQL:
 - calculate_loan_payment(amount, term, profile_code)
 - generate_loan_summary(amount, term, interest_rate, commission_rate)
+
+El perfil legacy (table_lookup) se calcula con la tabla legacy en memoria
+(legacy_table.py), sin ir a la base.
 """
 from decimal import Decimal
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from ..domain import RateProfile, LoanCalculation
+from .legacy_table import LegacyGrid, legacy_grid_cache
+from .reference_table import EXCLUDED_PROFILES, ReferenceTableRegenerator
 
 
 class RateProfileService:
@@ -20,6 +25,10 @@ class RateProfileService:
     def __init__(self, db: Session):
         self.db = db
     
+    def legacy_grid(self) -> LegacyGrid:
+        """Tabla legacy en memoria (se lee de la base solo si no está cargada)."""
+        return legacy_grid_cache.get(self.db)
+    
     def list_profiles(self, enabled_only: bool = True) -> List[RateProfile]:
         """
         Lista todos los perfiles de tasa.
@@ -68,7 +77,7 @@ class RateProfileService:
             for row in rows
         ]
     
-    def get_profile(self, profile_code: str) -> RateProfile:
+    def get_profile(self, profile_code: str, include_disabled: bool = False) -> RateProfile:
         """
         Obtiene un perfil por su código.
         
@@ -98,7 +107,7 @@ class RateProfileService:
         if not row:
             raise ValueError(f"Perfil de tasa '{profile_code}' no encontrado")
         
-        if not row.enabled:
+        if not row.enabled and not include_disabled:
             raise ValueError(f"Perfil de tasa '{profile_code}' está deshabilitado")
         
         return RateProfile(
@@ -121,6 +130,43 @@ class RateProfileService:
             updated_by=row.updated_by
         )
     
+    def update_profile(
+        self,
+        profile_code: str,
+        changes: Dict[str, Any],
+        updated_by: Optional[int] = None
+    ) -> RateProfile:
+        """
+        Edita un perfil y regenera solo su parte de la tabla de referencia,
+        en la misma transacción (el llamador hace commit).
+        
+        Args:
+            profile_code: Código del perfil
+            changes: Campos a modificar (columnas de rate_profiles)
+            updated_by: Usuario que edita
+            
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        if changes:
+            assignments = ", ".join(f"{column} = :{column}" for column in changes)
+            row = self.db.execute(
+                text(f"""
+                    UPDATE rate_profiles
+                    SET {assignments}, updated_by = :updated_by, updated_at = CURRENT_TIMESTAMP
+                    WHERE code = :profile_code
+                    RETURNING code
+                """),
+                {**changes, "updated_by": updated_by, "profile_code": profile_code}
+            ).fetchone()
+            if not row:
+                raise ValueError(f"Perfil de tasa '{profile_code}' no encontrado")
+            
+            if profile_code not in EXCLUDED_PROFILES:
+                ReferenceTableRegenerator(self.db).regenerate(profile_code)
+        
+        return self.get_profile(profile_code, include_disabled=True)
+    
     def calculate_loan(
         self, 
         amount: Decimal, 
@@ -133,6 +179,7 @@ class RateProfileService:
         Calcula un préstamo usando un perfil de tasa o tasas custom.
         
         Si profile_code='custom', usa calculate_loan_payment_custom() con las tasas provistas.
+        Si el perfil es table_lookup (legacy), usa la tabla legacy en memoria.
         Si no, llama a la función SQL: calculate_loan_payment(amount, term, profile)
         
         Args:
@@ -148,6 +195,11 @@ class RateProfileService:
         Raises:
             ValueError: Si el perfil no existe o cálculo falla, o si custom sin tasas
         """
+        # Perfil legacy: mismo resultado que la rama table_lookup de la función SQL
+        # (la rejilla solo se pide para ese perfil)
+        if profile_code != 'custom' and legacy_grid_cache.handles(self.db, profile_code):
+            return self.legacy_grid().quote(profile_code, amount, term_biweeks)
+        
         # Si es custom, usar función custom
         if profile_code == 'custom':
             if interest_rate is None or commission_rate is None:
@@ -6,21 +6,29 @@ Rutas:
 - GET /rate-profiles/{code} → Detalle perfil
 - POST /rate-profiles/calculate → Calcular préstamo
 - POST /rate-profiles/compare → Comparar perfiles
+- PATCH /rate-profiles/{code} → Editar perfil (regenera su tabla de referencia)
+- POST /rate-profiles/reference/regenerate → Regenerar tabla de referencia
 """
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db, get_async_db
+from app.core.cache import cached, invalidate_from_thread
+from app.core.queries import register_query
+from app.core.dependencies import get_current_user_id, require_admin
 from .application import (
     RateProfileDTO,
     LegacyAmountDTO,
     CalculateLoanRequest,
     LoanCalculationDTO,
     CompareProfilesRequest,
-    CompareProfilesResponse
+    CompareProfilesResponse,
+    UpdateRateProfileRequest,
+    ReferenceRegenerationDTO
 )
+from .application.reference_table import ReferenceTableRegenerator
 from .application.services import RateProfileService
 
 
@@ -33,6 +41,7 @@ def get_rate_profile_service(db: Session = Depends(get_db)) -> RateProfileServic
 
 
 @router.get("/", response_model=List[RateProfileDTO])
+@cached("rate_profiles", ttl=3600)
 def list_rate_profiles(
     enabled_only: bool = True,
     service: RateProfileService = Depends(get_rate_profile_service)
@@ -71,7 +80,30 @@ def list_rate_profiles(
 # ============================================================================
 # ENDPOINT: Tabla de Referencia (debe estar ANTES de /{profile_code})
 # ============================================================================
+_REFERENCE_TABLE = register_query("rate_profiles.reference_table", """
+    SELECT 
+        r.profile_code,
+        r.amount,
+        r.term_biweeks,
+        r.biweekly_payment,
+        r.total_payment,
+        r.commission_per_payment,
+        r.total_commission,
+        r.associate_payment,
+        r.associate_total,
+        r.interest_rate_percent,
+        r.commission_rate_percent,
+        p.name as profile_name
+    FROM rate_profile_reference_table r
+    JOIN rate_profiles p ON r.profile_code = p.code
+    WHERE (CAST(:profile_code AS VARCHAR) IS NULL OR r.profile_code = :profile_code)
+      AND (CAST(:term_biweeks AS INTEGER) IS NULL OR r.term_biweeks = :term_biweeks)
+    ORDER BY r.profile_code, r.term_biweeks, r.amount
+""")
+
+
 @router.get("/reference")
+@cached("rate_profiles", ttl=3600)
 async def get_reference_table(
     profile_code: str = None,
     term_biweeks: int = None,
@@ -80,43 +112,10 @@ async def get_reference_table(
     """
     Obtiene la tabla de referencia precalculada para consulta rápida.
     """
-    from sqlalchemy import text
-    
-    # Build WHERE clause
-    if profile_code and term_biweeks:
-        where_clause = "r.profile_code = :profile_code AND r.term_biweeks = :term_biweeks"
-        params = {"profile_code": profile_code, "term_biweeks": term_biweeks}
-    elif profile_code:
-        where_clause = "r.profile_code = :profile_code"
-        params = {"profile_code": profile_code}
-    elif term_biweeks:
-        where_clause = "r.term_biweeks = :term_biweeks"
-        params = {"term_biweeks": term_biweeks}
-    else:
-        where_clause = "1=1"
-        params = {}
-    
-    query_str = f"""
-        SELECT 
-            r.profile_code,
-            r.amount,
-            r.term_biweeks,
-            r.biweekly_payment,
-            r.total_payment,
-            r.commission_per_payment,
-            r.total_commission,
-            r.associate_payment,
-            r.associate_total,
-            r.interest_rate_percent,
-            r.commission_rate_percent,
-            p.name as profile_name
-        FROM rate_profile_reference_table r
-        JOIN rate_profiles p ON r.profile_code = p.code
-        WHERE {where_clause}
-        ORDER BY r.profile_code, r.term_biweeks, r.amount
-    """
-    
-    result = await session.execute(text(query_str), params)
+    result = await _REFERENCE_TABLE.execute(session, {
+        "profile_code": profile_code or None,
+        "term_biweeks": term_biweeks or None,
+    })
     rows = result.fetchall()
     
     if not rows:
@@ -150,10 +149,33 @@ async def get_reference_table(
     }
 
 
+@router.post("/reference/regenerate", response_model=ReferenceRegenerationDTO, dependencies=[Depends(require_admin)])
+def regenerate_reference_table(
+    profile_code: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Regenera la tabla de referencia completa o de un solo perfil.
+    
+    Usar después de agregar montos a rate_profile_reference_amounts o de
+    editar perfiles / legacy_payment_table directamente en la base.
+    El reemplazo es atómico: las consultas ven la tabla anterior o la nueva.
+    """
+    try:
+        result = ReferenceTableRegenerator(db).regenerate(profile_code)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    
+    db.commit()
+    invalidate_from_thread("rate_profiles")
+    return ReferenceRegenerationDTO(**result.__dict__)
+
+
 # ============================================================================
 # ENDPOINT: Legacy Payments (debe estar ANTES de /{profile_code})
 # ============================================================================
 @router.get("/legacy-payments", response_model=List[LegacyAmountDTO])
+@cached("rate_profiles", ttl=3600)
 def list_legacy_amounts(
     service: RateProfileService = Depends(get_rate_profile_service)
 ):
@@ -162,6 +184,7 @@ def list_legacy_amounts(
     
     Estos son los montos predefinidos que se pueden usar con el perfil legacy.
     Todos los montos legacy son para 12 quincenas.
+    Se sirven desde la tabla legacy en memoria (sin consultar la base).
     
     Returns:
         Lista de montos disponibles ordenados por amount
@@ -180,35 +203,20 @@ def list_legacy_amounts(
         ]
         ```
     """
-    from sqlalchemy import text
-    
-    query = text("""
-        SELECT 
-            amount,
-            biweekly_payment,
-            total_payment,
-            total_interest,
-            effective_rate_percent
-        FROM legacy_payment_table
-        ORDER BY amount
-    """)
-    
-    result = service.db.execute(query)
-    rows = result.fetchall()
-    
     return [
         LegacyAmountDTO(
-            amount=row.amount,
-            biweekly_payment=row.biweekly_payment,
-            total_payment=row.total_payment,
-            total_interest=row.total_interest,
-            effective_rate_percent=row.effective_rate_percent
+            amount=entry.amount,
+            biweekly_payment=entry.biweekly_payment,
+            total_payment=entry.total_payment,
+            total_interest=entry.total_interest,
+            effective_rate_percent=entry.effective_rate_percent
         )
-        for row in rows
+        for entry in service.legacy_grid().entries
     ]
 
 
 @router.get("/{profile_code}", response_model=RateProfileDTO)
+@cached("rate_profiles", ttl=3600)
 def get_rate_profile(
     profile_code: str,
     service: RateProfileService = Depends(get_rate_profile_service)
@@ -250,6 +258,39 @@ def get_rate_profile(
     )
 
 
+@router.patch("/{profile_code}", response_model=RateProfileDTO, dependencies=[Depends(require_admin)])
+def update_rate_profile(
+    profile_code: str,
+    request: UpdateRateProfileRequest,
+    service: RateProfileService = Depends(get_rate_profile_service),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    Edita un perfil de tasa (solo los campos enviados).
+    
+    La tabla de referencia de ese perfil se regenera en la misma transacción;
+    los demás perfiles no se tocan.
+    
+    Raises:
+        404: Si el perfil no existe
+    """
+    try:
+        profile = service.update_profile(
+            profile_code,
+            request.model_dump(exclude_unset=True),
+            updated_by=current_user_id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    service.db.commit()
+    invalidate_from_thread("rate_profiles")
+    return RateProfileDTO.model_validate(profile)
+
+
 @router.post("/calculate", response_model=LoanCalculationDTO)
 def calculate_loan_payment(
     request: CalculateLoanRequest,
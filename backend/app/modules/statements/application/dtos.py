@@ -191,3 +191,13 @@ class PeriodStatsDTO(BaseModel):
             }
         }
     )
+
+
+class StatementRenderSummaryDTO(BaseModel):
+    """Result of rendering the printable documents of a period."""
+    
+    cut_period_id: int
+    total: int
+    rendered: int
+    cached: int
+    duration_ms: int
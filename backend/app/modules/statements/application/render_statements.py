@@ -0,0 +1,152 @@
+"""
+Pipeline de documentos imprimibles de statements.
+
+1. Calcula la versión de contenido de cada statement en una sola consulta
+   (updated_at del statement + sus pagos del período + sus abonos).
+2. Compara contra statement_renders: solo lo que cambió se vuelve a armar
+   y a renderizar (en el pool de procesos).
+3. Guarda cada formato en el almacenamiento de documentos (por SHA-256) y
+   registra versión y llave; lo demás se sirve directo del almacenamiento.
+"""
+import logging
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Sequence
+
+from app.core.storage import DocumentStorage
+from app.core.zipstream import ZipEntry
+
+from ..infrastructure.pg_statement_render_repository import PgStatementRenderRepository
+from .rendering import MEDIA_TYPES, RENDERER_VERSION, render_documents
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderSummary:
+    """Resultado de asegurar los renders de un conjunto de statements."""
+
+    total: int
+    rendered: int
+    cached: int
+    duration_ms: int
+
+
+@dataclass
+class RenderedStatementFile:
+    """Ubicación de un documento ya renderizado."""
+
+    storage_key: str
+    filename: str
+    media_type: str
+
+
+def _slug(value: str) -> str:
+    ascii_value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9]+", "_", ascii_value).strip("_") or "asociado"
+
+
+def document_filename(statement_number: str, associate_name: str, fmt: str) -> str:
+    return f"{_slug(statement_number)}_{_slug(associate_name)}.{fmt}"
+
+
+class StatementRenderService:
+    """
+    Renderiza statements bajo demanda y sirve la versión en cache mientras
+    el contenido no cambie.
+    """
+
+    def __init__(self, repository: PgStatementRenderRepository, storage: DocumentStorage):
+        self.repository = repository
+        self.storage = storage
+
+    async def _ensure(self, versions: dict, force: bool = False) -> RenderSummary:
+        started = time.monotonic()
+        renders = await self.repository.get_renders(list(versions)) if versions else {}
+
+        stale = [
+            statement_id
+            for statement_id, version in versions.items()
+            if force or any(
+                (renders.get((statement_id, fmt)) or {}).get("content_version") != version
+                for fmt in MEDIA_TYPES
+            )
+        ]
+
+        if stale:
+            docs = await self.repository.load_documents(stale)
+            outputs = await render_documents(docs)
+
+            rows = []
+            for doc, output in zip(docs, outputs):
+                for fmt, data in output.items():
+                    stored = await self.storage.save_bytes(data)
+                    rows.append({
+                        "statement_id": doc["statement_id"],
+                        "format": fmt,
+                        "content_version": versions[doc["statement_id"]],
+                        "storage_key": stored.key,
+                        "size_bytes": stored.size,
+                    })
+            await self.repository.save_renders(rows)
+
+        return RenderSummary(
+            total=len(versions),
+            rendered=len(stale),
+            cached=len(versions) - len(stale),
+            duration_ms=int((time.monotonic() - started) * 1000),
+        )
+
+    async def render_period(self, period_id: int, force: bool = False) -> RenderSummary:
+        """
+        Asegura los documentos de todos los statements del período.
+
+        Args:
+            period_id: ID del período de corte
+            force: Re-renderizar aunque la versión no haya cambiado
+        """
+        versions = await self.repository.get_content_versions(RENDERER_VERSION, period_id=period_id)
+        summary = await self._ensure(versions, force=force)
+        if summary.rendered:
+            logger.info(
+                f"🖨️ Período {period_id}: {summary.rendered} statements renderizados, "
+                f"{summary.cached} desde cache ({summary.duration_ms} ms)"
+            )
+        return summary
+
+    async def get_owner_id(self, statement_id: int) -> Optional[int]:
+        """Asociado dueño del statement. None si no existe."""
+        return await self.repository.get_statement_owner(statement_id)
+
+    async def get_document(self, statement_id: int, fmt: str) -> Optional[RenderedStatementFile]:
+        """Documento de un statement (se re-renderiza solo si cambió). None si no existe."""
+        versions = await self.repository.get_content_versions(RENDERER_VERSION, statement_ids=[statement_id])
+        if not versions:
+            return None
+        await self._ensure(versions)
+
+        doc = (await self.repository.list_documents(fmt, statement_ids=[statement_id]))[0]
+        return RenderedStatementFile(
+            storage_key=doc["storage_key"],
+            filename=document_filename(doc["statement_number"], doc["associate_name"], fmt),
+            media_type=MEDIA_TYPES[fmt],
+        )
+
+    async def period_zip_entries(self, period_id: int, fmt: str) -> List[dict]:
+        """Renders del período listos para el zip (llamar después de render_period)."""
+        return await self.repository.list_documents(fmt, period_id=period_id)
+
+    async def iter_zip_entries(self, documents: Sequence[dict], fmt: str) -> AsyncIterator[ZipEntry]:
+        """
+        Miembros del zip leídos en streaming desde el almacenamiento.
+
+        Solo usa el almacenamiento: puede consumirse después de cerrar la sesión.
+        """
+        for doc in documents:
+            name = f"{doc['cut_period_code']}/{document_filename(doc['statement_number'], doc['associate_name'], fmt)}"
+            chunks = self.storage.backend.iter_range(
+                doc["storage_key"], 0, doc["size_bytes"] - 1, self.storage.chunk_size
+            )
+            yield name, chunks
@@ -0,0 +1,239 @@
+"""
+Render de estados de cuenta imprimibles (HTML y texto plano).
+
+Las funciones de render son puras y solo usan la biblioteca estándar: reciben
+el documento como dict (Decimal/date, serializable con pickle) y devuelven
+bytes. Así un período completo se reparte en un ProcessPoolExecutor sin
+bloquear el event loop ni pelear por el GIL.
+
+Cambiar una plantilla exige subir RENDERER_VERSION: forma parte de la
+versión de contenido y obliga a re-renderizar lo que ya estaba en cache.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal
+from html import escape
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RENDERER_VERSION = "1"
+
+MEDIA_TYPES = {
+    "html": "text/html",
+    "txt": "text/plain",
+}
+
+StatementDocument = Dict[str, Any]
+RenderedDocument = Dict[str, bytes]
+
+
+# =============================================================================
+# FORMATO
+# =============================================================================
+
+def _money(value: Optional[Decimal]) -> str:
+    return f"${(value or Decimal('0')):,.2f}"
+
+
+def _date(value: Optional[date]) -> str:
+    return value.strftime("%d/%m/%Y") if value else "—"
+
+
+def _e(value: Any) -> str:
+    return escape(str(value if value is not None else ""))
+
+
+def remaining_amount(doc: StatementDocument) -> Decimal:
+    """Saldo pendiente, con el mismo cálculo que StatementEnhancedService."""
+    return (
+        (doc["total_to_credicuenta"] or Decimal("0"))
+        - (doc["paid_amount"] or Decimal("0"))
+        + (doc["late_fee_amount"] or Decimal("0"))
+    )
+
+
+def _summary_rows(doc: StatementDocument) -> List[tuple]:
+    return [
+        ("Pagos del período", str(doc["total_payments_count"])),
+        ("Total cobrado", _money(doc["total_amount_collected"])),
+        (f"Comisión ({doc['commission_rate_applied']}%)", _money(doc["commission_earned"])),
+        ("Total a CrediCuenta", _money(doc["total_to_credicuenta"])),
+        ("Abonado", _money(doc["paid_amount"])),
+        ("Mora", _money(doc["late_fee_amount"])),
+        ("Saldo pendiente", _money(remaining_amount(doc))),
+    ]
+
+
+# =============================================================================
+# PLANTILLAS
+# =============================================================================
+
+_HTML_STYLE = (
+    "body{font-family:Arial,sans-serif;font-size:12px;margin:24px}"
+    "h1{font-size:18px;margin:0}table{border-collapse:collapse;width:100%;margin-top:12px}"
+    "th,td{border:1px solid #999;padding:4px 6px}th{background:#eee}"
+    "td.n{text-align:right}.meta td{border:none;padding:2px 6px}"
+    "@media print{body{margin:0}}"
+)
+
+
+def render_html(doc: StatementDocument) -> bytes:
+    """Estado de cuenta en HTML listo para imprimir."""
+    payment_rows = "".join(
+        "<tr>"
+        f"<td>{_e(p['loan_id'])}</td><td>{_e(p['payment_number'])}</td><td>{_e(p['client_name'])}</td>"
+        f"<td>{_date(p['payment_due_date'])}</td><td class=n>{_money(p['expected_amount'])}</td>"
+        f"<td class=n>{_money(p['commission_amount'])}</td><td class=n>{_money(p['associate_payment'])}</td>"
+        f"<td class=n>{_money(p['amount_paid'])}</td><td>{_e(p['status'])}</td>"
+        "</tr>"
+        for p in doc["payments"]
+    ) or "<tr><td colspan=9>Sin pagos en el período</td></tr>"
+
+    abono_rows = "".join(
+        "<tr>"
+        f"<td>{_date(a['payment_date'])}</td><td class=n>{_money(a['payment_amount'])}</td>"
+        f"<td>{_e(a['payment_method'])}</td><td>{_e(a['payment_reference'])}</td>"
+        "</tr>"
+        for a in doc["statement_payments"]
+    ) or "<tr><td colspan=4>Sin abonos registrados</td></tr>"
+
+    summary_rows = "".join(
+        f"<tr><th>{_e(label)}</th><td class=n>{_e(value)}</td></tr>" for label, value in _summary_rows(doc)
+    )
+
+    html = (
+        "<!DOCTYPE html><html lang=es><head><meta charset=utf-8>"
+        f"<title>Estado de cuenta {_e(doc['statement_number'])}</title><style>{_HTML_STYLE}</style></head><body>"
+        f"<h1>CrediCuenta · Estado de cuenta {_e(doc['statement_number'])}</h1>"
+        "<table class=meta>"
+        f"<tr><td>Asociado:</td><td><b>{_e(doc['associate_name'])}</b></td>"
+        f"<td>Período:</td><td><b>{_e(doc['cut_period_code'])}</b> "
+        f"({_date(doc['period_start_date'])} – {_date(doc['period_end_date'])})</td></tr>"
+        f"<tr><td>Impresión:</td><td>{_date(doc['print_date'])}</td>"
+        f"<td>Vencimiento:</td><td>{_date(doc['due_date'])}</td></tr>"
+        f"<tr><td>Estado:</td><td>{_e(doc['status_name'])}</td><td></td><td></td></tr>"
+        "</table>"
+        f"<table>{summary_rows}</table>"
+        "<h2>Pagos del período</h2><table><tr><th>Préstamo</th><th>#</th><th>Cliente</th><th>Vence</th>"
+        "<th>Esperado</th><th>Comisión</th><th>A CrediCuenta</th><th>Pagado</th><th>Estado</th></tr>"
+        f"{payment_rows}</table>"
+        "<h2>Abonos</h2><table><tr><th>Fecha</th><th>Monto</th><th>Método</th><th>Referencia</th></tr>"
+        f"{abono_rows}</table>"
+        "</body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def render_text(doc: StatementDocument) -> bytes:
+    """Estado de cuenta en texto plano de ancho fijo (impresoras de ticket, correo)."""
+    width = 96
+    lines = [
+        "=" * width,
+        f"CREDICUENTA - ESTADO DE CUENTA {doc['statement_number']}".center(width),
+        "=" * width,
+        f"Asociado:    {doc['associate_name']}",
+        f"Período:     {doc['cut_period_code']} ({_date(doc['period_start_date'])} - {_date(doc['period_end_date'])})",
+        f"Impresión:   {_date(doc['print_date'])}    Vencimiento: {_date(doc['due_date'])}",
+        f"Estado:      {doc['status_name']}",
+        "-" * width,
+    ]
+    lines += [f"{label:<30}{value:>20}" for label, value in _summary_rows(doc)]
+
+    lines += ["-" * width, "PAGOS DEL PERÍODO"]
+    lines.append(f"{'Préstamo':>8} {'#':>3} {'Cliente':<26} {'Vence':<10} {'Esperado':>13} {'A CrediCuenta':>14} {'Pagado':>13}")
+    for p in doc["payments"]:
+        lines.append(
+            f"{p['loan_id']:>8} {p['payment_number'] or '':>3} {str(p['client_name'] or '')[:26]:<26} "
+            f"{_date(p['payment_due_date']):<10} {_money(p['expected_amount']):>13} "
+            f"{_money(p['associate_payment']):>14} {_money(p['amount_paid']):>13}"
+        )
+    if not doc["payments"]:
+        lines.append("  Sin pagos en el período")
+
+    lines += ["-" * width, "ABONOS"]
+    for a in doc["statement_payments"]:
+        lines.append(
+            f"{_date(a['payment_date']):<10} {_money(a['payment_amount']):>13}  "
+            f"{a['payment_method'] or ''}  {a['payment_reference'] or ''}".rstrip()
+        )
+    if not doc["statement_payments"]:
+        lines.append("  Sin abonos registrados")
+    lines.append("=" * width)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+RENDERERS: Dict[str, Callable[[StatementDocument], bytes]] = {
+    "html": render_html,
+    "txt": render_text,
+}
+
+
+def render_statement(doc: StatementDocument) -> RenderedDocument:
+    """Todos los formatos de un estado de cuenta."""
+    return {fmt: render(doc) for fmt, render in RENDERERS.items()}
+
+
+def render_batch(docs: List[StatementDocument]) -> List[RenderedDocument]:
+    """Unidad de trabajo del pool: un lote por viaje entre procesos."""
+    return [render_statement(doc) for doc in docs]
+
+
+# =============================================================================
+# POOL DE PROCESOS
+# =============================================================================
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Pool compartido (STATEMENT_RENDER_WORKERS procesos).
+
+    Con 0 workers no hay pool y el render corre en el threadpool.
+    """
+    global _pool
+    if _pool is None and settings.statement_render_workers > 0:
+        # spawn: no heredar del servidor hilos ni conexiones abiertas
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.statement_render_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"🖨️ Pool de render de statements iniciado ({settings.statement_render_workers} procesos)")
+    return _pool
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def render_documents(docs: List[StatementDocument]) -> List[RenderedDocument]:
+    """
+    Renderiza `docs` en lotes de STATEMENT_RENDER_BATCH_SIZE repartidos en el pool.
+
+    Returns:
+        Un dict {formato: bytes} por documento, en el mismo orden
+    """
+    if not docs:
+        return []
+    pool = get_render_pool()
+    if pool is None:
+        return await run_in_threadpool(render_batch, docs)
+
+    size = max(1, settings.statement_render_batch_size)
+    loop = asyncio.get_running_loop()
+    batches = await asyncio.gather(*(
+        loop.run_in_executor(pool, render_batch, docs[i:i + size])
+        for i in range(0, len(docs), size)
+    ))
+    return [rendered for batch in batches for rendered in batch]
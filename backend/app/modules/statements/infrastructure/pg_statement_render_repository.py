@@ -0,0 +1,230 @@
+"""PostgreSQL queries for rendered statement documents (statement_renders)."""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Versión de contenido: updated_at del statement + firma de sus pagos del
+# período (los que muestra payments-preview) + firma de sus abonos. Cualquier
+# UPDATE toca updated_at (trigger) y los alta/baja cambian la lista de ids.
+_VERSIONS_SQL = """
+    SELECT
+        aps.id AS statement_id,
+        md5(concat_ws('|', CAST(:renderer_version AS text), aps.updated_at, pay.signature, ab.signature)) AS content_version
+    FROM associate_payment_statements aps
+    LEFT JOIN LATERAL (
+        SELECT string_agg(p.id || ':' || p.updated_at, ',' ORDER BY p.id) AS signature
+        FROM payments p
+        JOIN loans l ON l.id = p.loan_id
+        WHERE p.cut_period_id = aps.cut_period_id
+          AND l.associate_user_id = aps.user_id
+          AND p.status_id != 13  -- Excluir pagos IN_AGREEMENT
+    ) pay ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT string_agg(asp.id || ':' || asp.updated_at, ',' ORDER BY asp.id) AS signature
+        FROM associate_statement_payments asp
+        WHERE asp.statement_id = aps.id
+    ) ab ON TRUE
+    WHERE {where}
+    ORDER BY aps.id
+"""
+
+_HEADERS_SQL = text("""
+    SELECT
+        aps.id AS statement_id,
+        aps.statement_number,
+        aps.user_id,
+        CONCAT(u.first_name, ' ', u.last_name) AS associate_name,
+        aps.cut_period_id,
+        cp.cut_code AS cut_period_code,
+        cp.period_start_date,
+        cp.period_end_date,
+        cp.period_end_date + 1 AS print_date,  -- se imprime el día siguiente al cierre (migración 024)
+        aps.total_payments_count,
+        aps.total_amount_collected,
+        aps.total_to_credicuenta,
+        aps.commission_earned,
+        aps.commission_rate_applied,
+        ss.name AS status_name,
+        aps.due_date,
+        COALESCE(aps.paid_amount, 0) AS paid_amount,
+        aps.late_fee_amount
+    FROM associate_payment_statements aps
+    JOIN users u ON aps.user_id = u.id
+    JOIN cut_periods cp ON aps.cut_period_id = cp.id
+    JOIN statement_statuses ss ON aps.status_id = ss.id
+    WHERE aps.id = ANY(:ids)
+""")
+
+_PAYMENTS_SQL = text("""
+    SELECT
+        aps.id AS statement_id,
+        p.loan_id,
+        p.payment_number,
+        COALESCE(uc.first_name || ' ' || uc.last_name, 'Cliente') AS client_name,
+        p.payment_due_date,
+        p.expected_amount,
+        p.commission_amount,
+        p.associate_payment,
+        p.amount_paid,
+        ps.name AS status
+    FROM associate_payment_statements aps
+    JOIN loans l ON l.associate_user_id = aps.user_id
+    JOIN payments p ON p.loan_id = l.id AND p.cut_period_id = aps.cut_period_id
+    LEFT JOIN users uc ON uc.id = l.user_id
+    LEFT JOIN payment_statuses ps ON ps.id = p.status_id
+    WHERE aps.id = ANY(:ids)
+      AND p.status_id != 13  -- Excluir pagos IN_AGREEMENT
+    ORDER BY aps.id, p.payment_due_date, uc.last_name, uc.first_name, p.id
+""")
+
+_STATEMENT_PAYMENTS_SQL = text("""
+    SELECT
+        asp.statement_id,
+        asp.payment_date,
+        asp.payment_amount,
+        pm.name AS payment_method,
+        asp.payment_reference
+    FROM associate_statement_payments asp
+    JOIN payment_methods pm ON pm.id = asp.payment_method_id
+    WHERE asp.statement_id = ANY(:ids)
+    ORDER BY asp.statement_id, asp.payment_date, asp.id
+""")
+
+
+class PgStatementRenderRepository:
+    """Lecturas para armar los documentos y el índice statement_renders."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_content_versions(
+        self,
+        renderer_version: str,
+        period_id: Optional[int] = None,
+        statement_ids: Optional[Sequence[int]] = None,
+    ) -> Dict[int, str]:
+        """Versión de contenido por statement, de un período o de una lista de ids."""
+        if period_id is not None:
+            where, params = "aps.cut_period_id = :period_id", {"period_id": period_id}
+        else:
+            where, params = "aps.id = ANY(:ids)", {"ids": list(statement_ids or [])}
+        params["renderer_version"] = renderer_version
+
+        result = await self.db.execute(text(_VERSIONS_SQL.format(where=where)), params)
+        return {row.statement_id: row.content_version for row in result.fetchall()}
+
+    async def get_renders(self, statement_ids: Sequence[int]) -> Dict[Tuple[int, str], dict]:
+        """Renders guardados, por (statement_id, formato)."""
+        result = await self.db.execute(
+            text("""
+                SELECT statement_id, format, content_version, storage_key, size_bytes
+                FROM statement_renders
+                WHERE statement_id = ANY(:ids)
+            """),
+            {"ids": list(statement_ids)},
+        )
+        return {(row.statement_id, row.format): dict(row._mapping) for row in result.fetchall()}
+
+    async def load_documents(self, statement_ids: Sequence[int]) -> List[dict]:
+        """
+        Datos completos para renderizar: encabezado, pagos del período y abonos.
+
+        Tres consultas para todo el lote, sin importar cuántos statements sean.
+        """
+        ids = list(statement_ids)
+        headers = (await self.db.execute(_HEADERS_SQL, {"ids": ids})).fetchall()
+        payments = (await self.db.execute(_PAYMENTS_SQL, {"ids": ids})).fetchall()
+        statement_payments = (await self.db.execute(_STATEMENT_PAYMENTS_SQL, {"ids": ids})).fetchall()
+
+        docs = {}
+        for row in headers:
+            doc = dict(row._mapping)
+            doc["payments"] = []
+            doc["statement_payments"] = []
+            docs[row.statement_id] = doc
+        for row in payments:
+            item = dict(row._mapping)
+            docs[item.pop("statement_id")]["payments"].append(item)
+        for row in statement_payments:
+            item = dict(row._mapping)
+            docs[item.pop("statement_id")]["statement_payments"].append(item)
+        return [docs[statement_id] for statement_id in ids if statement_id in docs]
+
+    async def save_renders(self, rows: List[dict]) -> None:
+        """Upsert de (statement_id, format) → versión y llave en el almacenamiento."""
+        if not rows:
+            return
+        await self.db.execute(
+            text("""
+                INSERT INTO statement_renders (statement_id, format, content_version, storage_key, size_bytes)
+                SELECT * FROM unnest(
+                    CAST(:statement_ids AS integer[]),
+                    CAST(:formats AS varchar[]),
+                    CAST(:versions AS varchar[]),
+                    CAST(:keys AS varchar[]),
+                    CAST(:sizes AS bigint[])
+                )
+                ON CONFLICT (statement_id, format) DO UPDATE SET
+                    content_version = EXCLUDED.content_version,
+                    storage_key = EXCLUDED.storage_key,
+                    size_bytes = EXCLUDED.size_bytes,
+                    rendered_at = CURRENT_TIMESTAMP
+            """),
+            {
+                "statement_ids": [r["statement_id"] for r in rows],
+                "formats": [r["format"] for r in rows],
+                "versions": [r["content_version"] for r in rows],
+                "keys": [r["storage_key"] for r in rows],
+                "sizes": [r["size_bytes"] for r in rows],
+            },
+        )
+
+    async def list_documents(
+        self,
+        fmt: str,
+        period_id: Optional[int] = None,
+        statement_ids: Optional[Sequence[int]] = None,
+    ) -> List[dict]:
+        """Renders de un período o de una lista de ids, en orden de impresión (por asociado)."""
+        if period_id is not None:
+            where, params = "aps.cut_period_id = :period_id", {"period_id": period_id}
+        else:
+            where, params = "aps.id = ANY(:ids)", {"ids": list(statement_ids or [])}
+        params["format"] = fmt
+
+        result = await self.db.execute(
+            text(f"""
+                SELECT
+                    aps.id AS statement_id,
+                    aps.statement_number,
+                    CONCAT(u.first_name, ' ', u.last_name) AS associate_name,
+                    cp.cut_code AS cut_period_code,
+                    sr.storage_key,
+                    sr.size_bytes
+                FROM associate_payment_statements aps
+                JOIN users u ON u.id = aps.user_id
+                JOIN cut_periods cp ON cp.id = aps.cut_period_id
+                JOIN statement_renders sr ON sr.statement_id = aps.id AND sr.format = :format
+                WHERE {where}
+                ORDER BY u.last_name, u.first_name, aps.id
+            """),
+            params,
+        )
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    async def get_statement_owner(self, statement_id: int) -> Optional[int]:
+        """user_id (asociado) del statement. None si no existe."""
+        result = await self.db.execute(
+            text("SELECT user_id FROM associate_payment_statements WHERE id = :id"), {"id": statement_id}
+        )
+        return result.scalar_one_or_none()
+
+    async def get_period_code(self, period_id: int) -> Optional[str]:
+        result = await self.db.execute(
+            text("SELECT cut_code FROM cut_periods WHERE id = :id"), {"id": period_id}
+        )
+        row = result.fetchone()
+        return row.cut_code if row else None
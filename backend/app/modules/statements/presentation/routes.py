@@ -1,10 +1,18 @@
 """API routes for statements endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
+from app.core.cache import invalidate_from_thread, response_cache
+from app.core.dependencies import ensure_owner_or_staff, require_admin
+from app.core.storage import get_storage
+from app.core.zipstream import stream_zip
 from app.modules.auth.routes import get_current_user
 from app.core.notifications import notify
 
@@ -14,7 +22,8 @@ from ..application.dtos import (
     ApplyLateFeeDTO,
     StatementResponseDTO,
     StatementSummaryDTO,
-    PeriodStatsDTO
+    PeriodStatsDTO,
+    StatementRenderSummaryDTO
 )
 from ..application.generate_statement import GenerateStatementUseCase
 from ..application.list_statements import ListStatementsUseCase
@@ -22,8 +31,11 @@ from ..application.get_statement_details import GetStatementDetailsUseCase
 from ..application.mark_statement_paid import MarkStatementPaidUseCase
 from ..application.apply_late_fee import ApplyLateFeeUseCase
 from ..application.enhanced_service import StatementEnhancedService
+from ..application.render_statements import StatementRenderService
 from ..infrastructure.pg_statement_repository import PgStatementRepository
+from ..infrastructure.pg_statement_render_repository import PgStatementRenderRepository
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/statements", tags=["Statements"])
 
@@ -34,6 +46,14 @@ def get_statement_repository(db: Session = Depends(get_db)) -> PgStatementReposi
     return PgStatementRepository(db)
 
 
+def get_render_service(db: AsyncSession = Depends(get_async_db)) -> StatementRenderService:
+    """Get printable documents pipeline."""
+    return StatementRenderService(PgStatementRenderRepository(db), get_storage())
+
+
+RenderFormat = Literal["html", "txt"]
+
+
 @router.post(
     "/",
     response_model=StatementResponseDTO,
@@ -69,6 +89,7 @@ def generate_statement(
                 detail=f"Failed to retrieve generated statement {statement.id}"
             )
         
+        invalidate_from_thread("statements")
         return StatementResponseDTO(**statement_data)
         
     except ValueError as e:
@@ -193,6 +214,7 @@ def mark_statement_paid(
                 detail=f"Statement {statement_id} not found after update"
             )
         
+        invalidate_from_thread("statements")
         return StatementResponseDTO(**statement_data)
         
     except LookupError as e:
@@ -239,6 +261,7 @@ def apply_late_fee(
                 detail=f"Statement {statement_id} not found after update"
             )
         
+        invalidate_from_thread("statements")
         return StatementResponseDTO(**statement_data)
         
     except LookupError as e:
@@ -328,6 +351,116 @@ def get_period_stats(
     )
 
 
+# =============================================================================
+# DOCUMENTOS IMPRIMIBLES (render en pool de procesos, cache por versión)
+# =============================================================================
+
+@router.post(
+    "/periods/{cut_period_id}/render",
+    response_model=StatementRenderSummaryDTO,
+    summary="Render period statements",
+    description="Render printable documents (HTML and plain text) for every statement of a period"
+)
+async def render_period_statements(
+    cut_period_id: int,
+    force: bool = Query(False, description="Re-render even if the content did not change"),
+    db: AsyncSession = Depends(get_async_db),
+    service: StatementRenderService = Depends(get_render_service),
+    _: None = Depends(require_admin)
+):
+    """
+    Renderiza los estados de cuenta del período (típicamente el día de impresión).
+
+    Solo se re-renderizan los statements cuyo contenido cambió desde el último
+    render; el resto se cuenta en `cached`.
+
+    **Permissions**: admin
+    """
+    if await service.repository.get_period_code(cut_period_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Cut period {cut_period_id} not found")
+
+    summary = await service.render_period(cut_period_id, force=force)
+    await db.commit()
+    return StatementRenderSummaryDTO(cut_period_id=cut_period_id, **summary.__dict__)
+
+
+@router.get(
+    "/periods/{cut_period_id}/documents.zip",
+    summary="Download period statements",
+    description="Zip stream with the printable document of every statement of a period"
+)
+async def download_period_statements(
+    cut_period_id: int,
+    format: RenderFormat = Query("html", description="html | txt"),
+    db: AsyncSession = Depends(get_async_db),
+    service: StatementRenderService = Depends(get_render_service),
+    _: None = Depends(require_admin)
+):
+    """
+    Descarga todo el período como zip en streaming.
+
+    Renderiza primero lo que esté desactualizado; los archivos se leen del
+    almacenamiento y se comprimen mientras se envían.
+
+    **Permissions**: admin
+    """
+    period_code = await service.repository.get_period_code(cut_period_id)
+    if period_code is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Cut period {cut_period_id} not found")
+
+    await service.render_period(cut_period_id)
+    await db.commit()
+    documents = await service.period_zip_entries(cut_period_id, format)
+
+    return StreamingResponse(
+        stream_zip(service.iter_zip_entries(documents, format)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="estados_de_cuenta_{period_code}_{format}.zip"'}
+    )
+
+
+@router.get(
+    "/{statement_id}/document",
+    summary="Download statement document",
+    description="Printable statement (HTML or plain text), served from cache while its content is unchanged"
+)
+async def download_statement_document(
+    statement_id: int,
+    request: Request,
+    format: RenderFormat = Query("html", description="html | txt"),
+    db: AsyncSession = Depends(get_async_db),
+    service: StatementRenderService = Depends(get_render_service),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Estado de cuenta imprimible de un statement.
+
+    ETag = SHA-256 del documento: con If-None-Match responde 304 mientras
+    el statement, sus pagos y sus abonos no cambien.
+
+    **Permissions**: admin, supervisor, associate (own statements only)
+    """
+    owner_id = await service.get_owner_id(statement_id)
+    if owner_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Statement {statement_id} not found")
+    ensure_owner_or_staff(
+        owner_id, current_user.id, current_user.roles,
+        detail="No tiene permisos para ver este statement"
+    )
+
+    document = await service.get_document(statement_id, format)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Statement {statement_id} not found")
+    await db.commit()
+
+    return await service.storage.download_response(
+        request,
+        document.storage_key,
+        filename=document.filename,
+        media_type=document.media_type
+    )
+
+
 # =============================================================================
 # ⭐ NUEVOS ENDPOINTS FASE 6 - ABONOS Y TRACKING
 # =============================================================================
@@ -389,6 +522,7 @@ async def register_statement_payment(
     })
     
     db.commit()
+    await response_cache.invalidate("statements")
     payment = result.fetchone()
     
     # Obtener estado actualizado del statement con nombre del asociado
@@ -416,7 +550,7 @@ async def register_statement_payment(
             level="info"
         ))
     except Exception as e:
-        print(f"⚠️ Error enviando notificación: {e}")
+        logger.warning(f"⚠️ Error enviando notificación: {e}")
     
     return {
         "success": True,
@@ -591,6 +725,7 @@ async def delete_statement_payment(
     """), {"statement_id": statement_id})
     
     db.commit()
+    await response_cache.invalidate("statements")
     
     # Obtener estado actualizado
     updated = db.execute(text("""
@@ -0,0 +1,247 @@
+"""
+Motor de morosidad (job nocturno).
+
+Tres pasadas set-based, cada una una sola sentencia sin importar el tamaño
+de la cartera:
+
+1. Pagos vencidos: sincroniza payments.is_late (vencido y sin cubrir en un
+   estado cobrable). También limpia el flag de pagos que ya se cubrieron.
+2. Moras de statements: aplica la regla de calculate_late_fee_for_statement()
+   (30% de commission_earned si el asociado no reportó ningún pago) a todos
+   los statements vencidos que aún no la tienen. El estado del statement no
+   cambia: el flujo COLLECTING → SETTLING → CLOSED sigue a cargo del
+   motor de cortes.
+3. Antigüedad: foto de delinquency_aging para la fecha de referencia, por
+   préstamo y por asociado (GROUPING SETS), en rangos 1-15, 16-30, 31-60 y
+   más de 60 días.
+
+En dry-run las pasadas corren igual y la transacción se revierte, así los
+conteos del resumen son exactos.
+
+Lo usan:
+- El job programado (app/scheduler/jobs.py → delinquency_job)
+- POST /scheduler/run-delinquency-now
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import PaymentStatusId, StatementStatusId
+
+logger = logging.getLogger(__name__)
+
+# Pagos que todavía se pueden cobrar al cliente
+OPEN_PAYMENT_STATUSES = [
+    PaymentStatusId.PENDING,
+    PaymentStatusId.DUE_TODAY,
+    PaymentStatusId.OVERDUE,
+    PaymentStatusId.PARTIAL,
+    PaymentStatusId.IN_COLLECTION,
+    PaymentStatusId.RESCHEDULED,
+]
+
+# Statements que todavía admiten mora (los cerrados/absorbidos ya no)
+LATE_FEE_STATEMENT_STATUSES = [
+    1,  # GENERATED (legacy)
+    2,  # SENT (legacy)
+    StatementStatusId.PARTIAL,
+    StatementStatusId.OVERDUE,
+    StatementStatusId.COLLECTING,
+    StatementStatusId.SETTLING,
+]
+
+# Misma regla que calculate_late_fee_for_statement()
+LATE_FEE_RATE = Decimal("0.30")
+
+AGING_BUCKETS = ("1_15", "16_30", "31_60", "60_plus")
+
+
+@dataclass
+class DelinquencyReport:
+    """Resumen de una corrida del motor de morosidad."""
+
+    as_of: date
+    dry_run: bool = False
+    payments_flagged: int = 0
+    payments_cleared: int = 0
+    late_fees_applied: int = 0
+    late_fees_total: Decimal = Decimal("0")
+    loans_overdue: int = 0
+    associates_overdue: int = 0
+    aging: Dict[str, Decimal] = field(default_factory=lambda: {b: Decimal("0") for b in AGING_BUCKETS})
+
+    @property
+    def total_overdue(self) -> Decimal:
+        return sum(self.aging.values(), Decimal("0"))
+
+    def to_dict(self) -> Dict:
+        return {
+            "as_of": self.as_of.isoformat(),
+            "dry_run": self.dry_run,
+            "payments_flagged": self.payments_flagged,
+            "payments_cleared": self.payments_cleared,
+            "late_fees_applied": self.late_fees_applied,
+            "late_fees_total": float(self.late_fees_total),
+            "loans_overdue": self.loans_overdue,
+            "associates_overdue": self.associates_overdue,
+            "aging": {bucket: float(amount) for bucket, amount in self.aging.items()},
+            "total_overdue": float(self.total_overdue),
+        }
+
+    def summary_lines(self) -> List[str]:
+        return [
+            f"• Pagos marcados vencidos: {self.payments_flagged} (regularizados: {self.payments_cleared})",
+            f"• Moras aplicadas: {self.late_fees_applied} (${float(self.late_fees_total):,.2f})",
+            f"• Préstamos con atraso: {self.loans_overdue} de {self.associates_overdue} asociados",
+            f"• 1-15 días: ${float(self.aging['1_15']):,.2f}",
+            f"• 16-30 días: ${float(self.aging['16_30']):,.2f}",
+            f"• 31-60 días: ${float(self.aging['31_60']):,.2f}",
+            f"• +60 días: ${float(self.aging['60_plus']):,.2f}",
+            f"• Total vencido: ${float(self.total_overdue):,.2f}",
+        ]
+
+
+class DelinquencyEngine:
+    """
+    Motor de morosidad sobre una AsyncSession.
+
+    `run()` confirma la transacción (o la revierte en dry-run); el llamador
+    solo provee la sesión.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def run(self, as_of: date, dry_run: bool = False) -> DelinquencyReport:
+        report = DelinquencyReport(as_of=as_of, dry_run=dry_run)
+        try:
+            await self.flag_late_payments(report)
+            await self.apply_late_fees(report)
+            await self.snapshot_aging(report)
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        if dry_run:
+            await self.db.rollback()
+        else:
+            await self.db.commit()
+
+        logger.info(
+            f"📉 Morosidad {as_of.isoformat()}{' (dry-run)' if dry_run else ''}: "
+            f"{report.payments_flagged} pagos vencidos, {report.late_fees_applied} moras, "
+            f"${float(report.total_overdue):,.2f} en cartera vencida"
+        )
+        return report
+
+    async def flag_late_payments(self, report: DelinquencyReport) -> None:
+        """Sincroniza payments.is_late con un solo UPDATE."""
+        result = await self.db.execute(
+            text("""
+            WITH candidates AS (
+                SELECT
+                    p.id,
+                    COALESCE(
+                        p.payment_due_date < CAST(:as_of AS DATE)
+                        AND p.status_id = ANY(:open_statuses)
+                        AND COALESCE(p.amount_paid, 0) < p.expected_amount,
+                        false
+                    ) AS should_be_late
+                FROM payments p
+                WHERE p.is_late = true
+                   OR (p.payment_due_date < CAST(:as_of AS DATE) AND p.status_id = ANY(:open_statuses))
+            )
+            UPDATE payments p
+            SET is_late = c.should_be_late,
+                updated_at = NOW()
+            FROM candidates c
+            WHERE p.id = c.id
+              AND p.is_late <> c.should_be_late
+            RETURNING p.is_late
+            """),
+            {"as_of": report.as_of, "open_statuses": [int(s) for s in OPEN_PAYMENT_STATUSES]}
+        )
+        flags = [row.is_late for row in result.fetchall()]
+        report.payments_flagged = sum(1 for f in flags if f)
+        report.payments_cleared = len(flags) - report.payments_flagged
+
+    async def apply_late_fees(self, report: DelinquencyReport) -> None:
+        """Aplica la mora a todos los statements vencidos elegibles."""
+        result = await self.db.execute(
+            text("""
+            UPDATE associate_payment_statements aps
+            SET late_fee_amount = ROUND(aps.commission_earned * :rate, 2),
+                late_fee_applied = true,
+                updated_at = NOW()
+            WHERE aps.due_date < CAST(:as_of AS DATE)
+              AND aps.late_fee_applied = false
+              AND aps.status_id = ANY(:statuses)
+              AND aps.total_payments_count = 0
+              AND aps.commission_earned > 0
+              AND NOT (aps.paid_date IS NOT NULL
+                       AND COALESCE(aps.paid_amount, 0) >= aps.total_to_credicuenta)
+            RETURNING aps.late_fee_amount
+            """),
+            {
+                "as_of": report.as_of,
+                "rate": LATE_FEE_RATE,
+                "statuses": [int(s) for s in LATE_FEE_STATEMENT_STATUSES],
+            }
+        )
+        fees = [row.late_fee_amount for row in result.fetchall()]
+        report.late_fees_applied = len(fees)
+        report.late_fees_total = sum(fees, Decimal("0"))
+
+    async def snapshot_aging(self, report: DelinquencyReport) -> None:
+        """Reemplaza la foto de delinquency_aging de la fecha de referencia."""
+        await self.db.execute(
+            text("DELETE FROM delinquency_aging WHERE as_of_date = CAST(:as_of AS DATE)"),
+            {"as_of": report.as_of}
+        )
+        result = await self.db.execute(
+            text("""
+            WITH overdue AS (
+                SELECT
+                    l.associate_user_id,
+                    p.loan_id,
+                    CAST(:as_of AS DATE) - p.payment_due_date AS days_overdue,
+                    p.expected_amount - COALESCE(p.amount_paid, 0) AS amount
+                FROM payments p
+                JOIN loans l ON l.id = p.loan_id
+                WHERE p.is_late = true
+                  AND l.associate_user_id IS NOT NULL
+            )
+            INSERT INTO delinquency_aging (
+                as_of_date, associate_user_id, loan_id, overdue_payments, max_days_overdue,
+                amount_1_15, amount_16_30, amount_31_60, amount_60_plus, total_overdue
+            )
+            SELECT
+                CAST(:as_of AS DATE),
+                associate_user_id,
+                loan_id,
+                COUNT(*),
+                MAX(days_overdue),
+                COALESCE(SUM(amount) FILTER (WHERE days_overdue BETWEEN 1 AND 15), 0),
+                COALESCE(SUM(amount) FILTER (WHERE days_overdue BETWEEN 16 AND 30), 0),
+                COALESCE(SUM(amount) FILTER (WHERE days_overdue BETWEEN 31 AND 60), 0),
+                COALESCE(SUM(amount) FILTER (WHERE days_overdue > 60), 0),
+                SUM(amount)
+            FROM overdue
+            GROUP BY GROUPING SETS ((associate_user_id, loan_id), (associate_user_id))
+            RETURNING loan_id, amount_1_15, amount_16_30, amount_31_60, amount_60_plus
+            """),
+            {"as_of": report.as_of}
+        )
+        for row in result.fetchall():
+            if row.loan_id is not None:
+                report.loans_overdue += 1
+                continue
+            report.associates_overdue += 1
+            for bucket in AGING_BUCKETS:
+                report.aging[bucket] += getattr(row, f"amount_{bucket}")
+
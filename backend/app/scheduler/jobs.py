@@ -7,19 +7,36 @@ No dependen del cron de Linux, corren dentro de la aplicación FastAPI.
 Jobs configurados:
 - auto_cut_period: Se ejecuta los días 8 y 23 a las 00:05 (5 min después de medianoche)
                    Procesa el cierre del período anterior y genera statements
+- resume_cut: Cada 15 minutos. Retoma una corrida del corte que quedó FAILED
+              o sin heartbeat (worker caído, timeout) desde su checkpoint
+- delinquency: Todas las noches a la 01:00. Marca pagos vencidos, aplica moras
+               a statements y guarda la antigüedad de cartera (delinquency_aging)
+
+Después de cada corte con cambios, auto_cut_period_job toma las fotos de cartera
+de los períodos que cambiaron de estado (portfolio_snapshot_job).
 
 Uso de APScheduler con jobstore en memoria (sin persistencia).
 Si el backend se reinicia en el momento exacto del job, se ejecutará en el próximo horario.
+El avance del corte sí persiste (tabla cut_runs): resume_cut lo continúa.
 ===============================================================================
 """
 import logging
 from datetime import datetime, date
+from typing import List, Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from sqlalchemy import text
+from apscheduler.triggers.interval import IntervalTrigger
 
+from app.core.cache import response_cache
 from app.core.database import async_engine
 from app.core.notifications import notify
+from app.modules.cut_periods.application.services import (
+    CutEngine,
+    CutRunInProgressError,
+    CutRunStore,
+)
+from app.scheduler.delinquency import DelinquencyEngine
+from app.scheduler.portfolio_snapshots import PortfolioSnapshotEngine
 
 logger = logging.getLogger(__name__)
 
@@ -34,20 +51,33 @@ scheduler = AsyncIOScheduler(
 )
 
 
-async def auto_cut_period_job():
+async def auto_cut_period_job(
+    force: bool = False,
+    dry_run: bool = False,
+    reference_date: date = None,
+    triggered_by: str = "scheduler",
+):
     """
     Job de corte automático de períodos.
     
     Se ejecuta los días 8 y 23 a las 00:05.
     
-    Lógica:
+    Lógica (CutEngine, la misma que POST /api/v1/cut-periods/advance-periods):
     1. Busca períodos que necesitan avanzar
     2. PENDING → CUTOFF: Marca el período como "en corte"
     3. CUTOFF → COLLECTING: Genera statements y pasa a cobro
     4. COLLECTING (antiguos) → SETTLING: Pasa a liquidación
+    5. Cortes perdidos (PENDING antiguos) se recuperan en la misma pasada
+    6. Fotos de cartera de los períodos que cambiaron (portfolio_snapshot_job)
+    
+    Cada etapa (y cada bloque de asociados) se confirma por separado con su
+    checkpoint en cut_runs; si la corrida se cae, resume_cut_job la retoma.
     
-    Esta lógica es la misma que el endpoint POST /api/v1/cut-periods/advance-periods
-    pero ejecutada automáticamente.
+    Args:
+        force: Ejecutar aunque no sea día de corte (8 o 23)
+        dry_run: Solo planear, sin modificar datos
+        reference_date: Fecha de referencia (default: hoy)
+        triggered_by: Origen de la corrida (scheduler, manual, resume)
     """
     job_id = f"auto_cut_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     logger.info(f"[{job_id}] 🚀 Iniciando job de corte automático")
@@ -56,160 +86,53 @@ async def auto_cut_period_job():
         from sqlalchemy.ext.asyncio import AsyncSession
         
         async with AsyncSession(async_engine) as db:
-            today = date.today()
-            changes = []
+            today = reference_date or date.today()
             
             logger.info(f"[{job_id}] 📅 Fecha actual: {today}, Día: {today.day}")
             
             # Solo ejecutar los días 8 y 23
-            if today.day not in [8, 23]:
+            if today.day not in [8, 23] and not force:
                 logger.info(f"[{job_id}] ℹ️ No es día de corte (8 o 23), saltando ejecución")
                 return {"status": "skipped", "reason": "not_cut_day"}
             
-            # 1. Obtener el período ACTUAL (donde cae hoy)
-            result = await db.execute(
-                text("""
-                SELECT id, cut_code, period_start_date, period_end_date, status_id
-                FROM cut_periods
-                WHERE period_start_date <= :today AND period_end_date >= :today
-                ORDER BY period_start_date DESC
-                LIMIT 1
-                """),
-                {"today": today}
-            )
-            current_period = result.fetchone()
+            def on_progress(batch: dict) -> None:
+                logger.info(
+                    f"[{job_id}] 📦 Período {batch['batch']}/{batch['batches']}: "
+                    f"{', '.join(batch['periods'])} ({batch['statements_generated']} statements)"
+                )
             
-            if not current_period:
+            engine = CutEngine(db, progress=on_progress)
+            if dry_run:
+                plan = await engine.run(today, dry_run=True)
+            else:
+                try:
+                    plan = await engine.run_resumable(today, triggered_by=triggered_by)
+                except CutRunInProgressError as e:
+                    logger.info(f"[{job_id}] ⏳ {e.message}, saltando ejecución")
+                    return {"status": "skipped", "reason": "cut_in_progress", "run_id": e.run_id}
+            
+            if not plan.current_period:
                 logger.warning(f"[{job_id}] ⚠️ No se encontró período para la fecha actual")
                 return {"status": "error", "reason": "no_current_period"}
             
-            logger.info(f"[{job_id}] 📋 Período actual: {current_period.cut_code} (status_id={current_period.status_id})")
-            
-            # 2. Obtener el período ANTERIOR INMEDIATO
-            result = await db.execute(
-                text("""
-                SELECT id, cut_code, period_start_date, period_end_date, status_id
-                FROM cut_periods
-                WHERE period_end_date < :current_start
-                ORDER BY period_end_date DESC
-                LIMIT 1
-                """),
-                {"current_start": current_period.period_start_date}
-            )
-            previous_period = result.fetchone()
-            
-            if previous_period:
-                logger.info(f"[{job_id}] 📋 Período anterior: {previous_period.cut_code} (status_id={previous_period.status_id})")
+            changes = [t.to_dict() for t in plan.transitions]
             
-            # 3. Obtener períodos MÁS ANTIGUOS en COLLECTING
-            if previous_period:
-                result = await db.execute(
-                    text("""
-                    SELECT id, cut_code, period_start_date, period_end_date, status_id
-                    FROM cut_periods
-                    WHERE period_end_date < :previous_start
-                    AND status_id = 4
-                    ORDER BY period_start_date ASC
-                    """),
-                    {"previous_start": previous_period.period_start_date}
-                )
-                old_collecting_periods = result.fetchall()
-            else:
-                old_collecting_periods = []
+            logger.info(f"[{job_id}] ✅ Corte {'simulado' if dry_run else 'completado'}. Cambios: {len(changes)}")
+            for change in changes:
+                logger.info(f"[{job_id}]    - {change['cut_code']}: {change['action']}")
             
-            # 4. Procesar transiciones
+            if changes and not dry_run:
+                await response_cache.invalidate("cut_periods", "statements")
             
-            # 4a. Períodos antiguos COLLECTING → SETTLING
-            for period in old_collecting_periods:
-                logger.info(f"[{job_id}] 🔄 {period.cut_code}: COLLECTING → SETTLING")
-                
-                # Marcar statements vencidos
-                await db.execute(
-                    text("""
-                    UPDATE associate_payment_statements 
-                    SET status_id = 9
-                    WHERE cut_period_id = :period_id 
-                    AND status_id IN (7, 8)
-                    AND (total_to_credicuenta + COALESCE(late_fee_amount, 0) - COALESCE(paid_amount, 0)) > 0.01
-                    """),
-                    {"period_id": period.id}
+            # 📸 Fotos de cartera (su error no invalida el corte ya confirmado)
+            snapshot = None
+            if changes and not dry_run:
+                snapshot = await portfolio_snapshot_job(
+                    period_ids=[t.period_id for t in plan.transitions]
                 )
-                
-                # Cambiar estado del período
-                await db.execute(
-                    text("UPDATE cut_periods SET status_id = 6, updated_at = NOW() WHERE id = :id"),
-                    {"id": period.id}
-                )
-                
-                changes.append({
-                    "cut_code": period.cut_code,
-                    "action": "COLLECTING → SETTLING",
-                    "reason": "Tiempo de cobro terminado"
-                })
-            
-            # 4b. Período anterior: PENDING o CUTOFF → COLLECTING
-            if previous_period and previous_period.status_id in [1, 3]:
-                if previous_period.status_id == 1:  # PENDING
-                    logger.info(f"[{job_id}] 🔄 {previous_period.cut_code}: PENDING → CUTOFF → COLLECTING")
-                    
-                    # Primero a CUTOFF
-                    await db.execute(
-                        text("UPDATE cut_periods SET status_id = 3, updated_at = NOW() WHERE id = :id"),
-                        {"id": previous_period.id}
-                    )
-                    
-                    # Generar statements
-                    statements_count = await _generate_statements(db, previous_period.id, previous_period.cut_code)
-                    
-                    # Luego a COLLECTING
-                    await db.execute(
-                        text("UPDATE cut_periods SET status_id = 4, updated_at = NOW() WHERE id = :id"),
-                        {"id": previous_period.id}
-                    )
-                    
-                    changes.append({
-                        "cut_code": previous_period.cut_code,
-                        "action": "PENDING → COLLECTING",
-                        "statements_generated": statements_count
-                    })
-                    
-                elif previous_period.status_id == 3:  # CUTOFF
-                    logger.info(f"[{job_id}] 🔄 {previous_period.cut_code}: CUTOFF → COLLECTING")
-                    
-                    # Verificar si ya tiene statements, si no, generarlos
-                    result = await db.execute(
-                        text("SELECT COUNT(*) as count FROM associate_payment_statements WHERE cut_period_id = :id"),
-                        {"id": previous_period.id}
-                    )
-                    stmt_count = result.fetchone().count
-                    
-                    if stmt_count == 0:
-                        statements_count = await _generate_statements(db, previous_period.id, previous_period.cut_code)
-                        logger.info(f"[{job_id}] ✅ Generados {statements_count} statements")
-                    else:
-                        statements_count = stmt_count
-                        logger.info(f"[{job_id}] ℹ️ Ya existen {stmt_count} statements")
-                    
-                    # Pasar a COLLECTING
-                    await db.execute(
-                        text("UPDATE cut_periods SET status_id = 4, updated_at = NOW() WHERE id = :id"),
-                        {"id": previous_period.id}
-                    )
-                    
-                    changes.append({
-                        "cut_code": previous_period.cut_code,
-                        "action": "CUTOFF → COLLECTING",
-                        "statements_count": statements_count
-                    })
-            
-            await db.commit()
-            
-            logger.info(f"[{job_id}] ✅ Corte completado. Cambios: {len(changes)}")
-            for change in changes:
-                logger.info(f"[{job_id}]    - {change['cut_code']}: {change['action']}")
             
             # 🔔 Enviar notificación de corte exitoso
-            if changes:
+            if changes and not dry_run:
                 changes_text = "\n".join([f"• {c['cut_code']}: {c['action']}" for c in changes])
                 await notify.send(
                     title="Corte de Período Ejecutado",
@@ -220,7 +143,15 @@ async def auto_cut_period_job():
             return {
                 "status": "success",
                 "date": today.isoformat(),
-                "changes": changes
+                "dry_run": dry_run,
+                "run_id": plan.run_id,
+                "resumed": plan.resumed,
+                "backfill": plan.backfill,
+                "current_period": plan.current_period.cut_code,
+                "previous_period": plan.previous_period.cut_code if plan.previous_period else None,
+                "statements_generated": plan.statements_generated,
+                "changes": changes,
+                "portfolio_snapshot": snapshot
             }
             
     except Exception as e:
@@ -236,95 +167,121 @@ async def auto_cut_period_job():
         return {"status": "error", "error": str(e)}
 
 
-async def _generate_statements(db, period_id: int, cut_code: str) -> int:
+async def resume_cut_job():
     """
-    Genera statements para cada asociado que tiene pagos en el período.
-    Retorna la cantidad de statements generados.
+    Retoma la última corrida del corte si quedó FAILED o sin heartbeat.
     
-    IMPORTANTE: Excluye pagos IN_AGREEMENT (status_id=13) porque esos
-    ya fueron consolidados en un convenio y no deben aparecer en statements.
+    Se ejecuta cada 15 minutos; si no hay nada que retomar no hace nada.
+    La corrida continúa desde sus checkpoints (ver CutEngine.run_resumable)
+    hasta agotar sus intentos.
     """
-    # Obtener asociados con pagos en el período
-    # EXCLUIR: status_id = 13 (IN_AGREEMENT) - estos pagos están en convenio
-    result = await db.execute(
-        text("""
-        SELECT 
-            l.associate_user_id as associate_id,
-            COUNT(DISTINCT p.id) as payment_count,
-            SUM(p.expected_amount) as total_collected,
-            SUM(p.commission_amount) as total_commission,
-            SUM(p.associate_payment) as total_to_credicuenta,
-            MAX(l.commission_rate) as commission_rate
-        FROM payments p
-        JOIN loans l ON l.id = p.loan_id
-        WHERE p.cut_period_id = :period_id
-        AND p.status_id != 13  -- Excluir pagos IN_AGREEMENT
-        AND l.associate_user_id IS NOT NULL
-        GROUP BY l.associate_user_id
-        """),
-        {"period_id": period_id}
-    )
+    from sqlalchemy.ext.asyncio import AsyncSession
     
-    associates = result.fetchall()
+    async with AsyncSession(async_engine) as db:
+        reference_date = await CutRunStore(db).needs_resume()
     
-    if not associates:
-        return 0
+    if reference_date is None:
+        return {"status": "skipped", "reason": "nothing_to_resume"}
     
-    # Obtener fecha de vencimiento del período
-    period_result = await db.execute(
-        text("SELECT period_end_date FROM cut_periods WHERE id = :id"),
-        {"id": period_id}
-    )
-    period = period_result.fetchone()
+    logger.info(f"♻️ Retomando corte pendiente del {reference_date.isoformat()}")
+    return await auto_cut_period_job(force=True, reference_date=reference_date, triggered_by="resume")
+
+
+async def delinquency_job(as_of: date = None, dry_run: bool = False):
+    """
+    Job nocturno de morosidad.
     
-    count = 0
-    for assoc in associates:
-        # Verificar si ya existe
-        existing = await db.execute(
-            text("""
-            SELECT id FROM associate_payment_statements 
-            WHERE user_id = :user_id AND cut_period_id = :period_id
-            """),
-            {"user_id": assoc.associate_id, "period_id": period_id}
-        )
+    Se ejecuta todos los días a la 01:00 (DelinquencyEngine):
+    1. Sincroniza payments.is_late
+    2. Aplica moras a statements vencidos sin reporte de pagos
+    3. Guarda la antigüedad de cartera por préstamo y asociado
+    
+    Args:
+        as_of: Fecha de referencia (default: hoy)
+        dry_run: Calcular el resumen sin guardar cambios
+    """
+    job_id = f"delinquency_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    as_of = as_of or date.today()
+    logger.info(f"[{job_id}] 🚀 Iniciando job de morosidad ({as_of.isoformat()}, dry_run={dry_run})")
+    
+    try:
+        from sqlalchemy.ext.asyncio import AsyncSession
         
-        if existing.fetchone():
-            continue
+        async with AsyncSession(async_engine) as db:
+            report = await DelinquencyEngine(db).run(as_of, dry_run=dry_run)
         
-        # Generar statement
-        statement_number = f"ST-{cut_code}-{assoc.associate_id:04d}"
+        if not dry_run and report.late_fees_applied:
+            await response_cache.invalidate("statements")
         
-        await db.execute(
-            text("""
-            INSERT INTO associate_payment_statements (
-                user_id, cut_period_id, statement_number,
-                total_amount_collected, total_to_credicuenta, commission_earned,
-                total_payments_count, commission_rate_applied,
-                paid_amount, late_fee_amount, status_id,
-                generated_date, due_date, created_at
-            ) VALUES (
-                :user_id, :period_id, :statement_number,
-                :total_collected, :total_to_credicuenta, :commission_earned,
-                :payment_count, :commission_rate,
-                0, 0, 7,
-                CURRENT_DATE, :due_date, NOW()
+        # 🔔 Resumen diario de cartera vencida
+        if not dry_run:
+            await notify.send(
+                title="Reporte de Morosidad",
+                message=f"📅 Fecha: {as_of.isoformat()}\n\n" + "\n".join(report.summary_lines()),
+                level="warning" if report.aging["60_plus"] > 0 else "info"
             )
-            """),
-            {
-                "user_id": assoc.associate_id,
-                "period_id": period_id,
-                "statement_number": statement_number,
-                "total_collected": assoc.total_collected or 0,
-                "total_to_credicuenta": assoc.total_to_credicuenta or 0,
-                "commission_earned": (assoc.total_collected or 0) - (assoc.total_to_credicuenta or 0),
-                "payment_count": assoc.payment_count,
-                "commission_rate": assoc.commission_rate or 0,
-                "due_date": period.period_end_date
-            }
+        
+        return {"status": "success", **report.to_dict()}
+        
+    except Exception as e:
+        logger.error(f"[{job_id}] ❌ Error en job de morosidad: {str(e)}", exc_info=True)
+        
+        await notify.send(
+            title="⚠️ Error en Job de Morosidad",
+            message=f"El job nocturno de morosidad falló:\n\n{str(e)}",
+            level="error"
         )
-        count += 1
+        
+        return {"status": "error", "error": str(e)}
+
+
+async def portfolio_snapshot_job(
+    period_ids: Optional[List[int]] = None,
+    cut_code: Optional[str] = None,
+    dry_run: bool = False,
+):
+    """
+    Fotos de cartera por período (PortfolioSnapshotEngine).
     
-    return count
+    Lo llaman auto_cut_period_job y POST /cut-periods/advance-periods con
+    los períodos del corte; a mano se puede
+    pedir un período por cut_code o, sin argumentos, el último ya cortado.
+    Reescribir la foto de un período es idempotente.
+    
+    Args:
+        period_ids: Períodos a fotografiar
+        cut_code: Período a fotografiar por código (ej. Mar08-2026)
+        dry_run: Calcular el resumen sin guardar cambios
+    """
+    job_id = f"portfolio_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    try:
+        from sqlalchemy.ext.asyncio import AsyncSession
+        
+        async with AsyncSession(async_engine) as db:
+            engine = PortfolioSnapshotEngine(db)
+            if period_ids is None:
+                period_id = await engine.find_period_id(cut_code)
+                if period_id is None:
+                    logger.warning(f"[{job_id}] ⚠️ No se encontró período para la foto de cartera")
+                    return {"status": "error", "reason": "period_not_found"}
+                period_ids = [period_id]
+            
+            logger.info(f"[{job_id}] 🚀 Fotos de cartera de {len(period_ids)} período(s) (dry_run={dry_run})")
+            report = await engine.run(period_ids, dry_run=dry_run)
+        
+        return {"status": "success", **report.to_dict()}
+        
+    except Exception as e:
+        logger.error(f"[{job_id}] ❌ Error en fotos de cartera: {str(e)}", exc_info=True)
+        
+        await notify.send(
+            title="⚠️ Error en Fotos de Cartera",
+            message=f"El job de fotos de cartera falló:\n\n{str(e)}",
+            level="error"
+        )
+        
+        return {"status": "error", "error": str(e)}
 
 
 def start_scheduler():
@@ -346,6 +303,24 @@ def start_scheduler():
         replace_existing=True
     )
     
+    # Reanudación del corte: cada 15 minutos retoma corridas caídas
+    scheduler.add_job(
+        resume_cut_job,
+        IntervalTrigger(minutes=15, timezone="America/Mexico_City"),
+        id="resume_cut",
+        name="Reanudación del corte automático",
+        replace_existing=True
+    )
+    
+    # Job de morosidad: todas las noches a la 01:00 hora de México
+    scheduler.add_job(
+        delinquency_job,
+        CronTrigger(hour=1, minute=0, timezone="America/Mexico_City"),
+        id="delinquency",
+        name="Morosidad y antigüedad de cartera",
+        replace_existing=True
+    )
+    
     scheduler.start()
     logger.info("✅ Scheduler iniciado")
     logger.info("📅 Jobs programados:")
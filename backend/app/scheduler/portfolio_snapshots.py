@@ -0,0 +1,234 @@
+"""
+Fotos de cartera por período (después de cada corte).
+
+Escribe las tablas de hechos de la migración 044 para los períodos pedidos,
+con un número fijo de sentencias sin importar el tamaño de la cartera ni
+cuántos períodos se procesen:
+
+1. Particiones: ensure_portfolio_snapshot_partitions() para cada año.
+2. Borra la foto anterior de esos períodos (repetir es idempotente).
+3. Préstamos: un INSERT ... SELECT sobre payments/loans por (período,
+   préstamo) con esperado, cobrado y comisión del período, y saldo pendiente
+   y vencido (pagos cobrables que vencen antes del inicio del período) al
+   momento de la foto.
+4. Asociados: un INSERT ... SELECT agregado desde la foto de préstamos; no
+   vuelve a leer payments.
+
+Los endpoints de tendencia (/dashboard/portfolio) leen solo estas tablas.
+
+En dry-run las pasadas corren igual y la transacción se revierte.
+
+Lo usan:
+- El job de corte (app/scheduler/jobs.py → auto_cut_period_job), para los
+  períodos que cambiaron de estado
+- POST /cut-periods/advance-periods, igual que el job de corte
+- POST /scheduler/run-portfolio-snapshot-now
+"""
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import CutPeriodStatusId
+from app.scheduler.delinquency import OPEN_PAYMENT_STATUSES
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_AMOUNTS = ("expected", "collected", "commission", "outstanding", "overdue")
+
+# Períodos ya cortados (los PENDING todavía no tienen foto que tomar)
+SNAPSHOT_PERIOD_STATUSES = [
+    CutPeriodStatusId.CUTOFF,
+    CutPeriodStatusId.COLLECTING,
+    CutPeriodStatusId.SETTLING,
+    CutPeriodStatusId.CLOSED,
+]
+
+
+@dataclass
+class PortfolioSnapshotReport:
+    """Resumen de una corrida de fotos de cartera."""
+
+    periods: List[str] = field(default_factory=list)
+    dry_run: bool = False
+    loans: int = 0
+    associates: int = 0
+    totals: Dict[str, Decimal] = field(default_factory=lambda: {a: Decimal("0") for a in SNAPSHOT_AMOUNTS})
+
+    def to_dict(self) -> Dict:
+        return {
+            "periods": self.periods,
+            "dry_run": self.dry_run,
+            "loans": self.loans,
+            "associates": self.associates,
+            "totals": {amount: float(value) for amount, value in self.totals.items()},
+        }
+
+    def summary_lines(self) -> List[str]:
+        return [
+            f"• Períodos: {', '.join(self.periods) or '-'}",
+            f"• Préstamos: {self.loans} de {self.associates} asociados",
+            f"• Esperado: ${float(self.totals['expected']):,.2f}",
+            f"• Cobrado: ${float(self.totals['collected']):,.2f}",
+            f"• Comisión: ${float(self.totals['commission']):,.2f}",
+            f"• Saldo pendiente: ${float(self.totals['outstanding']):,.2f}",
+            f"• Vencido: ${float(self.totals['overdue']):,.2f}",
+        ]
+
+
+class PortfolioSnapshotEngine:
+    """
+    Fotos de cartera sobre una AsyncSession.
+
+    `run()` confirma la transacción (o la revierte en dry-run); el llamador
+    solo provee la sesión.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def find_period_id(self, cut_code: Optional[str] = None) -> Optional[int]:
+        """Período por cut_code o, sin código, el último ya cortado."""
+        result = await self.db.execute(
+            text("""
+            SELECT id FROM cut_periods
+            WHERE (CAST(:cut_code AS VARCHAR) IS NULL AND status_id = ANY(:statuses))
+               OR cut_code = :cut_code
+            ORDER BY period_end_date DESC
+            LIMIT 1
+            """),
+            {"cut_code": cut_code, "statuses": [int(s) for s in SNAPSHOT_PERIOD_STATUSES]}
+        )
+        return result.scalar_one_or_none()
+
+    async def run(self, period_ids: Sequence[int], dry_run: bool = False) -> PortfolioSnapshotReport:
+        report = PortfolioSnapshotReport(dry_run=dry_run)
+        period_ids = sorted(set(period_ids))
+        if not period_ids:
+            return report
+
+        try:
+            await self.prepare(period_ids, report)
+            await self.snapshot_loans(period_ids)
+            await self.snapshot_associates(period_ids, report)
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        if dry_run:
+            await self.db.rollback()
+        else:
+            await self.db.commit()
+
+        logger.info(
+            f"📸 Fotos de cartera {', '.join(report.periods)}{' (dry-run)' if dry_run else ''}: "
+            f"{report.loans} préstamos, {report.associates} asociados, "
+            f"${float(report.totals['outstanding']):,.2f} pendiente"
+        )
+        return report
+
+    async def prepare(self, period_ids: List[int], report: PortfolioSnapshotReport) -> None:
+        """Crea las particiones que falten y borra la foto anterior."""
+        result = await self.db.execute(
+            text("""
+            SELECT cut_code, ensure_portfolio_snapshot_partitions(
+                       CAST(EXTRACT(YEAR FROM period_end_date) AS INTEGER)
+                   ) AS ensured
+            FROM cut_periods
+            WHERE id = ANY(:period_ids)
+            ORDER BY period_end_date
+            """),
+            {"period_ids": period_ids}
+        )
+        report.periods = [row.cut_code for row in result.fetchall()]
+
+        for table in ("portfolio_loan_snapshots", "portfolio_associate_snapshots"):
+            await self.db.execute(
+                text(f"""
+                DELETE FROM {table}
+                WHERE (period_end_date, cut_period_id) IN (
+                    SELECT period_end_date, id FROM cut_periods WHERE id = ANY(:period_ids)
+                )
+                """),
+                {"period_ids": period_ids}
+            )
+
+    async def snapshot_loans(self, period_ids: List[int]) -> None:
+        """Una fila por (período, préstamo) con pagos del período o saldo pendiente."""
+        await self.db.execute(
+            text("""
+            INSERT INTO portfolio_loan_snapshots (
+                period_end_date, cut_period_id, cut_code, loan_id, associate_user_id, client_user_id,
+                payments_due, expected_amount, collected_amount, commission_amount,
+                outstanding_amount, overdue_payments, overdue_amount
+            )
+            SELECT
+                cp.period_end_date,
+                cp.id,
+                cp.cut_code,
+                l.id,
+                l.associate_user_id,
+                l.user_id,
+                COUNT(*) FILTER (WHERE p.cut_period_id = cp.id),
+                COALESCE(SUM(p.expected_amount) FILTER (WHERE p.cut_period_id = cp.id), 0),
+                COALESCE(SUM(p.amount_paid) FILTER (WHERE p.cut_period_id = cp.id), 0),
+                COALESCE(SUM(p.commission_amount) FILTER (WHERE p.cut_period_id = cp.id), 0),
+                COALESCE(SUM(p.expected_amount - COALESCE(p.amount_paid, 0))
+                         FILTER (WHERE p.status_id = ANY(:open_statuses)), 0),
+                COUNT(*) FILTER (WHERE p.status_id = ANY(:open_statuses)
+                                   AND p.payment_due_date < cp.period_start_date),
+                COALESCE(SUM(p.expected_amount - COALESCE(p.amount_paid, 0))
+                         FILTER (WHERE p.status_id = ANY(:open_statuses)
+                                   AND p.payment_due_date < cp.period_start_date), 0)
+            FROM cut_periods cp
+            JOIN payments p
+              ON p.cut_period_id = cp.id
+              OR p.status_id = ANY(:open_statuses)
+            JOIN loans l ON l.id = p.loan_id
+            WHERE cp.id = ANY(:period_ids)
+              AND l.associate_user_id IS NOT NULL
+            GROUP BY cp.id, l.id
+            """),
+            {"period_ids": period_ids, "open_statuses": [int(s) for s in OPEN_PAYMENT_STATUSES]}
+        )
+
+    async def snapshot_associates(self, period_ids: List[int], report: PortfolioSnapshotReport) -> None:
+        """Agrega la foto de préstamos por (período, asociado)."""
+        result = await self.db.execute(
+            text("""
+            INSERT INTO portfolio_associate_snapshots (
+                period_end_date, cut_period_id, cut_code, associate_user_id,
+                loans_count, payments_due, expected_amount, collected_amount, commission_amount,
+                outstanding_amount, overdue_loans, overdue_amount
+            )
+            SELECT
+                period_end_date,
+                cut_period_id,
+                MIN(cut_code),
+                associate_user_id,
+                COUNT(*),
+                SUM(payments_due),
+                SUM(expected_amount),
+                SUM(collected_amount),
+                SUM(commission_amount),
+                SUM(outstanding_amount),
+                COUNT(*) FILTER (WHERE overdue_amount > 0),
+                SUM(overdue_amount)
+            FROM portfolio_loan_snapshots
+            WHERE (period_end_date, cut_period_id) IN (
+                SELECT period_end_date, id FROM cut_periods WHERE id = ANY(:period_ids)
+            )
+            GROUP BY period_end_date, cut_period_id, associate_user_id
+            RETURNING loans_count, expected_amount, collected_amount, commission_amount,
+                      outstanding_amount, overdue_amount
+            """),
+            {"period_ids": period_ids}
+        )
+        for row in result.fetchall():
+            report.associates += 1
+            report.loans += row.loans_count
+            for amount in SNAPSHOT_AMOUNTS:
+                report.totals[amount] += getattr(row, f"{amount}_amount")
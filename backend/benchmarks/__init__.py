@@ -0,0 +1,19 @@
+"""
+CrediNet v2.0 - Benchmark Suite
+===============================================================================
+Harness reproducible para medir rendimiento de los endpoints calientes.
+
+Componentes:
+- portfolio: generador de portafolio sintético (COPY + funciones/triggers reales)
+- generate:  CLI del generador (N años de historial para M asociados)
+- metrics:   conteo de consultas por request y estadísticas de latencia
+- scenarios: definición de los escenarios medidos (list_loans, dashboard, ...)
+- runner:    ejecución de escenarios y reporte JSON comparable entre corridas
+
+Uso:
+    python -m benchmarks.generate --associates 50 --clients 20 --years 2 --statements
+    python -m benchmarks --seed --associates 20 --clients 15
+    python -m benchmarks --iterations 50 --output results/baseline.json
+    python -m benchmarks --compare results/baseline.json
+===============================================================================
+"""
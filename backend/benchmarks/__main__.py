@@ -0,0 +1,116 @@
+"""
+CLI del benchmark.
+
+Ejemplos:
+    # Sembrar portafolio sintético y medir todos los escenarios
+    python -m benchmarks --seed --associates 20 --clients 15 --output results/run.json
+
+    # Solo lectura, 100 iteraciones con concurrencia 4
+    python -m benchmarks --read-only --iterations 100 --concurrency 4
+
+    # Comparar contra una corrida anterior
+    python -m benchmarks --read-only --compare results/baseline.json
+
+    # Incluir el perfil de tiempo de importación (arranque del worker)
+    python -m benchmarks --read-only --import-profile --output results/run.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from .importtime import compare_import, profile_import
+from .portfolio import PortfolioSpec, seed_portfolio
+from .runner import compare, run_benchmark, write_report
+from .scenarios import READ_ONLY, SCENARIOS, load_context
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark de endpoints calientes de CrediNet",
+    )
+    parser.add_argument("--seed", action="store_true",
+                        help="Sembrar el portafolio sintético antes de medir")
+    parser.add_argument("--random-seed", type=int, default=42,
+                        help="Semilla del portafolio (default: 42)")
+    parser.add_argument("--associates", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=10,
+                        help="Clientes por asociado")
+    parser.add_argument("--loans-per-client", type=int, default=1)
+    parser.add_argument("--history-days", type=int, default=180)
+
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS),
+                        help="Escenarios a ejecutar (default: todos)")
+    parser.add_argument("--read-only", action="store_true",
+                        help="Omitir escenarios que modifican datos")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--base-url",
+                        help="Medir un servidor externo en lugar de la app en proceso")
+
+    parser.add_argument("--import-profile", action="store_true",
+                        help="Agregar el perfil de -X importtime de app.main al reporte")
+    parser.add_argument("--import-runs", type=int, default=3)
+
+    parser.add_argument("--output", help="Archivo JSON de salida (default: stdout)")
+    parser.add_argument("--compare", help="Reporte JSON anterior para comparar")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from app.core.database import engine
+
+    spec = PortfolioSpec(
+        associates=args.associates,
+        clients_per_associate=args.clients,
+        loans_per_client=args.loans_per_client,
+        history_days=args.history_days,
+        seed=args.random_seed,
+    )
+    portfolio = None
+    if args.seed:
+        summary = seed_portfolio(engine, spec)
+        portfolio = {**spec.to_dict(), **summary.to_dict()}
+        print(f"🌱 Portafolio {summary.tag}: {summary.loans} préstamos, "
+              f"{summary.payments} pagos ({'nuevo' if summary.created else 'existente'})",
+              file=sys.stderr)
+
+    names = args.scenarios or list(SCENARIOS)
+    if args.read_only:
+        names = [n for n in names if n in READ_ONLY]
+
+    ctx = load_context(engine, tag=spec.tag if args.seed else None)
+    report = asyncio.run(run_benchmark(
+        names, ctx,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        base_url=args.base_url,
+        portfolio=portfolio,
+    ))
+
+    if args.import_profile:
+        report["import_time"] = profile_import(runs=args.import_runs)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        report["comparison"] = compare(report, baseline)
+        if "import_time" in report and "import_time" in baseline:
+            report["comparison"]["import_time"] = compare_import(report["import_time"], baseline["import_time"])
+
+    if args.output:
+        write_report(report, args.output)
+        print(f"✅ Reporte escrito en {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False, default=str)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Perfil de tiempo de importación (python -X importtime).
+
+Mide cuánto tarda un worker en importar la app antes de poder atender, y
+qué paquetes pesan más. Cada corrida es un proceso nuevo; se reporta la
+mediana de N corridas para filtrar el ruido del disco/cache.
+
+Ejemplos:
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --runs 5 --top 25 --output results/import.json
+    python -m benchmarks.importtime --compare results/import_baseline.json
+
+También se incluye en el reporte principal con `python -m benchmarks --import-profile`.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """
+    Convierte la salida de -X importtime en filas
+    {module, self_us, cumulative_us, depth}.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            })
+    return rows
+
+
+def package_of(module: str) -> str:
+    """Agrupa por paquete: app.modules.<m>, app.<x> o el paquete raíz de terceros."""
+    parts = module.split(".")
+    if parts[0] == "app":
+        return ".".join(parts[:3] if len(parts) > 2 and parts[1] == "modules" else parts[:2])
+    return parts[0]
+
+
+def summarize_run(rows: List[Dict], target: str) -> Dict:
+    """Total del módulo objetivo y tiempo propio por módulo y por paquete."""
+    total = max((r["cumulative_us"] for r in rows if r["module"] == target), default=0)
+    by_module: Dict[str, int] = {}
+    by_package: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        by_module[row["module"]] = row["self_us"]
+        by_package[package_of(row["module"])] += row["self_us"]
+    return {"total_us": total, "modules": len(rows), "by_module": by_module, "by_package": dict(by_package)}
+
+
+def profile_import(target: str = "app.main", runs: int = 3, top: int = 20,
+                   python: Optional[str] = None) -> Dict:
+    """
+    Importa `target` en `runs` procesos nuevos y resume las medianas.
+
+    Returns:
+        dict con total_ms, modules, top_modules y top_packages (ms, tiempo propio)
+    """
+    summaries = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [python or sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"No se pudo importar {target}:\n{proc.stderr[-2000:]}")
+        summaries.append(summarize_run(parse_importtime(proc.stderr), target))
+
+    def median_ms(key: str, name: str) -> float:
+        return round(statistics.median(s[key].get(name, 0) for s in summaries) / 1000, 2)
+
+    def top_of(key: str) -> List[Dict]:
+        names = set().union(*(s[key] for s in summaries))
+        ranked = sorted(((median_ms(key, n), n) for n in names), reverse=True)[:top]
+        return [{"name": n, "self_ms": ms} for ms, n in ranked]
+
+    return {
+        "target": target,
+        "runs": runs,
+        "total_ms": round(statistics.median(s["total_us"] for s in summaries) / 1000, 1),
+        "modules": summaries[0]["modules"],
+        "top_packages": top_of("by_package"),
+        "top_modules": top_of("by_module"),
+    }
+
+
+def compare_import(current: Dict, baseline: Dict) -> Dict:
+    """Delta del total y de los paquetes presentes en ambos perfiles."""
+    def pct(new: float, old: float) -> Optional[float]:
+        return round((new - old) / old * 100, 1) if old else None
+
+    base_packages = {p["name"]: p["self_ms"] for p in baseline.get("top_packages", [])}
+    return {
+        "total_delta_pct": pct(current["total_ms"], baseline["total_ms"]),
+        "modules_delta": current["modules"] - baseline["modules"],
+        "packages_delta_ms": {
+            p["name"]: round(p["self_ms"] - base_packages[p["name"]], 2)
+            for p in current["top_packages"] if p["name"] in base_packages
+        },
+    }
+
+
+def format_table(profile: Dict) -> str:
+    lines = [f"⏱️  import {profile['target']}: {profile['total_ms']} ms "
+             f"({profile['modules']} módulos, mediana de {profile['runs']})", ""]
+    lines.append(f"{'paquete':<40} {'ms':>8}")
+    for item in profile["top_packages"]:
+        lines.append(f"{item['name']:<40} {item['self_ms']:>8.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.importtime",
+                                     description="Perfil de tiempo de importación de la app")
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="Archivo JSON de salida")
+    parser.add_argument("--compare", help="Perfil JSON anterior para comparar")
+    args = parser.parse_args(argv)
+
+    profile = profile_import(args.target, runs=args.runs, top=args.top)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        profile["comparison"] = compare_import(profile, baseline.get("import_time", baseline))
+
+    print(format_table(profile), file=sys.stderr)
+    if args.output:
+        from .runner import write_report
+        write_report(profile, args.output)
+    else:
+        json.dump(profile, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
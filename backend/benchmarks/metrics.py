@@ -0,0 +1,95 @@
+"""
+Métricas del benchmark: consultas por request y percentiles de latencia.
+"""
+import math
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """
+    Cuenta las sentencias SQL ejecutadas dentro del scope actual.
+
+    Se engancha a `before_cursor_execute` de los engines de la app (sync y
+    async). El contador activo vive en un ContextVar, así cada request
+    concurrente acumula solo sus propias consultas.
+    """
+
+    def __init__(self):
+        self._current: ContextVar[Optional[List[int]]] = ContextVar(
+            "benchmark_query_counter", default=None
+        )
+        self._engines: List[Engine] = []
+
+    def install(self, *engines: Engine) -> None:
+        """Registra el listener en los engines indicados."""
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+            self._engines.append(engine)
+
+    def uninstall(self) -> None:
+        """Quita el listener de todos los engines registrados."""
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._on_execute)
+        self._engines.clear()
+
+    def start(self) -> List[int]:
+        """Abre un nuevo scope de conteo y lo retorna."""
+        box = [0]
+        self._current.set(box)
+        return box
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        box = self._current.get()
+        if box is not None:
+            box[0] += 1
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """
+    Percentil con interpolación lineal (mismo criterio que numpy por defecto).
+
+    Args:
+        values: Muestras
+        q: Percentil entre 0 y 100
+    """
+    data = sorted(values)
+    if not data:
+        return 0.0
+    if len(data) == 1:
+        return float(data[0])
+    rank = (len(data) - 1) * (q / 100.0)
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return float(data[low])
+    return data[low] + (data[high] - data[low]) * (rank - low)
+
+
+def summarize(latencies_ms: List[float], queries: List[int], errors: int = 0) -> Dict:
+    """
+    Resume las muestras de un escenario en un dict serializable.
+
+    Returns:
+        dict con n, errores, p50/p95/p99/mean/min/max (ms) y consultas por request
+    """
+    n = len(latencies_ms)
+    return {
+        "n": n,
+        "errors": errors,
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 3),
+            "p95": round(percentile(latencies_ms, 95), 3),
+            "p99": round(percentile(latencies_ms, 99), 3),
+            "mean": round(sum(latencies_ms) / n, 3) if n else 0.0,
+            "min": round(min(latencies_ms), 3) if n else 0.0,
+            "max": round(max(latencies_ms), 3) if n else 0.0,
+        },
+        "queries_per_request": {
+            "mean": round(sum(queries) / len(queries), 2) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+    }
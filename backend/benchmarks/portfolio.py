@@ -0,0 +1,572 @@
+"""
+Generador de portafolio sintético.
+
+Siembra asociados, clientes, préstamos, pagos, convenios y statements usando
+las mismas funciones y triggers de la base de datos que usa la aplicación:
+- calculate_loan_payment() calcula los montos de cada préstamo
+- generate_payment_schedule (trigger) genera el cronograma al aprobar
+- los triggers de crédito actualizan pending_payments_total del asociado
+  al aprobar y al marcar pagos
+- los convenios siguen el mismo flujo que POST /agreements/from-loans
+
+Las filas base (usuarios y préstamos) se cargan con COPY; el resto es
+set-based (INSERT ... SELECT / UPDATE ... FROM) dentro de una sola
+transacción. Todo es determinista por semilla: las filas salen de
+random.Random(seed) y las decisiones por pago de hashtext() sobre llaves
+sintéticas, nunca de IDs de secuencia.
+"""
+import io
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+ProgressCallback = Callable[[str, Dict], None]
+
+
+@dataclass
+class PortfolioSpec:
+    """Parámetros del portafolio sintético."""
+
+    associates: int = 10
+    clients_per_associate: int = 10
+    loans_per_client: int = 1
+    history_days: int = 180
+    paid_ratio: float = 0.8
+    agreement_ratio: float = 0.0
+    statements: bool = False
+    seed: int = 42
+    amounts: Tuple[int, ...] = (3000, 5000, 8000, 10000, 15000, 20000)
+    terms: Tuple[int, ...] = (6, 12, 18, 24)
+    profile_code: str = "standard"
+
+    @property
+    def tag(self) -> str:
+        """Prefijo de username que identifica los registros de esta semilla."""
+        return f"bench{self.seed}"
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["tag"] = self.tag
+        return data
+
+
+@dataclass
+class PortfolioSummary:
+    """Resultado de la siembra."""
+
+    tag: str
+    created: bool
+    associates: int = 0
+    clients: int = 0
+    loans: int = 0
+    payments: int = 0
+    paid_payments: int = 0
+    agreements: int = 0
+    statements: int = 0
+    elapsed_s: float = 0.0
+    loan_ids: List[int] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data.pop("loan_ids")
+        return data
+
+
+# Placeholder de hash: los usuarios sintéticos nunca inician sesión, el
+# benchmark firma sus propios JWT.
+_NO_LOGIN_HASH = "!benchmark-no-login"
+
+
+def _phone_prefix(seed: int) -> int:
+    # 10 dígitos: 7|8|9 + semilla (3 dígitos) + consecutivo (6 dígitos)
+    return (seed % 1000) * 1_000_000
+
+
+def _hash_below(expr: str, ratio_param: str) -> str:
+    """Fragmento SQL: decisión determinista `hash(expr) < ratio`."""
+    return f"(abs(hashtext({expr})::bigint) % 10000) < (:{ratio_param} * 10000)"
+
+
+def _copy_rows(conn: Connection, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """
+    Carga filas con COPY FROM STDIN (formato texto) en la transacción actual.
+
+    Los valores no deben contener tabs ni saltos de línea.
+    """
+    buf = io.StringIO()
+    count = 0
+    for row in rows:
+        buf.write("\t".join("\\N" if v is None else str(v) for v in row))
+        buf.write("\n")
+        count += 1
+    buf.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+    finally:
+        cursor.close()
+    return count
+
+
+def _get_admin_user_id(conn: Connection, tag: str) -> int:
+    """Retorna un usuario admin existente o crea uno para el benchmark."""
+    admin_id = conn.execute(text("""
+        SELECT ur.user_id
+        FROM user_roles ur
+        WHERE ur.role_id IN (1, 2)
+        ORDER BY ur.user_id
+        LIMIT 1
+    """)).scalar()
+    if admin_id:
+        return admin_id
+
+    admin_id = conn.execute(text("""
+        INSERT INTO users (username, password_hash, first_name, last_name, phone_number)
+        VALUES (:username, :pwd, 'Admin', 'Benchmark', :phone)
+        RETURNING id
+    """), {
+        "username": f"{tag}_admin",
+        "pwd": _NO_LOGIN_HASH,
+        "phone": f"7{_phone_prefix(0) + 999_999:09d}",
+    }).scalar()
+    conn.execute(
+        text("INSERT INTO user_roles (user_id, role_id) VALUES (:uid, 2)"),
+        {"uid": admin_id},
+    )
+    return admin_id
+
+
+def existing_portfolio(conn: Connection, spec: PortfolioSpec) -> PortfolioSummary:
+    """Resume un portafolio ya sembrado con la misma semilla."""
+    row = conn.execute(text("""
+        SELECT
+            COUNT(*) FILTER (WHERE u.username LIKE :tag || '\\_a%') AS associates,
+            COUNT(*) FILTER (WHERE u.username LIKE :tag || '\\_c%') AS clients
+        FROM users u
+        WHERE u.username LIKE :tag || '\\_%'
+    """), {"tag": spec.tag}).mappings().one()
+
+    loan_ids = [r[0] for r in conn.execute(text("""
+        SELECT l.id
+        FROM loans l
+        JOIN users u ON u.id = l.user_id
+        WHERE u.username LIKE :tag || '\\_c%'
+        ORDER BY l.id
+    """), {"tag": spec.tag})]
+
+    counts = conn.execute(text("""
+        SELECT
+            (SELECT COUNT(*) FROM payments WHERE loan_id = ANY(:ids)) AS payments,
+            (SELECT COUNT(*) FROM payments WHERE loan_id = ANY(:ids) AND status_id = 3) AS paid,
+            (SELECT COUNT(DISTINCT agreement_id) FROM agreement_items
+             WHERE loan_id = ANY(:ids)) AS agreements,
+            (SELECT COUNT(*) FROM associate_payment_statements s
+             JOIN users u ON u.id = s.user_id
+             WHERE u.username LIKE :tag || '\\_a%') AS statements
+    """), {"ids": loan_ids, "tag": spec.tag}).mappings().one()
+
+    return PortfolioSummary(
+        tag=spec.tag,
+        created=False,
+        associates=row["associates"],
+        clients=row["clients"],
+        loans=len(loan_ids),
+        payments=counts["payments"],
+        paid_payments=counts["paid"],
+        agreements=counts["agreements"],
+        statements=counts["statements"],
+        loan_ids=loan_ids,
+    )
+
+
+# =============================================================================
+# PASOS
+# =============================================================================
+
+def _load_users(conn: Connection, spec: PortfolioSpec) -> None:
+    """Asociados (rol 4, nivel más alto) y clientes (rol 5) vía COPY."""
+    base = _phone_prefix(spec.seed)
+    n_clients = spec.associates * spec.clients_per_associate
+    columns = ("username", "password_hash", "first_name", "last_name", "phone_number")
+
+    _copy_rows(conn, "users", columns, (
+        (f"{spec.tag}_a{n}", _NO_LOGIN_HASH, "Asociado", f"Bench {n}", f"8{base + n:09d}")
+        for n in range(1, spec.associates + 1)
+    ))
+    _copy_rows(conn, "users", columns, (
+        (f"{spec.tag}_c{n}", _NO_LOGIN_HASH, "Cliente", f"Bench {n}", f"9{base + n:09d}")
+        for n in range(1, n_clients + 1)
+    ))
+
+    params = {"tag": spec.tag}
+    conn.execute(text("""
+        INSERT INTO user_roles (user_id, role_id)
+        SELECT id, CASE WHEN username LIKE :tag || '\\_a%' THEN 4 ELSE 5 END
+        FROM users
+        WHERE username LIKE :tag || '\\_a%' OR username LIKE :tag || '\\_c%'
+    """), params)
+    # Nivel más alto para que el crédito disponible no limite el portafolio
+    conn.execute(text("""
+        INSERT INTO associate_profiles (user_id, level_id, credit_limit)
+        SELECT u.id, lvl.id, lvl.credit_limit
+        FROM users u
+        CROSS JOIN LATERAL (
+            SELECT id, credit_limit FROM associate_levels
+            ORDER BY credit_limit DESC LIMIT 1
+        ) lvl
+        WHERE u.username LIKE :tag || '\\_a%'
+    """), params)
+
+
+def _draw_loans(spec: PortfolioSpec, rng: random.Random, now: datetime) -> List[Tuple]:
+    """
+    Sortea los préstamos del portafolio.
+
+    El cliente N pertenece al asociado ((N - 1) % asociados) + 1. Cada fila
+    lleva una llave sintética estable (`<tag>#<k>`) que se guarda en notes.
+    """
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = []
+    key = 0
+    for n in range(1, spec.associates * spec.clients_per_associate + 1):
+        associate_n = ((n - 1) % spec.associates) + 1
+        for _ in range(spec.loans_per_client):
+            key += 1
+            created_at = today - timedelta(days=1 + rng.randrange(spec.history_days))
+            rows.append((
+                key,
+                f"{spec.tag}_c{n}",
+                f"{spec.tag}_a{associate_n}",
+                rng.choice(spec.amounts),
+                rng.choice(spec.terms),
+                created_at.isoformat(),
+                f"{spec.tag}#{key}",
+            ))
+    return rows
+
+
+def _load_loans(conn: Connection, spec: PortfolioSpec, rows: List[Tuple], admin_id: int) -> List[int]:
+    """
+    Inserta los préstamos en PENDING y los aprueba.
+
+    La aprobación es un UPDATE set-based: por cada fila se disparan los
+    triggers reales (cronograma de pagos y crédito del asociado).
+    """
+    conn.execute(text("""
+        CREATE TEMP TABLE _portfolio_loans (
+            gen_key INTEGER,
+            client_username TEXT,
+            associate_username TEXT,
+            amount NUMERIC(12, 2),
+            term_biweeks INTEGER,
+            created_at TIMESTAMPTZ,
+            notes TEXT
+        ) ON COMMIT DROP
+    """))
+    _copy_rows(conn, "_portfolio_loans", (
+        "gen_key", "client_username", "associate_username",
+        "amount", "term_biweeks", "created_at", "notes",
+    ), rows)
+
+    loan_ids = [r[0] for r in conn.execute(text("""
+        INSERT INTO loans (
+            user_id, associate_user_id, amount, interest_rate, commission_rate,
+            term_biweeks, status_id, profile_code, biweekly_payment, total_payment,
+            total_interest, total_commission, commission_per_payment,
+            associate_payment, created_at, notes
+        )
+        SELECT
+            c.id, a.id, g.amount,
+            calc.interest_rate_percent, calc.commission_rate_percent,
+            g.term_biweeks, 1, :profile_code, calc.biweekly_payment, calc.total_payment,
+            calc.total_interest, calc.total_commission, calc.commission_per_payment,
+            calc.associate_payment, g.created_at, g.notes
+        FROM _portfolio_loans g
+        JOIN users c ON c.username = g.client_username
+        JOIN users a ON a.username = g.associate_username
+        CROSS JOIN LATERAL calculate_loan_payment(g.amount, g.term_biweeks, :profile_code) calc
+        ORDER BY g.gen_key
+        RETURNING id
+    """), {"profile_code": spec.profile_code})]
+
+    conn.execute(text("""
+        UPDATE loans
+        SET status_id = 2,
+            approved_at = created_at + INTERVAL '1 day',
+            approved_by = :admin_id
+        WHERE id = ANY(:ids)
+    """), {"ids": loan_ids, "admin_id": admin_id})
+    return loan_ids
+
+
+def _mark_paid(conn: Connection, spec: PortfolioSpec, loan_ids: List[int], admin_id: int) -> None:
+    """Historial de cobro: una fracción de los pagos vencidos se marca PAID."""
+    conn.execute(text(f"""
+        UPDATE payments p
+        SET amount_paid = p.expected_amount,
+            payment_date = p.payment_due_date,
+            status_id = 3,
+            marked_by = :admin_id,
+            marked_at = p.payment_due_date
+        FROM loans l
+        WHERE l.id = p.loan_id
+          AND p.loan_id = ANY(:ids)
+          AND p.payment_due_date < CURRENT_DATE
+          AND {_hash_below("l.notes || '/' || p.payment_number", "paid_ratio")}
+    """), {"ids": loan_ids, "admin_id": admin_id, "paid_ratio": spec.paid_ratio})
+
+
+def _create_agreements(conn: Connection, spec: PortfolioSpec, loan_ids: List[int], admin_id: int) -> None:
+    """
+    Convenios sobre una fracción de los préstamos activos.
+
+    Mismo flujo que POST /agreements/from-loans, en bloque: un convenio por
+    préstamo, sus pagos PENDING pasan a IN_AGREEMENT, el préstamo a
+    IN_AGREEMENT y el monto se mueve de pending_payments_total a
+    consolidated_debt. El cronograma sigue el doble calendario (15 / fin de mes).
+    """
+    conn.execute(text(f"""
+        CREATE TEMP TABLE _portfolio_agreements ON COMMIT DROP AS
+        WITH chosen AS (
+            SELECT
+                l.id AS loan_id,
+                l.user_id AS client_user_id,
+                ap.id AS associate_profile_id,
+                SUM(p.associate_payment) AS total_debt,
+                (ARRAY[6, 12, 18, 24])[1 + abs(hashtext(l.notes || '/plan')) % 4] AS biweeks,
+                CURRENT_DATE - (abs(hashtext(l.notes || '/start')) % 60) AS start_date
+            FROM loans l
+            JOIN associate_profiles ap ON ap.user_id = l.associate_user_id
+            JOIN payments p ON p.loan_id = l.id AND p.status_id = 1
+            WHERE l.id = ANY(:ids)
+              AND l.status_id = 2
+              AND {_hash_below("l.notes || '/agreement'", "agreement_ratio")}
+            GROUP BY l.id, l.user_id, ap.id
+            HAVING SUM(p.associate_payment) > 0
+        )
+        SELECT
+            c.*,
+            calculate_first_payment_date(c.start_date) AS first_payment_date,
+            ROUND(c.total_debt / c.biweeks, 2) AS period_amount,
+            'CONV-' || EXTRACT(YEAR FROM c.start_date) || '-' || lpad((
+                (SELECT COALESCE(MAX(CAST(SUBSTRING(agreement_number FROM 'CONV-[0-9]+-([0-9]+)') AS INTEGER)), 0)
+                 FROM agreements)
+                + ROW_NUMBER() OVER (ORDER BY c.loan_id)
+            )::text, 4, '0') AS agreement_number
+        FROM chosen c
+    """), {"ids": loan_ids, "agreement_ratio": spec.agreement_ratio})
+
+    conn.execute(text("""
+        INSERT INTO agreements (
+            associate_profile_id, agreement_number, agreement_date, total_debt_amount,
+            payment_plan_months, monthly_payment_amount, payment_plan_periods,
+            period_payment_amount, payment_frequency, status, start_date, end_date,
+            created_by, notes
+        )
+        SELECT
+            g.associate_profile_id, g.agreement_number, g.start_date, g.total_debt,
+            g.biweeks, g.period_amount, g.biweeks, g.period_amount, 'biweekly', 'ACTIVE',
+            g.start_date, g.first_payment_date + 15 * g.biweeks, :admin_id,
+            'Convenio sintético ' || :tag
+        FROM _portfolio_agreements g
+        ORDER BY g.loan_id
+    """), {"admin_id": admin_id, "tag": spec.tag})
+
+    conn.execute(text("""
+        INSERT INTO agreement_items (agreement_id, loan_id, client_user_id, debt_amount, debt_type, description)
+        SELECT a.id, g.loan_id, g.client_user_id, g.total_debt, 'LOAN_TRANSFER',
+               'Pagos pendientes del préstamo #' || g.loan_id
+        FROM _portfolio_agreements g
+        JOIN agreements a ON a.agreement_number = g.agreement_number
+    """))
+
+    conn.execute(text("""
+        UPDATE payments p
+        SET status_id = 13,
+            marking_notes = 'Incluido en convenio ' || g.agreement_number,
+            updated_at = CURRENT_TIMESTAMP
+        FROM _portfolio_agreements g
+        WHERE p.loan_id = g.loan_id
+          AND p.status_id = 1
+    """))
+    conn.execute(text("""
+        UPDATE loans l
+        SET status_id = 9, updated_at = CURRENT_TIMESTAMP
+        FROM _portfolio_agreements g
+        WHERE l.id = g.loan_id
+    """))
+    conn.execute(text("""
+        UPDATE associate_profiles ap
+        SET pending_payments_total = GREATEST(0, ap.pending_payments_total - m.amount),
+            consolidated_debt = COALESCE(ap.consolidated_debt, 0) + m.amount,
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT associate_profile_id, SUM(total_debt) AS amount
+            FROM _portfolio_agreements
+            GROUP BY associate_profile_id
+        ) m
+        WHERE ap.id = m.associate_profile_id
+    """))
+
+    # Cronograma quincenal: alterna día 15 / último día del mes a partir
+    # del primer pago; el último pago absorbe el redondeo.
+    conn.execute(text("""
+        INSERT INTO agreement_payments (
+            agreement_id, payment_number, payment_amount, payment_due_date, cut_period_id, status
+        )
+        SELECT
+            a.id,
+            s.i + 1,
+            CASE WHEN s.i + 1 = g.biweeks
+                 THEN g.total_debt - g.period_amount * (g.biweeks - 1)
+                 ELSE g.period_amount END,
+            d.due_date,
+            cp.id,
+            'PENDING'
+        FROM _portfolio_agreements g
+        JOIN agreements a ON a.agreement_number = g.agreement_number
+        CROSS JOIN LATERAL generate_series(0, g.biweeks - 1) AS s(i)
+        CROSS JOIN LATERAL (
+            SELECT CASE
+                WHEN EXTRACT(DAY FROM g.first_payment_date) = 15 THEN
+                    CASE WHEN s.i % 2 = 0
+                         THEN date_trunc('month', g.first_payment_date) + make_interval(months => s.i / 2) + INTERVAL '14 days'
+                         ELSE date_trunc('month', g.first_payment_date) + make_interval(months => s.i / 2 + 1) - INTERVAL '1 day'
+                    END
+                ELSE
+                    CASE WHEN s.i % 2 = 0
+                         THEN date_trunc('month', g.first_payment_date) + make_interval(months => s.i / 2 + 1) - INTERVAL '1 day'
+                         ELSE date_trunc('month', g.first_payment_date) + make_interval(months => (s.i + 1) / 2) + INTERVAL '14 days'
+                    END
+            END::date AS due_date
+        ) d
+        LEFT JOIN LATERAL (
+            SELECT id FROM cut_periods
+            WHERE period_end_date < d.due_date
+            ORDER BY period_end_date DESC
+            LIMIT 1
+        ) cp ON TRUE
+    """))
+
+
+def _generate_statements(conn: Connection, spec: PortfolioSpec) -> None:
+    """
+    Statements históricos de los asociados sintéticos.
+
+    Mismo agregado que el job de corte (_generate_statements), en un solo
+    INSERT para todos los periodos ya cortados. Estado según el historial:
+    PAID si todos los pagos del periodo se cobraron, COLLECTING si el
+    periodo terminó hace menos de una quincena, CLOSED en otro caso.
+    """
+    conn.execute(text("""
+        INSERT INTO associate_payment_statements (
+            user_id, cut_period_id, statement_number,
+            total_amount_collected, total_to_credicuenta, commission_earned,
+            total_payments_count, commission_rate_applied,
+            paid_amount, paid_date, late_fee_amount, status_id,
+            generated_date, due_date
+        )
+        SELECT
+            l.associate_user_id,
+            cp.id,
+            'ST-' || cp.cut_code || '-'
+                || lpad(l.associate_user_id::text, GREATEST(4, length(l.associate_user_id::text)), '0'),
+            SUM(p.expected_amount),
+            SUM(p.associate_payment),
+            SUM(p.expected_amount) - SUM(p.associate_payment),
+            COUNT(p.id),
+            MAX(l.commission_rate),
+            COALESCE(SUM(p.associate_payment) FILTER (WHERE p.status_id = 3), 0),
+            CASE WHEN bool_and(p.status_id = 3) THEN cp.period_end_date + 15 END,
+            0,
+            CASE
+                WHEN bool_and(p.status_id = 3) THEN 3
+                WHEN cp.period_end_date >= CURRENT_DATE - 15 THEN 7
+                ELSE 10
+            END,
+            cp.period_end_date + 1,
+            cp.period_end_date
+        FROM payments p
+        JOIN loans l ON l.id = p.loan_id
+        JOIN users u ON u.id = l.associate_user_id
+        JOIN cut_periods cp ON cp.id = p.cut_period_id
+        WHERE u.username LIKE :tag || '\\_a%'
+          AND p.status_id != 13
+          AND cp.period_end_date < CURRENT_DATE
+          AND NOT EXISTS (
+              SELECT 1 FROM associate_payment_statements s
+              WHERE s.user_id = l.associate_user_id AND s.cut_period_id = cp.id
+          )
+        GROUP BY l.associate_user_id, cp.id, cp.cut_code, cp.period_end_date
+    """), {"tag": spec.tag})
+
+
+# =============================================================================
+# ORQUESTACIÓN
+# =============================================================================
+
+def seed_portfolio(
+    engine: Engine,
+    spec: PortfolioSpec,
+    progress: Optional[ProgressCallback] = None,
+) -> PortfolioSummary:
+    """
+    Siembra el portafolio sintético (idempotente por semilla).
+
+    Si ya existen usuarios con el tag de la semilla no se inserta nada y se
+    retorna el resumen de lo existente.
+
+    Args:
+        engine: Engine sync (psycopg2, requerido para COPY)
+        spec: Parámetros del portafolio
+        progress: Callback opcional `(paso, detalle)` al terminar cada paso
+
+    Raises:
+        RuntimeError: Si no hay periodos de corte que cubran el historial
+    """
+    started = time.perf_counter()
+
+    def step(name: str, fn, *args):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        if progress:
+            progress(name, {"elapsed_s": round(time.perf_counter() - t0, 3)})
+        return result
+
+    with engine.begin() as conn:
+        summary = existing_portfolio(conn, spec)
+        if summary.associates:
+            return summary
+
+        periods = conn.execute(text("""
+            SELECT COUNT(*) FROM cut_periods
+            WHERE period_start_date <= CURRENT_DATE - :days
+        """), {"days": spec.history_days}).scalar()
+        if not periods:
+            raise RuntimeError(
+                "No hay periodos de corte que cubran el historial solicitado; "
+                "ejecuta scripts/generate_cut_periods_complete.py primero"
+            )
+
+        admin_id = _get_admin_user_id(conn, spec.tag)
+        rng = random.Random(spec.seed)
+        loan_rows = _draw_loans(spec, rng, datetime.now(timezone.utc))
+
+        step("users", _load_users, conn, spec)
+        loan_ids = step("loans", _load_loans, conn, spec, loan_rows, admin_id)
+        step("payments", _mark_paid, conn, spec, loan_ids, admin_id)
+        if spec.agreement_ratio > 0:
+            step("agreements", _create_agreements, conn, spec, loan_ids, admin_id)
+        if spec.statements:
+            step("statements", _generate_statements, conn, spec)
+
+        summary = existing_portfolio(conn, spec)
+        summary.created = True
+
+    summary.elapsed_s = round(time.perf_counter() - started, 3)
+    return summary
@@ -0,0 +1,219 @@
+"""
+Ejecución de escenarios y reporte JSON.
+
+Por defecto la app se ejecuta en el mismo proceso (httpx + ASGITransport),
+lo que permite contar las consultas SQL de cada request. Con `base_url` se
+mide un servidor externo (solo latencia; las consultas quedan en null).
+"""
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from .metrics import QueryCounter, summarize
+from .scenarios import SCENARIOS, Scenario, ScenarioContext
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _admin_headers(admin_user_id: int) -> Dict[str, str]:
+    from app.core.security import create_access_token
+
+    token = create_access_token({
+        "sub": "benchmark",
+        "user_id": admin_user_id,
+        "email": None,
+        "roles": ["admin"],
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ctx: ScenarioContext,
+    iterations: int,
+    warmup: int,
+    concurrency: int,
+    counter: Optional[QueryCounter],
+    headers: Dict[str, str],
+    offset: int = 0,
+) -> Dict:
+    """
+    Ejecuta un escenario y resume sus muestras.
+
+    Los requests de calentamiento no se cuentan. Los escenarios que mutan
+    datos no se calientan (consumirían los pagos pendientes del pool).
+
+    Args:
+        offset: Índice inicial para los builders (evita reusar pagos)
+    """
+    if scenario.max_iterations is not None:
+        iterations = min(iterations, scenario.max_iterations)
+    if scenario.mutating:
+        warmup = 0
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    status_codes: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int, record: bool) -> None:
+        nonlocal errors
+        req = scenario.build(ctx, offset + i)
+        if req is None:
+            return
+        path, body = req
+        async with semaphore:
+            box = counter.start() if counter else None
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, path, json=body, headers=headers)
+                code = str(response.status_code)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                code = "error"
+                failed = True
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        if not record:
+            return
+        status_codes[code] = status_codes.get(code, 0) + 1
+        latencies.append(elapsed_ms)
+        if box is not None:
+            queries.append(box[0])
+        if failed:
+            errors += 1
+
+    for i in range(warmup):
+        await one(i, record=False)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(warmup + i, record=True) for i in range(iterations)))
+    wall_s = time.perf_counter() - started
+
+    result = summarize(latencies, queries, errors)
+    result["status_codes"] = status_codes
+    result["mutating"] = scenario.mutating
+    result["throughput_rps"] = round(len(latencies) / wall_s, 2) if wall_s and latencies else 0.0
+    if not latencies:
+        result["skipped"] = "sin datos para construir requests"
+    return result
+
+
+async def run_benchmark(
+    scenario_names: List[str],
+    ctx: ScenarioContext,
+    iterations: int = 30,
+    warmup: int = 3,
+    concurrency: int = 1,
+    base_url: Optional[str] = None,
+    portfolio: Optional[Dict] = None,
+) -> Dict:
+    """
+    Ejecuta los escenarios indicados y retorna el reporte completo.
+
+    Returns:
+        dict con `meta` (fecha, commit, parámetros, portafolio) y `scenarios`
+    """
+    headers = _admin_headers(ctx.admin_user_id)
+    counter: Optional[QueryCounter] = None
+
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=120)
+    else:
+        from app.core.database import async_engine, engine
+        from app.main import app
+
+        counter = QueryCounter()
+        counter.install(async_engine.sync_engine, engine)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://benchmark",
+            timeout=120,
+        )
+
+    results: Dict[str, Dict] = {}
+    offset = 0
+    try:
+        async with client:
+            for name in scenario_names:
+                scenario = SCENARIOS[name]
+                results[name] = await run_scenario(
+                    client, scenario, ctx, iterations, warmup, concurrency,
+                    counter, headers, offset=offset,
+                )
+                if scenario.mutating:
+                    offset += results[name]["n"]
+    finally:
+        if counter:
+            counter.uninstall()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "mode": "http" if base_url else "in-process",
+            "base_url": base_url,
+            "iterations": iterations,
+            "warmup": warmup,
+            "concurrency": concurrency,
+            "portfolio": portfolio,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict) -> Dict[str, Dict]:
+    """
+    Compara dos reportes escenario por escenario.
+
+    Returns:
+        {escenario: {p50_delta_pct, p95_delta_pct, queries_delta}}
+    """
+    def pct(new: float, old: float) -> Optional[float]:
+        if not old:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    deltas: Dict[str, Dict] = {}
+    for name, cur in current.get("scenarios", {}).items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        cur_q = cur["queries_per_request"]["mean"]
+        base_q = base["queries_per_request"]["mean"]
+        deltas[name] = {
+            "p50_delta_pct": pct(cur["latency_ms"]["p50"], base["latency_ms"]["p50"]),
+            "p95_delta_pct": pct(cur["latency_ms"]["p95"], base["latency_ms"]["p95"]),
+            "p99_delta_pct": pct(cur["latency_ms"]["p99"], base["latency_ms"]["p99"]),
+            "queries_delta": (
+                round(cur_q - base_q, 2) if cur_q is not None and base_q is not None else None
+            ),
+        }
+    return deltas
+
+
+def write_report(report: Dict, path: str) -> None:
+    """Escribe el reporte JSON (crea el directorio si no existe)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False, default=str)
@@ -0,0 +1,160 @@
+"""
+Escenarios del benchmark.
+
+Cada escenario describe un request HTTP contra la API. Los parámetros
+(IDs de periodo, pagos pendientes, etc.) se resuelven una sola vez desde la
+base de datos antes de medir, para que la corrida no mida sus propias
+consultas de preparación.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+API = "/api/v1"
+
+# (path, body) para el request número i
+RequestBuilder = Callable[["ScenarioContext", int], Optional[Tuple[str, Optional[Dict[str, Any]]]]]
+
+
+@dataclass
+class ScenarioContext:
+    """Datos de la base de datos que necesitan los escenarios."""
+
+    admin_user_id: int
+    preview_period_id: Optional[int] = None
+    pending_payments: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    """Un endpoint medido."""
+
+    name: str
+    method: str
+    build: RequestBuilder
+    mutating: bool = False
+    max_iterations: Optional[int] = None
+    description: str = ""
+
+
+def load_context(engine: Engine, tag: Optional[str] = None) -> ScenarioContext:
+    """
+    Resuelve los parámetros de los escenarios.
+
+    Args:
+        engine: Engine sync
+        tag: Prefijo del portafolio sintético; si se indica, los pagos a
+            registrar se toman solo de ese portafolio
+    """
+    with engine.connect() as conn:
+        admin_user_id = conn.execute(text("""
+            SELECT user_id FROM user_roles
+            WHERE role_id IN (1, 2)
+            ORDER BY user_id
+            LIMIT 1
+        """)).scalar()
+        if admin_user_id is None:
+            raise RuntimeError("No existe ningún usuario admin; siembra el portafolio primero")
+
+        # El periodo con más pagos es el peor caso del preview
+        preview_period_id = conn.execute(text("""
+            SELECT cut_period_id
+            FROM payments
+            WHERE cut_period_id IS NOT NULL
+            GROUP BY cut_period_id
+            ORDER BY COUNT(*) DESC
+            LIMIT 1
+        """)).scalar()
+
+        pending = conn.execute(text("""
+            SELECT p.id, p.expected_amount, p.payment_due_date
+            FROM payments p
+            JOIN loans l ON l.id = p.loan_id
+            JOIN users u ON u.id = l.user_id
+            WHERE p.status_id IN (1, 2, 4)
+              AND COALESCE(p.amount_paid, 0) = 0
+              AND l.status_id = 2
+              AND (CAST(:tag AS TEXT) IS NULL OR u.username LIKE :tag || '\\_c%')
+            ORDER BY p.payment_due_date, p.id
+            LIMIT 5000
+        """), {"tag": tag}).mappings().all()
+
+    return ScenarioContext(
+        admin_user_id=admin_user_id,
+        preview_period_id=preview_period_id,
+        pending_payments=[dict(r) for r in pending],
+    )
+
+
+# =============================================================================
+# BUILDERS
+# =============================================================================
+
+def _list_loans(ctx: ScenarioContext, i: int):
+    # Rota páginas para no medir siempre la misma
+    return f"{API}/loans?limit=50&offset={(i % 4) * 50}", None
+
+
+def _dashboard_stats(ctx: ScenarioContext, i: int):
+    return f"{API}/dashboard/stats", None
+
+
+def _payments_preview(ctx: ScenarioContext, i: int):
+    if ctx.preview_period_id is None:
+        return None
+    return f"{API}/cut-periods/{ctx.preview_period_id}/payments-preview", None
+
+
+_SIM_AMOUNTS = (3000, 5000, 10000, 15000, 25000)
+_SIM_TERMS = (6, 12, 18, 24)
+
+
+def _simulate(ctx: ScenarioContext, i: int):
+    return f"{API}/simulator/simulate", {
+        "amount": _SIM_AMOUNTS[i % len(_SIM_AMOUNTS)],
+        "term_biweeks": _SIM_TERMS[i % len(_SIM_TERMS)],
+        "profile_code": "standard",
+        "approval_date": date.today().isoformat(),
+    }
+
+
+def _payments_register(ctx: ScenarioContext, i: int):
+    if i >= len(ctx.pending_payments):
+        return None
+    payment = ctx.pending_payments[i]
+    return f"{API}/payments/register", {
+        "payment_id": payment["id"],
+        "amount_paid": str(payment["expected_amount"]),
+        # check_payments_dates_logical: payment_date <= payment_due_date
+        "payment_date": min(date.today(), payment["payment_due_date"]).isoformat(),
+        "marked_by": ctx.admin_user_id,
+        "notes": "benchmark",
+    }
+
+
+def _auto_cut(ctx: ScenarioContext, i: int):
+    return f"{API}/scheduler/run-cut-now?force=true", None
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    s.name: s
+    for s in (
+        Scenario("list_loans", "GET", _list_loans,
+                 description="GET /loans paginado"),
+        Scenario("dashboard_stats", "GET", _dashboard_stats,
+                 description="GET /dashboard/stats"),
+        Scenario("payments_preview", "GET", _payments_preview,
+                 description="GET /cut-periods/{id}/payments-preview del periodo más cargado"),
+        Scenario("simulate", "POST", _simulate,
+                 description="POST /simulator/simulate"),
+        Scenario("payments_register", "POST", _payments_register, mutating=True,
+                 description="POST /payments/register sobre pagos pendientes"),
+        Scenario("auto_cut", "POST", _auto_cut, mutating=True, max_iterations=1,
+                 description="Job de corte automático (POST /scheduler/run-cut-now?force=true)"),
+    )
+}
+
+READ_ONLY = [name for name, s in SCENARIOS.items() if not s.mutating]
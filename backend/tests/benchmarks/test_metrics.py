@@ -0,0 +1,85 @@
+"""
+Unit Tests - Benchmark metrics and report comparison
+"""
+import pytest
+from sqlalchemy import create_engine, text
+
+from benchmarks.metrics import QueryCounter, percentile, summarize
+from benchmarks.runner import compare
+
+
+class TestPercentile:
+    """Test linear-interpolation percentile"""
+
+    def test_empty_returns_zero(self):
+        """Should return 0.0 when there are no samples"""
+        assert percentile([], 95) == 0.0
+
+    def test_single_value(self):
+        """Should return the only sample for any percentile"""
+        assert percentile([7.5], 99) == 7.5
+
+    def test_interpolates_between_samples(self):
+        """Should interpolate linearly like numpy's default method"""
+        values = [1, 2, 3, 4]
+        assert percentile(values, 50) == pytest.approx(2.5)
+        assert percentile(values, 0) == 1
+        assert percentile(values, 100) == 4
+
+    def test_unsorted_input(self):
+        """Should not depend on input order"""
+        assert percentile([10, 1, 5], 50) == 5
+
+
+class TestSummarize:
+    """Test scenario summary"""
+
+    def test_summary_shape(self):
+        """Should report latency percentiles and queries per request"""
+        result = summarize([10.0, 20.0, 30.0], [3, 3, 4], errors=1)
+        assert result["n"] == 3
+        assert result["errors"] == 1
+        assert result["latency_ms"]["p50"] == 20.0
+        assert result["latency_ms"]["min"] == 10.0
+        assert result["latency_ms"]["max"] == 30.0
+        assert result["queries_per_request"] == {"mean": 3.33, "max": 4}
+
+    def test_no_queries_is_null(self):
+        """Should report null queries when counting is not available (HTTP mode)"""
+        result = summarize([1.0], [])
+        assert result["queries_per_request"] == {"mean": None, "max": None}
+
+
+class TestQueryCounter:
+    """Test SQL statement counting per scope"""
+
+    def test_counts_only_inside_scope(self):
+        """Should count statements executed after start()"""
+        engine = create_engine("sqlite://")
+        counter = QueryCounter()
+        counter.install(engine)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                box = counter.start()
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+            assert box[0] == 2
+        finally:
+            counter.uninstall()
+
+
+class TestCompare:
+    """Test report comparison"""
+
+    def test_deltas(self):
+        """Should compute percentage deltas and query difference per scenario"""
+        def report(p50, q):
+            return {"scenarios": {"list_loans": {
+                "latency_ms": {"p50": p50, "p95": p50, "p99": p50},
+                "queries_per_request": {"mean": q},
+            }}}
+
+        deltas = compare(report(50.0, 3.0), report(100.0, 5.0))
+        assert deltas["list_loans"]["p50_delta_pct"] == -50.0
+        assert deltas["list_loans"]["queries_delta"] == -2.0
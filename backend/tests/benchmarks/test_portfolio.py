@@ -0,0 +1,64 @@
+"""
+Unit Tests - Synthetic portfolio generator (pure parts)
+"""
+import random
+from datetime import datetime, timezone
+
+from benchmarks.generate import build_parser, spec_from_args
+from benchmarks.portfolio import PortfolioSpec, _draw_loans
+
+NOW = datetime(2026, 3, 10, 15, 30, tzinfo=timezone.utc)
+
+
+class TestDrawLoans:
+    """Test deterministic loan draws"""
+
+    def test_same_seed_same_rows(self):
+        """Should produce identical rows for the same seed"""
+        spec = PortfolioSpec(associates=3, clients_per_associate=4, loans_per_client=2, seed=7)
+        first = _draw_loans(spec, random.Random(spec.seed), NOW)
+        second = _draw_loans(spec, random.Random(spec.seed), NOW)
+        assert first == second
+
+    def test_different_seed_different_rows(self):
+        """Should change amounts/dates when the seed changes"""
+        a = PortfolioSpec(associates=3, clients_per_associate=4, seed=1)
+        b = PortfolioSpec(associates=3, clients_per_associate=4, seed=2)
+        rows_a = _draw_loans(a, random.Random(a.seed), NOW)
+        rows_b = _draw_loans(b, random.Random(b.seed), NOW)
+        assert [r[3:6] for r in rows_a] != [r[3:6] for r in rows_b]
+
+    def test_clients_round_robin_over_associates(self):
+        """Should assign client N to associate ((N - 1) % associates) + 1"""
+        spec = PortfolioSpec(associates=3, clients_per_associate=2, seed=5)
+        rows = _draw_loans(spec, random.Random(spec.seed), NOW)
+        pairs = {(r[1], r[2]) for r in rows}
+        assert ("bench5_c1", "bench5_a1") in pairs
+        assert ("bench5_c4", "bench5_a1") in pairs
+        assert ("bench5_c6", "bench5_a3") in pairs
+
+    def test_rows_respect_spec(self):
+        """Should draw valid amounts, terms and dates inside the history window"""
+        spec = PortfolioSpec(associates=2, clients_per_associate=5, loans_per_client=3,
+                             history_days=30, seed=9)
+        rows = _draw_loans(spec, random.Random(spec.seed), NOW)
+        assert len(rows) == 2 * 5 * 3
+        assert [r[0] for r in rows] == list(range(1, len(rows) + 1))
+        for key, _, _, amount, term, created_at, notes in rows:
+            assert amount in spec.amounts
+            assert term in spec.terms
+            created = datetime.fromisoformat(created_at)
+            assert 1 <= (NOW - created).days <= 31
+            assert notes == f"bench9#{key}"
+
+
+class TestGenerateCli:
+    """Test CLI argument mapping"""
+
+    def test_years_to_history_days(self):
+        """Should convert --years into history_days"""
+        args = build_parser().parse_args(["--years", "2", "--associates", "5", "--statements"])
+        spec = spec_from_args(args)
+        assert spec.history_days == 730
+        assert spec.associates == 5
+        assert spec.statements is True
@@ -0,0 +1,140 @@
+"""
+Unit Tests - HTTP response cache (LRU, ETag, invalidation)
+"""
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core import cache as cache_module
+from app.core.cache import (
+    MemoryCacheBackend,
+    ResponseCache,
+    cached,
+    etag_matches,
+    weak_etag,
+)
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    """Replace the global cache with an isolated one"""
+    instance = ResponseCache(backend=MemoryCacheBackend(max_entries=10), default_ttl=60)
+    monkeypatch.setattr(cache_module, "response_cache", instance)
+    return instance
+
+
+def _app(calls):
+    app = FastAPI()
+
+    @app.get("/profiles")
+    @cached("rate_profiles")
+    async def list_profiles(enabled_only: bool = True):
+        calls.append(enabled_only)
+        return [{"code": "standard", "enabled": enabled_only}]
+
+    @app.get("/sync")
+    @cached("rate_profiles")
+    def sync_endpoint():
+        calls.append("sync")
+        return {"ok": True}
+
+    @app.get("/periods/{period_id}")
+    @cached("statements", condition=lambda content: content["closed"])
+    async def period(period_id: int):
+        calls.append(period_id)
+        return {"id": period_id, "closed": period_id == 1}
+
+    return app
+
+
+class TestETag:
+    """Test weak ETag comparison"""
+
+    def test_weak_comparison(self):
+        """Should match weak and strong forms of the same tag"""
+        etag = weak_etag(b"{}")
+        assert etag.startswith('W/"')
+        assert etag_matches(etag, etag)
+        assert etag_matches(etag[2:], etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestMemoryBackend:
+    """Test LRU eviction and invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Should evict the least recently used entry"""
+        backend = MemoryCacheBackend(max_entries=2)
+        await backend.set("a:0:1", (b"1", "e1"), 60)
+        await backend.set("a:0:2", (b"2", "e2"), 60)
+        await backend.get("a:0:1")
+        await backend.set("a:0:3", (b"3", "e3"), 60)
+        assert await backend.get("a:0:2") is None
+        assert await backend.get("a:0:1") == (b"1", "e1")
+
+    @pytest.mark.asyncio
+    async def test_invalidate_bumps_generation(self):
+        """Should drop entries of the namespace and change its generation"""
+        backend = MemoryCacheBackend()
+        await backend.set("a:0:1", (b"1", "e1"), 60)
+        await backend.set("b:0:1", (b"1", "e1"), 60)
+        await backend.invalidate("a")
+        assert await backend.generation("a") == 1
+        assert await backend.get("a:0:1") is None
+        assert await backend.get("b:0:1") is not None
+
+
+class TestCachedDecorator:
+    """Test the endpoint decorator end to end"""
+
+    @pytest.mark.asyncio
+    async def test_hit_304_and_invalidation(self, fresh_cache):
+        """Should serve hits, answer 304 for matching ETags and recompute after invalidation"""
+        calls = []
+        async with AsyncClient(transport=ASGITransport(app=_app(calls)), base_url="http://test") as client:
+            first = await client.get("/profiles")
+            second = await client.get("/profiles")
+            not_modified = await client.get("/profiles", headers={"If-None-Match": first.headers["etag"]})
+            other_query = await client.get("/profiles?enabled_only=false")
+            await fresh_cache.invalidate("rate_profiles")
+            after = await client.get("/profiles")
+
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == first.json()
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert other_query.json()[0]["enabled"] is False
+        assert after.headers["x-cache"] == "MISS"
+        assert calls == [True, False, True]
+
+    @pytest.mark.asyncio
+    async def test_key_includes_role(self, fresh_cache, monkeypatch):
+        """Should not share entries between roles"""
+        calls = []
+        monkeypatch.setattr(
+            cache_module, "decode_access_token",
+            lambda token: {"roles": [token]},
+        )
+        async with AsyncClient(transport=ASGITransport(app=_app(calls)), base_url="http://test") as client:
+            await client.get("/sync", headers={"Authorization": "Bearer admin"})
+            await client.get("/sync", headers={"Authorization": "Bearer asociado"})
+            hit = await client.get("/sync", headers={"Authorization": "Bearer admin"})
+
+        assert calls == ["sync", "sync"]
+        assert hit.headers["x-cache"] == "HIT"
+
+    @pytest.mark.asyncio
+    async def test_condition_controls_storage(self, fresh_cache):
+        """Should only store responses accepted by the condition"""
+        calls = []
+        async with AsyncClient(transport=ASGITransport(app=_app(calls)), base_url="http://test") as client:
+            for _ in range(2):
+                await client.get("/periods/1")
+                await client.get("/periods/2")
+
+        assert calls == [1, 2, 2]
@@ -0,0 +1,139 @@
+"""
+Unit Tests - Live events broker (LISTEN/NOTIFY fan-out for SSE)
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.events import RESYNC, EventWatcher, LiveEventBroker
+from app.core.security import create_access_token
+from app.modules.notifications.routes import get_stream_user_id
+
+
+def _notify(broker, event_type, **data):
+    broker._on_notification(None, 1, "credinet_events", json.dumps({"type": event_type, "data": data}))
+
+
+class TestLiveEventBroker:
+    """Test fan-out, filtering and resume semantics"""
+
+    @pytest.mark.asyncio
+    async def test_fan_out_with_type_filter(self):
+        """Should deliver each notification only to interested subscribers"""
+        broker = LiveEventBroker()
+
+        async with broker.subscribe() as everything, \
+                broker.subscribe(types={"payment.registered"}) as payments:
+            _notify(broker, "period.advanced", count=1)
+            _notify(broker, "payment.registered", count=2, loan_ids=[10])
+
+            assert [(await everything.get(0.1)).type for _ in range(2)] == [
+                "period.advanced", "payment.registered"
+            ]
+            event = await payments.get(0.1)
+            assert event.data == {"count": 2, "loan_ids": [10]}
+            assert await payments.get(0.01) is None
+
+        assert broker.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_sse_format(self):
+        """Should render id, event and compact JSON data"""
+        broker = LiveEventBroker()
+        event = broker.publish("loan.approved", {"count": 1, "loan_ids": [7]})
+
+        assert event.to_sse() == (
+            f'id: {broker.boot_id}-1\nevent: loan.approved\n'
+            'data: {"count":1,"loan_ids":[7]}\n\n'
+        ).encode()
+
+    @pytest.mark.asyncio
+    async def test_resume_from_last_event_id(self):
+        """Should replay only the events after Last-Event-ID"""
+        broker = LiveEventBroker()
+        first = broker.publish("notification", {"id": 1})
+        broker.publish("notification", {"id": 2})
+
+        async with broker.subscribe(last_event_id=first.id) as subscription:
+            assert (await subscription.get(0.1)).data == {"id": 2}
+            assert await subscription.get(0.01) is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_or_expired_id_requests_resync(self):
+        """Should ask for a full reload when the gap cannot be replayed"""
+        broker = LiveEventBroker(replay_size=2)
+        for i in range(5):
+            broker.publish("notification", {"id": i})
+
+        async with broker.subscribe(last_event_id=f"{broker.boot_id}-1") as expired, \
+                broker.subscribe(last_event_id="otherboot-4") as foreign:
+            for subscription in (expired, foreign):
+                event = await subscription.get(0.1)
+                assert event.type == RESYNC
+                assert event.id == f"{broker.boot_id}-5"
+
+    @pytest.mark.asyncio
+    async def test_slow_client_gets_resync(self):
+        """Should replace a full queue with a single resync event"""
+        broker = LiveEventBroker(queue_size=3)
+
+        async with broker.subscribe() as subscription:
+            for i in range(4):
+                broker.publish("notification", {"id": i})
+
+            assert (await subscription.get(0.1)).type == RESYNC
+            assert await subscription.get(0.01) is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_payload_is_ignored(self):
+        """Should log and drop payloads that are not events"""
+        broker = LiveEventBroker()
+
+        async with broker.subscribe() as subscription:
+            broker._on_notification(None, 1, "credinet_events", "not json")
+            broker._on_notification(None, 1, "credinet_events", '{"data": {}}')
+            assert await subscription.get(0.01) is None
+
+
+class TestEventWatcher:
+    """Test in-process consumers used by NOTIFY-invalidated caches"""
+
+    @pytest.mark.asyncio
+    async def test_handler_gets_matching_events_and_resync(self):
+        """Should call the handler for its types and for resync, surviving handler errors"""
+        broker = LiveEventBroker()
+        seen = []
+
+        async def handler(event):
+            seen.append(event.type)
+            if event.type == "legacy_grid.changed":
+                raise RuntimeError("boom")
+
+        watcher = EventWatcher("test", {"legacy_grid.changed"}, handler, broker=broker)
+        watcher.start()
+        await asyncio.sleep(0)
+        _notify(broker, "legacy_grid.changed")
+        _notify(broker, "payment.registered")
+        broker.publish(RESYNC)
+        await asyncio.sleep(0.01)
+        await watcher.stop()
+
+        assert seen == ["legacy_grid.changed", RESYNC]
+        assert broker.subscriber_count == 0
+
+
+class TestStreamAuth:
+    """Test JWT extraction for EventSource clients"""
+
+    def test_token_query_param(self):
+        """Should accept the token as a query parameter"""
+        token = create_access_token({"sub": "admin", "user_id": 3})
+        assert get_stream_user_id(token=token, credentials=None) == 3
+
+    def test_missing_token(self):
+        """Should reject requests without a valid token"""
+        with pytest.raises(HTTPException) as exc:
+            get_stream_user_id(token="garbage", credentials=None)
+        assert exc.value.status_code == 401
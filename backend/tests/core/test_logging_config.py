@@ -0,0 +1,134 @@
+"""
+Unit Tests - Structured logging (JSON records, sampling, DB timing)
+"""
+import json
+import logging
+import queue
+import sys
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+
+from app.core.logging_config import (
+    ContextQueueHandler,
+    DbTimer,
+    JsonFormatter,
+    RequestContextFilter,
+    RequestSampler,
+    db_timer_var,
+    instrument_engine,
+    parse_sampling,
+    request_id_var,
+)
+from app.core.middleware import setup_middleware
+
+
+def _record(msg="hola %s", args=("mundo",), exc_info=None, **extra):
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, msg, args, exc_info)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestJsonFormatter:
+    """Test JSON output through the queue handler"""
+
+    def test_context_and_extra_fields(self):
+        """Should include request context and extra= fields"""
+        token = request_id_var.set("req-1")
+        try:
+            record = _record(status=200, duration_ms=1.5)
+            RequestContextFilter().filter(record)
+        finally:
+            request_id_var.reset(token)
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["msg"] == "hola mundo"
+        assert entry["request_id"] == "req-1"
+        assert (entry["status"], entry["duration_ms"]) == (200, 1.5)
+        assert "args" not in entry and "user_id" not in entry
+
+    def test_queue_handler_keeps_traceback_apart(self):
+        """Should resolve the message and keep the traceback as its own field"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = _record(exc_info=sys.exc_info())
+
+        log_queue = queue.SimpleQueue()
+        ContextQueueHandler(log_queue).emit(record)
+        queued = log_queue.get_nowait()
+        entry = json.loads(JsonFormatter().format(queued))
+
+        assert entry["msg"] == "hola mundo"
+        assert "ValueError: boom" in entry["exc_info"]
+
+
+class TestRequestSampler:
+    """Test per-route sampling"""
+
+    def test_longest_prefix_wins(self):
+        """Should apply the most specific rule"""
+        sampler = RequestSampler(parse_sampling("/api/v1=0.5, /api/v1/health=0"), slow_ms=1000)
+
+        assert sampler.rate_for("/api/v1/health") == 0.0
+        assert sampler.rate_for("/api/v1/loans") == 0.5
+        assert sampler.rate_for("/docs") == 1.0
+
+    def test_errors_slow_and_writes_always_logged(self):
+        """Should never drop errors, slow requests or non-GET methods"""
+        sampler = RequestSampler(parse_sampling("/api=0"), slow_ms=500)
+
+        assert sampler.should_log("GET", "/api/x", 200, 10) is False
+        assert sampler.should_log("GET", "/api/x", 503, 10) is True
+        assert sampler.should_log("GET", "/api/x", 200, 800) is True
+        assert sampler.should_log("POST", "/api/x", 201, 10) is True
+
+
+class TestDbTimer:
+    """Test SQL time accounting"""
+
+    def test_counts_queries_of_current_request(self):
+        """Should accumulate time only while a timer is active"""
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        instrument_engine(engine)  # idempotente
+        timer = DbTimer()
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            token = db_timer_var.set(timer)
+            try:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+            finally:
+                db_timer_var.reset(token)
+
+        assert timer.queries == 2
+        assert timer.ms >= 0
+
+
+class TestRequestLogMiddleware:
+    """Test the per-request log line"""
+
+    @pytest.mark.asyncio
+    async def test_request_line_and_id(self, caplog):
+        """Should emit one structured line and echo X-Request-ID"""
+        app = FastAPI()
+        setup_middleware(app)
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            return {"id": item_id}
+
+        caplog.set_level(logging.INFO, logger="app.core.middleware")
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/items/3", headers={"X-Request-ID": "abc"})
+
+        assert response.headers["X-Request-ID"] == "abc"
+        [record] = [r for r in caplog.records if r.name == "app.core.middleware"]
+        assert (record.method, record.status, record.path) == ("GET", 200, "/items/3")
+        assert record.db_queries == 0
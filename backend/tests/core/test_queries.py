@@ -0,0 +1,85 @@
+"""
+Unit Tests - Query registry (fixed SQL text per hot query, per-query stats)
+"""
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.queries import QueryRegistry
+from app.modules.associates.routes import get_associate_clients
+
+
+class TestQueryRegistry:
+    """Test registration, compiled variants and execution stats"""
+
+    @pytest.mark.asyncio
+    async def test_execute_records_calls_errors_and_time(self):
+        """Should reuse one statement object and count every execution, including failures"""
+        registry = QueryRegistry()
+        query = registry.register("things.list", "SELECT 1 WHERE (CAST(:kind AS VARCHAR) IS NULL OR :kind = 'a')")
+        db = AsyncMock()
+        db.execute.side_effect = ["ok", "ok", RuntimeError("boom")]
+
+        await query.execute(db, {"kind": None})
+        await query.execute(db, {"kind": "a"})
+        with pytest.raises(RuntimeError):
+            await query.execute(db, {"kind": "b"})
+
+        statements = {id(call.args[0]) for call in db.execute.await_args_list}
+        assert statements == {id(query.statement)}
+        stats = registry.stats()["things.list"]
+        assert (stats["calls"], stats["errors"]) == (3, 1)
+        assert stats["max_ms"] >= stats["avg_ms"] >= 0
+
+    def test_register_is_idempotent_but_rejects_conflicts(self):
+        """Should return the existing query for identical SQL and refuse a different one"""
+        registry = QueryRegistry()
+        query = registry.register("things.count", "SELECT COUNT(*) FROM things")
+
+        assert registry.register("things.count", "  SELECT COUNT(*) FROM things\n") is query
+        with pytest.raises(ValueError, match="things.count"):
+            registry.register("things.count", "SELECT COUNT(id) FROM things")
+
+    def test_variants_compile_fixed_fragments(self):
+        """Should register one named query per variant with its fragment in place"""
+        registry = QueryRegistry()
+
+        variants = registry.register_variants(
+            "things.page", "SELECT id FROM things {variant}",
+            keyset="WHERE id < :cursor ORDER BY id DESC LIMIT :limit",
+            offset="ORDER BY id DESC LIMIT :limit OFFSET :offset",
+        )
+
+        assert variants["keyset"].sql == "SELECT id FROM things WHERE id < :cursor ORDER BY id DESC LIMIT :limit"
+        assert "things.page.offset" in registry
+        assert registry.get("things.page.offset") is variants["offset"]
+
+
+class TestAssociateClientsQuery:
+    """Test that the clients listing binds its status filter instead of interpolating it"""
+
+    @pytest.mark.asyncio
+    async def test_status_filter_is_a_bound_parameter(self):
+        """Should send the same SQL for every filter and pass the statuses as parameters"""
+        sql_seen = set()
+        params_seen = []
+
+        async def execute(statement, params):
+            result = AsyncMock()
+            if "associate_profiles" in str(statement):
+                result.fetchone = lambda: type("Profile", (), {"id": 9, "user_id": 90})()
+            else:
+                sql_seen.add(str(statement))
+                params_seen.append(params["status_names"])
+                result.fetchall = lambda: []
+            return result
+
+        db = AsyncMock()
+        db.execute.side_effect = execute
+
+        for status_filter in (None, "ACTIVE", "GOOD_STANDING", "x' OR '1'='1"):
+            await get_associate_clients(9, db=db, status_filter=status_filter, limit=50, offset=0)
+
+        assert len(sql_seen) == 1
+        assert "x' OR" not in sql_seen.pop()
+        assert params_seen == [None, ["ACTIVE"], ["COMPLETED", "PAID"], ["x' OR '1'='1"]]
@@ -0,0 +1,97 @@
+"""
+Unit Tests - Read replica routing (lag-aware, read-your-writes)
+"""
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.database import ReadReplicaRouter
+
+
+class FakeEngine:
+    """Engine whose connections report a configurable replica lag"""
+
+    def __init__(self, lag=0.0, error=None):
+        self.lag = lag
+        self.error = error
+        self.checks = 0
+
+    @asynccontextmanager
+    async def connect(self):
+        self.checks += 1
+        if self.error:
+            raise self.error
+        conn = MagicMock()
+        result = MagicMock()
+        result.scalar.return_value = self.lag
+
+        async def execute(statement):
+            return result
+
+        conn.execute = execute
+        yield conn
+
+
+def _router(engine, **kwargs):
+    return ReadReplicaRouter(engine, max_lag_seconds=5, read_your_writes_seconds=10, **kwargs)
+
+
+class TestReadReplicaRouter:
+    """Test replica vs primary decisions"""
+
+    @pytest.mark.asyncio
+    async def test_without_replica_uses_primary(self):
+        """Should always use the primary when no read URL is configured"""
+        assert await _router(None).use_replica(1) is False
+
+    @pytest.mark.asyncio
+    async def test_lag_threshold(self):
+        """Should use the replica only while its lag is within the limit"""
+        engine = FakeEngine(lag=1.5)
+        router = _router(engine, check_interval=0)
+        assert await router.use_replica(1) is True
+
+        engine.lag = 12.0
+        assert await router.use_replica(1) is False
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes(self):
+        """Should send a user that just wrote to the primary"""
+        router = _router(FakeEngine(lag=0))
+        router.note_write(7)
+
+        assert await router.use_replica(7) is False
+        assert await router.use_replica(8) is True
+
+    @pytest.mark.asyncio
+    async def test_write_window_expires(self, monkeypatch):
+        """Should return to the replica once the window has passed"""
+        import app.core.database as database
+
+        clock = [1000.0]
+        monkeypatch.setattr(database.time, "monotonic", lambda: clock[0])
+        router = _router(FakeEngine(lag=0))
+        router.note_write(7)
+
+        clock[0] += 11
+        assert await router.use_replica(7) is True
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_falls_back(self):
+        """Should treat connection errors as infinite lag"""
+        router = _router(FakeEngine(error=OSError("connection refused")))
+
+        assert await router.use_replica(1) is False
+        assert await router.replica_lag() == float("inf")
+
+    @pytest.mark.asyncio
+    async def test_lag_is_cached(self):
+        """Should measure lag at most once per check interval"""
+        engine = FakeEngine(lag=0)
+        router = _router(engine, check_interval=60)
+
+        for _ in range(5):
+            await router.use_replica(1)
+
+        assert engine.checks == 1
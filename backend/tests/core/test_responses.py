@@ -0,0 +1,98 @@
+"""
+Unit Tests - ORJSONResponse, sparse fieldsets and compression
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+from app.core.responses import ORJSONResponse, apply_fields, parse_fields, sparse_fields
+
+
+class Item(BaseModel):
+    id: int
+    amount: Decimal
+
+
+class TestORJSONResponse:
+    """Test fast JSON rendering"""
+
+    def test_renders_decimal_dates_and_models(self):
+        """Should serialize Decimal as float, dates as ISO and Pydantic models"""
+        body = ORJSONResponse({
+            "amount": Decimal("10.50"),
+            "due": date(2026, 3, 8),
+            "item": Item(id=1, amount=Decimal("2.5")),
+        }).body
+        assert body == b'{"amount":10.5,"due":"2026-03-08","item":{"id":1,"amount":"2.5"}}'
+
+
+class TestSparseFields:
+    """Test ?fields= projection"""
+
+    def test_parse_nested(self):
+        """Should build a tree; a bare field wins over its sub-fields"""
+        assert parse_fields("id, payments.id,payments.amount") == {
+            "id": None, "payments": {"id": None, "amount": None}
+        }
+        assert parse_fields("payments.id,payments") == {"payments": None}
+        assert parse_fields("") is None
+
+    def test_apply_fields(self):
+        """Should keep only requested keys, projecting nested lists"""
+        rows = [{"id": 1, "name": "a", "payments": [{"id": 7, "amount": 1.0, "x": 0}]}]
+        assert apply_fields(rows, parse_fields("id,payments.amount,unknown")) == [
+            {"id": 1, "payments": [{"amount": 1.0}]}
+        ]
+        assert apply_fields(rows, None) == rows
+
+    def test_apply_fields_to_models(self):
+        """Should project Pydantic models"""
+        assert apply_fields([Item(id=1, amount=Decimal("3"))], parse_fields("id")) == [{"id": 1}]
+
+
+def _app():
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=200)
+
+    @app.get("/big")
+    def big(fields=Depends(sparse_fields)):
+        return ORJSONResponse(apply_fields(
+            [{"id": i, "description": "x" * 20} for i in range(100)], fields
+        ))
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    return app
+
+
+class TestCompression:
+    """Test brotli/gzip negotiation"""
+
+    def test_choose_encoding(self):
+        """Should honour q=0 and fall back to gzip"""
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, identity") is None
+        assert choose_encoding("") is None
+
+    @pytest.mark.asyncio
+    async def test_large_responses_are_compressed(self):
+        """Should gzip responses above the threshold only"""
+        async with AsyncClient(transport=ASGITransport(app=_app()), base_url="http://test") as client:
+            headers = {"Accept-Encoding": "gzip"}
+            big = await client.get("/big", headers=headers)
+            small = await client.get("/small", headers=headers)
+            lean = await client.get("/big?fields=id", headers=headers)
+
+        assert big.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in big.headers["vary"].lower()
+        assert len(big.json()) == 100
+        assert int(big.headers["content-length"]) < len(big.content)
+        assert "content-encoding" not in small.headers
+        assert lean.json()[0] == {"id": 0}
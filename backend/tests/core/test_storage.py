@@ -0,0 +1,229 @@
+"""
+Unit Tests - Document storage (content addressing, streaming, Range/ETag)
+"""
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from httpx import ASGITransport, AsyncClient
+
+from app.core.storage import (
+    DocumentStorage,
+    LocalStorageBackend,
+    S3StorageBackend,
+    UploadTooLargeError,
+    content_key,
+    parse_range,
+    sniff_media_type,
+)
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class FakeS3Error(Exception):
+    def __init__(self, code):
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """In-memory stand-in with the boto3 S3 client calls the backend uses"""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append("put_object")
+        self.objects[Key] = Body
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise FakeS3Error("404")
+        return {"ContentLength": len(self.objects[Key])}
+
+    def create_multipart_upload(self, Bucket, Key):
+        self.calls.append("create_multipart_upload")
+        self.uploads[Key] = {}
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[p["PartNumber"]] for p in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.uploads.pop(UploadId, None)
+
+    def copy_object(self, Bucket, Key, CopySource):
+        self.objects[Key] = self.objects[CopySource["Key"]]
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = (int(x) for x in Range[6:].split("-"))
+        return {"Body": io.BytesIO(self.objects[Key][start:end + 1])}
+
+
+class TestParseRange:
+    """Test single-range parsing"""
+
+    def test_forms(self):
+        """Should support closed, open-ended and suffix ranges"""
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+
+    def test_ignored_and_unsatisfiable(self):
+        """Should serve the whole file for multi-ranges and reject ranges past the end"""
+        assert parse_range(None, 100) is None
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        with pytest.raises(HTTPException) as exc:
+            parse_range("bytes=100-", 100)
+        assert exc.value.status_code == 416
+
+
+class TestLocalStorage:
+    """Test streamed, content-addressed writes on disk"""
+
+    @pytest.mark.asyncio
+    async def test_same_content_is_stored_once(self, tmp_path):
+        """Should key by SHA-256 and deduplicate repeated uploads"""
+        storage = DocumentStorage(LocalStorageBackend(tmp_path), max_size=1024, chunk_size=7)
+        data = b"INE frente " * 20
+
+        first = await storage.save(_chunks(data))
+        second = await storage.save(_chunks(data))
+
+        assert first.key == second.key == content_key(hashlib.sha256(data).hexdigest())
+        assert (first.created, second.created) == (True, False)
+        assert (tmp_path / first.key).read_bytes() == data
+        assert list((tmp_path / "tmp").iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_too_large_leaves_nothing(self, tmp_path):
+        """Should abort the staged file when the size limit is exceeded"""
+        storage = DocumentStorage(LocalStorageBackend(tmp_path), max_size=10)
+
+        with pytest.raises(UploadTooLargeError):
+            await storage.save(_chunks(b"x" * 11, size=4))
+
+        assert list((tmp_path / "tmp").iterdir()) == []
+        assert not (tmp_path / "sha256").exists()
+
+
+class TestS3Storage:
+    """Test the S3 backend against an in-memory stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_multipart_upload_and_dedup(self):
+        """Should upload in parts to a temp key, publish under the hash and skip duplicates"""
+        client = FakeS3Client()
+        backend = S3StorageBackend(client, "docs", prefix="credinet", part_size=10)
+        storage = DocumentStorage(backend, max_size=1024, chunk_size=4)
+        data = bytes(range(25))
+
+        stored = await storage.save(_chunks(data, size=4))
+        again = await storage.save(_chunks(data, size=4))
+
+        assert client.objects == {f"credinet/{stored.key}": data}
+        assert stored.created and not again.created
+        assert client.calls.count("create_multipart_upload") == 2
+        assert "abort_multipart_upload" in client.calls
+
+    @pytest.mark.asyncio
+    async def test_small_file_goes_straight_to_its_key(self):
+        """Should skip multipart for files smaller than one part"""
+        client = FakeS3Client()
+        storage = DocumentStorage(S3StorageBackend(client, "docs", part_size=1024), max_size=1024)
+
+        stored = await storage.save(_chunks(b"comprobante"))
+
+        assert client.calls == ["put_object"]
+        assert await storage.backend.size(stored.key) == 11
+
+
+class TestDownloadResponse:
+    """Test streamed downloads with Range and conditional requests"""
+
+    @pytest.mark.asyncio
+    async def test_range_and_etag(self, tmp_path):
+        """Should answer 206 for ranges, 304 for a matching ETag and ignore a stale If-Range"""
+        storage = DocumentStorage(LocalStorageBackend(tmp_path), max_size=1024, chunk_size=3)
+        data = b"0123456789abcdef"
+        stored = await storage.save(_chunks(data))
+
+        app = FastAPI()
+
+        @app.get("/files/{key:path}")
+        async def download(key: str, request: Request):
+            return await storage.download_response(request, key, "ine.jpg", "image/jpeg")
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            full = await client.get(f"/files/{stored.key}")
+            partial = await client.get(f"/files/{stored.key}", headers={"Range": "bytes=4-7"})
+            not_modified = await client.get(f"/files/{stored.key}", headers={"If-None-Match": full.headers["etag"]})
+            stale_if_range = await client.get(
+                f"/files/{stored.key}", headers={"Range": "bytes=4-7", "If-Range": '"other"'}
+            )
+
+        assert full.status_code == 200 and full.content == data
+        assert full.headers["etag"] == f'"{stored.sha256}"'
+        assert partial.status_code == 206 and partial.content == b"4567"
+        assert partial.headers["content-range"] == f"bytes 4-7/{len(data)}"
+        assert not_modified.status_code == 304 and not_modified.content == b""
+        assert stale_if_range.status_code == 200 and stale_if_range.content == data
+
+    @pytest.mark.asyncio
+    async def test_only_safe_types_render_inline(self, tmp_path):
+        """Should send nosniff always and serve HTML/SVG as attachments"""
+        storage = DocumentStorage(LocalStorageBackend(tmp_path), max_size=1024)
+        stored = await storage.save(_chunks(b"<svg onload=alert(1)>"))
+
+        app = FastAPI()
+
+        @app.get("/files/{media_type:path}")
+        async def download(media_type: str, request: Request):
+            return await storage.download_response(request, stored.key, "x", media_type)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            pdf = await client.get("/files/application/pdf")
+            svg = await client.get("/files/image/svg+xml")
+            html = await client.get("/files/text/html")
+
+        assert pdf.headers["content-disposition"].startswith("inline;")
+        for response in (pdf, svg, html):
+            assert response.headers["x-content-type-options"] == "nosniff"
+        assert svg.headers["content-disposition"].startswith("attachment;")
+        assert html.headers["content-disposition"].startswith("attachment;")
+
+
+class TestSniffMediaType:
+    """Test upload-time MIME detection"""
+
+    def test_signature_wins_over_declared_type(self):
+        """Should trust magic numbers and never keep an unverified inline type"""
+        assert sniff_media_type(b"%PDF-1.7\n", "text/html") == "application/pdf"
+        assert sniff_media_type(b"\xff\xd8\xff\xe0", None) == "image/jpeg"
+        assert sniff_media_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ", None) == "image/webp"
+        assert sniff_media_type(b"<html><script>", "image/png") == "application/octet-stream"
+        assert sniff_media_type(b"<html><script>", "Text/HTML; charset=utf-8") == "text/html"
+
+    @pytest.mark.asyncio
+    async def test_save_reports_sniffed_type(self, tmp_path):
+        """Should sniff the first bytes even when they arrive split across chunks"""
+        storage = DocumentStorage(LocalStorageBackend(tmp_path), max_size=1024)
+
+        stored = await storage.save(_chunks(b"\x89PNG\r\n\x1a\n" + b"0" * 20, size=3))
+
+        assert stored.media_type == "image/png"
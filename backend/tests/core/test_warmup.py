@@ -0,0 +1,165 @@
+"""
+Unit Tests - Worker warm-up (pool, hot statements, cache priming, readiness)
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core import cache as cache_module
+from app.core import warmup
+from app.core.cache import MemoryCacheBackend, ResponseCache, cached
+from app.core.security import create_access_token
+from benchmarks.importtime import package_of, parse_importtime, summarize_run
+
+
+class FakeEngine:
+    """Async engine that tracks how many connections are open at once"""
+
+    def __init__(self, size=3, fail_after=None):
+        self.pool = MagicMock()
+        self.pool.size.return_value = size
+        self.fail_after = fail_after
+        self.opened = 0
+        self.open_now = 0
+        self.max_open = 0
+
+    @asynccontextmanager
+    async def connect(self):
+        if self.fail_after is not None and self.opened >= self.fail_after:
+            raise OSError("connection refused")
+        self.opened += 1
+        self.open_now += 1
+        self.max_open = max(self.max_open, self.open_now)
+        conn = MagicMock()
+
+        async def rollback():
+            return None
+
+        conn.rollback = rollback
+        try:
+            yield conn
+        finally:
+            self.open_now -= 1
+
+
+class TestWarmAsyncPool:
+    """Test pool pre-opening"""
+
+    @pytest.mark.asyncio
+    async def test_opens_pool_size_connections_at_once(self):
+        """Should hold every connection open so none is reused"""
+        engine = FakeEngine(size=4)
+        sessions = []
+
+        async def statements(session):
+            sessions.append(session)
+            await asyncio.sleep(0)
+
+        assert await warmup.warm_async_pool(engine, statements) == 4
+        assert engine.max_open == 4
+        assert len(sessions) == 4
+
+    @pytest.mark.asyncio
+    async def test_connection_failure_does_not_hang(self):
+        """Should raise instead of waiting for connections that never open"""
+        engine = FakeEngine(size=3, fail_after=1)
+
+        async def statements(session):
+            return None
+
+        with pytest.raises(OSError):
+            await asyncio.wait_for(warmup.warm_async_pool(engine, statements), timeout=1)
+
+
+class TestPrimeResponseCache:
+    """Test in-process cache priming"""
+
+    @pytest.mark.asyncio
+    async def test_primes_each_role(self, monkeypatch):
+        """Should leave the cached response ready for every configured role"""
+        monkeypatch.setattr(
+            cache_module, "response_cache", ResponseCache(backend=MemoryCacheBackend(), default_ttl=60)
+        )
+        calls = []
+        app = FastAPI()
+
+        @app.get("/catalogs/roles")
+        @cached("catalogs")
+        async def roles():
+            calls.append(1)
+            return [{"id": 1}]
+
+        assert await warmup.prime_response_cache(app, ["/catalogs/roles"], ["administrador", "asociado"]) == 2
+
+        token = create_access_token({"sub": "x", "user_id": 9, "roles": ["asociado"]})
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/catalogs/roles", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.headers["X-Cache"] == "HIT"
+        assert len(calls) == 2
+
+
+class TestRunWarmup:
+    """Test orchestration and readiness"""
+
+    @pytest.mark.asyncio
+    async def test_failed_step_still_marks_ready(self, monkeypatch):
+        """Should record the failure and become ready anyway"""
+        async def broken_pool(engine):
+            raise OSError("db down")
+
+        async def prime(app, paths, roles):
+            return len(paths) * len(roles)
+
+        monkeypatch.setattr(warmup, "warm_async_pool", broken_pool)
+        monkeypatch.setattr(warmup, "warm_sync_pool", lambda engine: 5)
+        monkeypatch.setattr(warmup, "prime_response_cache", prime)
+        state = warmup.WarmupState()
+
+        await warmup.run_warmup(FastAPI(), state)
+
+        assert state.ready is True
+        assert state.steps["async_pool"] == {"ok": False, "error": "db down", "ms": state.steps["async_pool"]["ms"]}
+        assert state.steps["sync_pool"]["result"] == 5
+        assert state.steps["response_cache"]["ok"] is True
+
+    @pytest.mark.asyncio
+    async def test_ready_endpoint(self, monkeypatch):
+        """Should answer 503 while warming up and 200 afterwards"""
+        import app.main as main
+
+        state = warmup.WarmupState()
+        monkeypatch.setattr(main, "warmup_state", state)
+
+        async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as client:
+            assert (await client.get("/ready")).status_code == 503
+            state.mark_ready()
+            response = await client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+
+class TestImportTimeProfile:
+    """Test -X importtime parsing for the benchmark report"""
+
+    def test_parse_and_group(self):
+        """Should parse nesting and group app modules by module package"""
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   sqlalchemy.sql\n"
+            "import time:       300 |        420 | sqlalchemy\n"
+            "import time:        80 |         80 |   app.modules.loans.routes\n"
+            "import time:       200 |        700 | app.main\n"
+        )
+        rows = parse_importtime(stderr)
+        summary = summarize_run(rows, "app.main")
+
+        assert [r["depth"] for r in rows] == [1, 0, 1, 0]
+        assert summary["total_us"] == 700
+        assert summary["by_package"] == {"sqlalchemy": 420, "app.modules.loans": 80, "app.main": 200}
+        assert package_of("app.core.cache") == "app.core"
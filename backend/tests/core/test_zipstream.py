@@ -0,0 +1,45 @@
+"""
+Unit Tests - Streaming zip
+"""
+import io
+import zipfile
+
+import pytest
+
+from app.core.zipstream import stream_zip
+
+
+async def _chunks(data: bytes, size: int = 5):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _entries(files):
+    for name, data in files.items():
+        yield name, _chunks(data)
+
+
+class TestStreamZip:
+    """Test zip generation without a seekable file"""
+
+    @pytest.mark.asyncio
+    async def test_produces_valid_archive_incrementally(self):
+        """Should yield several pieces that together form a readable zip"""
+        files = {"Feb23-2026/a.html": b"<p>hola</p>" * 200, "Feb23-2026/b.txt": b"", "c.txt": b"abc"}
+
+        pieces = [piece async for piece in stream_zip(_entries(files))]
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+
+        assert len(pieces) > 2
+        assert archive.testzip() is None
+        assert {name: archive.read(name) for name in archive.namelist()} == files
+
+    @pytest.mark.asyncio
+    async def test_stored_mode(self):
+        """Should keep members uncompressed with ZIP_STORED"""
+        data = b"x" * 1000
+        body = b"".join([p async for p in stream_zip(_entries({"x.bin": data}), compression=zipfile.ZIP_STORED)])
+        info = zipfile.ZipFile(io.BytesIO(body)).getinfo("x.bin")
+
+        assert info.compress_type == zipfile.ZIP_STORED
+        assert info.compress_size == len(data)
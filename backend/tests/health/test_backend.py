@@ -127,6 +127,14 @@ class TestBackendAvailability:
         else:
             pytest.fail(f"Health endpoint returned {status}")
     
+    def test_ready_endpoint(self):
+        """Verificar que el worker terminó el warm-up."""
+        status, body, data = curl_get("/ready")
+        if status == 404:
+            pytest.skip("Ready endpoint not implemented")
+        assert status == 200, f"Ready endpoint returned {status}: {body}"
+        assert data and data.get("ready") is True
+    
     def test_api_docs_available(self):
         """Verificar que la documentación de API está disponible."""
         status, body, data = curl_get("/docs")
@@ -0,0 +1,70 @@
+"""
+Unit Tests - Defaulted report evidence access (reporting associate or staff only)
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.modules.agreements import defaulted_reports_routes as report_routes
+
+
+def _db(**row):
+    result = MagicMock()
+    result.fetchone.return_value = SimpleNamespace(associate_user_id=90, **row)
+    db = AsyncMock()
+    db.execute.return_value = result
+    return db
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = MagicMock()
+    storage.save = AsyncMock()
+    storage.download_response = AsyncMock(return_value="streamed")
+    monkeypatch.setattr(report_routes, "get_storage", lambda: storage)
+    return storage
+
+
+class TestDefaultedReportEvidenceAccess:
+    """Test that evidence is only attached or served for the reporting associate or staff"""
+
+    @pytest.mark.asyncio
+    async def test_other_associate_cannot_upload(self, storage):
+        """Should return 403 before storing the file"""
+        with pytest.raises(HTTPException) as exc:
+            await report_routes.upload_defaulted_report_evidence(
+                3, file=MagicMock(), db=_db(status="PENDING"), current_user_id=91, current_user_roles=["asociado"]
+            )
+
+        assert exc.value.status_code == 403
+        storage.save.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_other_associate_cannot_download(self, storage):
+        """Should return 403 instead of streaming the evidence"""
+        db = _db(evidence_file_path="ab/cd", evidence_file_name="foto.jpg", evidence_mime_type="image/jpeg")
+
+        with pytest.raises(HTTPException) as exc:
+            await report_routes.download_defaulted_report_evidence(
+                3, SimpleNamespace(headers={}), db=db, current_user_id=91, current_user_roles=["asociado"]
+            )
+
+        assert exc.value.status_code == 403
+        storage.download_response.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_owner_and_staff_can_download(self, storage):
+        """Should stream the evidence to the reporting associate and to staff"""
+        db = _db(evidence_file_path="ab/cd", evidence_file_name="foto.jpg", evidence_mime_type="image/jpeg")
+        request = SimpleNamespace(headers={})
+
+        await report_routes.download_defaulted_report_evidence(
+            3, request, db=db, current_user_id=90, current_user_roles=["asociado"]
+        )
+        await report_routes.download_defaulted_report_evidence(
+            3, request, db=db, current_user_id=1, current_user_roles=["administrador"]
+        )
+
+        assert storage.download_response.await_count == 2
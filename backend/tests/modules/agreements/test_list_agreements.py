@@ -0,0 +1,80 @@
+"""
+Unit Tests - Agreement listing (keyset pagination over denormalized progress)
+"""
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.modules.agreements.routes import list_agreements
+
+
+def _row(agreement_id):
+    return SimpleNamespace(
+        id=agreement_id,
+        associate_profile_id=5,
+        agreement_number=f"CONV-2026-{agreement_id:04d}",
+        agreement_date=None,
+        total_debt_amount=Decimal("1000.00"),
+        status="ACTIVE",
+        monthly_payment_amount=Decimal("250.00"),
+        payment_plan_months=4,
+        period_payment_amount=None,
+        payment_plan_periods=None,
+        payment_frequency=None,
+        total_paid=Decimal("250.00"),
+        payments_made=1,
+        next_due_date=None,
+        remaining_balance=Decimal("750.00"),
+        associate_name="Juan Pérez",
+    )
+
+
+def _db(total, ids):
+    count_result = MagicMock()
+    count_result.scalar_one.return_value = total
+    page_result = MagicMock()
+    page_result.fetchall.return_value = [_row(i) for i in ids]
+    db = AsyncMock()
+    db.execute.side_effect = [count_result, page_result]
+    return db
+
+
+def _page_sql(db):
+    statement, params = db.execute.await_args_list[1].args
+    return str(statement), params
+
+
+class TestListAgreements:
+    """Test agreements listing"""
+
+    @pytest.mark.asyncio
+    async def test_first_page_returns_next_cursor(self):
+        """Should fetch limit + 1 rows and expose the last id as cursor"""
+        db = _db(total=5, ids=[9, 8, 7])
+
+        page = await list_agreements(limit=2, offset=0, cursor=None, db=db)
+
+        sql, params = _page_sql(db)
+        assert "agreement_payments" not in sql
+        assert params["limit"] == 3
+        assert [item["id"] for item in page["items"]] == [9, 8]
+        assert page["next_cursor"] == 8
+        assert page["items"][0]["remaining_balance"] == Decimal("750.00")
+        assert page["items"][0]["payment_frequency"] == "monthly"
+
+    @pytest.mark.asyncio
+    async def test_cursor_replaces_offset(self):
+        """Should seek by id when a cursor is given"""
+        db = _db(total=5, ids=[7, 6])
+
+        page = await list_agreements(
+            status="ACTIVE", associate_profile_id=None, limit=2, offset=40, cursor=8, db=db
+        )
+
+        sql, params = _page_sql(db)
+        assert "ag.id < :cursor" in sql
+        assert "OFFSET" not in sql
+        assert params["cursor"] == 8
+        assert params["status"] == "ACTIVE"
+        assert page["next_cursor"] is None
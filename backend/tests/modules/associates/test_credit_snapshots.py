@@ -0,0 +1,122 @@
+"""
+Unit Tests - Versioned associate credit snapshot cache
+"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from app.core.events import LiveEvent, RESYNC
+from app.modules.associates.application import credit_snapshots
+from app.modules.associates.application.credit_snapshots import CreditSnapshotCache
+from app.modules.associates.application.use_cases import GetAssociateCreditUseCase
+from app.modules.associates.domain.entities import AssociateCreditSnapshot
+
+
+def _snapshot(user_id, available="5000.00"):
+    return AssociateCreditSnapshot(
+        associate_id=user_id + 100,
+        user_id=user_id,
+        credit_limit=Decimal("10000.00"),
+        pending_payments_total=Decimal("4000.00"),
+        consolidated_debt=Decimal("10000.00") - Decimal("4000.00") - Decimal(available),
+        available_credit=Decimal(available),
+        pending_debts_count=1,
+    )
+
+
+class FakeCreditRepository:
+    """In-memory stand-in for PgAssociateRepository.find_credit_snapshots"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.pause = None
+
+    async def find_credit_snapshots(self, user_ids):
+        self.calls.append(list(user_ids))
+        if self.pause is not None:
+            await self.pause.wait()
+        return {uid: self.rows[uid] for uid in user_ids if uid in self.rows}
+
+
+class TestCreditSnapshotCache:
+    """Test per-associate caching, batching and versioned invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_batches_misses_and_serves_hits(self):
+        """Should load only missing associates in one call and skip unknown ones"""
+        repository = FakeCreditRepository({1: _snapshot(1), 2: _snapshot(2)})
+        cache = CreditSnapshotCache(is_live=lambda: True)
+
+        first = await cache.get_many(repository, [1, 2, 99])
+        second = await cache.get_many(repository, [2, 1])
+        cache.invalidate([2])
+        third = await cache.get_many(repository, [1, 2])
+
+        assert sorted(first) == [1, 2]
+        assert second[1] is first[1]
+        assert repository.calls == [[1, 2, 99], [2]]
+        assert third[2].version > first[2].version
+
+    @pytest.mark.asyncio
+    async def test_load_racing_an_invalidation_is_not_stored(self):
+        """Should not cache a snapshot read before a change notification arrived"""
+        repository = FakeCreditRepository({1: _snapshot(1)})
+        repository.pause = asyncio.Event()
+        cache = CreditSnapshotCache(is_live=lambda: True)
+
+        pending = asyncio.create_task(cache.get(repository, 1))
+        await asyncio.sleep(0)
+        cache.invalidate([1])
+        repository.pause.set()
+        await pending
+        await cache.get(repository, 1)
+
+        assert len(repository.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_no_caching_without_listen(self):
+        """Should read through every time while the LISTEN connection is down"""
+        repository = FakeCreditRepository({1: _snapshot(1)})
+        cache = CreditSnapshotCache(is_live=lambda: False)
+
+        await cache.get(repository, 1)
+        await cache.get(repository, 1)
+
+        assert len(repository.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_notification_handler(self, monkeypatch):
+        """Should drop listed associates, or everything on truncated lists and resync"""
+        repository = FakeCreditRepository({1: _snapshot(1), 2: _snapshot(2)})
+        cache = CreditSnapshotCache(is_live=lambda: True)
+        monkeypatch.setattr(credit_snapshots, "credit_snapshot_cache", cache)
+
+        await cache.get_many(repository, [1, 2])
+        await credit_snapshots._on_credit_changed(
+            LiveEvent(id="x-1", type="associate.credit_changed", data={"count": 1, "user_ids": [1]})
+        )
+        assert sorted(cache._snapshots) == [2]
+
+        await credit_snapshots._on_credit_changed(
+            LiveEvent(id="x-2", type="associate.credit_changed", data={"count": 250, "user_ids": [5]})
+        )
+        assert cache._snapshots == {}
+
+        await cache.get_many(repository, [1, 2])
+        await credit_snapshots._on_credit_changed(LiveEvent(id="x-3", type=RESYNC))
+        assert cache._snapshots == {}
+
+    @pytest.mark.asyncio
+    async def test_credit_use_case(self):
+        """Should return the snapshot used by the credit endpoint and loan checks"""
+        repository = FakeCreditRepository({1: _snapshot(1, available="5000.00")})
+        cache = CreditSnapshotCache(is_live=lambda: True)
+
+        credit = await GetAssociateCreditUseCase(repository, cache).execute(1)
+
+        assert credit.get_credit_usage_percentage() == 40.0
+        assert credit.has_available_credit(Decimal("5000.00"))
+        assert not credit.has_available_credit(Decimal("5000.01"))
+        assert await GetAssociateCreditUseCase(repository, cache).execute(2) is None
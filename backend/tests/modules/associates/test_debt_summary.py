@@ -0,0 +1,89 @@
+"""
+Unit Tests - Associate debt summary (incrementally maintained table)
+"""
+import json
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import HTTPException
+
+from app.modules.associates.routes import get_associate_debt_history, get_debt_summary
+
+
+def _result(one=None, rows=None):
+    result = MagicMock()
+    result.fetchone.return_value = one
+    result.fetchall.return_value = rows or []
+    return result
+
+
+def _summary_row():
+    return SimpleNamespace(
+        associate_profile_id=5, user_id=12, associate_name="Ana López",
+        total_debt=Decimal("1000.10"), periods_with_debt=3,
+        oldest_debt_date=datetime(2026, 1, 8, tzinfo=timezone.utc), newest_debt_date=None,
+        profile_consolidated_debt=Decimal("1000.10"), credit_limit=Decimal("50000.00"),
+        available_credit=Decimal("48999.90"), pending_payments_total=Decimal("0"),
+        total_paid_to_debt=Decimal("200.20"), total_payments_count=2,
+        last_payment_date=date(2026, 2, 1),
+    )
+
+
+class TestDebtSummary:
+    """Test /associates/{id}/debt-summary"""
+
+    @pytest.mark.asyncio
+    async def test_reads_summary_table_by_key(self):
+        """Should read one summary row instead of aggregating the view"""
+        db = AsyncMock()
+        db.execute.return_value = _result(one=_summary_row())
+
+        response = await get_debt_summary(associate_id=5, db=db)
+
+        sql = str(db.execute.await_args.args[0])
+        assert "associate_debt_summary" in sql
+        assert "v_associate_real_debt_summary" not in sql
+        data = json.loads(response.body)["data"]
+        assert data["total_debt"] == 1000.10
+        assert data["total_paid_to_debt"] == 200.20
+        assert data["last_payment_date"] == "2026-02-01"
+
+    @pytest.mark.asyncio
+    async def test_unknown_associate(self):
+        """Should return 404 when the profile does not exist"""
+        db = AsyncMock()
+        db.execute.return_value = _result(one=None)
+
+        with pytest.raises(HTTPException) as exc:
+            await get_debt_summary(associate_id=99, db=db)
+
+        assert exc.value.status_code == 404
+
+
+class TestDebtHistory:
+    """Test /associates/{id}/debt-history totals"""
+
+    @pytest.mark.asyncio
+    async def test_total_comes_from_summary(self):
+        """Should report the exact summary total instead of a float sum"""
+        debts = [
+            SimpleNamespace(
+                id=i, cut_period_id=i, cut_code=f"P{i}", period_start_date=None, period_end_date=None,
+                accumulated_debt=Decimal("0.10"), debt_details=[], created_at=None, updated_at=None,
+            )
+            for i in range(3)
+        ]
+        db = AsyncMock()
+        db.execute.side_effect = [
+            _result(one=SimpleNamespace(id=5, user_id=12, total_debt=Decimal("0.30"))),
+            _result(rows=debts),
+        ]
+
+        response = await get_associate_debt_history(associate_id=5, db=db)
+
+        data = json.loads(response.body)["data"]
+        assert data["total_debt"] == 0.3  # a float sum gives 0.30000000000000004
+        assert data["periods_with_debt"] == 3
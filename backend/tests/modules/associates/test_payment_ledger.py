@@ -0,0 +1,69 @@
+"""
+Unit Tests - Associate payment ledger (keyset pagination)
+"""
+import json
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.modules.associates.routes import get_all_payments
+
+
+def _row(ledger_id):
+    return SimpleNamespace(
+        ledger_id=ledger_id, source_id=ledger_id + 100, entry_type="SALDO_ACTUAL", is_reversal=False,
+        payment_amount=Decimal("100.00"), payment_date=date(2026, 3, 1), payment_method="Efectivo",
+        payment_reference=None, cut_period_id=9, period_start=date(2026, 2, 8), period_end=date(2026, 2, 22),
+        notes=None, running_balance=Decimal(ledger_id * 100), created_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+    )
+
+
+def _db(total, ids):
+    count_result = MagicMock()
+    count_result.scalar_one.return_value = total
+    page_result = MagicMock()
+    page_result.fetchall.return_value = [_row(i) for i in ids]
+    db = AsyncMock()
+    db.execute.side_effect = [count_result, page_result]
+    return db
+
+
+def _page_sql(db):
+    statement, params = db.execute.await_args_list[1].args
+    return str(statement), params
+
+
+class TestAllPayments:
+    """Test /associates/{id}/all-payments"""
+
+    @pytest.mark.asyncio
+    async def test_first_page_returns_real_total_and_cursor(self):
+        """Should count the whole ledger and expose the last ledger id as cursor"""
+        db = _db(total=7, ids=[9, 8, 7])
+
+        response = await get_all_payments(associate_id=5, limit=2, offset=0, cursor=None, fields=None, db=db)
+
+        sql, params = _page_sql(db)
+        assert "associate_payment_ledger" in sql
+        assert "v_associate_all_payments" not in sql
+        assert params["limit"] == 3
+        data = json.loads(response.body)["data"]
+        assert data["total"] == 7
+        assert data["next_cursor"] == 8
+        assert [p["id"] for p in data["payments"]] == [109, 108]
+        assert data["payments"][0]["running_balance"] == 900.0
+
+    @pytest.mark.asyncio
+    async def test_cursor_replaces_offset(self):
+        """Should seek after the cursor row instead of using OFFSET"""
+        db = _db(total=7, ids=[6])
+
+        response = await get_all_payments(associate_id=5, limit=2, offset=40, cursor=8, fields=None, db=db)
+
+        sql, params = _page_sql(db)
+        assert "(l.payment_date, l.id) <" in sql
+        assert "OFFSET" not in sql
+        assert params["cursor"] == 8
+        assert json.loads(response.body)["data"]["next_cursor"] is None
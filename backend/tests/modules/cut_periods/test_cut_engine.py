@@ -0,0 +1,165 @@
+"""
+Unit Tests - Cut Engine (plan / run)
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.modules.cut_periods.application.services import CutEngine, PeriodTransition
+from app.modules.cut_periods.application.services.cut_engine import (
+    PENDING, CUTOFF, COLLECTING, SETTLING,
+)
+
+
+def _result(rows=None, one=None):
+    result = MagicMock()
+    result.fetchall.return_value = rows or []
+    result.fetchone.return_value = one
+    return result
+
+
+def _period(id, cut_code, status_id, is_previous=False):
+    return SimpleNamespace(
+        id=id, cut_code=cut_code, status_id=status_id, is_previous=is_previous,
+        period_start_date=date(2026, 1, 1), period_end_date=date(2026, 1, 7),
+    )
+
+
+def _engine(previous_rows, **kwargs):
+    db = AsyncMock()
+    current = (10, "Mar23-2026", date(2026, 3, 8), date(2026, 3, 22), 1)
+    db.execute.side_effect = [_result(one=current), _result(rows=previous_rows)]
+    return CutEngine(db, **kwargs), db
+
+
+class TestCutEnginePlan:
+    """Test transition planning"""
+
+    @pytest.mark.asyncio
+    async def test_previous_period_goes_to_collecting(self):
+        """Should cut the previous period and generate its statements"""
+        engine, _ = _engine([_period(9, "Mar08-2026", PENDING, is_previous=True)])
+
+        plan = await engine.plan(date(2026, 3, 10))
+
+        assert plan.current_period.cut_code == "Mar23-2026"
+        assert plan.previous_period.id == 9
+        assert not plan.backfill
+        [t] = plan.transitions
+        assert (t.from_status, t.to_status) == (PENDING, COLLECTING)
+        assert t.generate_statements and not t.mark_settling
+
+    @pytest.mark.asyncio
+    async def test_missed_periods_are_backfilled(self):
+        """Should settle older uncut periods and close old collecting ones"""
+        engine, _ = _engine([
+            _period(6, "Jan23-2026", COLLECTING),
+            _period(7, "Feb08-2026", 2),  # ACTIVE heredado
+            _period(8, "Feb23-2026", CUTOFF),
+            _period(9, "Mar08-2026", PENDING, is_previous=True),
+        ])
+
+        plan = await engine.plan(date(2026, 3, 10))
+
+        assert plan.backfill
+        by_id = {t.period_id: t for t in plan.transitions}
+        assert not by_id[6].generate_statements and by_id[6].to_status == SETTLING
+        assert by_id[7].from_status == PENDING and by_id[7].generate_statements
+        assert by_id[8].to_status == SETTLING and by_id[8].mark_settling
+        assert by_id[9].to_status == COLLECTING
+
+    @pytest.mark.asyncio
+    async def test_no_current_period(self):
+        """Should return an empty plan when no period covers the date"""
+        db = AsyncMock()
+        db.execute.return_value = _result(one=None)
+
+        plan = await CutEngine(db).plan(date(2030, 1, 1))
+
+        assert plan.current_period is None
+        assert plan.transitions == []
+
+
+class TestCutEngineRun:
+    """Test batched execution"""
+
+    @pytest.mark.asyncio
+    async def test_commits_once_per_batch_and_reports_progress(self):
+        """Should checkpoint every batch and call the progress callback"""
+        progress = []
+        engine, db = _engine(
+            [_period(i, f"P{i}", COLLECTING) for i in range(1, 6)],
+            batch_size=2, progress=progress.append,
+        )
+        engine.mark_settling = AsyncMock(return_value=0)
+        engine._set_status = AsyncMock()
+
+        plan = await engine.run(date(2026, 3, 10))
+
+        assert db.commit.await_count == 3
+        assert [p["batch"] for p in progress] == [1, 2, 3]
+        assert all(t.status == "APPLIED" for t in plan.transitions)
+
+    @pytest.mark.asyncio
+    async def test_dry_run_does_not_commit(self):
+        """Should only count statements in dry-run mode"""
+        engine, db = _engine([_period(9, "Mar08-2026", PENDING, is_previous=True)])
+        engine.count_pending_statements = AsyncMock(return_value={9: 4})
+
+        plan = await engine.run(date(2026, 3, 10), dry_run=True)
+
+        db.commit.assert_not_awaited()
+        assert plan.dry_run
+        assert plan.statements_generated == 4
+        assert plan.transitions[0].status == "DRY_RUN"
+
+
+class TestTransferPendingDebts:
+    """Test set-based debt transfer on close"""
+
+    @pytest.mark.asyncio
+    async def test_fixed_statement_count(self):
+        """Should use three statements regardless of the number of associates"""
+        debts = [
+            SimpleNamespace(user_id=i, associate_name=f"Asociado {i}", statements=2, debt_amount=Decimal("100.50"))
+            for i in range(1, 51)
+        ]
+        absorbed = [SimpleNamespace(associate_user_id=1)] * 3 + [SimpleNamespace(associate_user_id=2)]
+        closed = _result()
+        closed.rowcount = 100
+        db = AsyncMock()
+        db.execute.side_effect = [_result(rows=debts), _result(rows=absorbed), closed]
+
+        transfers = await CutEngine(db).transfer_pending_debts(9)
+
+        assert db.execute.await_count == 3
+        assert len(transfers) == 50
+        assert [t.payments_absorbed for t in transfers[:3]] == [3, 1, 0]
+        assert transfers[0].to_dict()["debt_amount"] == 100.5
+
+    @pytest.mark.asyncio
+    async def test_no_debts_only_closes_statements(self):
+        """Should skip the payments update when nothing is owed"""
+        closed = _result()
+        closed.rowcount = 4
+        db = AsyncMock()
+        db.execute.side_effect = [_result(rows=[]), closed]
+
+        transfers = await CutEngine(db).transfer_pending_debts(9)
+
+        assert transfers == []
+        assert db.execute.await_count == 2
+
+
+class TestPeriodTransition:
+    """Test transition description"""
+
+    def test_action_names_statuses(self):
+        """Should describe the transition with status names"""
+        t = PeriodTransition(
+            period_id=1, cut_code="Mar08-2026", from_status=PENDING, to_status=COLLECTING,
+            generate_statements=True, mark_settling=False, reason="",
+        )
+        assert "PENDING" in t.action and "COLLECTING" in t.action
@@ -0,0 +1,228 @@
+"""
+Unit Tests - Resumable cut (CutEngine.run_resumable / CutRunStore)
+"""
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.modules.cut_periods.application.services import (
+    CutEngine,
+    CutPlan,
+    CutRunInProgressError,
+    CutRunLeaseLostError,
+    CutRunStore,
+    PeriodTransition,
+)
+from app.modules.cut_periods.application.services.cut_engine import (
+    PENDING, CUTOFF, COLLECTING, SETTLING,
+)
+from app.modules.cut_periods.application.services.cut_runs import CutRun, PeriodCursor
+from app.modules.cut_periods import routes as cut_period_routes
+
+
+class FakeStore:
+    """In-memory CutRunStore that records every checkpoint"""
+
+    def __init__(self, cursors=None, resumed=False):
+        self.run = CutRun(1, date(2026, 3, 10), "test", resumed=resumed)
+        self.cursors = cursors or {}
+        self.checkpoints = []
+        self.finished = False
+        self.failed = None
+
+    async def claim(self, reference_date, triggered_by):
+        return self.run
+
+    async def register_periods(self, run, transitions):
+        for t in transitions:
+            self.cursors.setdefault(t.period_id, PeriodCursor(t.period_id))
+        return self.cursors
+
+    async def checkpoint(self, run, cursor, stage, last_associate_id=None, created=0):
+        self.checkpoints.append((cursor.period_id, stage, last_associate_id, created))
+        cursor.stage = stage
+        cursor.last_associate_id = max(cursor.last_associate_id, last_associate_id or 0)
+        cursor.statements_generated += created
+
+    async def finish(self, run):
+        self.finished = True
+
+    async def fail(self, run, error):
+        self.failed = error
+
+
+def _transition(period_id, from_status, to_status, generate=True, settle=False):
+    return PeriodTransition(
+        period_id=period_id, cut_code=f"P{period_id}", from_status=from_status,
+        to_status=to_status, generate_statements=generate, mark_settling=settle, reason="",
+    )
+
+
+def _engine(transitions, chunks=(), chunk_size=2):
+    db = AsyncMock()
+    engine = CutEngine(db, associate_chunk_size=chunk_size)
+    engine.plan = AsyncMock(return_value=CutPlan(reference_date=date(2026, 3, 10), transitions=transitions))
+    engine._set_status = AsyncMock()
+    engine.mark_settling = AsyncMock(return_value=0)
+    engine.generate_statements_chunk = AsyncMock(side_effect=list(chunks))
+    return engine, db
+
+
+class TestRunResumable:
+    """Test staged execution with checkpoints"""
+
+    @pytest.mark.asyncio
+    async def test_commits_each_stage_and_chunk(self):
+        """Should checkpoint and commit cutoff, every associate chunk and collecting"""
+        engine, db = _engine([_transition(9, PENDING, COLLECTING)], chunks=[(2, 14), (1, 20)])
+        store = FakeStore()
+
+        plan = await engine.run_resumable(date(2026, 3, 10), store=store)
+
+        assert [c[1] for c in store.checkpoints] == ["CUTOFF", "STATEMENTS", "STATEMENTS", "COLLECTING", "DONE"]
+        assert engine.generate_statements_chunk.await_args_list[1].args == (9, 14, 2)
+        # register + cutoff + 2 chunks + collecting
+        assert db.commit.await_count == 5
+        assert plan.run_id == 1 and plan.statements_generated == 3
+        assert plan.transitions[0].status == "APPLIED"
+        assert store.finished
+
+    @pytest.mark.asyncio
+    async def test_resume_continues_from_associate_cursor(self):
+        """Should skip finished periods and restart statements after the last associate"""
+        cursors = {
+            6: PeriodCursor(6, stage="DONE", statements_generated=4),
+            7: PeriodCursor(7, stage="STATEMENTS", last_associate_id=30, statements_generated=5),
+        }
+        engine, _ = _engine(
+            [_transition(6, COLLECTING, SETTLING, generate=False, settle=True),
+             _transition(7, CUTOFF, SETTLING, settle=True)],
+            chunks=[(1, 31)],
+        )
+        store = FakeStore(cursors, resumed=True)
+
+        plan = await engine.run_resumable(date(2026, 3, 10), store=store)
+
+        engine.generate_statements_chunk.assert_awaited_once_with(7, 30, 2)
+        engine.mark_settling.assert_awaited_once_with([7])
+        assert plan.resumed is True
+        assert [t.statements_generated for t in plan.transitions] == [4, 6]
+
+    @pytest.mark.asyncio
+    async def test_failure_marks_run_failed(self):
+        """Should roll back the open stage, record the error and re-raise"""
+        engine, db = _engine([_transition(9, CUTOFF, COLLECTING)], chunks=[RuntimeError("boom")])
+        store = FakeStore()
+
+        with pytest.raises(RuntimeError):
+            await engine.run_resumable(date(2026, 3, 10), store=store)
+
+        db.rollback.assert_awaited()
+        assert store.failed == "boom"
+        assert not store.finished
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_does_not_touch_run(self):
+        """Should leave the run to its new owner when the lease was taken over"""
+        engine, _ = _engine([_transition(9, PENDING, COLLECTING)])
+        store = FakeStore()
+        store.checkpoint = AsyncMock(side_effect=CutRunLeaseLostError(1))
+
+        with pytest.raises(CutRunLeaseLostError):
+            await engine.run_resumable(date(2026, 3, 10), store=store)
+
+        assert store.failed is None
+
+
+def _result(one=None, scalar=None):
+    result = MagicMock()
+    result.fetchone.return_value = one
+    result.scalar_one.return_value = scalar
+    return result
+
+
+class TestCutRunStore:
+    """Test run claiming and lease checks"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_running_run_blocks_claim(self):
+        """Should refuse to start while another run keeps its heartbeat"""
+        db = AsyncMock()
+        latest = SimpleNamespace(id=4, reference_date=date(2026, 3, 10), status="RUNNING", attempts=1, stale=False)
+        db.execute.side_effect = [_result(one=latest)]
+
+        with pytest.raises(CutRunInProgressError) as exc:
+            await CutRunStore(db).claim(date(2026, 3, 10))
+
+        assert exc.value.run_id == 4
+        db.commit.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_run_of_same_date_is_resumed(self):
+        """Should take over a failed run instead of creating a new one"""
+        db = AsyncMock()
+        latest = SimpleNamespace(id=4, reference_date=date(2026, 3, 10), status="FAILED", attempts=1, stale=True)
+        db.execute.side_effect = [_result(one=latest), _result(one=SimpleNamespace(attempts=2))]
+
+        run = await CutRunStore(db).claim(date(2026, 3, 10))
+
+        assert (run.id, run.attempts, run.resumed) == (4, 2, True)
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_completed_run_starts_new_one(self):
+        """Should insert a new run after a completed one"""
+        db = AsyncMock()
+        latest = SimpleNamespace(id=4, reference_date=date(2026, 3, 10), status="COMPLETED", attempts=1, stale=True)
+        db.execute.side_effect = [_result(one=latest), _result(scalar=5)]
+
+        run = await CutRunStore(db).claim(date(2026, 3, 10))
+
+        assert (run.id, run.resumed) == (5, False)
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_without_lease_raises(self):
+        """Should raise when the run no longer belongs to this owner"""
+        db = AsyncMock()
+        db.execute.side_effect = [_result(one=None)]
+        run = CutRun(4, date(2026, 3, 10), "me")
+
+        with pytest.raises(CutRunLeaseLostError):
+            await CutRunStore(db).checkpoint(run, PeriodCursor(9), "CUTOFF")
+
+
+class TestAdvancePeriodsRoute:
+    """Test that a manual cut refreshes the portfolio snapshots like the scheduled one"""
+
+    @pytest.fixture
+    def snapshot_job(self, monkeypatch):
+        job = AsyncMock(return_value={"status": "success"})
+        monkeypatch.setattr(cut_period_routes, "portfolio_snapshot_job", job)
+        monkeypatch.setattr(cut_period_routes.response_cache, "invalidate", AsyncMock())
+        return job
+
+    def _patch_engine(self, monkeypatch, transitions):
+        plan = CutPlan(reference_date=date(2026, 3, 10), transitions=transitions)
+        engine = MagicMock(run=AsyncMock(return_value=plan), run_resumable=AsyncMock(return_value=plan))
+        monkeypatch.setattr(cut_period_routes, "CutEngine", lambda db: engine)
+
+    @pytest.mark.asyncio
+    async def test_snapshots_transitioned_periods(self, monkeypatch, snapshot_job):
+        """Should snapshot every period the run moved"""
+        self._patch_engine(monkeypatch, [_transition(8, CUTOFF, SETTLING), _transition(9, PENDING, COLLECTING)])
+
+        response = await cut_period_routes.advance_periods(dry_run=False, db=AsyncMock())
+
+        snapshot_job.assert_awaited_once_with(period_ids=[8, 9])
+        assert response["portfolio_snapshot"] == {"status": "success"}
+
+    @pytest.mark.asyncio
+    async def test_dry_run_and_empty_runs_skip_snapshots(self, monkeypatch, snapshot_job):
+        """Should not snapshot on dry-run or when nothing changed"""
+        self._patch_engine(monkeypatch, [_transition(9, PENDING, COLLECTING)])
+        await cut_period_routes.advance_periods(dry_run=True, db=AsyncMock())
+        self._patch_engine(monkeypatch, [])
+        await cut_period_routes.advance_periods(dry_run=False, db=AsyncMock())
+
+        snapshot_job.assert_not_awaited()
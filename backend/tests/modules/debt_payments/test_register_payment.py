@@ -0,0 +1,69 @@
+"""
+Unit Tests - RegisterDebtPaymentUseCase (preview mode)
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from app.modules.debt_payments.application import RegisterDebtPaymentDTO, RegisterDebtPaymentUseCase
+
+
+def _dto(amount):
+    return RegisterDebtPaymentDTO(
+        associate_profile_id=5,
+        payment_amount=Decimal(amount),
+        payment_date=date(2026, 1, 15),
+        payment_method_id=1,
+    )
+
+
+def _repository(consolidated_debt=550.0, items=None):
+    repository = MagicMock()
+    repository.get_associate_debt_summary.return_value = {
+        "associate_name": "Juan Pérez",
+        "current_consolidated_debt": consolidated_debt,
+    }
+    repository.preview_allocation.return_value = items or []
+    return repository
+
+
+class TestRegisterDebtPaymentPreview:
+    """Test FIFO allocation preview"""
+
+    def test_preview_does_not_write(self):
+        """Should summarize the allocation without creating the payment"""
+        repository = _repository(items=[
+            {"breakdown_id": 10, "cut_period_id": 5, "original_amount": Decimal("300.00"),
+             "amount_applied": Decimal("300.00"), "liquidated": True},
+            {"breakdown_id": 11, "cut_period_id": 6, "original_amount": Decimal("250.00"),
+             "amount_applied": Decimal("100.00"), "liquidated": False,
+             "remaining_amount": Decimal("150.00")},
+        ])
+
+        preview = RegisterDebtPaymentUseCase(repository).preview(_dto("400.00"))
+
+        repository.create.assert_not_called()
+        repository.preview_allocation.assert_called_once_with(5, Decimal("400.00"))
+        assert preview.amount_applied == Decimal("400.00")
+        assert preview.unapplied_amount == Decimal("0")
+        assert (preview.total_items_liquidated, preview.total_items_partial) == (1, 1)
+
+    def test_preview_reports_unapplied_excess(self):
+        """Should report the part of the payment that exceeds the debt"""
+        repository = _repository(items=[
+            {"breakdown_id": 10, "cut_period_id": 5, "original_amount": Decimal("300.00"),
+             "amount_applied": Decimal("300.00"), "liquidated": True},
+        ])
+
+        preview = RegisterDebtPaymentUseCase(repository).preview(_dto("500.00"))
+
+        assert preview.unapplied_amount == Decimal("200.00")
+
+    def test_preview_without_debt(self):
+        """Should reject associates without pending debt"""
+        repository = _repository(consolidated_debt=0.0)
+
+        with pytest.raises(ValueError, match="no pending debt"):
+            RegisterDebtPaymentUseCase(repository).preview(_dto("100.00"))
+        repository.preview_allocation.assert_not_called()
@@ -0,0 +1,67 @@
+"""
+Unit Tests - Client document upload/download access (owner or staff only)
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.modules.documents import routes as document_routes
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = MagicMock()
+    storage.download_response = AsyncMock(return_value="streamed")
+    monkeypatch.setattr(document_routes, "get_storage", lambda: storage)
+    return storage
+
+
+@pytest.fixture
+def document(monkeypatch):
+    document = SimpleNamespace(user_id=5, file_path="ab/cd", original_file_name="ine.pdf", mime_type="application/pdf")
+    repository = MagicMock(find_by_id=AsyncMock(return_value=document))
+    monkeypatch.setattr(document_routes, "PgClientDocumentRepository", lambda db: repository)
+    return document
+
+
+class TestClientDocumentAccess:
+    """Test that client documents are only stored or served for their owner or staff"""
+
+    @pytest.mark.asyncio
+    async def test_upload_for_another_client_is_forbidden(self, storage):
+        """Should return 403 before storing anything when the user_id is someone else's"""
+        with pytest.raises(HTTPException) as exc:
+            await document_routes.upload_client_document(
+                user_id=5, document_type_id=1, comments=None, file=MagicMock(),
+                db=AsyncMock(), current_user_id=6, current_user_roles=["cliente"]
+            )
+
+        assert exc.value.status_code == 403
+        storage.save.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_download_of_another_clients_document_is_forbidden(self, storage, document):
+        """Should return 403 to other clients and associates"""
+        with pytest.raises(HTTPException) as exc:
+            await document_routes.download_client_document(
+                7, SimpleNamespace(headers={}), db=AsyncMock(), current_user_id=6, current_user_roles=["asociado"]
+            )
+
+        assert exc.value.status_code == 403
+        storage.download_response.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_owner_and_staff_can_download(self, storage, document):
+        """Should stream the document to the owning client and to staff"""
+        request = SimpleNamespace(headers={})
+
+        await document_routes.download_client_document(
+            7, request, db=AsyncMock(), current_user_id=5, current_user_roles=["cliente"]
+        )
+        await document_routes.download_client_document(
+            7, request, db=AsyncMock(), current_user_id=1, current_user_roles=["auxiliar_administrativo"]
+        )
+
+        assert storage.download_response.await_count == 2
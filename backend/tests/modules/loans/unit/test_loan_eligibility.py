@@ -0,0 +1,105 @@
+"""
+Unit Tests - LoanEligibilityEngine
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.modules.loans.application.services.eligibility import (
+    ASSOCIATE_NOT_FOUND,
+    CLIENT_DEFAULTER,
+    CLIENT_HAS_PENDING_LOANS,
+    INSUFFICIENT_CREDIT,
+    LOAN_NOT_FOUND,
+    LOAN_NOT_PENDING,
+    EligibilityCandidate,
+    LoanEligibilityEngine,
+    evaluate_row,
+)
+
+
+def _row(**overrides):
+    row = dict(
+        idx=1, loan_id=None, client_user_id=5, associate_user_id=10,
+        amount=Decimal("5000.00"), loan_status_id=None, associate_profile_id=3,
+        available_credit=Decimal("8000.00"), pending_loans=0, is_defaulter=False,
+        first_payment_date=date(2026, 3, 15),
+    )
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+class TestEvaluateRow:
+    """Test rule evaluation over one query row"""
+
+    def test_eligible_candidate(self):
+        """Should pass when credit is enough and the client is clean"""
+        result = evaluate_row(_row())
+
+        assert result.eligible
+        assert result.first_payment_date == date(2026, 3, 15)
+
+    def test_new_request_reports_rules_in_creation_order(self):
+        """Should list credit, pending and defaulter failures in creation order"""
+        result = evaluate_row(_row(available_credit=Decimal("100"), pending_loans=1, is_defaulter=True))
+
+        assert [r.code for r in result.reasons] == [INSUFFICIENT_CREDIT, CLIENT_HAS_PENDING_LOANS, CLIENT_DEFAULTER]
+        with pytest.raises(ValueError, match="no tiene crédito disponible"):
+            result.raise_if_ineligible()
+
+    def test_approval_uses_pre_approval_order_and_messages(self):
+        """Should check defaulter before pending loans and use approval wording"""
+        result = evaluate_row(_row(loan_id=7, loan_status_id=1, pending_loans=2, is_defaulter=True))
+
+        assert [r.code for r in result.reasons] == [CLIENT_DEFAULTER, CLIENT_HAS_PENDING_LOANS]
+        assert "No se puede aprobar" in result.reasons[0].message
+        assert "2 préstamos PENDING adicionales" in result.reasons[1].message
+
+    def test_missing_loan_and_associate(self):
+        """Should flag unknown loans, non-pending loans and users without associate profile"""
+        assert [r.code for r in evaluate_row(_row(loan_id=9, client_user_id=None)).reasons] == [LOAN_NOT_FOUND]
+
+        result = evaluate_row(_row(loan_id=9, loan_status_id=2, associate_profile_id=None, available_credit=None))
+        assert [r.code for r in result.reasons] == [LOAN_NOT_PENDING, ASSOCIATE_NOT_FOUND]
+
+    def test_missing_associate_keeps_credit_wording(self):
+        """Should report a user without associate profile with the insufficient-credit message"""
+        result = evaluate_row(_row(associate_profile_id=None, available_credit=None))
+
+        assert [r.code for r in result.reasons] == [ASSOCIATE_NOT_FOUND]
+        with pytest.raises(ValueError, match="El asociado 10 no tiene crédito disponible suficiente"):
+            result.raise_if_ineligible()
+
+
+class TestLoanEligibilityEngine:
+    """Test batching into a single query"""
+
+    @pytest.mark.asyncio
+    async def test_evaluates_all_candidates_in_one_query(self):
+        """Should send every candidate as arrays in one round-trip"""
+        session = AsyncMock()
+        result = MagicMock()
+        result.fetchall.return_value = [_row(idx=1), _row(idx=2, client_user_id=6, pending_loans=1)]
+        session.execute.return_value = result
+
+        results = await LoanEligibilityEngine(session).evaluate([
+            EligibilityCandidate(5, 10, Decimal("5000.00")),
+            EligibilityCandidate(6, 10, Decimal("5000.00")),
+        ], reference_date=date(2026, 3, 1))
+
+        session.execute.assert_awaited_once()
+        params = session.execute.await_args.args[1]
+        assert params["client_ids"] == [5, 6]
+        assert params["loan_ids"] == [None, None]
+        assert params["reference_date"] == date(2026, 3, 1)
+        assert [r.eligible for r in results] == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_skips_query(self):
+        """Should not touch the database for an empty list"""
+        session = AsyncMock()
+
+        assert await LoanEligibilityEngine(session).evaluate_loans([]) == []
+        session.execute.assert_not_awaited()
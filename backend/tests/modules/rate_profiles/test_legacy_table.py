@@ -0,0 +1,138 @@
+"""
+Unit Tests - In-memory legacy payment table
+"""
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.modules.rate_profiles.application import legacy_table
+from app.modules.rate_profiles.application.legacy_table import (
+    LegacyGrid,
+    LegacyGridCache,
+    LegacyGridEntry,
+    LegacyProfile,
+)
+from app.modules.rate_profiles.application.services import RateProfileService
+
+
+def _entry(amount, payment, associate_payment, term=12):
+    amount, payment, associate_payment = Decimal(amount), Decimal(payment), Decimal(associate_payment)
+    total = payment * term
+    return LegacyGridEntry(
+        amount=amount,
+        term_biweeks=term,
+        biweekly_payment=payment,
+        total_payment=total,
+        total_interest=total - amount,
+        effective_rate_percent=((total - amount) / amount * 100).quantize(Decimal("0.01")),
+        biweekly_rate_percent=((total - amount) / amount / term * 100).quantize(Decimal("0.001")),
+        commission_per_payment=payment - associate_payment,
+        total_commission=(payment - associate_payment) * term,
+        associate_biweekly_payment=associate_payment,
+        associate_total_payment=associate_payment * term,
+    )
+
+
+def _grid(enabled=True):
+    return LegacyGrid(
+        entries=(_entry("4000", "510.00", "441.00"), _entry("3000", "392.00", "340.00")),
+        profiles={"legacy": LegacyProfile(code="legacy", name="Tabla Histórica v2.0", enabled=enabled)},
+    )
+
+
+class TestLegacyGrid:
+    """Test lookups with the same semantics as calculate_loan_payment('legacy')"""
+
+    def test_quote_matches_sql_legacy_branch(self):
+        """Should return the precomputed row values and the derived commission rate"""
+        calc = _grid().quote("legacy", Decimal("3000"), 12)
+
+        assert calc.calculation_method == "table_lookup"
+        assert calc.profile_name == "Tabla Histórica v2.0"
+        assert calc.biweekly_payment == Decimal("392.00")
+        assert calc.total_payment == Decimal("4704.00")
+        assert calc.interest_rate_percent == Decimal("4.733")
+        assert calc.commission_rate_percent == Decimal("13.265")  # 52 / 392
+        assert (calc.commission_per_payment, calc.total_commission) == (Decimal("52.00"), Decimal("624.00"))
+        assert (calc.associate_payment, calc.associate_total) == (Decimal("340.00"), Decimal("4080.00"))
+
+    def test_exact_match_only_with_nearest_hint(self):
+        """Should round to cents like DECIMAL(12,2) and suggest the nearest amount on a miss"""
+        grid = _grid()
+
+        assert grid.get(Decimal("3000.004"), 12).amount == Decimal("3000")
+        assert grid.get(Decimal("3000"), 24) is None
+        assert grid.nearest_amount(Decimal("3600"), 12) == Decimal("4000")
+        assert grid.nearest_amount(Decimal("3500"), 12) == Decimal("3000")  # tie -> lower
+        with pytest.raises(ValueError, match=r"Monto 3600.00 .* plazo 12Q \(monto más cercano: 4000"):
+            grid.lookup(Decimal("3600"), 12)
+        with pytest.raises(ValueError, match="deshabilitado: legacy"):
+            _grid(enabled=False).quote("legacy", Decimal("3000"), 12)
+
+    def test_entries_sorted_and_read_only(self):
+        """Should expose entries ordered by amount and reject mutation"""
+        grid = _grid()
+
+        assert [e.amount for e in grid.entries] == [Decimal("3000"), Decimal("4000")]
+        with pytest.raises(TypeError):
+            grid.profiles["standard"] = None
+        with pytest.raises(AttributeError):
+            grid.entries = ()
+
+
+class TestLegacyGridCache:
+    """Test in-process caching and invalidation"""
+
+    def test_caches_only_while_listening(self, monkeypatch):
+        """Should reuse the grid while LISTEN is up and drop it on invalidate"""
+        loads = []
+        monkeypatch.setattr(legacy_table, "load_legacy_grid", lambda db: loads.append(db) or _grid())
+        live = [True]
+        cache = LegacyGridCache(is_live=lambda: live[0])
+
+        first = cache.get("db")
+        assert cache.get("db") is first
+        cache.invalidate()
+        assert cache.get("db") is not first
+        live[0] = False
+        cache.get("db")
+        cache.get("db")
+
+        assert len(loads) == 4
+
+    def test_non_legacy_profile_skips_grid_without_listen(self, monkeypatch):
+        """Should only check the profile type, not read legacy_payment_table, while LISTEN is down"""
+        loads = []
+        monkeypatch.setattr(legacy_table, "load_legacy_grid", lambda db: loads.append(db) or _grid())
+        monkeypatch.setattr(
+            "app.modules.rate_profiles.application.services.legacy_grid_cache",
+            LegacyGridCache(is_live=lambda: False),
+        )
+        db = MagicMock()
+        db.execute.return_value.scalar.return_value = False
+        db.execute.return_value.fetchone.return_value = None
+
+        with pytest.raises(ValueError, match="standard"):
+            RateProfileService(db).calculate_loan(Decimal("4000"), 12, "standard")
+        with pytest.raises(ValueError, match="custom"):
+            RateProfileService(db).calculate_loan(Decimal("4000"), 12, "custom", Decimal("4.25"), Decimal("1.6"))
+
+        assert loads == []
+        # profile-type EXISTS + calculate_loan_payment; custom skips the type check
+        assert db.execute.call_count == 3
+
+    def test_service_serves_legacy_quotes_without_queries(self, monkeypatch):
+        """Should answer legacy quotes from the grid without touching the session"""
+        cache = LegacyGridCache(is_live=lambda: True)
+        monkeypatch.setattr(legacy_table, "load_legacy_grid", lambda db: _grid())
+        monkeypatch.setattr("app.modules.rate_profiles.application.services.legacy_grid_cache", cache)
+        cache.get(None)
+        db = MagicMock()
+
+        calc = RateProfileService(db).calculate_loan(Decimal("4000"), 12, "legacy")
+        compared = RateProfileService(db).compare_profiles(Decimal("3600"), 12, ["legacy"])
+
+        assert calc.biweekly_payment == Decimal("510.00")
+        assert compared == []
+        db.execute.assert_not_called()
@@ -0,0 +1,81 @@
+"""
+Unit Tests - rate_profile_reference_table regeneration
+"""
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.modules.rate_profiles.application.reference_table import (
+    ReferenceTableRegenerator,
+    formula_grid,
+    legacy_grid,
+)
+
+
+class TestFormulaGrid:
+    """Test Decimal-exact parity with calculate_loan_payment()"""
+
+    def test_matches_sql_function_values(self):
+        """Should reproduce the SQL function including its intermediate rounding"""
+        rows = formula_grid(
+            "standard", Decimal("4.250"), Decimal("1.600"),
+            amounts=[Decimal("3000.00"), Decimal("7000.00"), Decimal("22000.00")], terms=[9, 21, 36],
+        )
+        by_key = {(r.amount, r.term_biweeks): r for r in rows}
+
+        # Values returned by calculate_loan_payment(amount, term, 'standard')
+        expected = {
+            (Decimal("22000.00"), 21): ("1982.62", "41635.00", "352.00", "1630.62", "34243.02"),
+            (Decimal("7000.00"), 9): ("1075.28", "9677.50", "112.00", "963.28", "8669.52"),
+            (Decimal("3000.00"), 36): ("210.83", "7590.00", "48.00", "162.83", "5861.88"),
+        }
+        for key, values in expected.items():
+            row = by_key[key]
+            assert (
+                row.biweekly_payment, row.total_payment, row.commission_per_payment,
+                row.associate_payment, row.associate_total,
+            ) == tuple(Decimal(v) for v in values)
+
+    def test_grid_is_cross_product(self):
+        """Should produce one row per amount and term, ordered by term then amount"""
+        rows = formula_grid("premium", Decimal("4.5"), Decimal("12"), [Decimal("1000"), Decimal("2000")], [3, 6, 12])
+
+        assert len(rows) == 6
+        assert [(r.term_biweeks, r.amount) for r in rows[:2]] == [(3, Decimal("1000")), (3, Decimal("2000"))]
+        assert all(r.total_commission == r.commission_per_payment * r.term_biweeks for r in rows)
+
+
+class TestLegacyGrid:
+    """Test the table_lookup profile copy"""
+
+    def test_copies_legacy_payment_table(self):
+        """Should derive totals and commission rate like migrations 018/020"""
+        legacy = SimpleNamespace(
+            amount=Decimal("8000.00"), term_biweeks=12, biweekly_payment=Decimal("1006.00"),
+            total_payment=Decimal("12072.00"), commission_per_payment=Decimal("128.00"),
+            associate_biweekly_payment=Decimal("878.00"), associate_total_payment=Decimal("10536.00"),
+            biweekly_rate_percent=Decimal("4.242"),
+        )
+
+        row = legacy_grid("legacy", [legacy])[0]
+
+        assert row.total_commission == Decimal("1536.00")
+        assert row.associate_total == Decimal("10536.00")
+        assert row.commission_rate_percent == Decimal("12.724")
+
+
+class TestRegenerator:
+    """Test profile selection before writing"""
+
+    def test_unknown_profile_raises_before_writing(self):
+        """Should refuse to delete rows of a profile it cannot rebuild"""
+        db = MagicMock()
+        db.execute.return_value.fetchall.return_value = []
+
+        with pytest.raises(ValueError, match="no encontrado"):
+            ReferenceTableRegenerator(db).regenerate("custom")
+
+        statements = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert not any("DELETE" in s for s in statements)
@@ -0,0 +1,185 @@
+"""
+Unit Tests - Printable statement rendering and content-versioned cache
+"""
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.storage import DocumentStorage, LocalStorageBackend
+from app.modules.statements.application import rendering
+from app.modules.statements.application.render_statements import StatementRenderService, document_filename
+from app.modules.statements.application.rendering import render_batch, render_html, render_text
+from app.modules.statements.presentation.routes import download_statement_document
+
+
+def _doc(statement_id=1, **overrides):
+    doc = dict(
+        statement_id=statement_id, statement_number=f"ST-Feb23-2026-000{statement_id}",
+        associate_name="María <Cruz> Escobedo", cut_period_code="Feb23-2026",
+        period_start_date=date(2026, 2, 8), period_end_date=date(2026, 2, 22), print_date=date(2026, 2, 23),
+        due_date=date(2026, 3, 7), status_name="COLLECTING", total_payments_count=1,
+        total_amount_collected=Decimal("3765.00"), commission_rate_applied=Decimal("12.75"),
+        commission_earned=Decimal("480.00"), total_to_credicuenta=Decimal("3285.00"),
+        paid_amount=Decimal("1000.00"), late_fee_amount=Decimal("0.00"),
+        payments=[dict(
+            loan_id=14, payment_number=2, client_name="Martha Paez", payment_due_date=date(2026, 2, 28),
+            expected_amount=Decimal("3765.00"), commission_amount=Decimal("480.00"),
+            associate_payment=Decimal("3285.00"), amount_paid=Decimal("0"), status="PENDING",
+        )],
+        statement_payments=[dict(
+            payment_date=date(2026, 2, 25), payment_amount=Decimal("1000.00"),
+            payment_method="EFECTIVO", payment_reference=None,
+        )],
+    )
+    doc.update(overrides)
+    return doc
+
+
+class FakeRenderRepository:
+    """In-memory stand-in for PgStatementRenderRepository"""
+
+    def __init__(self, docs, versions, owners=None):
+        self.docs = {d["statement_id"]: d for d in docs}
+        self.versions = versions
+        self.owners = owners or {}
+        self.renders = {}
+        self.loaded = []
+
+    async def get_statement_owner(self, statement_id):
+        return self.owners.get(statement_id)
+
+    async def get_content_versions(self, renderer_version, period_id=None, statement_ids=None):
+        return {k: v for k, v in self.versions.items() if statement_ids is None or k in statement_ids}
+
+    async def get_renders(self, statement_ids):
+        return {k: v for k, v in self.renders.items() if k[0] in statement_ids}
+
+    async def load_documents(self, statement_ids):
+        self.loaded.append(list(statement_ids))
+        return [self.docs[i] for i in statement_ids]
+
+    async def save_renders(self, rows):
+        for row in rows:
+            self.renders[(row["statement_id"], row["format"])] = row
+
+    async def list_documents(self, fmt, period_id=None, statement_ids=None):
+        return [
+            {**self.docs[sid], "storage_key": row["storage_key"], "size_bytes": row["size_bytes"]}
+            for (sid, f), row in sorted(self.renders.items())
+            if f == fmt and (statement_ids is None or sid in statement_ids)
+        ]
+
+
+class TestRenderers:
+    """Test the pure HTML and plain-text templates"""
+
+    def test_html_escapes_and_shows_totals(self):
+        """Should escape user data and print the remaining balance"""
+        html = render_html(_doc()).decode()
+
+        assert "María &lt;Cruz&gt; Escobedo" in html
+        assert "<Cruz>" not in html
+        assert "$2,285.00" in html  # 3285 - 1000 + 0
+        assert "23/02/2026" in html
+
+    def test_text_lists_payments_and_abonos(self):
+        """Should render fixed-width lines for payments and abonos"""
+        text = render_text(_doc(statement_payments=[])).decode()
+
+        assert "ST-Feb23-2026-0001" in text
+        assert "$3,765.00" in text
+        assert "Sin abonos registrados" in text
+
+    def test_batch_renders_every_format(self):
+        """Should return one dict per document with all formats"""
+        outputs = render_batch([_doc(1), _doc(2)])
+
+        assert [sorted(o) for o in outputs] == [["html", "txt"], ["html", "txt"]]
+        assert document_filename("ST-Feb23-2026-0001", "María Cruz", "txt") == "ST_Feb23_2026_0001_Maria_Cruz.txt"
+
+
+class TestStatementRenderService:
+    """Test that only statements whose content version changed are re-rendered"""
+
+    @pytest.fixture(autouse=True)
+    def no_process_pool(self, monkeypatch):
+        monkeypatch.setattr(rendering.settings, "statement_render_workers", 0)
+
+    @pytest.mark.asyncio
+    async def test_serves_cache_until_version_changes(self, tmp_path):
+        """Should render everything once, then only the statement with a new version"""
+        repository = FakeRenderRepository([_doc(1), _doc(2)], {1: "v1", 2: "v1"})
+        service = StatementRenderService(repository, DocumentStorage(LocalStorageBackend(tmp_path), max_size=1024 * 1024))
+
+        first = await service.render_period(51)
+        second = await service.render_period(51)
+        repository.versions[2] = "v2"
+        third = await service.render_period(51)
+
+        assert (first.rendered, first.cached) == (2, 0)
+        assert (second.rendered, second.cached) == (0, 2)
+        assert (third.rendered, third.cached) == (1, 1)
+        assert repository.loaded == [[1, 2], [2]]
+        assert repository.renders[(2, "html")]["content_version"] == "v2"
+
+    @pytest.mark.asyncio
+    async def test_get_document_and_zip_entries(self, tmp_path):
+        """Should render on demand and stream stored files into zip members"""
+        repository = FakeRenderRepository([_doc(1)], {1: "v1"})
+        storage = DocumentStorage(LocalStorageBackend(tmp_path), max_size=1024 * 1024)
+        service = StatementRenderService(repository, storage)
+
+        document = await service.get_document(1, "txt")
+        entries = [
+            (name, b"".join([c async for c in chunks]))
+            async for name, chunks in service.iter_zip_entries(await service.period_zip_entries(51, "txt"), "txt")
+        ]
+
+        assert document.media_type == "text/plain"
+        assert (tmp_path / document.storage_key).read_bytes() == render_text(_doc(1))
+        assert entries == [("Feb23-2026/" + document.filename, render_text(_doc(1)))]
+        assert await service.get_document(99, "txt") is None
+
+
+class TestDownloadStatementDocument:
+    """Test that the printable statement is only served to staff or its owner"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(rendering.settings, "statement_render_workers", 0)
+        repository = FakeRenderRepository([_doc(1)], {1: "v1"}, owners={1: 90})
+        return StatementRenderService(repository, DocumentStorage(LocalStorageBackend(tmp_path), max_size=1024 * 1024))
+
+    async def _download(self, service, user_id, roles, statement_id=1):
+        request = SimpleNamespace(headers={})
+        user = SimpleNamespace(id=user_id, roles=roles)
+        return await download_statement_document(statement_id, request, "txt", AsyncMock(), service, user)
+
+    @pytest.mark.asyncio
+    async def test_owner_and_staff_can_download(self, service):
+        """Should serve the document to the owning associate and to staff"""
+        owner = await self._download(service, 90, ["asociado"])
+        staff = await self._download(service, 1, ["auxiliar_administrativo"])
+
+        assert owner.status_code == staff.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_other_associate_is_forbidden(self, service):
+        """Should return 403 before rendering another associate's statement"""
+        with pytest.raises(HTTPException) as exc:
+            await self._download(service, 91, ["asociado"])
+
+        assert exc.value.status_code == 403
+        assert service.repository.loaded == []
+
+    @pytest.mark.asyncio
+    async def test_unknown_statement_is_not_found(self, service):
+        """Should return 404 when the statement does not exist"""
+        with pytest.raises(HTTPException) as exc:
+            await self._download(service, 1, ["administrador"], statement_id=99)
+
+        assert exc.value.status_code == 404
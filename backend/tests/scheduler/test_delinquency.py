@@ -0,0 +1,96 @@
+"""
+Unit Tests - DelinquencyEngine (nightly delinquency job)
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.scheduler.delinquency import DelinquencyEngine
+
+
+def _result(rows):
+    result = MagicMock()
+    result.fetchall.return_value = rows
+    return result
+
+
+def _aging_row(loan_id, b1=0, b2=0, b3=0, b4=0):
+    return SimpleNamespace(
+        loan_id=loan_id,
+        amount_1_15=Decimal(b1),
+        amount_16_30=Decimal(b2),
+        amount_31_60=Decimal(b3),
+        amount_60_plus=Decimal(b4),
+    )
+
+
+def _db():
+    db = AsyncMock()
+    db.execute.side_effect = [
+        # flag_late_payments
+        _result([SimpleNamespace(is_late=True)] * 3 + [SimpleNamespace(is_late=False)]),
+        # apply_late_fees
+        _result([SimpleNamespace(late_fee_amount=Decimal("45.00")),
+                 SimpleNamespace(late_fee_amount=Decimal("30.50"))]),
+        # snapshot_aging: DELETE + INSERT ... RETURNING
+        _result([]),
+        _result([
+            _aging_row(10, b1="100.00"),
+            _aging_row(11, b4="250.00"),
+            _aging_row(None, b1="100.00", b4="250.00"),
+            _aging_row(12, b2="80.00"),
+            _aging_row(None, b2="80.00"),
+        ]),
+    ]
+    return db
+
+
+class TestDelinquencyEngine:
+    """Test set-based delinquency passes"""
+
+    @pytest.mark.asyncio
+    async def test_run_builds_report(self):
+        """Should aggregate the RETURNING rows with a fixed number of statements"""
+        db = _db()
+
+        report = await DelinquencyEngine(db).run(date(2026, 3, 1))
+
+        assert db.execute.await_count == 4
+        db.commit.assert_awaited_once()
+        assert (report.payments_flagged, report.payments_cleared) == (3, 1)
+        assert report.late_fees_applied == 2
+        assert report.late_fees_total == Decimal("75.50")
+        assert (report.loans_overdue, report.associates_overdue) == (3, 2)
+        assert report.aging == {
+            "1_15": Decimal("100.00"),
+            "16_30": Decimal("80.00"),
+            "31_60": Decimal("0"),
+            "60_plus": Decimal("250.00"),
+        }
+        assert report.total_overdue == Decimal("430.00")
+
+    @pytest.mark.asyncio
+    async def test_dry_run_rolls_back(self):
+        """Should compute the same summary without committing"""
+        db = _db()
+
+        report = await DelinquencyEngine(db).run(date(2026, 3, 1), dry_run=True)
+
+        db.commit.assert_not_awaited()
+        db.rollback.assert_awaited_once()
+        assert report.to_dict()["dry_run"] is True
+        assert report.to_dict()["total_overdue"] == 430.0
+
+    @pytest.mark.asyncio
+    async def test_error_rolls_back(self):
+        """Should roll back and propagate database errors"""
+        db = AsyncMock()
+        db.execute.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await DelinquencyEngine(db).run(date(2026, 3, 1))
+
+        db.rollback.assert_awaited_once()
+        db.commit.assert_not_awaited()
@@ -0,0 +1,90 @@
+"""
+Unit Tests - PortfolioSnapshotEngine (per-period portfolio snapshots)
+"""
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.scheduler.portfolio_snapshots import PortfolioSnapshotEngine
+
+
+def _result(rows):
+    result = MagicMock()
+    result.fetchall.return_value = rows
+    return result
+
+
+def _associate_row(loans, expected, collected, commission, outstanding, overdue):
+    return SimpleNamespace(
+        loans_count=loans,
+        expected_amount=Decimal(expected),
+        collected_amount=Decimal(collected),
+        commission_amount=Decimal(commission),
+        outstanding_amount=Decimal(outstanding),
+        overdue_amount=Decimal(overdue),
+    )
+
+
+def _db():
+    db = AsyncMock()
+    db.execute.side_effect = [
+        # prepare: partitions + period codes, DELETE x2
+        _result([SimpleNamespace(cut_code="Feb23-2026"), SimpleNamespace(cut_code="Mar08-2026")]),
+        _result([]),
+        _result([]),
+        # snapshot_loans: INSERT ... SELECT
+        _result([]),
+        # snapshot_associates: INSERT ... SELECT ... RETURNING
+        _result([
+            _associate_row(3, "1500.00", "1000.00", "180.00", "9000.00", "250.00"),
+            _associate_row(2, "800.00", "800.00", "96.00", "4000.00", "0"),
+        ]),
+    ]
+    return db
+
+
+class TestPortfolioSnapshotEngine:
+    """Test set-based portfolio snapshot passes"""
+
+    @pytest.mark.asyncio
+    async def test_run_builds_report(self):
+        """Should rewrite all periods with a fixed number of statements and sum the associate rows"""
+        db = _db()
+
+        report = await PortfolioSnapshotEngine(db).run([52, 51, 52])
+
+        assert db.execute.await_count == 5
+        assert db.execute.await_args_list[0].args[1] == {"period_ids": [51, 52]}
+        db.commit.assert_awaited_once()
+        assert report.periods == ["Feb23-2026", "Mar08-2026"]
+        assert (report.loans, report.associates) == (5, 2)
+        assert report.totals == {
+            "expected": Decimal("2300.00"),
+            "collected": Decimal("1800.00"),
+            "commission": Decimal("276.00"),
+            "outstanding": Decimal("13000.00"),
+            "overdue": Decimal("250.00"),
+        }
+
+    @pytest.mark.asyncio
+    async def test_dry_run_rolls_back(self):
+        """Should compute the same summary without committing"""
+        db = _db()
+
+        report = await PortfolioSnapshotEngine(db).run([51, 52], dry_run=True)
+
+        db.commit.assert_not_awaited()
+        db.rollback.assert_awaited_once()
+        assert report.to_dict()["totals"]["outstanding"] == 13000.0
+
+    @pytest.mark.asyncio
+    async def test_no_periods_is_a_no_op(self):
+        """Should not touch the database when there is nothing to snapshot"""
+        db = AsyncMock()
+
+        report = await PortfolioSnapshotEngine(db).run([])
+
+        db.execute.assert_not_awaited()
+        db.commit.assert_not_awaited()
+        assert report.periods == []
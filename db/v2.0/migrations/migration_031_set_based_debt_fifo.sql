@@ -0,0 +1,340 @@
+-- =============================================================================
+-- Migration 031: FIFO de abonos a deuda set-based (totales acumulados)
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - apply_excess_to_debt_fifo y apply_debt_payment_v2 recorren la deuda fila
+--   por fila en un LOOP PL/pgSQL: un UPDATE por item, un SUM completo para
+--   recalcular la deuda y, por cada is_liquidated que cambia, una ejecución de
+--   trigger_update_associate_credit_on_debt_payment.
+-- - Asociados con historial largo de deuda registran abonos en tiempo lineal.
+-- - Ambas funciones seguían usando columnas renombradas
+--   (debt_balance → consolidated_debt, liquidated_at → liquidation_date,
+--   liquidation_reference → liquidation_notes).
+--
+-- SOLUCIÓN:
+-- 1. Índices parciales FIFO (solo deuda viva) para el orden created_at, id
+-- 2. Asignación FIFO con SUM(...) OVER (ORDER BY created_at, id):
+--    - un UPDATE para los items liquidados completamente
+--    - un UPDATE para el (único) item parcial
+--    - un solo ajuste de consolidated_debt en associate_profiles
+-- 3. trigger_update_associate_credit_on_debt_payment pasa a ser FOR EACH
+--    STATEMENT con tablas de transición (un UPDATE agregado por sentencia).
+--    Las funciones FIFO ya hacen su propio ajuste, así que lo desactivan
+--    mientras corren (credinet.fifo_credit_adjusted).
+--
+-- Firmas y tipos de retorno sin cambios.
+-- =============================================================================
+
+-- 1. ÍNDICES FIFO
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_debt_breakdown_fifo
+    ON associate_debt_breakdown (associate_profile_id, created_at, id)
+    WHERE is_liquidated = false;
+
+CREATE INDEX IF NOT EXISTS idx_accumulated_balances_fifo
+    ON associate_accumulated_balances (user_id, created_at, id)
+    WHERE accumulated_debt > 0;
+
+
+-- 2. FUNCIÓN: apply_excess_to_debt_fifo
+-- =============================================================================
+CREATE OR REPLACE FUNCTION apply_excess_to_debt_fifo(
+    p_associate_profile_id INTEGER,
+    p_excess_amount DECIMAL,
+    p_payment_reference VARCHAR
+)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_liquidated_count INTEGER := 0;
+    v_liquidated_amount DECIMAL(12,2) := 0;
+    v_partial_amount DECIMAL(12,2);
+BEGIN
+    IF p_excess_amount IS NULL OR p_excess_amount <= 0 THEN
+        RETURN;
+    END IF;
+
+    -- El ajuste de consolidated_debt se hace una sola vez al final
+    PERFORM set_config('credinet.fifo_credit_adjusted', 'on', true);
+
+    -- Items cubiertos completamente: total acumulado <= excedente
+    WITH fifo AS (
+        SELECT
+            id,
+            SUM(amount) OVER (ORDER BY created_at, id) AS running_total
+        FROM associate_debt_breakdown
+        WHERE associate_profile_id = p_associate_profile_id
+          AND is_liquidated = false
+    ),
+    liquidated AS (
+        UPDATE associate_debt_breakdown adb
+        SET
+            is_liquidated = true,
+            liquidation_date = CURRENT_TIMESTAMP,
+            liquidation_notes = p_payment_reference,
+            updated_at = CURRENT_TIMESTAMP
+        FROM fifo
+        WHERE adb.id = fifo.id
+          AND fifo.running_total <= p_excess_amount
+        RETURNING adb.amount
+    )
+    SELECT COUNT(*), COALESCE(SUM(amount), 0)
+    INTO v_liquidated_count, v_liquidated_amount
+    FROM liquidated;
+
+    -- Item parcial: el siguiente en la fila absorbe el sobrante
+    IF p_excess_amount > v_liquidated_amount THEN
+        WITH next_item AS (
+            SELECT id
+            FROM associate_debt_breakdown
+            WHERE associate_profile_id = p_associate_profile_id
+              AND is_liquidated = false
+            ORDER BY created_at, id
+            LIMIT 1
+        )
+        UPDATE associate_debt_breakdown adb
+        SET
+            amount = adb.amount - (p_excess_amount - v_liquidated_amount),
+            updated_at = CURRENT_TIMESTAMP
+        FROM next_item
+        WHERE adb.id = next_item.id
+          AND adb.amount > p_excess_amount - v_liquidated_amount
+        RETURNING p_excess_amount - v_liquidated_amount INTO v_partial_amount;
+    END IF;
+
+    v_partial_amount := COALESCE(v_partial_amount, 0);
+
+    -- Un solo ajuste de deuda del asociado
+    UPDATE associate_profiles
+    SET
+        consolidated_debt = GREATEST(consolidated_debt - (v_liquidated_amount + v_partial_amount), 0),
+        credit_last_updated = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = p_associate_profile_id;
+
+    PERFORM set_config('credinet.fifo_credit_adjusted', '', true);
+
+    RAISE NOTICE 'Excedente aplicado: % (% items liquidados, parcial: %, sobrante: %)',
+                 v_liquidated_amount + v_partial_amount, v_liquidated_count, v_partial_amount,
+                 p_excess_amount - v_liquidated_amount - v_partial_amount;
+END;
+$$;
+
+COMMENT ON FUNCTION apply_excess_to_debt_fifo(INTEGER, DECIMAL, VARCHAR) IS '⭐ v2.0.5: Aplica excedente de pago a deuda (associate_debt_breakdown) en FIFO con totales acumulados: un UPDATE de items liquidados, uno del item parcial y un ajuste de consolidated_debt.';
+
+
+-- 3. FUNCIÓN: apply_debt_payment_v2
+-- =============================================================================
+CREATE OR REPLACE FUNCTION apply_debt_payment_v2(
+    p_associate_profile_id INTEGER,
+    p_payment_amount DECIMAL,
+    p_payment_method_id INTEGER,
+    p_payment_reference VARCHAR,
+    p_registered_by INTEGER,
+    p_notes TEXT DEFAULT NULL
+)
+RETURNS TABLE(
+    payment_id INTEGER,
+    amount_applied DECIMAL,
+    remaining_debt DECIMAL,
+    applied_items JSONB,
+    credit_released DECIMAL
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_id INTEGER;
+    v_debt_before DECIMAL(12,2);
+    v_debt_after DECIMAL(12,2);
+    v_applied_items JSONB;
+    v_total_applied DECIMAL(12,2);
+    v_remaining_amount DECIMAL(12,2);
+    v_payment_id INTEGER;
+BEGIN
+    -- Validaciones iniciales
+    IF p_payment_amount <= 0 THEN
+        RAISE EXCEPTION 'El monto del abono debe ser mayor a 0';
+    END IF;
+
+    SELECT ap.user_id, ap.consolidated_debt
+    INTO v_user_id, v_debt_before
+    FROM associate_profiles ap WHERE ap.id = p_associate_profile_id;
+
+    IF v_user_id IS NULL THEN
+        RAISE EXCEPTION 'Perfil de asociado % no encontrado', p_associate_profile_id;
+    END IF;
+
+    -- ⭐ Asignación FIFO en una sola lectura: cada balance recibe
+    -- LEAST(deuda, abono - deuda de los balances anteriores)
+    WITH fifo AS (
+        SELECT
+            aab.id,
+            aab.cut_period_id,
+            cp.cut_code,
+            aab.accumulated_debt,
+            SUM(aab.accumulated_debt) OVER (ORDER BY aab.created_at, aab.id) AS running_total
+        FROM associate_accumulated_balances aab
+        JOIN cut_periods cp ON cp.id = aab.cut_period_id
+        WHERE aab.user_id = v_user_id
+          AND aab.accumulated_debt > 0
+    ),
+    allocation AS (
+        SELECT
+            fifo.*,
+            LEAST(accumulated_debt, p_payment_amount - (running_total - accumulated_debt)) AS to_apply
+        FROM fifo
+        WHERE running_total - accumulated_debt < p_payment_amount
+    )
+    SELECT
+        COALESCE(jsonb_agg(jsonb_build_object(
+            'accumulated_balance_id', id,
+            'cut_period_id', cut_period_id,
+            'period_code', cut_code,
+            'original_debt', accumulated_debt,
+            'amount_applied', to_apply,
+            'remaining_debt', CASE WHEN to_apply = accumulated_debt THEN 0 ELSE accumulated_debt - to_apply END,
+            'fully_liquidated', to_apply = accumulated_debt
+        ) ORDER BY running_total), '[]'::jsonb),
+        COALESCE(SUM(to_apply), 0)
+    INTO v_applied_items, v_total_applied
+    FROM allocation;
+
+    IF v_total_applied = 0 THEN
+        RAISE EXCEPTION 'No se encontró deuda pendiente (sin convenio) para aplicar el abono. Use el sistema de convenios para pagos a convenios.';
+    END IF;
+
+    v_remaining_amount := p_payment_amount - v_total_applied;
+
+    -- Balances liquidados completamente
+    UPDATE associate_accumulated_balances aab
+    SET
+        accumulated_debt = 0,
+        updated_at = CURRENT_TIMESTAMP
+    FROM jsonb_to_recordset(v_applied_items) AS item(accumulated_balance_id INTEGER, fully_liquidated BOOLEAN)
+    WHERE aab.id = item.accumulated_balance_id
+      AND item.fully_liquidated;
+
+    -- Balance parcial (a lo sumo uno)
+    UPDATE associate_accumulated_balances aab
+    SET
+        accumulated_debt = aab.accumulated_debt - item.amount_applied,
+        updated_at = CURRENT_TIMESTAMP
+    FROM jsonb_to_recordset(v_applied_items) AS item(accumulated_balance_id INTEGER, amount_applied DECIMAL, fully_liquidated BOOLEAN)
+    WHERE aab.id = item.accumulated_balance_id
+      AND NOT item.fully_liquidated;
+
+    -- Insertar registro de pago
+    INSERT INTO associate_debt_payments (
+        associate_profile_id,
+        payment_amount,
+        payment_date,
+        payment_method_id,
+        payment_reference,
+        registered_by,
+        applied_breakdown_items,
+        notes
+    ) VALUES (
+        p_associate_profile_id,
+        v_total_applied,
+        CURRENT_DATE,
+        p_payment_method_id,
+        p_payment_reference,
+        p_registered_by,
+        v_applied_items,
+        CASE
+            WHEN v_remaining_amount > 0 THEN
+                COALESCE(p_notes, '') || ' [Sobrante no aplicado: ' || v_remaining_amount || ']'
+            ELSE p_notes
+        END
+    )
+    RETURNING id INTO v_payment_id;
+
+    -- Un solo ajuste de deuda (available_credit se recalcula solo)
+    UPDATE associate_profiles
+    SET
+        consolidated_debt = GREATEST(0, consolidated_debt - v_total_applied),
+        credit_last_updated = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = p_associate_profile_id
+    RETURNING consolidated_debt INTO v_debt_after;
+
+    RETURN QUERY SELECT
+        v_payment_id,
+        v_total_applied,
+        v_debt_after,
+        v_applied_items,
+        v_debt_before - v_debt_after;
+END;
+$$;
+
+COMMENT ON FUNCTION apply_debt_payment_v2(INTEGER, DECIMAL, INTEGER, VARCHAR, INTEGER, TEXT) IS '⭐ v2.0.5: Abono a deuda acumulada (associate_accumulated_balances) con FIFO por totales acumulados. Número fijo de sentencias sin importar cuántos períodos con deuda tenga el asociado.';
+
+
+-- 4. TRIGGER: ajuste de crédito por sentencia
+-- =============================================================================
+CREATE OR REPLACE FUNCTION trigger_update_associate_credit_on_debt_payment()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Las funciones FIFO hacen su propio ajuste (una sola vez)
+    IF current_setting('credinet.fifo_credit_adjusted', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE associate_profiles ap
+    SET
+        consolidated_debt = GREATEST(ap.consolidated_debt - liq.amount, 0),
+        credit_last_updated = CURRENT_TIMESTAMP
+    FROM (
+        SELECT n.associate_profile_id, SUM(n.amount) AS amount
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE n.is_liquidated = true
+          AND o.is_liquidated = false
+        GROUP BY n.associate_profile_id
+    ) liq
+    WHERE ap.id = liq.associate_profile_id;
+
+    RETURN NULL;
+END;
+$$;
+
+-- Solo se reemplaza donde el trigger ya existía
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'trigger_update_associate_credit_on_debt_payment'
+          AND tgrelid = 'associate_debt_breakdown'::regclass
+    ) THEN
+        DROP TRIGGER trigger_update_associate_credit_on_debt_payment ON associate_debt_breakdown;
+
+        CREATE TRIGGER trigger_update_associate_credit_on_debt_payment
+            AFTER UPDATE ON associate_debt_breakdown
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION trigger_update_associate_credit_on_debt_payment();
+
+        COMMENT ON TRIGGER trigger_update_associate_credit_on_debt_payment ON associate_debt_breakdown IS
+        '⭐ MIGRACIÓN 031: Decrementa consolidated_debt una vez por sentencia con los items liquidados.';
+
+        RAISE NOTICE '✅ trigger_update_associate_credit_on_debt_payment ahora es FOR EACH STATEMENT';
+    END IF;
+END;
+$$;
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+BEGIN
+    IF pg_get_functiondef('apply_excess_to_debt_fifo(integer, numeric, character varying)'::regprocedure) LIKE '%LOOP%' THEN
+        RAISE EXCEPTION 'apply_excess_to_debt_fifo sigue usando LOOP';
+    END IF;
+    RAISE NOTICE '✅ FIFO set-based instalado (apply_excess_to_debt_fifo, apply_debt_payment_v2)';
+END;
+$$;
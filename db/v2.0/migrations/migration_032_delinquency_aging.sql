@@ -0,0 +1,61 @@
+-- =============================================================================
+-- Migration 032: Antigüedad de cartera vencida (delinquency_aging)
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - El estado de vencido de los pagos se recalcula al vuelo
+--   (payment_due_date < hoy en el dashboard) y payments.is_late no lo
+--   actualiza nadie en bloque.
+-- - No existe una vista histórica de la antigüedad de la cartera vencida.
+--
+-- SOLUCIÓN:
+-- Tabla delinquency_aging que llena el job nocturno de morosidad
+-- (app/scheduler/delinquency.py). Una foto por fecha de corte:
+-- - una fila por préstamo con pagos vencidos (loan_id NOT NULL)
+-- - una fila de total por asociado (loan_id NULL)
+-- Montos por rango de días de atraso: 1-15, 16-30, 31-60 y más de 60.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS delinquency_aging (
+    id SERIAL PRIMARY KEY,
+    as_of_date DATE NOT NULL,
+    associate_user_id INTEGER NOT NULL REFERENCES users(id),
+    loan_id INTEGER REFERENCES loans(id),
+    overdue_payments INTEGER NOT NULL DEFAULT 0,
+    max_days_overdue INTEGER NOT NULL DEFAULT 0,
+    amount_1_15 DECIMAL(12,2) NOT NULL DEFAULT 0,
+    amount_16_30 DECIMAL(12,2) NOT NULL DEFAULT 0,
+    amount_31_60 DECIMAL(12,2) NOT NULL DEFAULT 0,
+    amount_60_plus DECIMAL(12,2) NOT NULL DEFAULT 0,
+    total_overdue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Una fila por (fecha, asociado, préstamo); el total del asociado usa loan_id NULL
+CREATE UNIQUE INDEX IF NOT EXISTS uq_delinquency_aging_snapshot
+    ON delinquency_aging (as_of_date, associate_user_id, COALESCE(loan_id, 0));
+
+CREATE INDEX IF NOT EXISTS idx_delinquency_aging_loan
+    ON delinquency_aging (loan_id, as_of_date DESC)
+    WHERE loan_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_delinquency_aging_associate_totals
+    ON delinquency_aging (associate_user_id, as_of_date DESC)
+    WHERE loan_id IS NULL;
+
+COMMENT ON TABLE delinquency_aging IS '⭐ v2.0.5: Antigüedad de cartera vencida por préstamo y asociado (loan_id NULL = total del asociado). La llena el job nocturno de morosidad.';
+COMMENT ON COLUMN delinquency_aging.as_of_date IS 'Fecha de referencia de la foto (días de atraso = as_of_date - payment_due_date).';
+COMMENT ON COLUMN delinquency_aging.amount_60_plus IS 'Saldo vencido con más de 60 días de atraso.';
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+BEGIN
+    IF to_regclass('delinquency_aging') IS NULL THEN
+        RAISE EXCEPTION 'No se creó delinquency_aging';
+    END IF;
+    RAISE NOTICE '✅ Tabla delinquency_aging lista';
+END;
+$$;
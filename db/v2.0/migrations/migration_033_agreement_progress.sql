@@ -0,0 +1,110 @@
+-- =============================================================================
+-- Migration 033: Avance de pagos denormalizado en agreements
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - GET /agreements calcula total_paid y payments_made con dos subconsultas
+--   correlacionadas sobre agreement_payments por cada convenio, y el total
+--   se obtiene envolviendo toda esa consulta en SELECT COUNT(*).
+-- - El detalle y los convenios por asociado vuelven a sumar los mismos pagos.
+--
+-- SOLUCIÓN:
+-- 1. Columnas de avance en agreements:
+--    total_paid, payments_made, next_due_date, remaining_balance
+-- 2. refresh_agreement_progress(agreement_id): recalcula las cuatro columnas
+--    desde agreement_payments en un solo UPDATE. El backend la llama en la
+--    misma transacción que crea el convenio, registra un pago o lo cancela.
+-- 3. Índices (filtro, id DESC) para la paginación keyset del listado.
+-- 4. Backfill de los convenios existentes.
+-- =============================================================================
+
+-- 1. COLUMNAS
+-- =============================================================================
+ALTER TABLE agreements
+    ADD COLUMN IF NOT EXISTS total_paid DECIMAL(12,2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS payments_made INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS next_due_date DATE,
+    ADD COLUMN IF NOT EXISTS remaining_balance DECIMAL(12,2) NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN agreements.total_paid IS '⭐ v2.0.5: Suma de agreement_payments PAID (mantenida por refresh_agreement_progress).';
+COMMENT ON COLUMN agreements.payments_made IS '⭐ v2.0.5: Número de agreement_payments PAID.';
+COMMENT ON COLUMN agreements.next_due_date IS '⭐ v2.0.5: Vencimiento del siguiente pago pendiente (NULL si no quedan).';
+COMMENT ON COLUMN agreements.remaining_balance IS '⭐ v2.0.5: Suma de agreement_payments pendientes (0 en convenios completados o cancelados).';
+
+
+-- 2. FUNCIÓN DE RECÁLCULO
+-- =============================================================================
+CREATE OR REPLACE FUNCTION refresh_agreement_progress(p_agreement_id INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE agreements ag
+    SET total_paid = p.total_paid,
+        payments_made = p.payments_made,
+        next_due_date = p.next_due_date,
+        remaining_balance = p.remaining_balance
+    FROM (
+        SELECT
+            COALESCE(SUM(payment_amount) FILTER (WHERE status = 'PAID'), 0) AS total_paid,
+            COUNT(*) FILTER (WHERE status = 'PAID') AS payments_made,
+            MIN(payment_due_date) FILTER (WHERE status IN ('PENDING', 'OVERDUE')) AS next_due_date,
+            COALESCE(SUM(payment_amount) FILTER (WHERE status IN ('PENDING', 'OVERDUE')), 0) AS remaining_balance
+        FROM agreement_payments
+        WHERE agreement_id = p_agreement_id
+    ) p
+    WHERE ag.id = p_agreement_id;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION refresh_agreement_progress(INTEGER) IS
+'⭐ v2.0.5: Recalcula total_paid, payments_made, next_due_date y remaining_balance de un convenio desde agreement_payments.';
+
+
+-- 3. ÍNDICES KEYSET (ORDER BY id DESC)
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_agreements_status_keyset
+    ON agreements (status, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_agreements_associate_keyset
+    ON agreements (associate_profile_id, id DESC);
+
+
+-- 4. BACKFILL
+-- =============================================================================
+UPDATE agreements ag
+SET total_paid = p.total_paid,
+    payments_made = p.payments_made,
+    next_due_date = p.next_due_date,
+    remaining_balance = p.remaining_balance
+FROM (
+    SELECT
+        agreement_id,
+        COALESCE(SUM(payment_amount) FILTER (WHERE status = 'PAID'), 0) AS total_paid,
+        COUNT(*) FILTER (WHERE status = 'PAID') AS payments_made,
+        MIN(payment_due_date) FILTER (WHERE status IN ('PENDING', 'OVERDUE')) AS next_due_date,
+        COALESCE(SUM(payment_amount) FILTER (WHERE status IN ('PENDING', 'OVERDUE')), 0) AS remaining_balance
+    FROM agreement_payments
+    GROUP BY agreement_id
+) p
+WHERE ag.id = p.agreement_id;
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+DECLARE
+    v_mismatches INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_mismatches
+    FROM agreements ag
+    WHERE ag.payments_made <> (
+        SELECT COUNT(*) FROM agreement_payments ap
+        WHERE ap.agreement_id = ag.id AND ap.status = 'PAID'
+    );
+
+    IF v_mismatches > 0 THEN
+        RAISE EXCEPTION 'Backfill incompleto: % convenios con payments_made distinto', v_mismatches;
+    END IF;
+    RAISE NOTICE '✅ Avance de convenios denormalizado';
+END;
+$$;
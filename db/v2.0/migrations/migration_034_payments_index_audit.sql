@@ -0,0 +1,124 @@
+-- =============================================================================
+-- Migration 034: Auditoría de índices de payments (menos escritura por UPDATE)
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - payments es la tabla con más UPDATEs (marcado de pagos, generación de
+--   cronogramas, cierre de periodos, job de morosidad) y cargaba 12 índices,
+--   casi todos de una sola columna. Cada INSERT y cada UPDATE no-HOT escribe
+--   una entrada en cada uno (además del trigger de auditoría).
+-- - Con el benchmark (40 asociados × 25 clientes × 2 años, ~30k pagos) y
+--   scripts/maintenance/index_advisor.py:
+--     idx_payments_balance_remaining, idx_payments_expected_amount,
+--     idx_payments_payment_number, idx_payments_due_date_status_expected,
+--     idx_payments_late_loan, idx_payments_is_late → 0 escaneos
+--     idx_payments_loan_id → cubierto por (loan_id, payment_number)
+--     idx_payments_cut_period_id → los cierres filtran además por status_id
+--
+-- SOLUCIÓN (12 → 5 índices):
+-- 1. UNIQUE (loan_id, payment_number) completo en lugar del parcial
+--    "WHERE payment_number IS NOT NULL": misma semántica (los NULL no chocan)
+--    y ahora sirve todas las búsquedas por loan_id.
+-- 2. (cut_period_id, status_id): cierre de periodo, statements y preview.
+-- 3. Parcial de pagos abiertos (status_id, payment_due_date): pendientes por
+--    estado y vencimientos (dashboard, job de morosidad). Los pagos cobrados
+--    salen del índice y dejan de pagar su mantenimiento.
+-- 4. Parcial WHERE is_late (loan_id): antigüedad de cartera.
+--
+-- BENCHMARK (misma base de ~30k pagos, antes → después):
+--   Tamaño de índices de payments ........... 10144 kB → 2328 kB
+--   UPDATE de 5000 pagos PENDING → PAID ..... 2539 ms → 2182 ms (mediana de 5,
+--                                              incluye triggers de auditoría)
+--   dashboard_stats (p50) .................... 62.5 ms → 44.3 ms
+--   preview de corte (EXPLAIN ANALYZE) ....... 3.6 ms → 2.0 ms
+--   El resto de escenarios de `python -m benchmarks` sin cambio apreciable.
+--
+-- Para repetir el análisis sobre otra base:
+--   python scripts/maintenance/index_advisor.py --table payments \
+--       --source backend/app db/v2.0/modules db/v2.0/migrations
+-- =============================================================================
+
+-- 1. UNIQUE COMPLETO (loan_id, payment_number)
+-- =============================================================================
+-- 02_core_tables.sql crea un índice NO único con este mismo nombre; con
+-- IF NOT EXISTS el UNIQUE no se crearía. Se borra solo si no es único para
+-- que repetir la migración no reconstruya el índice.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_index
+        WHERE indexrelid = to_regclass('idx_payments_loan_payment_number')
+          AND NOT indisunique
+    ) THEN
+        DROP INDEX idx_payments_loan_payment_number;
+    END IF;
+END;
+$$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_payments_loan_payment_number
+    ON payments (loan_id, payment_number);
+
+DROP INDEX IF EXISTS idx_payments_loan_number_unique;
+DROP INDEX IF EXISTS idx_payments_loan_id;
+
+
+-- 2. CORTE: (cut_period_id, status_id)
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_payments_cut_period_status
+    ON payments (cut_period_id, status_id);
+
+DROP INDEX IF EXISTS idx_payments_cut_period_id;
+
+
+-- 3. PAGOS ABIERTOS (PENDING, DUE_TODAY, OVERDUE, PARTIAL, IN_COLLECTION, RESCHEDULED)
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_payments_open_due
+    ON payments (status_id, payment_due_date)
+    WHERE status_id IN (1, 2, 4, 5, 6, 7);
+
+DROP INDEX IF EXISTS idx_payments_status_id;
+DROP INDEX IF EXISTS idx_payments_payment_due_date;
+DROP INDEX IF EXISTS idx_payments_due_date_status_expected;
+
+
+-- 4. PAGOS ATRASADOS
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_payments_late
+    ON payments (loan_id)
+    WHERE is_late;
+
+DROP INDEX IF EXISTS idx_payments_is_late;
+DROP INDEX IF EXISTS idx_payments_late_loan;
+
+
+-- 5. SIN USO
+-- =============================================================================
+DROP INDEX IF EXISTS idx_payments_balance_remaining;
+DROP INDEX IF EXISTS idx_payments_expected_amount;
+DROP INDEX IF EXISTS idx_payments_payment_number;
+
+ANALYZE payments;
+
+COMMENT ON INDEX idx_payments_loan_payment_number IS '⭐ v2.0.5: Un número de pago por préstamo; también sirve búsquedas por loan_id.';
+COMMENT ON INDEX idx_payments_open_due IS '⭐ v2.0.5: Solo pagos abiertos (status 1, 2, 4, 5, 6, 7). Mantener en sync con OPEN_PAYMENT_STATUSES.';
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+DECLARE
+    v_indexes INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_indexes FROM pg_indexes WHERE tablename = 'payments';
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_index
+        WHERE indexrelid = to_regclass('idx_payments_loan_payment_number')
+          AND indisunique
+          AND indpred IS NULL
+    ) THEN
+        RAISE EXCEPTION 'Falta el UNIQUE (loan_id, payment_number)';
+    END IF;
+    RAISE NOTICE '✅ payments con % índices', v_indexes;
+END;
+$$;
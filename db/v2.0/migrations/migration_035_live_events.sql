@@ -0,0 +1,224 @@
+-- =============================================================================
+-- Migration 035: Eventos en vivo vía LISTEN/NOTIFY
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - El frontend hace polling de /dashboard/stats, del preview de corte y del
+--   historial de notificaciones para enterarse de pagos, aprobaciones y
+--   cortes. Cada consulta vuelve a correr los agregados pesados aunque no
+--   haya cambiado nada, y en días de cobranza el polling domina la carga.
+--
+-- SOLUCIÓN:
+-- 1. publish_live_event(tipo, datos): pg_notify en el canal 'credinet_events'
+--    con un JSON pequeño {"type": ..., "data": {...}}. Postgres entrega la
+--    notificación solo al confirmar la transacción (un rollback no avisa).
+-- 2. Triggers FOR EACH STATEMENT con tablas de transición: un UPDATE masivo
+--    (cierre de periodo, job de morosidad) genera UNA notificación con el
+--    conteo y los ids afectados, no una por fila:
+--      payment.registered  payments con amount_paid mayor o que pasan a PAID
+--      statement.paid      statements con paid_amount mayor
+--      loan.approved       loans que pasan de PENDING a ACTIVE
+--      period.advanced     cut_periods que cambian de estado
+--      notification        cada INSERT en system_events
+-- 3. El backend escucha con una sola conexión por proceso
+--    (app/core/events.py) y reenvía los eventos por SSE:
+--    GET /api/v1/notifications/stream
+--
+-- Las listas de ids se recortan a 100 elementos y "periods" a 50 objetos
+-- (el payload de NOTIFY tiene un límite de 8000 bytes); "count" siempre trae
+-- el total.
+-- =============================================================================
+
+-- 1. PUBLICACIÓN
+-- =============================================================================
+CREATE OR REPLACE FUNCTION publish_live_event(p_type TEXT, p_data JSONB)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM pg_notify(
+        'credinet_events',
+        jsonb_build_object('type', p_type, 'data', p_data)::text
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION publish_live_event(TEXT, JSONB) IS
+'⭐ v2.0.5: Publica un evento en vivo (canal credinet_events) para el stream SSE del backend.';
+
+
+-- 2. PAGOS REGISTRADOS
+-- =============================================================================
+CREATE OR REPLACE FUNCTION notify_payments_registered()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_data JSONB;
+BEGIN
+    SELECT jsonb_build_object(
+        'count', COUNT(*),
+        'payment_ids', (array_agg(n.id ORDER BY n.id))[1:100],
+        'loan_ids', (array_agg(DISTINCT n.loan_id))[1:100],
+        'cut_period_ids', COALESCE((array_agg(DISTINCT n.cut_period_id) FILTER (WHERE n.cut_period_id IS NOT NULL))[1:100], '{}')
+    )
+    INTO v_data
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE COALESCE(n.amount_paid, 0) > COALESCE(o.amount_paid, 0)
+       OR (n.status_id = 3 AND o.status_id IS DISTINCT FROM 3);
+
+    IF (v_data->>'count')::INTEGER > 0 THEN
+        PERFORM publish_live_event('payment.registered', v_data);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_live_payments_registered ON payments;
+CREATE TRIGGER trigger_live_payments_registered
+    AFTER UPDATE ON payments
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_payments_registered();
+
+
+-- 3. STATEMENTS PAGADOS
+-- =============================================================================
+CREATE OR REPLACE FUNCTION notify_statements_paid()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_data JSONB;
+BEGIN
+    SELECT jsonb_build_object(
+        'count', COUNT(*),
+        'statement_ids', (array_agg(n.id ORDER BY n.id))[1:100],
+        'associate_user_ids', (array_agg(DISTINCT n.user_id))[1:100],
+        'cut_period_ids', (array_agg(DISTINCT n.cut_period_id))[1:100]
+    )
+    INTO v_data
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE COALESCE(n.paid_amount, 0) > COALESCE(o.paid_amount, 0);
+
+    IF (v_data->>'count')::INTEGER > 0 THEN
+        PERFORM publish_live_event('statement.paid', v_data);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_live_statements_paid ON associate_payment_statements;
+CREATE TRIGGER trigger_live_statements_paid
+    AFTER UPDATE ON associate_payment_statements
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_statements_paid();
+
+
+-- 4. PRÉSTAMOS APROBADOS (PENDING → ACTIVE)
+-- =============================================================================
+CREATE OR REPLACE FUNCTION notify_loans_approved()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_data JSONB;
+BEGIN
+    SELECT jsonb_build_object(
+        'count', COUNT(*),
+        'loan_ids', (array_agg(n.id ORDER BY n.id))[1:100],
+        'associate_user_ids', COALESCE(array_agg(DISTINCT n.associate_user_id) FILTER (WHERE n.associate_user_id IS NOT NULL), '{}')
+    )
+    INTO v_data
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE n.status_id = 2
+      AND o.status_id = 1;
+
+    IF (v_data->>'count')::INTEGER > 0 THEN
+        PERFORM publish_live_event('loan.approved', v_data);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_live_loans_approved ON loans;
+CREATE TRIGGER trigger_live_loans_approved
+    AFTER UPDATE ON loans
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_loans_approved();
+
+
+-- 5. AVANCE DE PERIODOS
+-- =============================================================================
+CREATE OR REPLACE FUNCTION notify_periods_advanced()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_data JSONB;
+BEGIN
+    SELECT jsonb_build_object(
+        'count', COUNT(*),
+        'periods', COALESCE(jsonb_path_query_array(jsonb_agg(jsonb_build_object(
+            'id', n.id,
+            'cut_code', n.cut_code,
+            'from_status_id', o.status_id,
+            'status_id', n.status_id
+        ) ORDER BY n.id), '$[0 to 49]'), '[]')
+    )
+    INTO v_data
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE n.status_id IS DISTINCT FROM o.status_id;
+
+    IF (v_data->>'count')::INTEGER > 0 THEN
+        PERFORM publish_live_event('period.advanced', v_data);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_live_periods_advanced ON cut_periods;
+CREATE TRIGGER trigger_live_periods_advanced
+    AFTER UPDATE ON cut_periods
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_periods_advanced();
+
+
+-- 6. NOTIFICACIONES (system_events)
+-- =============================================================================
+CREATE OR REPLACE FUNCTION notify_system_event()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM publish_live_event('notification', jsonb_build_object(
+        'id', NEW.id,
+        'event_type', NEW.event_type,
+        'title', NEW.title,
+        'level', NEW.level,
+        'entity_type', NEW.entity_type,
+        'entity_id', NEW.entity_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_live_system_events ON system_events;
+CREATE TRIGGER trigger_live_system_events
+    AFTER INSERT ON system_events
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_system_event();
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+DECLARE
+    v_triggers INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_triggers
+    FROM pg_trigger
+    WHERE tgname LIKE 'trigger_live_%' AND NOT tgisinternal;
+
+    IF v_triggers <> 5 THEN
+        RAISE EXCEPTION 'Se esperaban 5 triggers de eventos en vivo, hay %', v_triggers;
+    END IF;
+    RAISE NOTICE '✅ Eventos en vivo publicados en el canal credinet_events';
+END;
+$$;
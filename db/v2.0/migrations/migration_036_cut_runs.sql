@@ -0,0 +1,84 @@
+-- =============================================================================
+-- Migration 036: Progreso del corte automático (cut_runs)
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - El corte (job de las 00:05 y POST /scheduler/run-cut-now) generaba los
+--   statements de un lote de períodos en una sola transacción: un error
+--   deshacía todo y los locks se mantenían durante toda la generación.
+-- - No quedaba registro de qué períodos/asociados ya estaban procesados;
+--   la única recuperación era volver a correr todo.
+--
+-- SOLUCIÓN:
+-- - cut_runs: una fila por corrida con su estado, dueño y heartbeat. Un
+--   índice único parcial garantiza una sola corrida RUNNING (varios workers
+--   con su propio scheduler no cortan dos veces).
+-- - cut_run_periods: avance por período (etapa y cursor del último asociado
+--   con statement generado). Cada etapa y cada bloque de asociados se
+--   confirma por separado junto con su checkpoint.
+-- - Una corrida FAILED o RUNNING sin heartbeat reciente se retoma: se vuelve
+--   a planear desde el estado de la BD y los statements continúan desde el
+--   cursor de cada período.
+--
+-- Etapas de cut_run_periods.stage:
+--   PLANNED → CUTOFF → STATEMENTS → COLLECTING → DONE
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS cut_runs (
+    id SERIAL PRIMARY KEY,
+    reference_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'RUNNING'
+        CHECK (status IN ('RUNNING', 'COMPLETED', 'FAILED')),
+    triggered_by VARCHAR(50) NOT NULL DEFAULT 'scheduler',
+    owner VARCHAR(100) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    periods_total INTEGER NOT NULL DEFAULT 0,
+    periods_done INTEGER NOT NULL DEFAULT 0,
+    statements_generated INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    heartbeat_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Una sola corrida activa a la vez
+CREATE UNIQUE INDEX IF NOT EXISTS uq_cut_runs_running
+    ON cut_runs ((true))
+    WHERE status = 'RUNNING';
+
+CREATE INDEX IF NOT EXISTS idx_cut_runs_started
+    ON cut_runs (started_at DESC);
+
+CREATE TABLE IF NOT EXISTS cut_run_periods (
+    run_id INTEGER NOT NULL REFERENCES cut_runs(id) ON DELETE CASCADE,
+    period_id INTEGER NOT NULL REFERENCES cut_periods(id),
+    cut_code VARCHAR(20),
+    from_status_id INTEGER NOT NULL,
+    to_status_id INTEGER NOT NULL,
+    stage VARCHAR(20) NOT NULL DEFAULT 'PLANNED'
+        CHECK (stage IN ('PLANNED', 'CUTOFF', 'STATEMENTS', 'COLLECTING', 'DONE')),
+    -- Checkpoint de statements: asociados con id <= last_associate_id ya tienen el suyo
+    last_associate_id INTEGER NOT NULL DEFAULT 0,
+    statements_generated INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, period_id)
+);
+
+COMMENT ON TABLE cut_runs IS
+'Corridas del corte automático (CutEngine.run_resumable). Una sola RUNNING; las FAILED o sin heartbeat se retoman.';
+COMMENT ON TABLE cut_run_periods IS
+'Avance por período de cada corrida: etapa confirmada y cursor de asociados para statements.';
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+BEGIN
+    IF to_regclass('public.cut_run_periods') IS NULL
+       OR to_regclass('public.uq_cut_runs_running') IS NULL THEN
+        RAISE EXCEPTION 'Migración 036 incompleta';
+    END IF;
+    RAISE NOTICE '✅ cut_runs / cut_run_periods listos';
+END;
+$$;
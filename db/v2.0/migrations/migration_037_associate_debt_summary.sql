@@ -0,0 +1,387 @@
+-- =============================================================================
+-- Migration 037: Resumen de deuda por asociado mantenido incrementalmente
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - GET /associates/{id}/debt-summary lee v_associate_real_debt_summary, que
+--   une associate_profiles con dos GROUP BY sobre TODA la tabla
+--   associate_accumulated_balances y TODA associate_debt_payments: consultar
+--   un solo asociado agrega la cartera completa.
+-- - /debt-history vuelve a sumar accumulated_debt en Python con floats.
+--
+-- SOLUCIÓN:
+-- 1. Tabla associate_debt_summary: una fila por asociado con deuda total,
+--    períodos con deuda, fechas de la deuda más antigua/reciente, total
+--    abonado a deuda, número de abonos y fecha del último abono.
+-- 2. Triggers FOR EACH STATEMENT con tablas de transición (mismo patrón que
+--    la migración 031) sobre associate_accumulated_balances y
+--    associate_debt_payments. Así la mantienen todas las rutas de escritura:
+--    cierre de período (CutEngine.transfer_pending_debts), abonos
+--    (apply_debt_payment_v2), pagos de convenio y registro de abonos.
+--    - Montos y contadores: se aplica el delta de la sentencia (new - old)
+--    - Fechas de deuda: primer/último registro con deuda del asociado por
+--      idx_accumulated_balances_fifo (no recorre la cartera)
+--    - Abonos modificados/borrados (raro): se recalcula solo ese asociado
+-- 3. v_associate_real_debt_summary se redefine sobre la tabla (mismas
+--    columnas) para los lectores que aún la usen.
+-- 4. refresh_associate_debt_summary(NULL) reconstruye todo (carga inicial o
+--    verificación); con ids solo esos asociados.
+-- =============================================================================
+
+-- 1. TABLA
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS associate_debt_summary (
+    associate_profile_id INTEGER PRIMARY KEY REFERENCES associate_profiles(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL UNIQUE,
+    total_debt NUMERIC(14,2) NOT NULL DEFAULT 0,
+    periods_with_debt INTEGER NOT NULL DEFAULT 0,
+    oldest_debt_date TIMESTAMP WITH TIME ZONE,
+    newest_debt_date TIMESTAMP WITH TIME ZONE,
+    total_paid_to_debt NUMERIC(14,2) NOT NULL DEFAULT 0,
+    total_payments_count INTEGER NOT NULL DEFAULT 0,
+    last_payment_date DATE,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE associate_debt_summary IS
+'⭐ MIGRACIÓN 037: Resumen de deuda por asociado, mantenido por triggers de associate_accumulated_balances y associate_debt_payments.';
+
+
+-- 2. RECÁLCULO POR ASOCIADO
+-- =============================================================================
+CREATE OR REPLACE FUNCTION refresh_associate_debt_summary(p_associate_profile_ids INTEGER[] DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    INSERT INTO associate_debt_summary AS s (
+        associate_profile_id, user_id,
+        total_debt, periods_with_debt, oldest_debt_date, newest_debt_date,
+        total_paid_to_debt, total_payments_count, last_payment_date, updated_at
+    )
+    SELECT
+        ap.id, ap.user_id,
+        COALESCE(b.total_debt, 0), b.periods_with_debt, b.oldest_debt_date, b.newest_debt_date,
+        COALESCE(p.total_paid, 0), p.payments_count, p.last_payment_date, NOW()
+    FROM associate_profiles ap
+    CROSS JOIN LATERAL (
+        SELECT SUM(aab.accumulated_debt) AS total_debt,
+               COUNT(*) AS periods_with_debt,
+               MIN(aab.created_at) AS oldest_debt_date,
+               MAX(aab.created_at) AS newest_debt_date
+        FROM associate_accumulated_balances aab
+        WHERE aab.user_id = ap.user_id
+          AND aab.accumulated_debt > 0
+    ) b
+    CROSS JOIN LATERAL (
+        SELECT SUM(adp.payment_amount) AS total_paid,
+               COUNT(*) AS payments_count,
+               MAX(adp.payment_date) AS last_payment_date
+        FROM associate_debt_payments adp
+        WHERE adp.associate_profile_id = ap.id
+    ) p
+    WHERE p_associate_profile_ids IS NULL OR ap.id = ANY(p_associate_profile_ids)
+    ON CONFLICT (associate_profile_id) DO UPDATE
+    SET user_id = EXCLUDED.user_id,
+        total_debt = EXCLUDED.total_debt,
+        periods_with_debt = EXCLUDED.periods_with_debt,
+        oldest_debt_date = EXCLUDED.oldest_debt_date,
+        newest_debt_date = EXCLUDED.newest_debt_date,
+        total_paid_to_debt = EXCLUDED.total_paid_to_debt,
+        total_payments_count = EXCLUDED.total_payments_count,
+        last_payment_date = EXCLUDED.last_payment_date,
+        updated_at = NOW();
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+COMMENT ON FUNCTION refresh_associate_debt_summary(INTEGER[]) IS
+'⭐ MIGRACIÓN 037: Recalcula associate_debt_summary de los asociados indicados (NULL = todos).';
+
+
+-- 3. DELTAS
+-- =============================================================================
+-- Deuda: p_debt / p_periods son el cambio neto por usuario (solo filas con
+-- deuda > 0 cuentan, igual que la vista original).
+CREATE OR REPLACE FUNCTION debt_summary_apply_balance_delta(
+    p_user_ids INTEGER[],
+    p_debt NUMERIC[],
+    p_periods INTEGER[]
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_missing INTEGER[];
+BEGIN
+    UPDATE associate_debt_summary s
+    SET total_debt = s.total_debt + d.debt,
+        periods_with_debt = s.periods_with_debt + d.periods,
+        oldest_debt_date = (
+            SELECT aab.created_at FROM associate_accumulated_balances aab
+            WHERE aab.user_id = s.user_id AND aab.accumulated_debt > 0
+            ORDER BY aab.created_at, aab.id
+            LIMIT 1
+        ),
+        newest_debt_date = (
+            SELECT aab.created_at FROM associate_accumulated_balances aab
+            WHERE aab.user_id = s.user_id AND aab.accumulated_debt > 0
+            ORDER BY aab.created_at DESC, aab.id DESC
+            LIMIT 1
+        ),
+        updated_at = NOW()
+    FROM unnest(p_user_ids, p_debt, p_periods) AS d(user_id, debt, periods)
+    WHERE s.user_id = d.user_id;
+
+    -- Asociados sin fila todavía: recálculo completo (ya incluye la sentencia)
+    SELECT array_agg(ap.id) INTO v_missing
+    FROM associate_profiles ap
+    WHERE ap.user_id = ANY(p_user_ids)
+      AND NOT EXISTS (SELECT 1 FROM associate_debt_summary s WHERE s.associate_profile_id = ap.id);
+
+    IF v_missing IS NOT NULL THEN
+        PERFORM refresh_associate_debt_summary(v_missing);
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION debt_summary_apply_payment_delta(
+    p_associate_profile_ids INTEGER[],
+    p_amount NUMERIC[],
+    p_count INTEGER[],
+    p_last_date DATE[]
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_missing INTEGER[];
+BEGIN
+    UPDATE associate_debt_summary s
+    SET total_paid_to_debt = s.total_paid_to_debt + d.amount,
+        total_payments_count = s.total_payments_count + d.payments,
+        last_payment_date = GREATEST(s.last_payment_date, d.last_date),
+        updated_at = NOW()
+    FROM unnest(p_associate_profile_ids, p_amount, p_count, p_last_date)
+         AS d(associate_profile_id, amount, payments, last_date)
+    WHERE s.associate_profile_id = d.associate_profile_id;
+
+    SELECT array_agg(id) INTO v_missing
+    FROM unnest(p_associate_profile_ids) AS id
+    WHERE NOT EXISTS (SELECT 1 FROM associate_debt_summary s WHERE s.associate_profile_id = id);
+
+    IF v_missing IS NOT NULL THEN
+        PERFORM refresh_associate_debt_summary(v_missing);
+    END IF;
+END;
+$$;
+
+
+-- 4. TRIGGERS
+-- =============================================================================
+-- Las tablas de transición no admiten varios eventos por trigger: una función
+-- por tabla que distingue TG_OP, y un trigger por evento.
+CREATE OR REPLACE FUNCTION trigger_debt_summary_balances()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user_ids INTEGER[];
+    v_debt NUMERIC[];
+    v_periods INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(user_id), array_agg(debt), array_agg(periods)
+        INTO v_user_ids, v_debt, v_periods
+        FROM (
+            SELECT user_id,
+                   SUM(GREATEST(accumulated_debt, 0)) AS debt,
+                   COUNT(*) FILTER (WHERE accumulated_debt > 0)::INTEGER AS periods
+            FROM new_rows
+            GROUP BY user_id
+        ) d;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(user_id), array_agg(debt), array_agg(periods)
+        INTO v_user_ids, v_debt, v_periods
+        FROM (
+            SELECT user_id, SUM(debt) AS debt, SUM(periods)::INTEGER AS periods
+            FROM (
+                SELECT user_id, GREATEST(accumulated_debt, 0) AS debt,
+                       (accumulated_debt > 0)::INTEGER AS periods
+                FROM new_rows
+                UNION ALL
+                SELECT user_id, -GREATEST(accumulated_debt, 0),
+                       -(accumulated_debt > 0)::INTEGER
+                FROM old_rows
+            ) changes
+            GROUP BY user_id
+        ) d;
+    ELSE
+        SELECT array_agg(user_id), array_agg(debt), array_agg(periods)
+        INTO v_user_ids, v_debt, v_periods
+        FROM (
+            SELECT user_id,
+                   -SUM(GREATEST(accumulated_debt, 0)) AS debt,
+                   -(COUNT(*) FILTER (WHERE accumulated_debt > 0))::INTEGER AS periods
+            FROM old_rows
+            GROUP BY user_id
+        ) d;
+    END IF;
+
+    IF v_user_ids IS NOT NULL THEN
+        PERFORM debt_summary_apply_balance_delta(v_user_ids, v_debt, v_periods);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION trigger_debt_summary_payments()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_ids INTEGER[];
+    v_amount NUMERIC[];
+    v_count INTEGER[];
+    v_last DATE[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(associate_profile_id), array_agg(amount), array_agg(payments), array_agg(last_date)
+        INTO v_ids, v_amount, v_count, v_last
+        FROM (
+            SELECT associate_profile_id, SUM(payment_amount) AS amount,
+                   COUNT(*)::INTEGER AS payments, MAX(payment_date) AS last_date
+            FROM new_rows
+            GROUP BY associate_profile_id
+        ) d;
+
+        IF v_ids IS NOT NULL THEN
+            PERFORM debt_summary_apply_payment_delta(v_ids, v_amount, v_count, v_last);
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    -- UPDATE / DELETE: el último abono puede cambiar, se recalculan esos asociados
+    IF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(DISTINCT associate_profile_id) INTO v_ids
+        FROM (
+            SELECT n.associate_profile_id FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            WHERE (n.associate_profile_id, n.payment_amount, n.payment_date)
+                  IS DISTINCT FROM (o.associate_profile_id, o.payment_amount, o.payment_date)
+            UNION ALL
+            SELECT o.associate_profile_id FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            WHERE n.associate_profile_id <> o.associate_profile_id
+        ) changed;
+    ELSE
+        SELECT array_agg(DISTINCT associate_profile_id) INTO v_ids FROM old_rows;
+    END IF;
+
+    IF v_ids IS NOT NULL THEN
+        PERFORM refresh_associate_debt_summary(v_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_debt_summary_balances_insert ON associate_accumulated_balances;
+DROP TRIGGER IF EXISTS trigger_debt_summary_balances_update ON associate_accumulated_balances;
+DROP TRIGGER IF EXISTS trigger_debt_summary_balances_delete ON associate_accumulated_balances;
+DROP TRIGGER IF EXISTS trigger_debt_summary_payments_insert ON associate_debt_payments;
+DROP TRIGGER IF EXISTS trigger_debt_summary_payments_update ON associate_debt_payments;
+DROP TRIGGER IF EXISTS trigger_debt_summary_payments_delete ON associate_debt_payments;
+
+CREATE TRIGGER trigger_debt_summary_balances_insert
+    AFTER INSERT ON associate_accumulated_balances
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_debt_summary_balances();
+
+CREATE TRIGGER trigger_debt_summary_balances_update
+    AFTER UPDATE ON associate_accumulated_balances
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_debt_summary_balances();
+
+CREATE TRIGGER trigger_debt_summary_balances_delete
+    AFTER DELETE ON associate_accumulated_balances
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_debt_summary_balances();
+
+CREATE TRIGGER trigger_debt_summary_payments_insert
+    AFTER INSERT ON associate_debt_payments
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_debt_summary_payments();
+
+CREATE TRIGGER trigger_debt_summary_payments_update
+    AFTER UPDATE ON associate_debt_payments
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_debt_summary_payments();
+
+CREATE TRIGGER trigger_debt_summary_payments_delete
+    AFTER DELETE ON associate_debt_payments
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_debt_summary_payments();
+
+
+-- 5. VISTA SOBRE LA TABLA (mismas columnas)
+-- =============================================================================
+DROP VIEW IF EXISTS v_associate_real_debt_summary;
+
+CREATE VIEW v_associate_real_debt_summary AS
+SELECT
+    ap.id AS associate_profile_id,
+    ap.user_id,
+    CONCAT(u.first_name, ' ', u.last_name) AS associate_name,
+    COALESCE(s.total_debt, 0) AS total_debt,
+    COALESCE(s.periods_with_debt, 0) AS periods_with_debt,
+    s.oldest_debt_date,
+    s.newest_debt_date,
+    ap.consolidated_debt AS profile_consolidated_debt,
+    ap.credit_limit,
+    ap.available_credit,
+    ap.pending_payments_total,
+    COALESCE(s.total_paid_to_debt, 0) AS total_paid_to_debt,
+    COALESCE(s.total_payments_count, 0) AS total_payments_count,
+    s.last_payment_date
+FROM associate_profiles ap
+JOIN users u ON u.id = ap.user_id
+LEFT JOIN associate_debt_summary s ON s.associate_profile_id = ap.id;
+
+
+-- 6. CARGA INICIAL
+-- =============================================================================
+SELECT refresh_associate_debt_summary(NULL);
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+DECLARE
+    v_mismatch INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_mismatch
+    FROM associate_profiles ap
+    LEFT JOIN associate_debt_summary s ON s.associate_profile_id = ap.id
+    WHERE s.associate_profile_id IS NULL
+       OR s.total_debt <> (
+           SELECT COALESCE(SUM(accumulated_debt), 0) FROM associate_accumulated_balances
+           WHERE user_id = ap.user_id AND accumulated_debt > 0
+       );
+
+    IF v_mismatch > 0 THEN
+        RAISE EXCEPTION 'associate_debt_summary no coincide para % asociados', v_mismatch;
+    END IF;
+    RAISE NOTICE '✅ associate_debt_summary cargado y mantenido por triggers';
+END;
+$$;
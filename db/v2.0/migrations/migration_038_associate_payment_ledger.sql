@@ -0,0 +1,327 @@
+-- =============================================================================
+-- Migration 038: Libro de pagos por asociado (associate_payment_ledger)
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - GET /associates/{id}/all-payments lee v_associate_all_payments: UNION ALL
+--   de associate_statement_payments (5 joins), associate_debt_payments
+--   (3 joins) y agreement_payments, ordenado por payment_date DESC,
+--   created_at DESC con OFFSET. Postgres materializa todas las ramas antes
+--   de ordenar y cada página más profunda cuesta más.
+-- - El `total` de la respuesta era len(rows) de la página, no un conteo real.
+-- - Cada pago de convenio aparecía dos veces: como PAGO_CONVENIO y como el
+--   abono a deuda (associate_debt_payments) que registra la misma operación.
+--
+-- SOLUCIÓN:
+-- 1. Tabla associate_payment_ledger, solo inserciones: una fila por abono
+--    con los datos ya resueltos (método, período) y running_balance = total
+--    abonado por el asociado hasta esa fila (en orden de registro).
+-- 2. La escriben triggers FOR EACH STATEMENT de las dos rutas de pago:
+--    - associate_statement_payments → SALDO_ACTUAL
+--    - associate_debt_payments → DEUDA_ACUMULADA (apply_debt_payment_v2,
+--      registro de abonos) o PAGO_CONVENIO cuando la ruta de convenios marca
+--      la sentencia con credinet.ledger_entry_type (mismo mecanismo que
+--      credinet.fifo_credit_adjusted de la migración 031). Así cada pago de
+--      convenio aparece una sola vez.
+--    Un abono eliminado no borra su fila: se agrega una reversión con monto
+--    negativo (is_reversal). Un advisory lock por asociado serializa el
+--    cálculo de running_balance.
+-- 3. Índice (associate_profile_id, payment_date DESC, id DESC) para la
+--    paginación keyset del endpoint.
+-- 4. Carga inicial desde las tablas de abonos.
+-- =============================================================================
+
+-- 1. TABLA
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS associate_payment_ledger (
+    id BIGSERIAL PRIMARY KEY,
+    associate_profile_id INTEGER NOT NULL,
+    entry_type VARCHAR(20) NOT NULL
+        CHECK (entry_type IN ('SALDO_ACTUAL', 'DEUDA_ACUMULADA', 'PAGO_CONVENIO')),
+    source_id INTEGER NOT NULL,
+    is_reversal BOOLEAN NOT NULL DEFAULT false,
+    payment_amount NUMERIC(12,2) NOT NULL,
+    payment_date DATE NOT NULL,
+    payment_method VARCHAR(50),
+    payment_reference VARCHAR(100),
+    cut_period_id INTEGER,
+    period_start DATE,
+    period_end DATE,
+    notes TEXT,
+    running_balance NUMERIC(14,2) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE,
+    recorded_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_payment_ledger_source UNIQUE (entry_type, source_id, is_reversal)
+);
+
+-- Paginación keyset del historial
+CREATE INDEX IF NOT EXISTS idx_payment_ledger_associate_date
+    ON associate_payment_ledger (associate_profile_id, payment_date DESC, id DESC);
+
+-- Última fila del asociado (running_balance de la siguiente)
+CREATE INDEX IF NOT EXISTS idx_payment_ledger_associate_id
+    ON associate_payment_ledger (associate_profile_id, id DESC);
+
+COMMENT ON TABLE associate_payment_ledger IS
+'⭐ MIGRACIÓN 038: Historial unificado de abonos por asociado (solo inserciones). Lo escriben los triggers de associate_statement_payments y associate_debt_payments.';
+COMMENT ON COLUMN associate_payment_ledger.running_balance IS
+'Total abonado por el asociado hasta esta fila, en orden de registro (id). Las reversiones restan.';
+
+
+-- 2. ESCRITURA
+-- =============================================================================
+-- Recibe las filas nuevas ya resueltas (sin running_balance) como arreglo
+-- JSONB y las agrega con el saldo acumulado por asociado.
+CREATE OR REPLACE FUNCTION payment_ledger_append(p_entries JSONB)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Un asociado a la vez (orden fijo para evitar deadlocks)
+    PERFORM pg_advisory_xact_lock(38038, a.associate_profile_id)
+    FROM (
+        SELECT DISTINCT (e->>'associate_profile_id')::INTEGER AS associate_profile_id
+        FROM jsonb_array_elements(p_entries) e
+        ORDER BY 1
+    ) a;
+
+    INSERT INTO associate_payment_ledger (
+        associate_profile_id, entry_type, source_id, is_reversal,
+        payment_amount, payment_date, payment_method, payment_reference,
+        cut_period_id, period_start, period_end, notes, running_balance, created_at
+    )
+    SELECT
+        e.associate_profile_id, e.entry_type, e.source_id, e.is_reversal,
+        e.payment_amount, e.payment_date, e.payment_method, e.payment_reference,
+        e.cut_period_id, e.period_start, e.period_end, e.notes,
+        COALESCE(last.running_balance, 0)
+            + SUM(e.payment_amount) OVER (PARTITION BY e.associate_profile_id ORDER BY e.source_id, e.is_reversal),
+        e.created_at
+    FROM jsonb_to_recordset(p_entries) AS e(
+        associate_profile_id INTEGER, entry_type VARCHAR, source_id INTEGER, is_reversal BOOLEAN,
+        payment_amount NUMERIC, payment_date DATE, payment_method VARCHAR, payment_reference VARCHAR,
+        cut_period_id INTEGER, period_start DATE, period_end DATE, notes TEXT, created_at TIMESTAMPTZ
+    )
+    LEFT JOIN LATERAL (
+        SELECT l.running_balance
+        FROM associate_payment_ledger l
+        WHERE l.associate_profile_id = e.associate_profile_id
+        ORDER BY l.id DESC
+        LIMIT 1
+    ) last ON true
+    ORDER BY e.associate_profile_id, e.source_id, e.is_reversal
+    ON CONFLICT (entry_type, source_id, is_reversal) DO NOTHING;
+END;
+$$;
+
+COMMENT ON FUNCTION payment_ledger_append(JSONB) IS
+'⭐ MIGRACIÓN 038: Agrega filas a associate_payment_ledger calculando running_balance por asociado.';
+
+
+-- 3. TRIGGERS
+-- =============================================================================
+CREATE OR REPLACE FUNCTION trigger_payment_ledger_statement_payments()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_entries JSONB;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT jsonb_agg(jsonb_build_object(
+            'associate_profile_id', ap.id,
+            'entry_type', 'SALDO_ACTUAL',
+            'source_id', n.id,
+            'is_reversal', false,
+            'payment_amount', n.payment_amount,
+            'payment_date', n.payment_date,
+            'payment_method', pm.name,
+            'payment_reference', n.payment_reference,
+            'cut_period_id', aps.cut_period_id,
+            'period_start', cp.period_start_date,
+            'period_end', cp.period_end_date,
+            'notes', n.notes,
+            'created_at', n.created_at
+        ))
+        INTO v_entries
+        FROM new_rows n
+        JOIN associate_payment_statements aps ON aps.id = n.statement_id
+        JOIN associate_profiles ap ON ap.user_id = aps.user_id
+        LEFT JOIN payment_methods pm ON pm.id = n.payment_method_id
+        LEFT JOIN cut_periods cp ON cp.id = aps.cut_period_id;
+    ELSE
+        -- Reversión con los datos de la fila original del libro (el statement
+        -- puede haberse borrado en cascada)
+        SELECT jsonb_agg(jsonb_build_object(
+            'associate_profile_id', l.associate_profile_id,
+            'entry_type', l.entry_type,
+            'source_id', l.source_id,
+            'is_reversal', true,
+            'payment_amount', -l.payment_amount,
+            'payment_date', CURRENT_DATE,
+            'payment_method', l.payment_method,
+            'payment_reference', l.payment_reference,
+            'cut_period_id', l.cut_period_id,
+            'period_start', l.period_start,
+            'period_end', l.period_end,
+            'notes', 'Reversión de abono #' || l.source_id,
+            'created_at', NOW()
+        ))
+        INTO v_entries
+        FROM old_rows o
+        JOIN associate_payment_ledger l
+          ON l.entry_type = 'SALDO_ACTUAL' AND l.source_id = o.id AND NOT l.is_reversal;
+    END IF;
+
+    IF v_entries IS NOT NULL THEN
+        PERFORM payment_ledger_append(v_entries);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION trigger_payment_ledger_debt_payments()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_entries JSONB;
+    v_entry_type VARCHAR := COALESCE(
+        NULLIF(current_setting('credinet.ledger_entry_type', true), ''),
+        'DEUDA_ACUMULADA'
+    );
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT jsonb_agg(jsonb_build_object(
+            'associate_profile_id', n.associate_profile_id,
+            'entry_type', v_entry_type,
+            'source_id', n.id,
+            'is_reversal', false,
+            'payment_amount', n.payment_amount,
+            'payment_date', n.payment_date,
+            'payment_method', pm.name,
+            'payment_reference', n.payment_reference,
+            'notes', n.notes,
+            'created_at', n.created_at
+        ))
+        INTO v_entries
+        FROM new_rows n
+        LEFT JOIN payment_methods pm ON pm.id = n.payment_method_id;
+    ELSE
+        SELECT jsonb_agg(jsonb_build_object(
+            'associate_profile_id', l.associate_profile_id,
+            'entry_type', l.entry_type,
+            'source_id', l.source_id,
+            'is_reversal', true,
+            'payment_amount', -l.payment_amount,
+            'payment_date', CURRENT_DATE,
+            'payment_method', l.payment_method,
+            'payment_reference', l.payment_reference,
+            'notes', 'Reversión de abono #' || l.source_id,
+            'created_at', NOW()
+        ))
+        INTO v_entries
+        FROM old_rows o
+        JOIN associate_payment_ledger l
+          ON l.entry_type IN ('DEUDA_ACUMULADA', 'PAGO_CONVENIO')
+         AND l.source_id = o.id AND NOT l.is_reversal;
+    END IF;
+
+    IF v_entries IS NOT NULL THEN
+        PERFORM payment_ledger_append(v_entries);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_payment_ledger_statement_insert ON associate_statement_payments;
+DROP TRIGGER IF EXISTS trigger_payment_ledger_statement_delete ON associate_statement_payments;
+DROP TRIGGER IF EXISTS trigger_payment_ledger_debt_insert ON associate_debt_payments;
+DROP TRIGGER IF EXISTS trigger_payment_ledger_debt_delete ON associate_debt_payments;
+
+CREATE TRIGGER trigger_payment_ledger_statement_insert
+    AFTER INSERT ON associate_statement_payments
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_payment_ledger_statement_payments();
+
+CREATE TRIGGER trigger_payment_ledger_statement_delete
+    AFTER DELETE ON associate_statement_payments
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_payment_ledger_statement_payments();
+
+CREATE TRIGGER trigger_payment_ledger_debt_insert
+    AFTER INSERT ON associate_debt_payments
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_payment_ledger_debt_payments();
+
+CREATE TRIGGER trigger_payment_ledger_debt_delete
+    AFTER DELETE ON associate_debt_payments
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION trigger_payment_ledger_debt_payments();
+
+
+-- 4. CARGA INICIAL (abonos existentes, en orden de registro)
+-- =============================================================================
+INSERT INTO associate_payment_ledger (
+    associate_profile_id, entry_type, source_id, payment_amount, payment_date,
+    payment_method, payment_reference, cut_period_id, period_start, period_end,
+    notes, running_balance, created_at
+)
+SELECT
+    p.associate_profile_id, p.entry_type, p.source_id, p.payment_amount, p.payment_date,
+    p.payment_method, p.payment_reference, p.cut_period_id, p.period_start, p.period_end,
+    p.notes,
+    SUM(p.payment_amount) OVER (
+        PARTITION BY p.associate_profile_id
+        ORDER BY p.created_at, p.entry_type, p.source_id
+    ),
+    p.created_at
+FROM (
+    SELECT ap.id AS associate_profile_id, 'SALDO_ACTUAL' AS entry_type, asp.id AS source_id,
+           asp.payment_amount, asp.payment_date, pm.name AS payment_method, asp.payment_reference,
+           aps.cut_period_id, cp.period_start_date AS period_start, cp.period_end_date AS period_end,
+           asp.notes, asp.created_at
+    FROM associate_statement_payments asp
+    JOIN associate_payment_statements aps ON aps.id = asp.statement_id
+    JOIN associate_profiles ap ON ap.user_id = aps.user_id
+    LEFT JOIN payment_methods pm ON pm.id = asp.payment_method_id
+    LEFT JOIN cut_periods cp ON cp.id = aps.cut_period_id
+    UNION ALL
+    SELECT adp.associate_profile_id,
+           CASE WHEN adp.notes LIKE 'Pago #% de convenio %' THEN 'PAGO_CONVENIO' ELSE 'DEUDA_ACUMULADA' END,
+           adp.id,
+           adp.payment_amount, adp.payment_date, pm.name, adp.payment_reference,
+           NULL, NULL, NULL,
+           adp.notes, adp.created_at
+    FROM associate_debt_payments adp
+    LEFT JOIN payment_methods pm ON pm.id = adp.payment_method_id
+) p
+ORDER BY p.associate_profile_id, p.created_at, p.entry_type, p.source_id
+ON CONFLICT (entry_type, source_id, is_reversal) DO NOTHING;
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+DECLARE
+    v_expected INTEGER;
+    v_count INTEGER;
+BEGIN
+    SELECT (SELECT COUNT(*) FROM associate_statement_payments asp
+            JOIN associate_payment_statements aps ON aps.id = asp.statement_id
+            JOIN associate_profiles ap ON ap.user_id = aps.user_id)
+         + (SELECT COUNT(*) FROM associate_debt_payments)
+    INTO v_expected;
+    SELECT COUNT(*) INTO v_count FROM associate_payment_ledger WHERE NOT is_reversal;
+
+    IF v_count < v_expected THEN
+        RAISE EXCEPTION 'associate_payment_ledger incompleto: % de % abonos', v_count, v_expected;
+    END IF;
+    RAISE NOTICE '✅ associate_payment_ledger cargado con % abonos', v_count;
+END;
+$$;
@@ -0,0 +1,55 @@
+-- =============================================================================
+-- Migration 039: Almacenamiento de documentos direccionado por contenido
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - client_documents.file_path y defaulted_client_reports.evidence_file_path
+--   eran solo texto: no había servicio de almacenamiento y cada subida o
+--   descarga tendría que cargar el archivo completo en memoria.
+-- - Los clientes re-suben los mismos escaneos (INE, comprobantes) y cada
+--   copia ocupaba espacio por separado.
+--
+-- SOLUCIÓN:
+-- - app/core/storage.py guarda cada archivo bajo su SHA-256
+--   (file_path = 'sha256/ab/cd/<hash>'): el mismo contenido se guarda una vez
+--   aunque lo referencien varios documentos o reportes.
+-- - content_sha256 / evidence_sha256 para ubicar duplicados; la evidencia
+--   guarda además nombre original y tipo MIME para servir la descarga.
+-- =============================================================================
+
+ALTER TABLE client_documents
+    ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64);
+
+ALTER TABLE defaulted_client_reports
+    ADD COLUMN IF NOT EXISTS evidence_sha256 VARCHAR(64),
+    ADD COLUMN IF NOT EXISTS evidence_file_name VARCHAR(255),
+    ADD COLUMN IF NOT EXISTS evidence_mime_type VARCHAR(100);
+
+-- Duplicados del mismo cliente ("¿ya subió este INE?")
+CREATE INDEX IF NOT EXISTS idx_client_documents_user_sha256
+    ON client_documents (user_id, content_sha256)
+    WHERE content_sha256 IS NOT NULL;
+
+COMMENT ON COLUMN client_documents.content_sha256 IS
+'SHA-256 del contenido. file_path es la llave en el almacenamiento (sha256/ab/cd/<hash>).';
+COMMENT ON COLUMN defaulted_client_reports.evidence_sha256 IS
+'SHA-256 del archivo de evidencia. evidence_file_path es su llave en el almacenamiento.';
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'client_documents' AND column_name = 'content_sha256'
+    ) OR NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'defaulted_client_reports' AND column_name = 'evidence_sha256'
+    ) THEN
+        RAISE EXCEPTION 'Migración 039 incompleta';
+    END IF;
+    RAISE NOTICE '✅ Almacenamiento de documentos por SHA-256 listo';
+END;
+$$;
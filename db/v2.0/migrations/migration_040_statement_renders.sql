@@ -0,0 +1,49 @@
+-- =============================================================================
+-- Migration 040: Documentos imprimibles de statements con cache por versión
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - Cada quincena (días de impresión 8 y 23, migración 024) se imprime un
+--   estado de cuenta por asociado, pero el detalle se arma por request
+--   (StatementEnhancedService + consultas de payments-preview) y no había
+--   un documento imprimible ni forma de bajar todo el período de una vez.
+--
+-- SOLUCIÓN:
+-- - El pipeline de render (statements/application/render_statements.py)
+--   genera HTML y texto plano en un pool de procesos y guarda cada archivo
+--   en el almacenamiento de documentos (por SHA-256, migración 039).
+-- - statement_renders registra, por statement y formato, la versión de
+--   contenido con la que se renderizó (md5 de updated_at del statement +
+--   sus pagos del período + sus abonos) y la llave del archivo. Mientras la
+--   versión no cambie el documento se sirve directo del almacenamiento.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS statement_renders (
+    statement_id INTEGER NOT NULL REFERENCES associate_payment_statements(id) ON DELETE CASCADE,
+    format VARCHAR(10) NOT NULL,
+    content_version VARCHAR(32) NOT NULL,
+    storage_key VARCHAR(255) NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    rendered_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (statement_id, format)
+);
+
+COMMENT ON TABLE statement_renders IS
+'Documentos renderizados de cada statement. content_version distinto al actual = hay que re-renderizar.';
+COMMENT ON COLUMN statement_renders.storage_key IS
+'Llave en el almacenamiento de documentos (sha256/ab/cd/<hash>).';
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.tables WHERE table_name = 'statement_renders'
+    ) THEN
+        RAISE EXCEPTION 'Migración 040 incompleta';
+    END IF;
+    RAISE NOTICE '✅ Cache de documentos de statements lista';
+END;
+$$;
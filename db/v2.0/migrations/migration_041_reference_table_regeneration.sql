@@ -0,0 +1,136 @@
+-- =============================================================================
+-- Migration 041: Regeneración por perfil de rate_profile_reference_table
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - regenerate_reference_table() (módulo 11) borra y recalcula TODO con una
+--   llamada a calculate_loan_payment() por combinación (perfil, monto, plazo),
+--   con montos y plazos fijos en el código de la función.
+-- - calculate_loan_payment() rechaza perfiles deshabilitados: con transition
+--   y premium deshabilitados la función completa falla y la tabla se queda
+--   desactualizada hasta que alguien la regenera a mano.
+-- - Agregar un monto o cambiar la tasa de un perfil obliga a la regeneración
+--   completa.
+--
+-- SOLUCIÓN:
+-- - rate_profile_reference_amounts: los montos de la rejilla son datos
+--   (sembrados con los que ya tenía la tabla). Los plazos salen de
+--   rate_profiles.valid_terms y se respetan min_amount/max_amount.
+-- - El backend regenera en Python (rate_profiles/application/reference_table.py)
+--   con COPY a una tabla sombra y reemplazo en una transacción; PATCH
+--   /rate-profiles/{code} regenera solo ese perfil.
+-- - regenerate_reference_table(p_profile_code) queda como equivalente SQL
+--   en un solo INSERT ... SELECT (cruce montos × plazos), para psql.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS rate_profile_reference_amounts (
+    amount DECIMAL(12,2) PRIMARY KEY CHECK (amount > 0),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE rate_profile_reference_amounts IS
+'Montos de la rejilla de rate_profile_reference_table para perfiles tipo formula.';
+
+INSERT INTO rate_profile_reference_amounts (amount)
+SELECT DISTINCT r.amount
+FROM rate_profile_reference_table r
+JOIN rate_profiles p ON p.code = r.profile_code
+WHERE p.calculation_type = 'formula'
+ON CONFLICT DO NOTHING;
+
+-- Sin datos previos (instalación nueva): montos originales del módulo 11
+INSERT INTO rate_profile_reference_amounts (amount)
+SELECT unnest(ARRAY[3000, 4000, 5000, 6000, 7000, 8000, 9000, 10000,
+                    12000, 15000, 18000, 20000, 25000, 30000]::DECIMAL[])
+WHERE NOT EXISTS (SELECT 1 FROM rate_profile_reference_amounts);
+
+
+-- =============================================================================
+-- FUNCIÓN: regenerate_reference_table(p_profile_code)
+-- =============================================================================
+-- Mismos redondeos intermedios que calculate_loan_payment():
+--   factor DECIMAL(10,6), total DECIMAL(12,2), pago y comisión DECIMAL(10,2)
+DROP FUNCTION IF EXISTS regenerate_reference_table();
+
+CREATE OR REPLACE FUNCTION regenerate_reference_table(p_profile_code VARCHAR DEFAULT NULL)
+RETURNS TEXT AS $$
+DECLARE
+    v_count INTEGER := 0;
+    v_legacy INTEGER := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('rate_profile_reference_table'));
+
+    DELETE FROM rate_profile_reference_table
+    WHERE p_profile_code IS NULL OR profile_code = p_profile_code;
+
+    INSERT INTO rate_profile_reference_table
+        (profile_code, amount, term_biweeks, biweekly_payment, total_payment,
+         commission_per_payment, total_commission, associate_payment, associate_total,
+         interest_rate_percent, commission_rate_percent)
+    SELECT
+        g.code, g.amount, g.term,
+        g.payment, g.total,
+        g.commission, g.commission * g.term,
+        g.payment - g.commission, (g.payment - g.commission) * g.term,
+        g.interest_rate_percent, g.commission_rate_percent
+    FROM (
+        SELECT
+            p.code, a.amount, t.term,
+            p.interest_rate_percent, p.commission_rate_percent,
+            ROUND(a.amount * ROUND(1 + (p.interest_rate_percent / 100) * t.term, 6), 2) AS total,
+            ROUND(ROUND(a.amount * ROUND(1 + (p.interest_rate_percent / 100) * t.term, 6), 2) / t.term, 2) AS payment,
+            ROUND(a.amount * (p.commission_rate_percent / 100), 2) AS commission
+        FROM rate_profiles p
+        CROSS JOIN LATERAL unnest(p.valid_terms) AS t(term)
+        JOIN rate_profile_reference_amounts a
+          ON (p.min_amount IS NULL OR a.amount >= p.min_amount)
+         AND (p.max_amount IS NULL OR a.amount <= p.max_amount)
+        WHERE p.calculation_type = 'formula'
+          AND p.code != 'custom'
+          AND p.interest_rate_percent IS NOT NULL
+          AND p.commission_rate_percent IS NOT NULL
+          AND (p_profile_code IS NULL OR p.code = p_profile_code)
+    ) g;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    -- Perfil legacy (table_lookup): copia de legacy_payment_table
+    INSERT INTO rate_profile_reference_table
+        (profile_code, amount, term_biweeks, biweekly_payment, total_payment,
+         commission_per_payment, total_commission, associate_payment, associate_total,
+         interest_rate_percent, commission_rate_percent)
+    SELECT
+        p.code, l.amount, l.term_biweeks, l.biweekly_payment, l.total_payment,
+        COALESCE(l.commission_per_payment, 0),
+        COALESCE(l.commission_per_payment, 0) * l.term_biweeks,
+        COALESCE(l.associate_biweekly_payment, 0),
+        COALESCE(l.associate_total_payment, 0),
+        l.biweekly_rate_percent,
+        ROUND(((COALESCE(l.commission_per_payment, 0) / NULLIF(l.biweekly_payment, 0)) * 100)::NUMERIC, 3)
+    FROM rate_profiles p
+    CROSS JOIN legacy_payment_table l
+    WHERE p.calculation_type = 'table_lookup'
+      AND (p_profile_code IS NULL OR p.code = p_profile_code);
+
+    GET DIAGNOSTICS v_legacy = ROW_COUNT;
+    RETURN (v_count + v_legacy)::TEXT || ' registros generados';
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION regenerate_reference_table(VARCHAR) IS
+'Regenera la tabla de referencia de un perfil (o de todos con NULL) en un solo INSERT set-based.
+El backend usa la versión en Python (COPY + reemplazo); ambas producen los mismos valores.';
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM rate_profile_reference_amounts) THEN
+        RAISE EXCEPTION 'Migración 041 incompleta: rate_profile_reference_amounts vacía';
+    END IF;
+    RAISE NOTICE '✅ Rejilla de montos de referencia: % montos',
+        (SELECT COUNT(*) FROM rate_profile_reference_amounts);
+END;
+$$;
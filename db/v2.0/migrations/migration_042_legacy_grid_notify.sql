@@ -0,0 +1,64 @@
+-- =============================================================================
+-- Migration 042: Aviso de cambios de la tabla legacy (tabla en memoria)
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - Cada cálculo con el perfil legacy (calculate_loan_payment 'table_lookup')
+--   y cada GET /rate-profiles/legacy-payments consultaban legacy_payment_table,
+--   una tabla de decenas de filas que casi nunca cambia.
+--
+-- SOLUCIÓN:
+-- - Cada worker del backend guarda la tabla en memoria, indexada por
+--   (monto, plazo) (rate_profiles/application/legacy_table.py), y cotiza y
+--   lista el perfil legacy sin ir a la base.
+-- - Para enterarse de los cambios, un trigger FOR EACH STATEMENT publica
+--   'legacy_grid.changed' con publish_live_event() (migración 035) en cada
+--   INSERT/UPDATE/DELETE/TRUNCATE de legacy_payment_table, junto al trigger
+--   de updated_at (que es BEFORE UPDATE por fila y no ve altas ni bajas).
+--   (Sin el prefijo trigger_live_: la verificación de la 035 cuenta esos.)
+--   También en rate_profiles: nombre y enabled del perfil legacy viajan en
+--   la misma rejilla.
+-- - Al recibirlo el backend descarta la tabla en memoria y el cache
+--   "rate_profiles"; la siguiente lectura la vuelve a cargar.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION notify_legacy_grid_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM publish_live_event(
+        'legacy_grid.changed',
+        jsonb_build_object('table', TG_TABLE_NAME, 'operation', TG_OP)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION notify_legacy_grid_changed() IS
+'⭐ v2.0.5: Avisa al backend (canal credinet_events) que debe recargar la tabla legacy en memoria.';
+
+DROP TRIGGER IF EXISTS trigger_legacy_grid_changed ON legacy_payment_table;
+CREATE TRIGGER trigger_legacy_grid_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON legacy_payment_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_legacy_grid_changed();
+
+DROP TRIGGER IF EXISTS trigger_rate_profiles_legacy_grid_changed ON rate_profiles;
+CREATE TRIGGER trigger_rate_profiles_legacy_grid_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rate_profiles
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_legacy_grid_changed();
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger WHERE tgname = 'trigger_legacy_grid_changed'
+    ) THEN
+        RAISE EXCEPTION 'Migración 042 incompleta';
+    END IF;
+    RAISE NOTICE '✅ Tabla legacy en memoria: avisos de cambio por NOTIFY activos';
+END;
+$$;
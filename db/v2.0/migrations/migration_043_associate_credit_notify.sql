@@ -0,0 +1,129 @@
+-- =============================================================================
+-- Migration 043: Aviso de cambios de crédito por asociado (cache de snapshots)
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - GET /associates/{user_id}/credit, GET /associates (con un conteo
+--   correlacionado sobre associate_accumulated_balances por fila) y la
+--   validación de crédito de préstamos (check_associate_available_credit)
+--   vuelven a leer el crédito del asociado en cada llamada, aunque solo
+--   cambia con aprobaciones, pagos, abonos a deuda, convenios o cambios de
+--   nivel.
+--
+-- SOLUCIÓN:
+-- - El backend guarda un snapshot de crédito por asociado en cada worker
+--   (associates/application/credit_snapshots.py) y lo descarta cuando llega
+--   'associate.credit_changed' {count, user_ids} por el canal credinet_events.
+-- - Los triggers de crédito de 07_triggers.sql, el cierre de período y los
+--   convenios terminan todos en un UPDATE de associate_profiles; los
+--   períodos con deuda viven en associate_debt_summary (migración 037). Por
+--   eso el aviso sale de triggers FOR EACH STATEMENT con tablas de
+--   transición en esas dos tablas (un UPDATE masivo = UNA notificación),
+--   solo si cambió alguna columna del snapshot:
+--     associate_profiles      credit_limit, pending_payments_total,
+--                             consolidated_debt (available_credit es generada)
+--     associate_debt_summary  periods_with_debt
+-- - user_ids se recorta a 100 (límite del payload de NOTIFY); si count es
+--   mayor, el backend descarta todos los snapshots.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION notify_associate_credit_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_user_ids INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT user_id) INTO v_user_ids FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT user_id) INTO v_user_ids FROM old_rows;
+    ELSIF TG_TABLE_NAME = 'associate_profiles' THEN
+        SELECT array_agg(DISTINCT n.user_id) INTO v_user_ids
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE (n.credit_limit, n.pending_payments_total, n.consolidated_debt)
+              IS DISTINCT FROM (o.credit_limit, o.pending_payments_total, o.consolidated_debt);
+    ELSE
+        SELECT array_agg(DISTINCT n.user_id) INTO v_user_ids
+        FROM new_rows n
+        JOIN old_rows o ON o.associate_profile_id = n.associate_profile_id
+        WHERE n.periods_with_debt IS DISTINCT FROM o.periods_with_debt;
+    END IF;
+
+    IF v_user_ids IS NOT NULL THEN
+        PERFORM publish_live_event(
+            'associate.credit_changed',
+            jsonb_build_object(
+                'count', cardinality(v_user_ids),
+                'user_ids', v_user_ids[1:100]
+            )
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION notify_associate_credit_changed() IS
+'⭐ v2.0.5: Avisa al backend (canal credinet_events) qué asociados cambiaron de crédito para descartar sus snapshots.';
+
+-- associate_profiles
+DROP TRIGGER IF EXISTS trigger_credit_changed_profiles_insert ON associate_profiles;
+CREATE TRIGGER trigger_credit_changed_profiles_insert
+    AFTER INSERT ON associate_profiles
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_associate_credit_changed();
+
+DROP TRIGGER IF EXISTS trigger_credit_changed_profiles_update ON associate_profiles;
+CREATE TRIGGER trigger_credit_changed_profiles_update
+    AFTER UPDATE ON associate_profiles
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_associate_credit_changed();
+
+DROP TRIGGER IF EXISTS trigger_credit_changed_profiles_delete ON associate_profiles;
+CREATE TRIGGER trigger_credit_changed_profiles_delete
+    AFTER DELETE ON associate_profiles
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_associate_credit_changed();
+
+-- associate_debt_summary
+DROP TRIGGER IF EXISTS trigger_credit_changed_debt_summary_insert ON associate_debt_summary;
+CREATE TRIGGER trigger_credit_changed_debt_summary_insert
+    AFTER INSERT ON associate_debt_summary
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_associate_credit_changed();
+
+DROP TRIGGER IF EXISTS trigger_credit_changed_debt_summary_update ON associate_debt_summary;
+CREATE TRIGGER trigger_credit_changed_debt_summary_update
+    AFTER UPDATE ON associate_debt_summary
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_associate_credit_changed();
+
+DROP TRIGGER IF EXISTS trigger_credit_changed_debt_summary_delete ON associate_debt_summary;
+CREATE TRIGGER trigger_credit_changed_debt_summary_delete
+    AFTER DELETE ON associate_debt_summary
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_associate_credit_changed();
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+DECLARE
+    v_triggers INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_triggers
+    FROM pg_trigger
+    WHERE tgname LIKE 'trigger_credit_changed_%' AND NOT tgisinternal;
+
+    IF v_triggers <> 6 THEN
+        RAISE EXCEPTION 'Se esperaban 6 triggers de cambio de crédito, hay %', v_triggers;
+    END IF;
+    RAISE NOTICE '✅ Avisos de cambio de crédito por asociado activos';
+END;
+$$;
@@ -0,0 +1,135 @@
+-- =============================================================================
+-- Migration 044: Fotos de cartera por período (portfolio snapshots)
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - No existe una vista histórica de la cartera: saldo pendiente, cobrado,
+--   vencido y comisión por período solo se pueden reconstruir recorriendo
+--   payments y loans, que son las tablas transaccionales más usadas.
+-- - delinquency_aging (migración 032) guarda solo la antigüedad de lo
+--   vencido, por fecha y no por período.
+--
+-- SOLUCIÓN:
+-- 1. Dos tablas de hechos particionadas por año de period_end_date que llena
+--    el job de fotos de cartera después de cada corte
+--    (app/scheduler/portfolio_snapshots.py):
+--    - portfolio_loan_snapshots: una fila por (período, préstamo)
+--    - portfolio_associate_snapshots: una fila por (período, asociado),
+--      agregada desde la foto de préstamos (no vuelve a leer payments)
+--    Cada foto se reescribe completa (DELETE + INSERT ... SELECT), así que
+--    repetir el job para un período es idempotente.
+-- 2. ensure_portfolio_snapshot_partitions(año) crea las particiones de un
+--    año en ambas tablas; el job la llama antes de escribir. Se crean aquí
+--    2025-2027. SECURITY DEFINER porque crear particiones exige ser dueño de
+--    la tabla y el backend no lo es.
+-- 3. Índices (associate_user_id / loan_id, period_end_date) para los
+--    endpoints de tendencia de /dashboard/portfolio.
+--
+-- Definiciones (al momento de la foto, período con fin E e inicio S):
+-- - expected/collected/commission: pagos con cut_period_id = período
+-- - outstanding: saldo (expected_amount - amount_paid) de pagos cobrables
+-- - overdue: la parte de outstanding que vence antes de S (arrastre de
+--   períodos anteriores)
+-- =============================================================================
+
+-- 1. TABLAS
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS portfolio_loan_snapshots (
+    period_end_date DATE NOT NULL,
+    cut_period_id INTEGER NOT NULL,
+    cut_code VARCHAR(10),
+    loan_id INTEGER NOT NULL,
+    associate_user_id INTEGER NOT NULL,
+    client_user_id INTEGER NOT NULL,
+    payments_due INTEGER NOT NULL DEFAULT 0,
+    expected_amount NUMERIC(12,2) NOT NULL DEFAULT 0,
+    collected_amount NUMERIC(12,2) NOT NULL DEFAULT 0,
+    commission_amount NUMERIC(12,2) NOT NULL DEFAULT 0,
+    outstanding_amount NUMERIC(12,2) NOT NULL DEFAULT 0,
+    overdue_payments INTEGER NOT NULL DEFAULT 0,
+    overdue_amount NUMERIC(12,2) NOT NULL DEFAULT 0,
+    snapshot_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period_end_date, cut_period_id, loan_id)
+) PARTITION BY RANGE (period_end_date);
+
+CREATE TABLE IF NOT EXISTS portfolio_associate_snapshots (
+    period_end_date DATE NOT NULL,
+    cut_period_id INTEGER NOT NULL,
+    cut_code VARCHAR(10),
+    associate_user_id INTEGER NOT NULL,
+    loans_count INTEGER NOT NULL DEFAULT 0,
+    payments_due INTEGER NOT NULL DEFAULT 0,
+    expected_amount NUMERIC(14,2) NOT NULL DEFAULT 0,
+    collected_amount NUMERIC(14,2) NOT NULL DEFAULT 0,
+    commission_amount NUMERIC(14,2) NOT NULL DEFAULT 0,
+    outstanding_amount NUMERIC(14,2) NOT NULL DEFAULT 0,
+    overdue_loans INTEGER NOT NULL DEFAULT 0,
+    overdue_amount NUMERIC(14,2) NOT NULL DEFAULT 0,
+    snapshot_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period_end_date, cut_period_id, associate_user_id)
+) PARTITION BY RANGE (period_end_date);
+
+-- Tendencia por préstamo / asociado
+CREATE INDEX IF NOT EXISTS idx_portfolio_loan_snapshots_loan
+    ON portfolio_loan_snapshots (loan_id, period_end_date DESC);
+
+CREATE INDEX IF NOT EXISTS idx_portfolio_associate_snapshots_associate
+    ON portfolio_associate_snapshots (associate_user_id, period_end_date DESC);
+
+COMMENT ON TABLE portfolio_loan_snapshots IS
+'⭐ MIGRACIÓN 044: Foto de cartera por (período, préstamo). La escribe el job de fotos de cartera después de cada corte; particionada por año de period_end_date.';
+COMMENT ON TABLE portfolio_associate_snapshots IS
+'⭐ MIGRACIÓN 044: Foto de cartera por (período, asociado), agregada desde portfolio_loan_snapshots.';
+COMMENT ON COLUMN portfolio_loan_snapshots.outstanding_amount IS
+'Saldo pendiente de pagos cobrables del préstamo al momento de la foto.';
+COMMENT ON COLUMN portfolio_loan_snapshots.overdue_amount IS
+'Parte de outstanding_amount que vence antes del inicio del período.';
+
+
+-- 2. PARTICIONES
+-- =============================================================================
+CREATE OR REPLACE FUNCTION ensure_portfolio_snapshot_partitions(p_year INTEGER)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_table TEXT;
+    v_from DATE := make_date(p_year, 1, 1);
+    v_to DATE := make_date(p_year + 1, 1, 1);
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY['portfolio_loan_snapshots', 'portfolio_associate_snapshots'] LOOP
+        IF to_regclass(format('%s_%s', v_table, p_year)) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                format('%s_%s', v_table, p_year), v_table, v_from, v_to
+            );
+        END IF;
+    END LOOP;
+END;
+$$;
+
+COMMENT ON FUNCTION ensure_portfolio_snapshot_partitions(INTEGER) IS
+'⭐ v2.0.5: Crea (si faltan) las particiones anuales de las fotos de cartera. La llama el job antes de escribir.';
+
+SELECT ensure_portfolio_snapshot_partitions(y) FROM generate_series(2025, 2027) AS y;
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+DECLARE
+    v_partitions INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_partitions
+    FROM pg_inherits
+    WHERE inhparent IN ('portfolio_loan_snapshots'::regclass, 'portfolio_associate_snapshots'::regclass);
+
+    IF v_partitions < 6 THEN
+        RAISE EXCEPTION 'Se esperaban al menos 6 particiones de fotos de cartera, hay %', v_partitions;
+    END IF;
+    RAISE NOTICE '✅ Fotos de cartera por período listas (% particiones)', v_partitions;
+END;
+$$;
@@ -0,0 +1,152 @@
+-- =============================================================================
+-- Migration 045: Trigger FIFO de abonos a deuda set-based
+-- =============================================================================
+--
+-- PROBLEMA:
+-- - RegisterDebtPaymentUseCase (POST /debt-payments) inserta en
+--   associate_debt_payments y la asignación la hace el trigger
+--   apply_debt_payment_fifo() del módulo 016. Ese trigger seguía siendo un
+--   LOOP PL/pgSQL: un UPDATE por item de associate_debt_breakdown y al final
+--   un SUM completo hacia associate_profiles.debt_balance (columna que ya no
+--   existe; hoy es consolidated_debt).
+-- - La migración 031 solo reescribió apply_excess_to_debt_fifo y
+--   apply_debt_payment_v2, así que el camino que usa el backend seguía en
+--   tiempo lineal respecto al historial de deuda del asociado.
+--
+-- SOLUCIÓN:
+-- - Misma asignación que la migración 031 y que
+--   PgDebtPaymentRepository.preview_allocation(): SUM(amount) OVER
+--   (ORDER BY created_at, id) sobre la deuda viva; cada item recibe
+--   LEAST(monto, abono - deuda anterior).
+-- - Un UPDATE para los items liquidados, uno para el (único) item parcial y
+--   un solo ajuste de consolidated_debt. trigger_update_associate_credit_on_
+--   debt_payment se salta con credinet.fifo_credit_adjusted (migración 031).
+-- - Columnas actuales: liquidation_date, liquidation_notes, consolidated_debt.
+-- - Si quien inserta ya trae applied_breakdown_items (apply_debt_payment_v2
+--   asigna sobre associate_accumulated_balances), el trigger no vuelve a
+--   asignar.
+-- - El trigger se (re)crea: el caso de uso depende de él.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION apply_debt_payment_fifo()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_applied_items JSONB;
+    v_total_applied DECIMAL(12,2);
+    v_previous_setting TEXT;
+BEGIN
+    -- Abono ya asignado por quien inserta
+    IF NEW.applied_breakdown_items IS NOT NULL AND NEW.applied_breakdown_items <> '[]'::jsonb THEN
+        RETURN NEW;
+    END IF;
+
+    -- ⭐ Asignación FIFO en una sola lectura
+    WITH fifo AS (
+        SELECT
+            id,
+            cut_period_id,
+            amount,
+            SUM(amount) OVER (ORDER BY created_at, id) AS running_total
+        FROM associate_debt_breakdown
+        WHERE associate_profile_id = NEW.associate_profile_id
+          AND is_liquidated = false
+    ),
+    allocation AS (
+        SELECT
+            fifo.*,
+            LEAST(amount, NEW.payment_amount - (running_total - amount)) AS to_apply
+        FROM fifo
+        WHERE running_total - amount < NEW.payment_amount
+    )
+    SELECT
+        COALESCE(jsonb_agg(
+            jsonb_build_object(
+                'breakdown_id', id,
+                'cut_period_id', cut_period_id,
+                'original_amount', amount,
+                'amount_applied', to_apply,
+                'liquidated', to_apply = amount,
+                'applied_at', NEW.payment_date
+            ) || CASE
+                WHEN to_apply < amount THEN jsonb_build_object('remaining_amount', amount - to_apply)
+                ELSE '{}'::jsonb
+            END
+            ORDER BY running_total
+        ), '[]'::jsonb),
+        COALESCE(SUM(to_apply), 0)
+    INTO v_applied_items, v_total_applied
+    FROM allocation;
+
+    -- El ajuste de consolidated_debt se hace una sola vez al final
+    v_previous_setting := current_setting('credinet.fifo_credit_adjusted', true);
+    PERFORM set_config('credinet.fifo_credit_adjusted', 'on', true);
+
+    -- Items liquidados completamente
+    UPDATE associate_debt_breakdown adb
+    SET
+        is_liquidated = true,
+        liquidation_date = NEW.payment_date,
+        liquidation_notes = NEW.payment_reference,
+        updated_at = CURRENT_TIMESTAMP
+    FROM jsonb_to_recordset(v_applied_items) AS item(breakdown_id INTEGER, liquidated BOOLEAN)
+    WHERE adb.id = item.breakdown_id
+      AND item.liquidated;
+
+    -- Item parcial (a lo sumo uno)
+    UPDATE associate_debt_breakdown adb
+    SET
+        amount = adb.amount - item.amount_applied,
+        updated_at = CURRENT_TIMESTAMP
+    FROM jsonb_to_recordset(v_applied_items) AS item(breakdown_id INTEGER, amount_applied DECIMAL, liquidated BOOLEAN)
+    WHERE adb.id = item.breakdown_id
+      AND NOT item.liquidated;
+
+    -- Un solo ajuste de deuda del asociado
+    IF v_total_applied > 0 THEN
+        UPDATE associate_profiles
+        SET
+            consolidated_debt = GREATEST(consolidated_debt - v_total_applied, 0),
+            credit_last_updated = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = NEW.associate_profile_id;
+    END IF;
+
+    PERFORM set_config('credinet.fifo_credit_adjusted', COALESCE(v_previous_setting, ''), true);
+
+    NEW.applied_breakdown_items := v_applied_items;
+    RETURN NEW;
+END;
+$$;
+
+COMMENT ON FUNCTION apply_debt_payment_fifo() IS '⭐ v2.0.5: Trigger de abonos a deuda (associate_debt_breakdown) con FIFO por totales acumulados: un UPDATE de items liquidados, uno del item parcial y un ajuste de consolidated_debt.';
+
+DROP TRIGGER IF EXISTS trigger_apply_debt_payment_fifo ON associate_debt_payments;
+CREATE TRIGGER trigger_apply_debt_payment_fifo
+    BEFORE INSERT ON associate_debt_payments
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_debt_payment_fifo();
+
+COMMENT ON TRIGGER trigger_apply_debt_payment_fifo ON associate_debt_payments IS
+'⭐ MIGRACIÓN 045: Aplica el abono en FIFO con totales acumulados (número fijo de sentencias).';
+
+
+-- =============================================================================
+-- VERIFICACIÓN
+-- =============================================================================
+DO $$
+BEGIN
+    IF pg_get_functiondef('apply_debt_payment_fifo()'::regprocedure) LIKE '%LOOP%' THEN
+        RAISE EXCEPTION 'apply_debt_payment_fifo sigue usando LOOP';
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'trigger_apply_debt_payment_fifo'
+          AND tgrelid = 'associate_debt_payments'::regclass
+    ) THEN
+        RAISE EXCEPTION 'No se creó trigger_apply_debt_payment_fifo';
+    END IF;
+    RAISE NOTICE '✅ Trigger FIFO de abonos a deuda set-based instalado';
+END;
+$$;
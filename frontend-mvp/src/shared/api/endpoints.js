@@ -31,6 +31,7 @@ export const ENDPOINTS = {
     create: '/api/v1/loans',
     approve: (id) => `/api/v1/loans/${id}/approve`,
     reject: (id) => `/api/v1/loans/${id}/reject`,
+    eligibility: '/api/v1/loans/eligibility',
     update: (id) => `/api/v1/loans/${id}`,
     delete: (id) => `/api/v1/loans/${id}`,
     amortization: (id) => `/api/v1/loans/${id}/amortization`,
@@ -58,6 +59,10 @@ export const ENDPOINTS = {
     // Phase 6: Payment tracking endpoints
     payments: (id) => `/api/v1/statements/${id}/payments`,
     registerPayment: (id) => `/api/v1/statements/${id}/payments`,
+    // Documentos imprimibles (format: html | txt)
+    document: (id, format = 'html') => `/api/v1/statements/${id}/document?format=${format}`,
+    renderPeriod: (periodId) => `/api/v1/statements/periods/${periodId}/render`,
+    periodDocumentsZip: (periodId, format = 'html') => `/api/v1/statements/periods/${periodId}/documents.zip?format=${format}`,
   },
 
   // Cut Periods (Estados de Cuenta base)
@@ -110,6 +115,8 @@ export const ENDPOINTS = {
     list: '/api/v1/rate-profiles',
     detail: (code) => `/api/v1/rate-profiles/${code}`,
     reference: '/api/v1/rate-profiles/reference',
+    update: (code) => `/api/v1/rate-profiles/${code}`,  // PATCH: regenera la tabla de referencia del perfil
+    regenerateReference: '/api/v1/rate-profiles/reference/regenerate',
   },
 
   // Simulator
@@ -126,6 +133,7 @@ export const ENDPOINTS = {
     createDefaultedReport: '/api/v1/defaulted-reports',
     approveDefaultedReport: (id) => `/api/v1/defaulted-reports/${id}/approve`,
     rejectDefaultedReport: (id) => `/api/v1/defaulted-reports/${id}/reject`,
+    defaultedReportEvidence: (id) => `/api/v1/defaulted-reports/${id}/evidence`,
     associateDefaultedReports: (associateProfileId) => `/api/v1/defaulted-reports/associate/${associateProfileId}`,
     
     // Convenios
@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Asesor de Índices por Carga Real - CrediNet v2.0
+================================================
+
+Lee las estadísticas de PostgreSQL después de repetir una carga de trabajo
+(el benchmark de backend/benchmarks) y propone qué índices sobran y cuáles
+faltan para los caminos de acceso que realmente se usan.
+
+Fuentes:
+- pg_stat_user_indexes / pg_stat_user_tables: uso de cada índice, tamaño,
+  UPDATEs y porcentaje HOT (amplificación de escritura).
+- pg_stat_statements (si la extensión está instalada): consultas ejecutadas
+  y sus llamadas, para obtener los caminos de acceso (columnas filtradas).
+- --source DIR: SQL del código (backend/app, db/v2.0/modules). Es la única
+  fuente de predicados literales (status_id IN (1, 2), is_late = true)
+  porque pg_stat_statements normaliza las constantes a $n.
+
+Reglas:
+1. Índice sin uso (idx_scan = 0 en la ventana medida) → DROP
+2. Índice cubierto por el prefijo de otro índice → DROP
+3. UNIQUE parcial "WHERE col IS NOT NULL" sobre una columna de la llave →
+   UNIQUE completo (mismo efecto: los NULL nunca chocan) y así sirve a las
+   búsquedas por la primera columna
+4. Camino de acceso con 2+ columnas de igualdad sin índice compuesto → CREATE
+   (y el índice de una sola columna que queda como prefijo → DROP)
+5. Filtro literal de baja selectividad (estados abiertos, flags) → índice
+   parcial con ese predicado
+
+Uso:
+    # 1. Reiniciar contadores
+    python scripts/maintenance/index_advisor.py --reset
+
+    # 2. Repetir la carga
+    cd backend && python -m benchmarks --seed --associates 20 --clients 15
+
+    # 3. Reporte y DDL propuesto
+    python scripts/maintenance/index_advisor.py --table payments \\
+        --source backend/app db/v2.0/modules --sql /tmp/payments_indexes.sql
+
+Variables de entorno: DATABASE_URL, o DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD.
+
+⚠️ Las propuestas son un punto de partida: revisarlas, escribir la migración
+y medir antes/después con el benchmark.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import psycopg2
+import psycopg2.extras
+
+# Consultas con menos peso que esto no generan propuestas de índices nuevos
+MIN_PATH_WEIGHT = 2
+# Un predicado literal que cubre más de esta fracción de filas no justifica índice parcial
+MAX_PARTIAL_FRACTION = 0.30
+# Filas por valor de llave a partir de las cuales ya no vale la pena otra columna
+TARGET_ROWS_PER_KEY = 64
+# Escaneos mínimos en la tabla para confiar en "índice sin uso"
+MIN_MEASURED_SCANS = 100
+
+SQL_FILE_SUFFIXES = (".sql", ".py")
+
+
+# =============================================================================
+# MODELO
+# =============================================================================
+
+@dataclass
+class IndexInfo:
+    name: str
+    columns: Tuple[str, ...]
+    predicate: Optional[str]
+    is_unique: bool
+    is_primary: bool
+    is_constraint: bool
+    scans: int
+    size_bytes: int
+    definition: str
+
+
+@dataclass
+class AccessPath:
+    """Columnas que una consulta usa para llegar a la tabla."""
+    equality: Tuple[str, ...]
+    range: Tuple[str, ...] = ()
+    literals: Tuple[str, ...] = ()   # predicados con constantes (solo --source)
+
+
+@dataclass
+class Proposal:
+    action: str      # DROP | CREATE | REPLACE
+    index: str
+    reason: str
+    sql: List[str] = field(default_factory=list)
+
+
+# =============================================================================
+# CONEXIÓN Y ESTADÍSTICAS
+# =============================================================================
+
+def connect():
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return psycopg2.connect(url.replace("postgresql+asyncpg://", "postgresql://"))
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=os.getenv("DB_PORT", "5432"),
+        dbname=os.getenv("DB_NAME", "credinet_db"),
+        user=os.getenv("DB_USER", "credinet_user"),
+        password=os.getenv("DB_PASSWORD", "credinet_pass_2024"),
+    )
+
+
+def has_pg_stat_statements(cur) -> bool:
+    cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+    return cur.fetchone() is not None
+
+
+def reset_stats(cur) -> None:
+    cur.execute("SELECT pg_stat_reset()")
+    if has_pg_stat_statements(cur):
+        cur.execute("SELECT pg_stat_statements_reset()")
+
+
+def load_indexes(cur, table: str) -> List[IndexInfo]:
+    cur.execute("""
+        SELECT
+            i.relname AS name,
+            ARRAY(
+                SELECT a.attname
+                FROM unnest(x.indkey) WITH ORDINALITY k(attnum, ord)
+                JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = k.attnum
+                ORDER BY k.ord
+            ) AS columns,
+            pg_get_expr(x.indpred, x.indrelid) AS predicate,
+            x.indisunique AS is_unique,
+            x.indisprimary AS is_primary,
+            EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid) AS is_constraint,
+            COALESCE(s.idx_scan, 0) AS scans,
+            pg_relation_size(x.indexrelid) AS size_bytes,
+            pg_get_indexdef(x.indexrelid) AS definition
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = x.indexrelid
+        WHERE x.indrelid = %s::regclass
+        ORDER BY i.relname
+    """, (table,))
+    return [
+        IndexInfo(
+            name=row["name"],
+            columns=tuple(row["columns"]),
+            predicate=row["predicate"],
+            is_unique=row["is_unique"],
+            is_primary=row["is_primary"],
+            is_constraint=row["is_constraint"],
+            scans=row["scans"],
+            size_bytes=row["size_bytes"],
+            definition=row["definition"],
+        )
+        for row in cur.fetchall()
+    ]
+
+
+def load_table_stats(cur, table: str) -> Dict:
+    cur.execute("""
+        SELECT
+            COALESCE(s.seq_scan, 0) AS seq_scan,
+            COALESCE(s.idx_scan, 0) AS idx_scan,
+            COALESCE(s.n_tup_ins, 0) AS n_tup_ins,
+            COALESCE(s.n_tup_upd, 0) AS n_tup_upd,
+            COALESCE(s.n_tup_hot_upd, 0) AS n_tup_hot_upd,
+            GREATEST(c.reltuples, 0)::bigint AS n_rows,
+            pg_relation_size(c.oid) AS table_bytes,
+            pg_indexes_size(c.oid) AS index_bytes
+        FROM pg_class c
+        LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+        WHERE c.oid = %s::regclass
+    """, (table,))
+    return dict(cur.fetchone())
+
+
+def load_columns(cur, table: str) -> Dict[str, str]:
+    cur.execute("""
+        SELECT attname, format_type(atttypid, atttypmod) AS type
+        FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+    """, (table,))
+    return {row["attname"]: row["type"] for row in cur.fetchall()}
+
+
+def load_distinct(cur, table: str) -> Dict[str, float]:
+    """n_distinct de pg_stats normalizado a valores positivos (más alto = más selectivo)."""
+    cur.execute("""
+        SELECT s.attname, s.n_distinct, c.reltuples
+        FROM pg_stats s
+        JOIN pg_class c ON c.relname = s.tablename
+        WHERE s.tablename = %s AND s.schemaname = 'public'
+    """, (table,))
+    distinct = {}
+    for row in cur.fetchall():
+        n = row["n_distinct"]
+        distinct[row["attname"]] = -n * max(row["reltuples"], 1) if n < 0 else n
+    return distinct
+
+
+def estimate_fraction(cur, table: str, predicate: str) -> Optional[float]:
+    """Fracción de filas que cumplen un predicado (conteo real, la tabla es local)."""
+    try:
+        cur.execute(f"SELECT AVG(CASE WHEN {predicate} THEN 1.0 ELSE 0 END) AS fraction FROM {table}")
+        value = cur.fetchone()["fraction"]
+        return float(value) if value is not None else None
+    except psycopg2.Error:
+        cur.connection.rollback()
+        return None
+
+
+def load_statements(cur, table: str) -> List[Tuple[str, int]]:
+    cur.execute("""
+        SELECT query, calls
+        FROM pg_stat_statements
+        WHERE query ~* %s
+        ORDER BY calls DESC
+    """, (rf"\m{table}\M",))
+    return [(row["query"], row["calls"]) for row in cur.fetchall()]
+
+
+# =============================================================================
+# CAMINOS DE ACCESO
+# =============================================================================
+
+_TABLE_ALIAS = (
+    r"(?:FROM|JOIN|UPDATE)\s+(?:public\.)?{table}\b"
+    r"(?:\s+(?:AS\s+)?(?!(?:WHERE|SET|JOIN|ON|LEFT|RIGHT|INNER|FULL|CROSS|GROUP|ORDER|LIMIT|USING|RETURNING)\b)(\w+))?"
+)
+_COMPARISON = r"(?<![\w.])(?:(\w+)\.)?({column})\s*(=\s*ANY\s*\(|IN\s*\(|IS\s+NOT\s+NULL|IS\s+NULL|<>|!=|<=|>=|=|<|>|BETWEEN)\s*([^\s,)]*)"
+_LITERAL = re.compile(r"^(?:\d+|true|false|'[^']*')$", re.IGNORECASE)
+
+
+def extract_access_paths(sql: str, table: str, columns: Iterable[str]) -> List[AccessPath]:
+    """
+    Columnas de la tabla filtradas en una sentencia.
+
+    Solo cuenta referencias calificadas con el alias de la tabla (o sin
+    calificar si la sentencia no tiene JOIN), para no confundir loan_id de
+    payments con loan_id de otras tablas.
+    """
+    matches = list(re.finditer(_TABLE_ALIAS.format(table=table), sql, re.IGNORECASE))
+    if not matches:
+        return []
+    # Solo condiciones: fuera la lista de SELECT y los SET de UPDATE
+    sql = re.sub(r"\bSET\b.*?(?=\bWHERE\b|\bFROM\b|$)", " ", sql, flags=re.S | re.IGNORECASE)
+    select = re.match(r"\s*SELECT\b.*?\bFROM\b", sql, re.S | re.IGNORECASE)
+    if select:
+        sql = sql[select.end():]
+    aliases = {(m.group(1) or table).lower() for m in matches} | {table}
+    unqualified_ok = not re.search(r"\bJOIN\b", sql, re.IGNORECASE)
+
+    equality, joins, range_, literals = set(), set(), set(), set()
+    pattern = re.compile(
+        _COMPARISON.format(column="|".join(sorted(columns, key=len, reverse=True))),
+        re.IGNORECASE,
+    )
+    for m in pattern.finditer(sql):
+        qualifier, column, operator, operand = m.group(1), m.group(2).lower(), m.group(3).upper(), m.group(4)
+        if qualifier is None and not unqualified_ok:
+            continue
+        if qualifier is not None and qualifier.lower() not in aliases:
+            continue
+        if operator.startswith(("IS", "<>", "!=")):
+            continue
+        if operator == "=" and re.fullmatch(r"\w+\.\w+", operand or ""):
+            joins.add(column)
+        elif operator.startswith(("=", "IN")):
+            equality.add(column)
+        else:
+            range_.add(column)
+        if operator == "=" and _LITERAL.match(operand or ""):
+            literals.add(f"{column} = {operand}")
+        elif operator.startswith("IN"):
+            values = re.match(r"IN\s*\(([^)]*)\)", sql[m.start(3):], re.IGNORECASE)
+            if values and all(_LITERAL.match(v.strip()) for v in values.group(1).split(",")):
+                literals.add(f"{column} IN ({', '.join(v.strip() for v in values.group(1).split(','))})")
+
+    # Una condición de JOIN solo es camino de acceso si no hay otro filtro
+    if not equality and not range_:
+        equality = joins
+    if not equality and not range_:
+        return []
+    return [AccessPath(
+        equality=tuple(sorted(equality)),
+        range=tuple(sorted(range_ - equality)),
+        literals=tuple(sorted(literals)),
+    )]
+
+
+def scan_sources(paths: Iterable[str], table: str) -> List[Tuple[str, int]]:
+    """Sentencias SQL del código que mencionan la tabla (peso 1 cada una)."""
+    statements = []
+    for root in paths:
+        for file in sorted(Path(root).rglob("*")):
+            if file.suffix not in SQL_FILE_SUFFIXES or "__pycache__" in file.parts:
+                continue
+            content = file.read_text(encoding="utf-8", errors="ignore")
+            chunks = re.findall(r'"""(.*?)"""', content, re.S) if file.suffix == ".py" else content.split(";")
+            for chunk in chunks:
+                if re.search(rf"\b{table}\b", chunk, re.IGNORECASE):
+                    statements.append((chunk, 1))
+    return statements
+
+
+def aggregate_paths(statements, table: str, columns: Iterable[str]) -> Counter:
+    weights = Counter()
+    for sql, calls in statements:
+        for path in extract_access_paths(sql, table, columns):
+            weights[(path.equality, path.range, path.literals)] += calls
+    return weights
+
+
+# =============================================================================
+# REGLAS
+# =============================================================================
+
+def _serves(index: IndexInfo, key: Tuple[str, ...], predicate: Optional[str]) -> bool:
+    """¿El índice empieza con esas columnas (en cualquier orden) y su predicado es compatible?"""
+    return (
+        set(index.columns[:len(key)]) == set(key)
+        and index.predicate in (None, predicate)
+    )
+
+
+def _choose_key(
+    equality: Tuple[str, ...],
+    distinct: Dict[str, float],
+    rows: float,
+) -> Tuple[str, ...]:
+    """
+    Columnas de igualdad por selectividad, hasta que la llave deje pocas filas
+    por valor (agregar status_id a loan_id no ayuda si cada préstamo tiene 24
+    pagos).
+    """
+    key: List[str] = []
+    remaining = rows
+    for column in sorted(equality, key=lambda c: -distinct.get(c, 1)):
+        key.append(column)
+        remaining /= max(distinct.get(column, 1), 1)
+        if remaining <= TARGET_ROWS_PER_KEY:
+            break
+    return tuple(key)
+
+
+def advise(
+    table: str,
+    indexes: List[IndexInfo],
+    stats: Dict,
+    paths: Counter,
+    distinct: Dict[str, float],
+    fraction_of=None,
+) -> List[Proposal]:
+    proposals: List[Proposal] = []
+    dropped = set()
+    rows = max(stats["n_rows"], 1)
+    measured = stats["seq_scan"] + stats["idx_scan"] >= MIN_MEASURED_SCANS
+    unique_columns = {i.columns[0] for i in indexes if i.is_unique and len(i.columns) == 1}
+
+    def drop(index: IndexInfo, reason: str):
+        if index.name in dropped or index.is_primary or index.is_constraint:
+            return
+        dropped.add(index.name)
+        proposals.append(Proposal("DROP", index.name, reason, [f"DROP INDEX IF EXISTS {index.name};"]))
+
+    # 3. UNIQUE parcial "IS NOT NULL" → UNIQUE completo
+    replacements = []
+    for index in indexes:
+        m = re.fullmatch(r"\(?(\w+) IS NOT NULL\)?", index.predicate or "")
+        if index.is_unique and m and m.group(1) in index.columns and not index.is_constraint:
+            name = f"idx_{table}_{'_'.join(index.columns)}"
+            proposals.append(Proposal(
+                "REPLACE", index.name,
+                f"UNIQUE parcial sobre {m.group(1)} IS NOT NULL: un UNIQUE completo tiene la misma "
+                f"semántica (NULLs distintos) y sirve búsquedas por {index.columns[0]}",
+                [f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(index.columns)});",
+                 f"DROP INDEX IF EXISTS {index.name};"],
+            ))
+            dropped.add(index.name)
+            replacements.append(IndexInfo(name, index.columns, None, True, False, False, 1, 0, ""))
+    # Los UNIQUE primero: son los que nunca se pueden borrar
+    effective = replacements + sorted(
+        (i for i in indexes if i.name not in dropped), key=lambda i: not i.is_unique
+    )
+
+    # 4 y 5. Caminos de acceso → llave de índice; el peso se suma por llave
+    keys: Counter = Counter()
+    for (equality, range_, literals), weight in paths.items():
+        if unique_columns & set(equality):
+            continue
+        # Predicado parcial: filtro literal que cubre pocas filas
+        predicate = None
+        for literal in literals:
+            fraction = fraction_of(literal) if fraction_of else None
+            if fraction is not None and fraction <= MAX_PARTIAL_FRACTION:
+                predicate = literal
+                break
+        candidates = tuple(c for c in equality if not (predicate and predicate.startswith(c + " ")))
+        key = _choose_key(candidates, distinct, rows)
+        if not key and predicate:
+            # El filtro literal es todo el camino (is_late = true): índice parcial mínimo
+            key = (predicate.split(" ")[0],)
+        with_range = False
+        if range_ and (not key or rows / max(distinct.get(key[0], 1), 1) > TARGET_ROWS_PER_KEY):
+            key += range_[:1]
+            with_range = True
+        if key:
+            keys[(key, predicate, with_range)] += weight
+
+    used = set()
+    leading_created = set()
+    # Mayor peso primero; a igual peso, llaves de igualdad antes que de rango
+    for (key, predicate, with_range), weight in sorted(keys.items(), key=lambda kv: (-kv[1], kv[0][2])):
+        serving = next((i for i in effective if _serves(i, key, predicate)), None)
+        if serving is not None:
+            used.add(serving.name)
+            continue
+        # Un índice nuevo por columna líder: el resto de caminos lo comparte
+        if weight < MIN_PATH_WEIGHT or (key[0], predicate) in leading_created:
+            continue
+        leading_created.add((key[0], predicate))
+        suffix = "_open" if predicate and "IN (" in predicate else "_partial" if predicate else ""
+        name = f"idx_{table}_{'_'.join(key)}{suffix}"
+        where = f" WHERE {predicate}" if predicate else ""
+        reason = f"camino de acceso ({' + '.join(key)}{'; ' + predicate if predicate else ''}) con peso {weight}"
+        proposals.append(Proposal("CREATE", name, reason,
+                                  [f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(key)}){where};"]))
+        effective.append(IndexInfo(name, key, predicate, False, False, False, 1, 0, ""))
+        used.add(name)
+
+    # 2. Prefijos redundantes
+    for index in indexes:
+        if index.is_unique or index.name in dropped:
+            continue
+        for other in effective:
+            if other.name == index.name or other.name in dropped:
+                continue
+            if (len(other.columns) > len(index.columns)
+                    and other.columns[:len(index.columns)] == index.columns
+                    and other.predicate in (None, index.predicate)):
+                drop(index, f"cubierto por el prefijo de {other.name} ({', '.join(other.columns)})")
+                break
+
+    # 1. Sin uso en la ventana medida (ni como respaldo de un camino de acceso)
+    if measured:
+        for index in indexes:
+            if index.scans == 0 and not index.is_unique and index.name not in used:
+                drop(index, "0 escaneos durante la carga medida")
+
+    return proposals
+
+
+# =============================================================================
+# REPORTE
+# =============================================================================
+
+def _mb(value: int) -> str:
+    return f"{value / 1024 / 1024:.2f} MB"
+
+
+def print_report(table: str, indexes, stats, paths, proposals, source_label: str) -> None:
+    print(f"\n📊 Índices de {table} ({len(indexes)}) — fuente de consultas: {source_label}")
+    print(f"   Tabla {_mb(stats['table_bytes'])}, índices {_mb(stats['index_bytes'])}, "
+          f"{stats['n_rows']:,} filas")
+    hot = stats["n_tup_hot_upd"] / stats["n_tup_upd"] * 100 if stats["n_tup_upd"] else 0
+    print(f"   UPDATEs: {stats['n_tup_upd']:,} ({hot:.1f}% HOT), INSERTs: {stats['n_tup_ins']:,}, "
+          f"seq_scan: {stats['seq_scan']:,}, idx_scan: {stats['idx_scan']:,}")
+    for index in indexes:
+        flags = "PK" if index.is_primary else "UQ" if index.is_unique else "  "
+        where = f" WHERE {index.predicate}" if index.predicate else ""
+        print(f"   {flags} {index.name:<42} {index.scans:>8,} scans {_mb(index.size_bytes):>10}  "
+              f"({', '.join(index.columns)}){where}")
+
+    if paths:
+        print("\n🧭 Caminos de acceso (peso):")
+        for (equality, range_, literals), weight in paths.most_common(15):
+            parts = list(equality) + [f"{c} (rango)" for c in range_]
+            extra = f"  [{'; '.join(literals)}]" if literals else ""
+            print(f"   {weight:>6}  {' + '.join(parts)}{extra}")
+
+    if not proposals:
+        print("\n✅ Sin propuestas")
+        return
+    print("\n💡 Propuestas:")
+    for p in proposals:
+        icon = {"DROP": "🗑️", "CREATE": "➕", "REPLACE": "🔁"}[p.action]
+        print(f"   {icon} {p.action:<7} {p.index}: {p.reason}")
+
+    before = len(indexes)
+    after = before - sum(1 for p in proposals if p.action == "DROP") + sum(1 for p in proposals if p.action == "CREATE")
+    print(f"\n✍️ Entradas de índice por INSERT / UPDATE no-HOT: {before} → {after}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Asesor de índices por carga real")
+    parser.add_argument("--table", default="payments", help="Tabla a analizar (default: payments)")
+    parser.add_argument("--reset", action="store_true",
+                        help="Reiniciar pg_stat_* (y pg_stat_statements) antes de repetir la carga")
+    parser.add_argument("--source", nargs="*", default=[],
+                        help="Directorios con SQL del código (backend/app db/v2.0/modules)")
+    parser.add_argument("--json", help="Guardar reporte JSON")
+    parser.add_argument("--sql", help="Guardar DDL propuesto")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    conn.autocommit = True
+    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+    if args.reset:
+        reset_stats(cur)
+        print("🔄 Estadísticas reiniciadas. Repite la carga y vuelve a correr el asesor.")
+        return 0
+
+    table = args.table
+    indexes = load_indexes(cur, table)
+    stats = load_table_stats(cur, table)
+    columns = load_columns(cur, table)
+    distinct = load_distinct(cur, table)
+
+    statements, sources = [], []
+    if has_pg_stat_statements(cur):
+        statements += load_statements(cur, table)
+        sources.append("pg_stat_statements")
+    else:
+        print("⚠️ pg_stat_statements no está instalada: solo se usan pg_stat_user_indexes"
+              + (" y --source" if args.source else ""))
+    if args.source:
+        statements += scan_sources(args.source, table)
+        sources.append("código")
+
+    paths = aggregate_paths(statements, table, columns)
+    fraction_cache: Dict[str, Optional[float]] = {}
+
+    def fraction_of(predicate: str) -> Optional[float]:
+        if predicate not in fraction_cache:
+            fraction_cache[predicate] = estimate_fraction(cur, table, predicate)
+        return fraction_cache[predicate]
+
+    proposals = advise(table, indexes, stats, paths, distinct, fraction_of)
+    print_report(table, indexes, stats, paths, proposals, " + ".join(sources) or "ninguna")
+
+    if args.sql:
+        with open(args.sql, "w", encoding="utf-8") as f:
+            f.write(f"-- Propuestas del asesor de índices para {table}\n")
+            for p in proposals:
+                f.write(f"\n-- {p.action} {p.index}: {p.reason}\n")
+                f.write("\n".join(p.sql) + "\n")
+        print(f"\n💾 DDL guardado en {args.sql}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "table": table,
+                "stats": stats,
+                "indexes": [asdict(i) for i in indexes],
+                "access_paths": [
+                    {"equality": list(e), "range": list(r), "literals": list(l), "weight": w}
+                    for (e, r, l), w in paths.most_common()
+                ],
+                "proposals": [asdict(p) for p in proposals],
+            }, f, indent=2, default=str)
+        print(f"💾 Reporte guardado en {args.json}")
+
+    cur.close()
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -50,8 +50,8 @@ echo ""
 echo "⏳ Esperando a que Backend esté listo..."
 sleep 3
 
-# Verificar que backend esté healthy
-until curl -sf http://localhost:8000/health &>/dev/null; do
+# Verificar que backend esté listo (/ready espera al warm-up)
+until curl -sf http://localhost:8000/ready &>/dev/null; do
     echo "   Esperando Backend..."
     sleep 2
 done
@@ -64,6 +64,7 @@ echo "━━━━━━━━━━━━━━━━━━━━━━━━
 echo ""
 echo "📍 Endpoints disponibles:"
 echo "   • Health:  http://localhost:8000/health"
+echo "   • Ready:   http://localhost:8000/ready"
 echo "   • API:     http://localhost:8000/api/v1"
 echo "   • Docs:    http://localhost:8000/docs"
 echo ""